@@ -16,12 +16,21 @@ import functools
 import jsonschema
 from oslo_utils import strutils
 import six
+from six.moves.urllib import parse as urlparse
 from webob import exc
 
+from senlin.api.common import version_request
+from senlin.common import consts
 from senlin.common.i18n import _
 from senlin.common import policy
 from senlin.objects import base as obj_base
 
+# The API version since which actions have a priority
+PRIORITY_VERSION = version_request.APIVersionRequest('1.4')
+
+# The API version since which list requests can be paged with cursors
+CURSOR_VERSION = version_request.APIVersionRequest('1.5')
+
 
 def policy_enforce(handler):
     """Decorator that enforces policies.
@@ -116,3 +125,42 @@ def parse_bool_param(name, value):
         raise exc.HTTPBadRequest(msg)
 
     return strutils.bool_from_string(value, strict=True)
+
+
+def allow_cursor(req, whitelist):
+    """Accept a pagination cursor if the API version of a request allows.
+
+    :param req: The WSGI request object of a list request.
+    :param whitelist: The whitelist of parameters of the request, to which
+                      the 'cursor' parameter is added.
+    :returns: True if the request is to be paged with cursors.
+    """
+    if req.version_request < CURSOR_VERSION:
+        return False
+
+    whitelist[consts.PARAM_CURSOR] = 'single'
+    return True
+
+
+def paginated_result(req, name, result):
+    """Build the response body of a list request.
+
+    Results of requests paged with a cursor carry a link to the next page,
+    unless the last page has been reached.
+
+    :param req: The WSGI request object of a list request.
+    :param name: The name of the collection listed.
+    :param result: The result of the RPC call.
+    :returns: The response body.
+    """
+    if not isinstance(result, dict):
+        return {name: result}
+
+    body = {name: result['items']}
+    if result['next']:
+        params = [(k, v) for k, v in req.GET.items()
+                  if k not in (consts.PARAM_CURSOR, consts.PARAM_MARKER)]
+        params.append((consts.PARAM_CURSOR, result['next']))
+        href = '%s?%s' % (req.path_url, urlparse.urlencode(params))
+        body[name + '_links'] = [{'rel': 'next', 'href': href}]
+    return body
@@ -42,6 +42,7 @@ from senlin.api.common import version_request
 from senlin.api.common import versioned_method
 from senlin.common import exception
 from senlin.common.i18n import _, _LE, _LI, _LW
+from senlin.common import metrics
 from senlin.rpc import client as rpc_client
 
 
@@ -205,6 +206,7 @@ class Server(object):
         if self.conf.workers == 0:
             # Useful for profiling, test, debug etc.
             self.pool = eventlet.GreenPool(size=self.threads)
+            metrics.setup(cfg.CONF.metrics.api_port)
             self.pool.spawn_n(self._single_run, self.application, self.sock)
             return
 
@@ -420,6 +422,7 @@ class Server(object):
         eventlet.patcher.monkey_patch(all=False, socket=True)
         self.pool = eventlet.GreenPool(size=self.threads)
         socket_timeout = cfg.CONF.senlin_api.client_socket_timeout or None
+        metrics.setup(cfg.CONF.metrics.api_port, tries=self.conf.workers)
 
         try:
             eventlet.wsgi.server(
@@ -614,6 +617,12 @@ class Resource(object):
         """WSGI method that controls (de)serialization and method dispatch."""
         action_args = self.get_action_args(request.environ)
         action = action_args.pop('action', None)
+        with metrics.API_REQUEST_SECONDS.time(
+                controller=self.controller.__class__.__name__,
+                action=action):
+            return self._process(request, action, action_args)
+
+    def _process(self, request, action, action_args):
         status_code = action_args.pop('success', None)
 
         try:
@@ -47,6 +47,18 @@ class ActionData(object):
         return dict((k, v) for k, v in data if k not in self.PARAMS)
 
 
+def _versioned_action(req, action):
+    """Drop the fields of an action unknown to the API version requested.
+
+    :param req: The WSGI request object.
+    :param action: The representation of an action returned by the engine.
+    :returns: The representation of the action.
+    """
+    if req.version_request < util.PRIORITY_VERSION:
+        action.pop(consts.ACTION_PRIORITY, None)
+    return action
+
+
 class ActionController(wsgi.Controller):
     """WSGI controller for Actions in Senlin v1 API."""
 
@@ -65,10 +77,14 @@ class ActionController(wsgi.Controller):
             consts.PARAM_SORT: 'single',
             consts.PARAM_GLOBAL_PROJECT: 'single',
         }
+        paginated = util.allow_cursor(req, whitelist)
         for key in req.params.keys():
             if key not in whitelist.keys():
                 raise exc.HTTPBadRequest(_('Invalid parameter %s') % key)
         params = util.get_allowed_params(req.params, whitelist)
+        if paginated:
+            params[consts.PARAM_CURSOR] = req.params.get(
+                consts.PARAM_CURSOR)
 
         project_safe = not util.parse_bool_param(
             consts.PARAM_GLOBAL_PROJECT,
@@ -77,8 +93,11 @@ class ActionController(wsgi.Controller):
 
         obj = util.parse_request('ActionListRequest', req, params)
         actions = self.rpc_client.call2(req.context, "action_list", obj)
+        items = actions['items'] if isinstance(actions, dict) else actions
+        for action in items:
+            _versioned_action(req, action)
 
-        return {'actions': actions}
+        return util.paginated_result(req, 'actions', actions)
 
     @util.policy_enforce
     def create(self, req, body):
@@ -97,4 +116,43 @@ class ActionController(wsgi.Controller):
         obj = util.parse_request('ActionGetRequest', req, params)
         action = self.rpc_client.call2(req.context, 'action_get', obj)
 
+        return {'action': _versioned_action(req, action)}
+
+    @wsgi.Controller.api_version('1.6')
+    @util.policy_enforce
+    def timing(self, req):
+        whitelist = {
+            consts.ACTION_ACTION: 'mixed',
+            'cluster': 'single',
+            'since': 'single',
+            consts.PARAM_LIMIT: 'single',
+            consts.PARAM_GLOBAL_PROJECT: 'single',
+        }
+        for key in req.params.keys():
+            if key not in whitelist.keys():
+                raise exc.HTTPBadRequest(_('Invalid parameter %s') % key)
+        params = util.get_allowed_params(req.params, whitelist)
+
+        project_safe = not util.parse_bool_param(
+            consts.PARAM_GLOBAL_PROJECT,
+            params.pop(consts.PARAM_GLOBAL_PROJECT, False))
+        params['project_safe'] = project_safe
+
+        obj = util.parse_request('ActionTimingRequest', req, params)
+        timing = self.rpc_client.call2(req.context, 'action_timing', obj)
+
+        return {'timing': timing}
+
+    @wsgi.Controller.api_version('1.4')
+    @util.policy_enforce
+    def update(self, req, action_id, body):
+        data = body.get('action', None)
+        if data is None:
+            raise exc.HTTPBadRequest(_("Malformed request data, missing "
+                                       "'action' key in request body."))
+        params = dict(data)
+        params['identity'] = action_id
+        obj = util.parse_request('ActionUpdateRequest', req, params)
+        action = self.rpc_client.call2(req.context, 'action_update', obj)
+
         return {'action': action}
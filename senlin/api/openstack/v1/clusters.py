@@ -49,11 +49,15 @@ class ClusterController(wsgi.Controller):
             consts.PARAM_SORT: 'single',
             consts.PARAM_GLOBAL_PROJECT: 'single',
         }
+        paginated = util.allow_cursor(req, whitelist)
         for key in req.params.keys():
             if key not in whitelist:
                 raise exc.HTTPBadRequest(_("Invalid parameter '%s'") % key)
 
         params = util.get_allowed_params(req.params, whitelist)
+        if paginated:
+            params[consts.PARAM_CURSOR] = req.params.get(
+                consts.PARAM_CURSOR)
         # Note: We have to do a boolean parsing here because 1) there is
         # a renaming, 2) the boolean is usually presented as a string.
         is_global = params.pop(consts.PARAM_GLOBAL_PROJECT, False)
@@ -61,7 +65,7 @@ class ClusterController(wsgi.Controller):
         params['project_safe'] = not unsafe
         req_obj = util.parse_request('ClusterListRequest', req, params)
         clusters = self.rpc_client.call2(req.context, 'cluster_list2', req_obj)
-        return {'clusters': clusters}
+        return util.paginated_result(req, 'clusters', clusters)
 
     @util.policy_enforce
     def create(self, req, body):
@@ -43,10 +43,14 @@ class EventController(wsgi.Controller):
             consts.PARAM_GLOBAL_PROJECT: 'single',
         }
 
+        paginated = util.allow_cursor(req, whitelist)
         for key in req.params.keys():
             if key not in whitelist.keys():
                 raise exc.HTTPBadRequest(_('Invalid parameter %s') % key)
         params = util.get_allowed_params(req.params, whitelist)
+        if paginated:
+            params[consts.PARAM_CURSOR] = req.params.get(
+                consts.PARAM_CURSOR)
 
         project_safe = not util.parse_bool_param(
             consts.PARAM_GLOBAL_PROJECT,
@@ -56,7 +60,7 @@ class EventController(wsgi.Controller):
         obj = util.parse_request('EventListRequest', req, params)
         events = self.rpc_client.call2(req.context, "event_list2", obj)
 
-        return {'events': events}
+        return util.paginated_result(req, 'events', events)
 
     @util.policy_enforce
     def get(self, req, event_id):
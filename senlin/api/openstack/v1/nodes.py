@@ -43,10 +43,14 @@ class NodeController(wsgi.Controller):
             consts.PARAM_SORT: 'single',
             consts.PARAM_GLOBAL_PROJECT: 'single'
         }
+        paginated = util.allow_cursor(req, whitelist)
         for key in req.params.keys():
             if key not in whitelist.keys():
                 raise exc.HTTPBadRequest(_('Invalid parameter %s') % key)
         params = util.get_allowed_params(req.params, whitelist)
+        if paginated:
+            params[consts.PARAM_CURSOR] = req.params.get(
+                consts.PARAM_CURSOR)
 
         project_safe = not util.parse_bool_param(
             consts.PARAM_GLOBAL_PROJECT,
@@ -55,7 +59,7 @@ class NodeController(wsgi.Controller):
 
         obj = util.parse_request('NodeListRequest', req, params)
         nodes = self.rpc_client.call2(req.context, 'node_list2', obj)
-        return {'nodes': nodes}
+        return util.paginated_result(req, 'nodes', nodes)
 
     @util.policy_enforce
     def create(self, req, body):
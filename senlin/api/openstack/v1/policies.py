@@ -39,18 +39,22 @@ class PolicyController(wsgi.Controller):
             consts.PARAM_SORT: 'single',
             consts.PARAM_GLOBAL_PROJECT: 'single',
         }
+        paginated = util.allow_cursor(req, whitelist)
         for key in req.params.keys():
             if key not in whitelist:
                 raise exc.HTTPBadRequest(_('Invalid parameter %s') % key)
 
         params = util.get_allowed_params(req.params, whitelist)
+        if paginated:
+            params[consts.PARAM_CURSOR] = req.params.get(
+                consts.PARAM_CURSOR)
         is_global = params.pop(consts.PARAM_GLOBAL_PROJECT, False)
 
         unsafe = util.parse_bool_param(consts.PARAM_GLOBAL_PROJECT, is_global)
         params['project_safe'] = not unsafe
         obj = util.parse_request('PolicyListRequest', req, params)
         policies = self.rpc_client.call2(req.context, 'policy_list2', obj)
-        return {'policies': policies}
+        return util.paginated_result(req, 'policies', policies)
 
     @util.policy_enforce
     def create(self, req, body):
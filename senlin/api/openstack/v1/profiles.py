@@ -39,11 +39,15 @@ class ProfileController(wsgi.Controller):
             consts.PARAM_SORT: 'single',
             consts.PARAM_GLOBAL_PROJECT: 'single',
         }
+        paginated = util.allow_cursor(req, whitelist)
         for key in req.params.keys():
             if key not in whitelist.keys():
                 raise exc.HTTPBadRequest(_('Invalid parameter %s') % key)
 
         params = util.get_allowed_params(req.params, whitelist)
+        if paginated:
+            params[consts.PARAM_CURSOR] = req.params.get(
+                consts.PARAM_CURSOR)
 
         project_safe = not util.parse_bool_param(
             consts.PARAM_GLOBAL_PROJECT,
@@ -52,7 +56,7 @@ class ProfileController(wsgi.Controller):
 
         obj = util.parse_request('ProfileListRequest', req, params)
         profiles = self.rpc_client.call2(req.context, 'profile_list2', obj)
-        return {'profiles': profiles}
+        return util.paginated_result(req, 'profiles', profiles)
 
     @util.policy_enforce
     def create(self, req, body):
@@ -232,10 +232,18 @@ class API(wsgi.Router):
                                action="create",
                                conditions={'method': 'POST'},
                                success=201)
+            sub_mapper.connect("action_timing",
+                               "/action-timing",
+                               action="timing",
+                               conditions={'method': 'GET'})
             sub_mapper.connect("action_get",
                                "/actions/{action_id}",
                                action="get",
                                conditions={'method': 'GET'})
+            sub_mapper.connect("action_update",
+                               "/actions/{action_id}",
+                               action="update",
+                               conditions={'method': 'PATCH'})
 
         # Receivers
         res = wsgi.Resource(receivers.ReceiverController(conf))
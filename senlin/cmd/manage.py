@@ -61,6 +61,8 @@ class ServiceManageCommand(object):
             'binary': service.binary,
             'host': service.host,
             'topic': service.topic,
+            'capacity': ('-' if service.capacity is None
+                         else service.capacity),
             'created_at': service.created_at,
             'updated_at': service.updated_at,
             'status': status
@@ -71,12 +73,13 @@ class ServiceManageCommand(object):
         services = [self._format_service(service)
                     for service in service_obj.Service.get_all(self.ctx)]
 
-        print_format = "%-36s %-24s %-16s %-16s %-10s %-24s %-24s"
+        print_format = "%-36s %-24s %-16s %-16s %-10s %-8s %-24s %-24s"
         print(print_format % (_('Service ID'),
                               _('Host'),
                               _('Binary'),
                               _('Topic'),
                               _('Status'),
+                              _('Capacity'),
                               _('Created At'),
                               _('Updated At')))
 
@@ -86,6 +89,7 @@ class ServiceManageCommand(object):
                                   svc['binary'],
                                   svc['topic'],
                                   svc['status'],
+                                  svc['capacity'],
                                   svc['created_at'],
                                   svc['updated_at']))
 
@@ -117,6 +121,7 @@ def add_command_parsers(subparsers):
     parser.add_argument('version', nargs='?')
     parser.add_argument('current_version', nargs='?')
 
+
 command_opt = cfg.SubCommandOpt('command',
                                 title='Commands',
                                 help='Show available commands.',
@@ -56,6 +56,12 @@ engine_opts = [
     cfg.IntOpt('max_nodes_per_cluster',
                default=1000,
                help=_('Maximum nodes allowed per top-level cluster.')),
+    cfg.IntOpt('node_chunk_size',
+               default=100,
+               min=1,
+               help=_('Number of nodes fetched from the database at a time '
+                      'by the operations iterating over all the nodes of a '
+                      'cluster.')),
     cfg.IntOpt('max_clusters_per_project',
                default=100,
                help=_('Maximum number of clusters any one project may have'
@@ -66,12 +72,100 @@ engine_opts = [
     cfg.IntOpt('max_actions_per_batch',
                default=0,
                help=_('Maximum number of node actions that each engine worker '
-                      'can schedule consecutively per batch. 0 means no '
-                      'limit.')),
+                      'can start in a burst against the cloud backend. '
+                      'Further node actions are left unclaimed so that no '
+                      'more than this number of actions are started in '
+                      'every batch_interval. 0 means no limit.')),
+    cfg.IntOpt('cluster_actions_per_batch',
+               default=0,
+               help=_('Maximum number of node actions of a single cluster '
+                      'that each engine worker can start in a burst. Further '
+                      'node actions of the cluster are given back so that '
+                      'no more than this number of actions are started in '
+                      'every batch_interval. 0 means no limit.')),
     cfg.IntOpt('batch_interval',
                default=3,
-               help=_('Seconds to pause between scheduling two consecutive '
-                      'batches of node actions.')),
+               help=_('Seconds over which the node actions allowed by '
+                      'max_actions_per_batch and cluster_actions_per_batch '
+                      'are started.')),
+    cfg.FloatOpt('dispatch_coalesce_window',
+                 default=0.05,
+                 help=_('Seconds during which notifications to start ready '
+                        'actions are coalesced before being sent to the '
+                        'engines with free capacity. 0 means every '
+                        'notification is sent immediately.')),
+    cfg.IntOpt('max_actions_per_engine',
+               default=0,
+               help=_('Maximum number of actions that each engine worker can '
+                      'run at the same time, not counting actions waiting '
+                      'for their dependents. A saturated engine stops '
+                      'claiming ready actions, leaving them to other '
+                      'engines. 0 means no limit.')),
+    cfg.DictOpt('max_actions_per_class',
+                default={},
+                help=_('Maximum number of actions of a class that each engine '
+                       'worker can run at the same time, as a list of '
+                       'class:number pairs where the class is the prefix of '
+                       'the action names, e.g. "cluster:50,node:500".')),
+    cfg.DictOpt('action_coalescing',
+                default={},
+                help=_('Rules for merging a new action requested by a user '
+                       'into a ready action of the same target requested by '
+                       'the same user, as a list of action:mode pairs, e.g. '
+                       '"CLUSTER_SCALE_OUT:sum,CLUSTER_CHECK:drop". The '
+                       '"drop" mode drops a new action whose inputs are the '
+                       'same as those of the ready action. The "sum" mode '
+                       'adds the count of a new scaling action to the ready '
+                       'one. The ID of the ready action is returned in both '
+                       'cases.')),
+    cfg.IntOpt('max_coalesced_count',
+               default=10,
+               help=_('Maximum count of a scaling action resulting from '
+                      'merging actions in the "sum" mode. 0 means no '
+                      'limit.')),
+    cfg.IntOpt('action_starvation_timeout',
+               default=300,
+               help=_('Seconds after which a ready action is claimed before '
+                      'any newer action regardless of its priority, so that '
+                      'actions of a low priority are not starved. 0 means '
+                      'priorities are always strictly honored.')),
+    cfg.BoolOpt('action_fair_share',
+                default=False,
+                help=_('Whether ready actions are claimed fairly among '
+                       'projects, from the project running the fewest '
+                       'actions relative to its weight, instead of from the '
+                       'whole queue.')),
+    cfg.IntOpt('max_actions_per_project',
+               default=0,
+               help=_('Maximum number of actions of a single project running '
+                      'at the same time across all engines when '
+                      'action_fair_share is enabled. 0 means unlimited.')),
+    cfg.DictOpt('project_action_weights',
+                default={},
+                help=_('Relative weights of projects for claiming ready '
+                       'actions when action_fair_share is enabled, as a list '
+                       'of project_id:weight pairs. Projects not listed have '
+                       'a weight of 1.')),
+    cfg.IntOpt('placement_refresh_interval',
+               default=600,
+               help=_('Seconds after which the availability zone data '
+                      'recorded for a node is considered stale and is '
+                      'refreshed by the health manager. 0 means never.')),
+    cfg.StrOpt('json_column_encoding',
+               default='json',
+               choices=['json', 'msgpack'],
+               help=_('Encoding of the values written to the JSON columns of '
+                      'the database, such as the inputs, outputs and data '
+                      'of actions. Values in any encoding can be read, so '
+                      'the encoding can be changed at any time. The msgpack '
+                      'encoding requires the msgpack package, installed '
+                      'with the "msgpack" extra of senlin.')),
+    cfg.IntOpt('json_column_compress_threshold',
+               default=0,
+               min=0,
+               help=_('Size in bytes above which the values written to the '
+                      'JSON columns of the database are compressed with '
+                      'zlib. 0 means values are never compressed.')),
     cfg.IntOpt('lock_retry_times',
                default=3,
                help=_('Number of times trying to grab a lock.')),
@@ -156,6 +250,30 @@ healthmgr_opts = [
 cfg.CONF.register_group(healthmgr_group)
 cfg.CONF.register_opts(healthmgr_opts, group=healthmgr_group)
 
+# Metrics group
+metrics_group = cfg.OptGroup('metrics')
+metrics_opts = [
+    cfg.BoolOpt('enabled', default=False,
+                help=_('Whether to collect metrics and serve them in the '
+                       'Prometheus text format.')),
+    cfg.StrOpt('bind_host', default='127.0.0.1',
+               help=_('Address to serve metrics on.')),
+    cfg.PortOpt('engine_port', default=9780,
+                help=_('Port to serve senlin-engine metrics on. When there '
+                       'are multiple engine workers, each of them takes the '
+                       'first free port from this one on.')),
+    cfg.PortOpt('api_port', default=9790,
+                help=_('Port to serve senlin-api metrics on. When there '
+                       'are multiple API workers, each of them takes the '
+                       'first free port from this one on.')),
+    cfg.IntOpt('sample_interval', default=15, min=1,
+               help=_('Seconds between samples of metrics which need a '
+                      'database query, e.g. the number of actions by '
+                      'status.')),
+]
+cfg.CONF.register_group(metrics_group)
+cfg.CONF.register_opts(metrics_opts, group=metrics_group)
+
 # Revision group
 revision_group = cfg.OptGroup('revision')
 revision_opts = [
@@ -232,6 +350,7 @@ def list_opts():
     yield 'DEFAULT', service_opts
     yield authentication_group.name, authentication_opts
     yield revision_group.name, revision_opts
+    yield metrics_group.name, metrics_opts
     yield receiver_group.name, receiver_opts
     yield zaqar_group.name, zaqar_opts
     yield profiler.list_opts()[0]
@@ -28,10 +28,10 @@ RPC_ATTRS = (
 
 RPC_PARAMS = (
     PARAM_LIMIT, PARAM_MARKER, PARAM_GLOBAL_PROJECT,
-    PARAM_SHOW_DETAILS, PARAM_SORT,
+    PARAM_SHOW_DETAILS, PARAM_SORT, PARAM_CURSOR,
 ) = (
     'limit', 'marker', 'global_project',
-    'show_details', 'sort',
+    'show_details', 'sort', 'cursor',
 )
 
 CLUSTER_ACTION_NAMES = (
@@ -189,20 +189,49 @@ ACTION_ATTRS = (
     ACTION_INTERVAL, ACTION_START_TIME, ACTION_END_TIME,
     ACTION_TIMEOUT, ACTION_STATUS, ACTION_STATUS_REASON,
     ACTION_INPUTS, ACTION_OUTPUTS, ACTION_DEPENDS_ON, ACTION_DEPENDED_BY,
-    ACTION_CREATED_AT, ACTION_UPDATED_AT,
+    ACTION_CREATED_AT, ACTION_UPDATED_AT, ACTION_PRIORITY,
 ) = (
     'name', 'target', 'action', 'cause',
     'interval', 'start_time', 'end_time',
     'timeout', 'status', 'status_reason',
     'inputs', 'outputs', 'depends_on', 'depended_by',
-    'created_at', 'updated_at',
+    'created_at', 'updated_at', 'priority',
 )
 
 ACTION_SORT_KEYS = [
     ACTION_NAME, ACTION_TARGET, ACTION_ACTION, ACTION_CREATED_AT,
-    ACTION_STATUS,
+    ACTION_STATUS, ACTION_PRIORITY,
 ]
 
+# Ready actions with a higher priority are claimed first
+ACTION_PRIORITIES = (
+    ACTION_PRIORITY_LOW, ACTION_PRIORITY_NORMAL, ACTION_PRIORITY_HIGH,
+) = (
+    25, 50, 75,
+)
+
+ACTION_PRIORITY_MAX = 100
+
+# Actions run in the background by default, e.g. for health checking
+BACKGROUND_ACTIONS = (
+    CLUSTER_CHECK, NODE_CHECK,
+)
+
+# How a new action is merged into a compatible ready action
+ACTION_COALESCE_MODES = (
+    ACTION_COALESCE_DROP, ACTION_COALESCE_SUM,
+) = (
+    'drop', 'sum',
+)
+
+# How victims are chosen when nodes are removed from a cluster
+DELETION_CRITERIA = (
+    DELETE_OLDEST_FIRST, DELETE_OLDEST_PROFILE_FIRST, DELETE_YOUNGEST_FIRST,
+    DELETE_RANDOM,
+) = (
+    'OLDEST_FIRST', 'OLDEST_PROFILE_FIRST', 'YOUNGEST_FIRST', 'RANDOM',
+)
+
 RECEIVER_TYPES = (
     RECEIVER_WEBHOOK, RECEIVER_MESSAGE,
 ) = (
@@ -0,0 +1,385 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Metrics are kept in the memory of each senlin-api or senlin-engine process
+and served on a local HTTP port by a background green thread when the
+'[metrics] enabled' option is set. A scrape only renders the values already
+collected, it never touches the database. When metrics are disabled, all
+updates are no-ops.
+"""
+
+import contextlib
+import threading
+import time
+
+import eventlet
+from eventlet import wsgi as eventlet_wsgi
+from oslo_config import cfg
+from oslo_log import log as logging
+import six
+
+from senlin.common.i18n import _LI, _LW
+
+LOG = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class Registry(object):
+    """A collection of metrics rendered together."""
+
+    def __init__(self):
+        self.enabled = False
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def reset(self):
+        """Forget all samples collected, mostly useful for tests."""
+        for metric in self.metrics:
+            metric.clear()
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def _escape(value):
+    value = six.text_type(value)
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric(object):
+    """Base class of metrics.
+
+    :param name: Name of the metric.
+    :param documentation: Help text of the metric.
+    :param labels: A tuple of label names. Values for all labels must be
+                   provided as keyword arguments when the metric is updated.
+    """
+
+    TYPE = None
+
+    def __init__(self, name, documentation, labels=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.registry = registry
+        self.samples = {}
+        registry.register(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(label) for label in self.labels)
+
+    def _label_str(self, key, extra=None):
+        pairs = list(zip(self.labels, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        return '{%s}' % ','.join('%s="%s"' % (k, _escape(v))
+                                 for k, v in pairs)
+
+    def clear(self):
+        with self.registry.lock:
+            self.samples.clear()
+
+    def collect(self):
+        return sorted(self.samples.items(), key=lambda i: repr(i[0]))
+
+    def render(self):
+        lines = ['# HELP %s %s' % (self.name, self.documentation),
+                 '# TYPE %s %s' % (self.name, self.TYPE)]
+        for key, value in self.collect():
+            lines.extend(self.render_sample(key, value))
+        return lines
+
+    def render_sample(self, key, value):
+        return ['%s%s %s' % (self.name, self._label_str(key),
+                             _format_value(value))]
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    TYPE = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self.registry.lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """A value that can go up and down.
+
+    A gauge can also be bound to a function evaluated at collection time,
+    which is cheap enough for values already kept in memory.
+    """
+
+    TYPE = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super(Gauge, self).__init__(*args, **kwargs)
+        self.function = None
+
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        with self.registry.lock:
+            self.samples[self._key(labels)] = value
+
+    def set_function(self, function):
+        self.function = function
+
+    def collect(self):
+        if self.function is not None:
+            try:
+                return [((), self.function())]
+            except Exception as ex:
+                LOG.warning(_LW('Failed collecting metric %(n)s: %(e)s'),
+                            {'n': self.name, 'e': ex})
+                return []
+        return super(Gauge, self).collect()
+
+
+class Histogram(Metric):
+    """Distribution of observed values, e.g. latencies in seconds."""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), registry=REGISTRY,
+                 buckets=DEFAULT_BUCKETS):
+        super(Histogram, self).__init__(name, documentation, labels,
+                                        registry)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self.registry.lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = {
+                    'buckets': [0] * len(self.buckets),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample['buckets'][i] += 1
+                    break
+            sample['sum'] += value
+            sample['count'] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe the time spent in a block of code."""
+        started = time.time()
+        try:
+            yield
+        finally:
+            self.observe(time.time() - started, **labels)
+
+    def render_sample(self, key, value):
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets, value['buckets']):
+            total += count
+            lines.append('%s_bucket%s %s' % (
+                self.name, self._label_str(key, ('le', _format_value(bound))),
+                _format_value(total)))
+        labels = self._label_str(key)
+        lines.append('%s_sum%s %s' % (self.name, labels,
+                                      _format_value(value['sum'])))
+        lines.append('%s_count%s %s' % (self.name, labels,
+                                        _format_value(value['count'])))
+        return lines
+
+
+# Engine metrics
+ACTIONS = Gauge(
+    'senlin_actions', 'Number of actions by status, sampled periodically.',
+    labels=('status',))
+PROJECT_ACTIONS = Gauge(
+    'senlin_project_actions',
+    'Number of ready and running actions by project, sampled periodically.',
+    labels=('project', 'status'))
+ACTION_WORKERS = Gauge(
+    'senlin_action_workers', 'Number of green threads running actions.')
+ACTIONS_COALESCED = Counter(
+    'senlin_actions_coalesced_total',
+    'Number of actions merged into a ready action of the same target.',
+    labels=('action',))
+ACTION_CAPACITY = Gauge(
+    'senlin_action_capacity',
+    'Number of actions the engine can still start, only reported when '
+    'max_actions_per_engine is set.')
+ACTION_CLAIM_SECONDS = Histogram(
+    'senlin_action_claim_seconds',
+    'Time spent claiming an action from the database.')
+ACTION_ADMISSIONS = Counter(
+    'senlin_action_admissions_total',
+    'Number of node actions started immediately or deferred by a rate '
+    'limiter.', labels=('limiter', 'decision'))
+ACTION_DEFER_SECONDS = Histogram(
+    'senlin_action_defer_seconds',
+    'Delay imposed on node actions by the rate limiters.')
+DISPATCH_NOTIFICATIONS = Counter(
+    'senlin_dispatch_notifications_total',
+    'Number of notifications to start actions which were coalesced or sent '
+    'to selected engines or broadcast.', labels=('mode',))
+LOCK_ACQUIRE_SECONDS = Histogram(
+    'senlin_lock_acquire_seconds', 'Time spent trying to acquire a lock.',
+    labels=('scope',))
+LOCK_CONTENTIONS = Counter(
+    'senlin_lock_contentions_total',
+    'Number of lock acquisitions which failed due to another owner.',
+    labels=('scope',))
+DRIVER_CALL_SECONDS = Histogram(
+    'senlin_driver_call_seconds', 'Latency of calls to cloud drivers.',
+    labels=('service', 'method'))
+DRIVER_CALL_ERRORS = Counter(
+    'senlin_driver_call_errors_total', 'Number of failed driver calls.',
+    labels=('service', 'method'))
+EVENTS = Counter(
+    'senlin_events_total', 'Number of events dispatched.',
+    labels=('level',))
+EVENT_DISPATCH_SECONDS = Histogram(
+    'senlin_event_dispatch_seconds',
+    'Time spent dispatching an event to all dispatchers.')
+EVENT_DISPATCH_ERRORS = Counter(
+    'senlin_event_dispatch_errors_total',
+    'Number of events which failed to be dispatched.')
+HEALTH_CHECK_LAG_SECONDS = Histogram(
+    'senlin_health_check_lag_seconds',
+    'Delay of cluster health checks behind their schedule.')
+
+# Shared metrics
+DB_QUERY_SECONDS = Histogram(
+    'senlin_db_query_seconds', 'Latency of database statements.',
+    labels=('operation', 'database'))
+
+# API metrics
+API_REQUEST_SECONDS = Histogram(
+    'senlin_api_request_seconds', 'Latency of API requests.',
+    labels=('controller', 'action'))
+
+
+def _on_before_execute(conn, cursor, statement, parameters, context,
+                       executemany):
+    conn.info['senlin_query_start'] = time.time()
+
+
+def _on_after_execute(database):
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('senlin_query_start', None)
+        if started is None:
+            return
+        operation = statement.split(None, 1)[0].upper() if statement else ''
+        DB_QUERY_SECONDS.observe(time.time() - started, operation=operation,
+                                 database=database)
+    return listener
+
+
+def instrument_db_engine(engine, database='primary'):
+    """Record latencies of statements executed on a SQLAlchemy engine.
+
+    :param engine: The engine to instrument.
+    :param database: Label of the database the engine connects to, i.e.
+                     'primary' or 'replica'.
+    """
+    import sqlalchemy
+
+    sqlalchemy.event.listen(engine, 'before_cursor_execute',
+                            _on_before_execute)
+    sqlalchemy.event.listen(engine, 'after_cursor_execute',
+                            _on_after_execute(database))
+
+
+def metrics_app(environ, start_response):
+    """WSGI application serving the metrics of this process."""
+    if environ.get('PATH_INFO', '/') not in ('/', '/metrics'):
+        start_response('404 Not Found', [('Content-Type', 'text/plain')])
+        return [b'Not Found\n']
+
+    body = REGISTRY.render().encode('utf-8')
+    start_response('200 OK', [('Content-Type', CONTENT_TYPE),
+                              ('Content-Length', str(len(body)))])
+    return [body]
+
+
+def serve(port, host=None, tries=1):
+    """Serve metrics from a background green thread.
+
+    Forked workers of the same service share the configured port range, each
+    of them binds to the first port which is still free.
+
+    :param port: The first port to try.
+    :param host: Address to bind to, defaults to '[metrics] bind_host'.
+    :param tries: Number of consecutive ports to try.
+    :returns: The port bound to or None if no port was free.
+    """
+    host = host or cfg.CONF.metrics.bind_host
+    for candidate in range(port, port + max(tries, 1)):
+        try:
+            sock = eventlet.listen((host, candidate))
+        except EnvironmentError:
+            continue
+        eventlet.spawn_n(eventlet_wsgi.server, sock, metrics_app,
+                         log_output=False)
+        LOG.info(_LI('Serving metrics on %(host)s:%(port)s'),
+                 {'host': host, 'port': candidate})
+        return candidate
+
+    LOG.warning(_LW('No free port for serving metrics in range '
+                    '%(first)s-%(last)s.'),
+                {'first': port, 'last': port + max(tries, 1) - 1})
+    return None
+
+
+def setup(port, tries=1):
+    """Enable metrics collection and start serving them if configured.
+
+    :param port: The first port to serve metrics on.
+    :param tries: Number of consecutive ports to try, usually the number of
+                  worker processes.
+    :returns: The port bound to or None if metrics are not served.
+    """
+    cfg.CONF.import_group('metrics', 'senlin.common.config')
+    if not cfg.CONF.metrics.enabled:
+        return None
+    REGISTRY.enabled = True
+    return serve(port, tries=tries)
@@ -238,11 +238,12 @@ def parse_resize_params(action, cluster, current=None):
     return action.RES_OK, ''
 
 
-def filter_error_nodes(nodes):
+def filter_error_nodes(nodes, ids_only=False):
     """Filter out ERROR nodes from the given node list.
 
-    :param nodes: candidate nodes for filter.
+    :param nodes: candidate nodes for filter, which can be an iterator.
     :param count: maximum number of nodes for selection.
+    :param ids_only: whether only the IDs of the good nodes are returned.
     :return: a tuple containing the chosen nodes' IDs and the undecided
              (good) nodes.
     """
@@ -255,7 +256,7 @@ def filter_error_nodes(nodes):
         elif n.created_at is None:
             not_created.append(n.id)
         else:
-            good.append(n)
+            good.append(n.id if ids_only else n)
 
     bad.extend(not_created)
     return bad, good
@@ -275,13 +276,7 @@ def nodes_by_random(nodes, count):
     count -= len(selected)
     random.seed()
 
-    i = count
-    while i > 0:
-        rand = random.randrange(len(candidates))
-        selected.append(candidates[rand].id)
-        candidates.remove(candidates[rand])
-        i = i - 1
-
+    selected.extend(n.id for n in random.sample(candidates, count))
     return selected
 
 
@@ -312,7 +307,8 @@ def nodes_by_profile_age(nodes, count):
 
     Note that old nodes will come before young ones.
 
-    :param nodes: list of candidate nodes.
+    :param nodes: list of candidate node records, as returned by
+                  `Node.get_records`.
     :param count: maximum number of nodes for selection.
     :return: a list of IDs for victim nodes.
     """
@@ -321,16 +317,8 @@ def nodes_by_profile_age(nodes, count):
         return selected[:count]
 
     count -= len(selected)
-    node_map = []
-    for node in nodes:
-        entry = {
-            'id': node.id,
-            'created_at': node.rt['profile'].created_at
-        }
-        node_map.append(entry)
-
-    sorted_map = sorted(node_map, key=lambda m: m['created_at'])
+    sorted_list = sorted(nodes, key=lambda r: r.profile_created_at)
     for i in range(count):
-        selected.append(sorted_map[i]['id'])
+        selected.append(sorted_list[i].id)
 
     return selected
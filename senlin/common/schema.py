@@ -435,13 +435,36 @@ class Operation(SchemaBase):
                 raise exc.ESchema(message=six.text_type(ex))
 
 
+def _copy_value(schema, value):
+    """Copy the lists and maps of a resolved value.
+
+    Only the levels described by the schema are copied, which are the ones
+    `resolve` builds anew, so that the result is as independent from other
+    copies as a freshly resolved value.
+    """
+    if isinstance(value, list) and isinstance(schema, List):
+        return [_copy_value(schema.schema[i], v) for i, v in enumerate(value)]
+    if isinstance(value, dict) and isinstance(schema, Map):
+        if schema.schema is None:
+            return dict(value)
+        return dict((k, _copy_value(schema.schema.get(k), v))
+                    for k, v in value.items())
+    return value
+
+
 class Spec(collections.Mapping):
-    """A class that contains all spec items."""
+    """A class that contains all spec items.
+
+    Spec items are resolved lazily and each of them is resolved only once,
+    the result is kept until `invalidate` is called. Callers get their own
+    copy of a resolved list or map so that they cannot alter the cached one.
+    """
 
     def __init__(self, schema, data, version=None):
         self._schema = schema
         self._data = data
         self._version = version
+        self._resolved = {}
 
     def validate(self):
         """Validate the schema."""
@@ -449,7 +472,7 @@ class Spec(collections.Mapping):
         for (k, s) in self._schema.items():
             try:
                 # Validate through resolve
-                self.resolve_value(k)
+                self._resolve_cached(k)
                 # Validate schema for version
                 if self._version:
                     self._schema[k]._validate_version(k, self._version)
@@ -461,6 +484,10 @@ class Spec(collections.Mapping):
                 msg = _("Unrecognizable spec item '%s'") % key
                 raise exc.ESchema(message=msg)
 
+    def invalidate(self):
+        """Forget the resolved spec items, e.g. after the data is changed."""
+        self._resolved.clear()
+
     def resolve_value(self, key):
         if key not in self:
             raise exc.ESchema(message="Invalid spec item: %s" % key)
@@ -475,9 +502,18 @@ class Spec(collections.Mapping):
             msg = _("Required spec item '%s' not provided") % key
             raise exc.ESchema(message=msg)
 
+    def _resolve_cached(self, key):
+        try:
+            return self._resolved[key]
+        except KeyError:
+            value = self.resolve_value(key)
+            self._resolved[key] = value
+            return value
+
     def __getitem__(self, key):
         '''Lazy evaluation for spec items.'''
-        return self.resolve_value(key)
+        value = self._resolve_cached(key)
+        return _copy_value(self._schema[key], value)
 
     def __len__(self):
         '''Number of items in the spec.
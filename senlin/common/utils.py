@@ -156,6 +156,22 @@ def isotime(at):
     return st
 
 
+def changed_values(values, stored):
+    """Get the values which differ from the ones last stored.
+
+    :param values: A dict of the current values of an object.
+    :param stored: A snapshot of the values last loaded or stored, or None
+                   if they are unknown.
+    :returns: A dict containing the changed values only, or all values if
+              the stored ones are unknown.
+    """
+    if stored is None:
+        return dict(values)
+
+    return dict((k, v) for k, v in values.items()
+                if k not in stored or stored[k] != v)
+
+
 def get_path_parser(path):
     """Get a JsonPath parser based on a path string.
 
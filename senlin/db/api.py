@@ -31,6 +31,30 @@ def get_engine():
     return IMPL.get_engine()
 
 
+def replica_reader():
+    return IMPL.replica_reader()
+
+
+def unit_of_work():
+    return IMPL.unit_of_work()
+
+
+def in_unit_of_work():
+    return IMPL.in_unit_of_work()
+
+
+def run_in_unit_of_work(func, *args, **kwargs):
+    return IMPL.run_in_unit_of_work(func, *args, **kwargs)
+
+
+def after_commit(func, *args, **kwargs):
+    return IMPL.after_commit(func, *args, **kwargs)
+
+
+def encode_cursor(obj, sort, default_key):
+    return IMPL.encode_cursor(obj, sort, default_key)
+
+
 # Clusters
 def cluster_create(context, values):
     return IMPL.cluster_create(context, values)
@@ -50,10 +74,15 @@ def cluster_get_by_short_id(context, short_id, project_safe=True):
                                         project_safe=project_safe)
 
 
+def cluster_find(context, identity, project_safe=True):
+    return IMPL.cluster_find(context, identity, project_safe=project_safe)
+
+
 def cluster_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                    project_safe=True):
+                    project_safe=True, cursor=None):
     return IMPL.cluster_get_all(context, limit=limit, marker=marker, sort=sort,
-                                filters=filters, project_safe=project_safe)
+                                filters=filters, project_safe=project_safe,
+                                cursor=cursor)
 
 
 def cluster_next_index(context, cluster_id):
@@ -91,11 +120,15 @@ def node_get_by_short_id(context, short_id, project_safe=True):
                                      project_safe=project_safe)
 
 
+def node_find(context, identity, project_safe=True):
+    return IMPL.node_find(context, identity, project_safe=project_safe)
+
+
 def node_get_all(context, cluster_id=None, limit=None, marker=None, sort=None,
-                 filters=None, project_safe=True):
+                 filters=None, project_safe=True, cursor=None):
     return IMPL.node_get_all(context, cluster_id=cluster_id, filters=filters,
                              limit=limit, marker=marker, sort=sort,
-                             project_safe=project_safe)
+                             project_safe=project_safe, cursor=cursor)
 
 
 def node_get_all_by_cluster(context, cluster_id, project_safe=True):
@@ -107,10 +140,37 @@ def node_count_by_cluster(context, cluster_id, **kwargs):
     return IMPL.node_count_by_cluster(context, cluster_id, **kwargs)
 
 
+def node_count_by_status(context, cluster_id, project_safe=True):
+    return IMPL.node_count_by_status(context, cluster_id,
+                                     project_safe=project_safe)
+
+
+def node_count_by_zone(context, cluster_id, project_safe=True):
+    return IMPL.node_count_by_zone(context, cluster_id,
+                                   project_safe=project_safe)
+
+
+def node_get_victims(context, cluster_id, count, criteria,
+                     project_safe=True):
+    return IMPL.node_get_victims(context, cluster_id, count, criteria,
+                                 project_safe=project_safe)
+
+
+def node_get_records(context, cluster_id, project_safe=True, limit=None,
+                     cursor=None):
+    return IMPL.node_get_records(context, cluster_id,
+                                 project_safe=project_safe, limit=limit,
+                                 cursor=cursor)
+
+
 def node_update(context, node_id, values):
     return IMPL.node_update(context, node_id, values)
 
 
+def node_update_batch(context, values):
+    return IMPL.node_update_batch(context, values)
+
+
 def node_migrate(context, node_id, to_cluster, timestamp, role=None):
     return IMPL.node_migrate(context, node_id, to_cluster, timestamp, role)
 
@@ -162,10 +222,15 @@ def policy_get_by_short_id(context, short_id, project_safe=True):
                                        project_safe=project_safe)
 
 
+def policy_find(context, identity, project_safe=True):
+    return IMPL.policy_find(context, identity, project_safe=project_safe)
+
+
 def policy_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                   project_safe=True):
+                   project_safe=True, cursor=None):
     return IMPL.policy_get_all(context, limit=limit, marker=marker, sort=sort,
-                               filters=filters, project_safe=project_safe)
+                               filters=filters, project_safe=project_safe,
+                               cursor=cursor)
 
 
 def policy_update(context, policy_id, values):
@@ -226,11 +291,15 @@ def profile_get_by_short_id(context, short_id, project_safe=True):
                                         project_safe=project_safe)
 
 
+def profile_find(context, identity, project_safe=True):
+    return IMPL.profile_find(context, identity, project_safe=project_safe)
+
+
 def profile_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                    project_safe=True):
+                    project_safe=True, cursor=None):
     return IMPL.profile_get_all(context, limit=limit, marker=marker,
                                 sort=sort, filters=filters,
-                                project_safe=project_safe)
+                                project_safe=project_safe, cursor=cursor)
 
 
 def profile_update(context, profile_id, values):
@@ -276,10 +345,15 @@ def event_get_by_short_id(context, short_id, project_safe=True):
                                       project_safe=project_safe)
 
 
+def event_find(context, identity, project_safe=True):
+    return IMPL.event_find(context, identity, project_safe=project_safe)
+
+
 def event_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                  project_safe=True):
+                  project_safe=True, cursor=None):
     return IMPL.event_get_all(context, limit=limit, marker=marker, sort=sort,
-                              filters=filters, project_safe=project_safe)
+                              filters=filters, project_safe=project_safe,
+                              cursor=cursor)
 
 
 def event_count_by_cluster(context, cluster_id, project_safe=True):
@@ -321,15 +395,34 @@ def action_get_by_short_id(context, short_id, project_safe=True):
                                        project_safe=project_safe)
 
 
+def action_find(context, identity, project_safe=True):
+    return IMPL.action_find(context, identity, project_safe=project_safe)
+
+
 def action_get_all_by_owner(context, owner):
     return IMPL.action_get_all_by_owner(context, owner)
 
 
 def action_get_all(context, filters=None, limit=None, marker=None, sort=None,
-                   project_safe=True):
+                   project_safe=True, cursor=None):
     return IMPL.action_get_all(context, filters=filters, sort=sort,
                                limit=limit, marker=marker,
-                               project_safe=project_safe)
+                               project_safe=project_safe, cursor=cursor)
+
+
+def action_get_timing(context, since=None, limit=None, cluster_id=None,
+                      actions=None, project_safe=True):
+    return IMPL.action_get_timing(context, since=since, limit=limit,
+                                  cluster_id=cluster_id, actions=actions,
+                                  project_safe=project_safe)
+
+
+def action_count_by_status(context, statuses=None):
+    return IMPL.action_count_by_status(context, statuses=statuses)
+
+
+def action_count_by_project(context, statuses=None):
+    return IMPL.action_count_by_project(context, statuses=statuses)
 
 
 def action_check_status(context, action_id, timestamp):
@@ -352,24 +445,40 @@ def dependency_get_dependents(context, action_id):
     return IMPL.dependency_get_dependents(context, action_id)
 
 
-def action_mark_succeeded(context, action_id, timestamp):
-    return IMPL.action_mark_succeeded(context, action_id, timestamp)
+def dependency_get_by_actions(context, action_ids):
+    return IMPL.dependency_get_by_actions(context, action_ids)
+
 
+def action_mark_succeeded(context, action_id, timestamp, outputs=None):
+    return IMPL.action_mark_succeeded(context, action_id, timestamp,
+                                      outputs=outputs)
 
-def action_mark_failed(context, action_id, timestamp, reason=None):
-    return IMPL.action_mark_failed(context, action_id, timestamp, reason)
 
+def action_mark_failed(context, action_id, timestamp, reason=None,
+                       outputs=None):
+    return IMPL.action_mark_failed(context, action_id, timestamp, reason,
+                                   outputs=outputs)
 
-def action_mark_cancelled(context, action_id, timestamp):
-    return IMPL.action_mark_cancelled(context, action_id, timestamp)
+
+def action_mark_cancelled(context, action_id, timestamp, outputs=None):
+    return IMPL.action_mark_cancelled(context, action_id, timestamp,
+                                      outputs=outputs)
 
 
 def action_acquire(context, action_id, owner, timestamp):
     return IMPL.action_acquire(context, action_id, owner, timestamp)
 
 
-def action_acquire_random_ready(context, owner, timestamp):
-    return IMPL.action_acquire_random_ready(context, owner, timestamp)
+def action_coalesce(context, target, action, inputs, mode, max_count=0):
+    return IMPL.action_coalesce(context, target, action, inputs, mode,
+                                max_count=max_count)
+
+
+def action_acquire_random_ready(context, owner, timestamp, excluded=None,
+                                excluded_clusters=None):
+    return IMPL.action_acquire_random_ready(
+        context, owner, timestamp, excluded=excluded,
+        excluded_clusters=excluded_clusters)
 
 
 def action_abandon(context, action_id):
@@ -395,6 +504,10 @@ def action_delete(context, action_id):
     return IMPL.action_delete(context, action_id)
 
 
+def action_context_purge(context):
+    return IMPL.action_context_purge(context)
+
+
 def receiver_create(context, values):
     return IMPL.receiver_create(context, values)
 
@@ -412,11 +525,15 @@ def receiver_get_by_short_id(context, short_id, project_safe=True):
                                          project_safe=project_safe)
 
 
+def receiver_find(context, identity, project_safe=True):
+    return IMPL.receiver_find(context, identity, project_safe=project_safe)
+
+
 def receiver_get_all(context, limit=None, marker=None, filters=None, sort=None,
-                     project_safe=True):
+                     project_safe=True, cursor=None):
     return IMPL.receiver_get_all(context, limit=limit, marker=marker,
                                  sort=sort, filters=filters,
-                                 project_safe=project_safe)
+                                 project_safe=project_safe, cursor=cursor)
 
 
 def receiver_delete(context, receiver_id):
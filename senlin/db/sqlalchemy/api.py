@@ -14,9 +14,14 @@
 Implementation of SQLAlchemy backend.
 """
 
+import contextlib
+import datetime
+import hashlib
+import random
 import six
 import sys
 import threading
+import weakref
 
 from oslo_config import cfg
 from oslo_db import api as oslo_db_api
@@ -24,23 +29,44 @@ from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import enginefacade
 from oslo_db.sqlalchemy import utils as sa_utils
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
+from oslo_utils import uuidutils
 import osprofiler.sqlalchemy
 import sqlalchemy
 from sqlalchemy.orm import joinedload_all
+from sqlalchemy.orm import lazyload
 from sqlalchemy.sql.expression import func
 
 from senlin.common import consts
 from senlin.common import exception
 from senlin.common.i18n import _
+from senlin.common import metrics
 from senlin.db.sqlalchemy import migration
 from senlin.db.sqlalchemy import models
 from senlin.db.sqlalchemy import utils
 
 LOG = logging.getLogger(__name__)
 
+cfg.CONF.import_opt('action_starvation_timeout', 'senlin.common.config')
+cfg.CONF.import_opt('action_fair_share', 'senlin.common.config')
+cfg.CONF.import_opt('max_actions_per_project', 'senlin.common.config')
+cfg.CONF.import_opt('project_action_weights', 'senlin.common.config')
+
+# Seconds during which a shared action context is kept after it was last
+# referenced by a new action, so that it is never purged while such an action
+# is being created
+ACTION_CONTEXT_GRACE = 3600
+
 _main_context_manager = None
 _CONTEXT = threading.local()
+# Whether reads of the current thread can be served by the replica database
+_REPLICA = threading.local()
+# Number of units of work the current thread is in, and the calls to make
+# once the outermost one is committed
+_UNIT_OF_WORK = threading.local()
+# IDs of objects found by their names or short IDs, per request context
+_RESOLVED_IDS = weakref.WeakKeyDictionary()
 
 
 def _get_main_context_manager():
@@ -52,6 +78,14 @@ def _get_main_context_manager():
             if cfg.CONF.profiler.trace_sqlalchemy:
                 eng = _main_context_manager.get_legacy_facade().get_engine()
                 osprofiler.sqlalchemy.add_tracing(sqlalchemy, eng, "db")
+        cfg.CONF.import_group('metrics', 'senlin.common.config')
+        if cfg.CONF.metrics.enabled:
+            facade = _main_context_manager.get_legacy_facade()
+            eng = facade.get_engine()
+            metrics.instrument_db_engine(eng, 'primary')
+            replica = facade.get_engine(use_slave=True)
+            if replica is not eng:
+                metrics.instrument_db_engine(replica, 'replica')
     return _main_context_manager
 
 
@@ -60,13 +94,104 @@ def get_engine():
 
 
 def session_for_read():
-    return _get_main_context_manager().reader.using(_CONTEXT)
+    reader = _get_main_context_manager().reader
+    if getattr(_REPLICA, 'enabled', False):
+        # The modifier is named 'async' in older releases of oslo.db
+        reader = getattr(reader, 'async_', None) or getattr(reader, 'async')
+    return reader.using(_CONTEXT)
+
+
+@contextlib.contextmanager
+def replica_reader():
+    """Route the reads done by the current thread to the replica database.
+
+    Reads are routed to the database configured by the 'slave_connection'
+    option of the 'database' group, or to the primary one if there is no
+    such database. Writes always go to the primary database.
+    """
+    enabled = getattr(_REPLICA, 'enabled', False)
+    _REPLICA.enabled = True
+    try:
+        yield
+    finally:
+        _REPLICA.enabled = enabled
 
 
 def session_for_write():
     return _get_main_context_manager().writer.using(_CONTEXT)
 
 
+def in_unit_of_work():
+    return getattr(_UNIT_OF_WORK, 'depth', 0) > 0
+
+
+@contextlib.contextmanager
+def unit_of_work():
+    """Group the writes done by the current thread into one transaction.
+
+    The calls made within the block join a single write transaction which is
+    committed when the outermost block exits and rolled back if it raises.
+    Calls retried on database errors are not retried within the block since
+    the transaction cannot be replayed from there, the errors are raised to
+    the caller instead. Use `run_in_unit_of_work` to retry the whole unit.
+    """
+    depth = getattr(_UNIT_OF_WORK, 'depth', 0)
+    if depth == 0:
+        _UNIT_OF_WORK.callbacks = []
+    _UNIT_OF_WORK.depth = depth + 1
+    try:
+        with session_for_write():
+            yield
+    finally:
+        _UNIT_OF_WORK.depth = depth
+        if depth == 0:
+            callbacks, _UNIT_OF_WORK.callbacks = _UNIT_OF_WORK.callbacks, []
+
+    # Only reached when the unit is committed
+    if depth == 0:
+        for callback, args, kwargs in callbacks:
+            callback(*args, **kwargs)
+
+
+def _retry(**kwargs):
+    """Retry a call on database errors unless it is in a unit of work."""
+    def decorator(func):
+        retried = oslo_db_api.wrap_db_retry(**kwargs)(func)
+
+        @six.wraps(func)
+        def wrapper(*args, **kw):
+            if in_unit_of_work():
+                return func(*args, **kw)
+            return retried(*args, **kw)
+
+        return wrapper
+
+    return decorator
+
+
+@_retry(max_retries=3, retry_on_deadlock=True, retry_interval=0.5,
+        inc_retry_interval=True)
+def run_in_unit_of_work(func, *args, **kwargs):
+    """Call a function whose writes are grouped into one unit of work.
+
+    The whole unit is retried on deadlocks unless it is nested in another
+    unit, so the function must be safe to call again after a rollback.
+    """
+    with unit_of_work():
+        return func(*args, **kwargs)
+
+
+def after_commit(func, *args, **kwargs):
+    """Call a function once the current unit of work is committed.
+
+    The call is dropped if the unit is rolled back. Outside of a unit of
+    work, the function is called at once.
+    """
+    if not in_unit_of_work():
+        return func(*args, **kwargs)
+    _UNIT_OF_WORK.callbacks.append((func, args, kwargs))
+
+
 def get_backend():
     """The backend is this module itself."""
     return sys.modules[__name__]
@@ -80,17 +205,15 @@ def model_query(context, *args):
 
 def query_by_short_id(context, model, short_id, project_safe=True):
     q = model_query(context, model)
-    q = q.filter(model.id.like('%s%%' % short_id))
+    q = q.filter(utils.prefix_filter(model.id, short_id))
 
     if not context.is_admin and project_safe:
         q = q.filter_by(project=context.project)
 
-    if q.count() == 1:
-        return q.first()
-    elif q.count() == 0:
-        return None
-    else:
+    objs = q.limit(2).all()
+    if len(objs) > 1:
         raise exception.MultipleChoices(arg=short_id)
+    return objs[0] if objs else None
 
 
 def query_by_name(context, model, name, project_safe=True):
@@ -100,12 +223,93 @@ def query_by_name(context, model, name, project_safe=True):
     if not context.is_admin and project_safe:
         q = q.filter_by(project=context.project)
 
-    if q.count() == 1:
-        return q.first()
-    elif q.count() == 0:
-        return None
-    else:
+    objs = q.limit(2).all()
+    if len(objs) > 1:
         raise exception.MultipleChoices(arg=name)
+    return objs[0] if objs else None
+
+
+def _query_visible(context, model, project_safe=True):
+    q = model_query(context, model)
+    if not context.is_admin and project_safe:
+        q = q.filter_by(project=context.project)
+    return q
+
+
+def query_by_identity(context, model, identity, project_safe=True,
+                      by_name=True):
+    """Find an object by its ID, name or short ID with a single query.
+
+    An ID match takes precedence over a name match, which in turn takes
+    precedence over a short ID match, as if they were tried one by one. A
+    short ID is only tried when the identity is not an UUID. The ID of an
+    object found by its name or short ID is remembered for the rest of the
+    request so that later lookups go straight to the object.
+
+    :raises: `MultipleChoices` if more than one object is matching the name
+             or the short ID.
+    """
+    resolved = _RESOLVED_IDS.setdefault(context, {})
+    key = (model.__tablename__, identity, project_safe)
+    if key in resolved:
+        obj = _query_visible(context, model, project_safe).filter_by(
+            id=resolved.pop(key)).first()
+        if obj is not None and ((by_name and obj.name == identity) or
+                                obj.id.startswith(identity)):
+            resolved[key] = obj.id
+            return obj
+
+    criteria = [model.id == identity]
+    ranks = [(model.id == identity, 0)]
+    if by_name:
+        criteria.append(model.name == identity)
+        ranks.append((model.name == identity, 1))
+    if not uuidutils.is_uuid_like(identity):
+        criteria.append(utils.prefix_filter(model.id, identity))
+    rank = sqlalchemy.case(ranks, else_=2)
+
+    q = _query_visible(context, model, project_safe).add_columns(rank)
+    q = q.filter(sqlalchemy.or_(*criteria)).order_by(rank)
+    rows = q.limit(2).all()
+    if not rows:
+        return None
+    # only the best kind of match is considered
+    if len(rows) > 1 and rows[0][1] == rows[1][1]:
+        raise exception.MultipleChoices(arg=identity)
+
+    obj, match = rows[0]
+    if match:
+        resolved[key] = obj.id
+    return obj
+
+
+def paginate_query(context, query, model, limit=None, marker=None,
+                   cursor=None, sort=None, default_key=None):
+    """Sort a query and get the page of results requested.
+
+    A page is located either by a cursor, which carries the sort key values
+    of the last row of the previous page, or by the ID of that row given as
+    a marker, which costs an extra query for fetching the row.
+    """
+    keys, dirs = utils.get_sort_params(sort, default_key)
+    if cursor:
+        values = utils.decode_cursor(cursor)
+        if not set(keys).issubset(values):
+            msg = _("The pagination cursor does not match the sort keys")
+            raise exception.BadRequest(msg=msg)
+        query = utils.seek_filter(query, model, keys, dirs,
+                                  [values[k] for k in keys])
+        marker = None
+    elif marker:
+        marker = model_query(context, model).get(marker)
+
+    return sa_utils.paginate_query(query, model, limit, keys, marker=marker,
+                                   sort_dirs=dirs).all()
+
+
+def encode_cursor(obj, sort, default_key):
+    """Build the cursor of the page following an object of a list."""
+    return utils.encode_cursor(obj, sort, default_key)
 
 
 # Clusters
@@ -139,6 +343,11 @@ def cluster_get_by_short_id(context, short_id, project_safe=True):
                              project_safe=project_safe)
 
 
+def cluster_find(context, identity, project_safe=True):
+    return query_by_identity(context, models.Cluster, identity,
+                             project_safe=project_safe)
+
+
 def _query_cluster_get_all(context, project_safe=True):
     query = model_query(context, models.Cluster)
 
@@ -148,17 +357,14 @@ def _query_cluster_get_all(context, project_safe=True):
 
 
 def cluster_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                    project_safe=True):
+                    project_safe=True, cursor=None):
     query = _query_cluster_get_all(context, project_safe=project_safe)
     if filters:
         query = utils.exact_filter(query, models.Cluster, filters)
 
-    keys, dirs = utils.get_sort_params(sort, consts.CLUSTER_INIT_AT)
-    if marker:
-        marker = model_query(context, models.Cluster).get(marker)
-
-    return sa_utils.paginate_query(query, models.Cluster, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(context, query, models.Cluster, limit=limit,
+                          marker=marker, cursor=cursor, sort=sort,
+                          default_key=consts.CLUSTER_INIT_AT)
 
 
 def cluster_next_index(context, cluster_id):
@@ -243,6 +449,11 @@ def node_get_by_short_id(context, short_id, project_safe=True):
                              project_safe=project_safe)
 
 
+def node_find(context, identity, project_safe=True):
+    return query_by_identity(context, models.Node, identity,
+                             project_safe=project_safe)
+
+
 def _query_node_get_all(context, project_safe=True, cluster_id=None):
     query = model_query(context, models.Node)
 
@@ -256,18 +467,16 @@ def _query_node_get_all(context, project_safe=True, cluster_id=None):
 
 
 def node_get_all(context, cluster_id=None, limit=None, marker=None, sort=None,
-                 filters=None, project_safe=True):
+                 filters=None, project_safe=True, cursor=None):
     query = _query_node_get_all(context, project_safe=project_safe,
                                 cluster_id=cluster_id)
 
     if filters:
         query = utils.exact_filter(query, models.Node, filters)
 
-    keys, dirs = utils.get_sort_params(sort, consts.NODE_INIT_AT)
-    if marker:
-        marker = model_query(context, models.Node).get(marker)
-    return sa_utils.paginate_query(query, models.Node, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(context, query, models.Node, limit=limit,
+                          marker=marker, cursor=cursor, sort=sort,
+                          default_key=consts.NODE_INIT_AT)
 
 
 def node_get_all_by_cluster(context, cluster_id, project_safe=True):
@@ -286,6 +495,130 @@ def node_count_by_cluster(context, cluster_id, **kwargs):
     return query.count()
 
 
+def node_count_by_status(context, cluster_id, project_safe=True):
+    """Count the nodes of a cluster by status.
+
+    The nodes are counted by the database in one single grouped query.
+
+    :param cluster_id: ID of the cluster.
+    :param project_safe: Whether only nodes from the requesting project are
+                         counted.
+    :returns: A dict with node statuses as keys and node numbers as values.
+    """
+    with session_for_read() as session:
+        query = session.query(models.Node.status,
+                              func.count(models.Node.id))
+        query = query.filter_by(cluster_id=cluster_id)
+        if project_safe:
+            query = query.filter_by(project=context.project)
+        rows = query.group_by(models.Node.status).all()
+
+    return dict(rows)
+
+
+def node_count_by_zone(context, cluster_id, project_safe=True):
+    """Count the nodes of a cluster by availability zone.
+
+    The zone is the one of the ``placement`` recorded in node data, which is
+    kept in its own column so that the nodes are counted by the database in
+    one single grouped query. Nodes without a recorded zone are not counted.
+
+    :param cluster_id: ID of the cluster.
+    :param project_safe: Whether only nodes from the requesting project are
+                         counted.
+    :returns: A dict with zone names as keys and node numbers as values.
+    """
+    with session_for_read() as session:
+        query = session.query(models.Node.zone, func.count(models.Node.id))
+        query = query.filter_by(cluster_id=cluster_id)
+        query = query.filter(models.Node.zone.isnot(None))
+        if project_safe:
+            query = query.filter_by(project=context.project)
+        rows = query.group_by(models.Node.zone).all()
+
+    return dict(rows)
+
+
+def _random_key(session):
+    if session.bind.dialect.name == 'mysql':
+        return func.rand()
+    return func.random()
+
+
+def node_get_victims(context, cluster_id, count, criteria,
+                     project_safe=True):
+    """Choose the nodes of a cluster to be deleted.
+
+    Nodes in ERROR status come first, followed by nodes not created yet,
+    both in the order they were initialized. The other nodes are ordered by
+    the given criteria. Only the IDs of the chosen nodes are queried.
+
+    :param cluster_id: ID of the cluster.
+    :param count: Maximum number of nodes to choose.
+    :param criteria: One of `consts.DELETION_CRITERIA`.
+    :param project_safe: Whether only nodes from the requesting project are
+                         chosen.
+    :returns: A list of node IDs.
+    """
+    with session_for_read() as session:
+        query = session.query(models.Node.id)
+        query = query.filter_by(cluster_id=cluster_id)
+        if project_safe:
+            query = query.filter_by(project=context.project)
+
+        rank = sqlalchemy.case([
+            (models.Node.status == consts.NS_ERROR, 0),
+            (models.Node.created_at.is_(None), 1),
+        ], else_=2)
+        if criteria == consts.DELETE_RANDOM:
+            key = _random_key(session)
+        elif criteria == consts.DELETE_OLDEST_PROFILE_FIRST:
+            query = query.outerjoin(
+                models.Profile, models.Node.profile_id == models.Profile.id)
+            key = models.Profile.created_at
+        else:
+            key = models.Node.created_at
+        # The order of the nodes chosen first doesn't depend on the criteria
+        key = sqlalchemy.case([(rank == 2, key)])
+        if criteria == consts.DELETE_YOUNGEST_FIRST:
+            key = key.desc()
+
+        query = query.order_by(rank, key, models.Node.init_at,
+                               models.Node.id)
+        return [node_id for (node_id,) in query.limit(count)]
+
+
+def node_get_records(context, cluster_id, project_safe=True, limit=None,
+                     cursor=None):
+    """Get the fields of the nodes of a cluster used for planning.
+
+    Only the columns needed by policies are queried, together with the
+    creation time of the profile of each node, in one single query.
+
+    :param cluster_id: ID of the cluster.
+    :param project_safe: Whether only nodes from the requesting project are
+                         returned.
+    :param limit: Maximum number of records returned, None for all.
+    :param cursor: A cursor built from the last record of the previous
+                   chunk, after which the records start.
+    :returns: A list of (id, status, created_at, profile_id,
+              profile_created_at, data, init_at) named tuples.
+    """
+    with session_for_read() as session:
+        query = session.query(
+            models.Node.id, models.Node.status, models.Node.created_at,
+            models.Node.profile_id,
+            models.Profile.created_at.label('profile_created_at'),
+            models.Node.data, models.Node.init_at)
+        query = query.outerjoin(
+            models.Profile, models.Node.profile_id == models.Profile.id)
+        query = query.filter(models.Node.cluster_id == cluster_id)
+        if project_safe:
+            query = query.filter(models.Node.project == context.project)
+        return paginate_query(context, query, models.Node, limit=limit,
+                              cursor=cursor, default_key=consts.NODE_INIT_AT)
+
+
 def node_update(context, node_id, values):
     '''Update a node with new property values.
 
@@ -311,6 +644,33 @@ def node_update(context, node_id, values):
                 cluster.save(session)
 
 
+def node_update_batch(context, values):
+    """Update a batch of nodes in one transaction.
+
+    Unlike node_update, this function doesn't propagate node status changes
+    to the owning cluster, it is meant for bulk updates of node properties
+    such as the ``data`` field.
+
+    :param values: A dictionary mapping the ID of each node to be updated to
+                   a dictionary of values to be updated on that node.
+    :raises ResourceNotFound: Any of the specified nodes doesn't exist in
+                              database.
+    """
+    if not values:
+        return
+
+    with session_for_write() as session:
+        query = session.query(models.Node).filter(
+            models.Node.id.in_(list(values.keys())))
+        nodes = dict((n.id, n) for n in query.all())
+        for node_id, node_values in values.items():
+            node = nodes.get(node_id)
+            if node is None:
+                raise exception.ResourceNotFound(type='node', id=node_id)
+            node.update(node_values)
+            node.save(session)
+
+
 def node_add_dependents(context, depended, dependent, dep_type=None):
     """Add dependency between nodes.
 
@@ -534,8 +894,13 @@ def policy_get_by_short_id(context, short_id, project_safe=True):
                              project_safe=project_safe)
 
 
+def policy_find(context, identity, project_safe=True):
+    return query_by_identity(context, models.Policy, identity,
+                             project_safe=project_safe)
+
+
 def policy_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                   project_safe=True):
+                   project_safe=True, cursor=None):
     query = model_query(context, models.Policy)
 
     if project_safe:
@@ -544,11 +909,9 @@ def policy_get_all(context, limit=None, marker=None, sort=None, filters=None,
     if filters:
         query = utils.exact_filter(query, models.Policy, filters)
 
-    keys, dirs = utils.get_sort_params(sort, consts.POLICY_CREATED_AT)
-    if marker:
-        marker = model_query(context, models.Policy).get(marker)
-    return sa_utils.paginate_query(query, models.Policy, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(context, query, models.Policy, limit=limit,
+                          marker=marker, cursor=cursor, sort=sort,
+                          default_key=consts.POLICY_CREATED_AT)
 
 
 def policy_update(context, policy_id, values):
@@ -754,8 +1117,13 @@ def profile_get_by_short_id(context, short_id, project_safe=True):
                              project_safe=project_safe)
 
 
+def profile_find(context, identity, project_safe=True):
+    return query_by_identity(context, models.Profile, identity,
+                             project_safe=project_safe)
+
+
 def profile_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                    project_safe=True):
+                    project_safe=True, cursor=None):
     query = model_query(context, models.Profile)
 
     if project_safe:
@@ -764,11 +1132,9 @@ def profile_get_all(context, limit=None, marker=None, sort=None, filters=None,
     if filters:
         query = utils.exact_filter(query, models.Profile, filters)
 
-    keys, dirs = utils.get_sort_params(sort, consts.PROFILE_CREATED_AT)
-    if marker:
-        marker = model_query(context, models.Profile).get(marker)
-    return sa_utils.paginate_query(query, models.Profile, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(context, query, models.Profile, limit=limit,
+                          marker=marker, cursor=cursor, sort=sort,
+                          default_key=consts.PROFILE_CREATED_AT)
 
 
 def profile_update(context, profile_id, values):
@@ -841,7 +1207,11 @@ def cred_create_update(context, values):
 
 # Events
 def event_create(context, values):
-    with session_for_write() as session:
+    writer = _get_main_context_manager().writer
+    if in_unit_of_work():
+        # A failed event write must not roll back the rest of the unit
+        writer = writer.savepoint
+    with writer.using(_CONTEXT) as session:
         event = models.Event()
         event.update(values)
         session.add(event)
@@ -862,26 +1232,32 @@ def event_get_by_short_id(context, short_id, project_safe=True):
                              project_safe=project_safe)
 
 
+def event_find(context, identity, project_safe=True):
+    return query_by_identity(context, models.Event, identity,
+                             project_safe=project_safe,
+                             by_name=False)
+
+
 def _event_filter_paginate_query(context, query, filters=None,
-                                 limit=None, marker=None, sort=None):
+                                 limit=None, marker=None, sort=None,
+                                 cursor=None):
     if filters:
         query = utils.exact_filter(query, models.Event, filters)
 
-    keys, dirs = utils.get_sort_params(sort, consts.EVENT_TIMESTAMP)
-    if marker:
-        marker = model_query(context, models.Event).get(marker)
-    return sa_utils.paginate_query(query, models.Event, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(context, query, models.Event, limit=limit,
+                          marker=marker, cursor=cursor, sort=sort,
+                          default_key=consts.EVENT_TIMESTAMP)
 
 
 def event_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                  project_safe=True):
+                  project_safe=True, cursor=None):
     query = model_query(context, models.Event)
     if project_safe:
         query = query.filter_by(project=context.project)
 
     return _event_filter_paginate_query(context, query, filters=filters,
-                                        limit=limit, marker=marker, sort=sort)
+                                        limit=limit, marker=marker, sort=sort,
+                                        cursor=cursor)
 
 
 def event_count_by_cluster(context, cluster_id, project_safe=True):
@@ -917,10 +1293,59 @@ def event_prune(context, cluster_id, project_safe=True):
 
 
 # Actions
+def _action_context_ref(session, value):
+    """Get the shared record of an action context, creating it if needed.
+
+    Records are keyed by the digest of the serialized context, so that all
+    the actions derived from a request share a single copy of its context.
+    """
+    data = jsonutils.dumps(value, sort_keys=True).encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+    now = timeutils.utcnow(True)
+
+    ref = session.query(models.ActionContext).get(digest)
+    if ref is None:
+        ref = models.ActionContext(id=digest, context=value, used_at=now)
+        session.add(ref)
+    elif timeutils.is_older_than(ref.used_at, ACTION_CONTEXT_GRACE // 2):
+        ref.used_at = now
+    return ref
+
+
+def _action_claim_query(session):
+    """Query actions to be locked for a claim.
+
+    The shared contexts are not joined to the locked rows, since a context
+    on the nullable side of an outer join cannot be locked by PostgreSQL and
+    would be locked along with the action by MySQL. The context of a claimed
+    action is loaded by a separate query instead, see `_action_claimed`.
+    """
+    return session.query(models.Action).\
+        options(lazyload('context_ref')).with_for_update()
+
+
+def _action_claimed(session, action, owner, timestamp):
+    action.owner = owner
+    action.start_time = timestamp
+    action.status = consts.ACTION_RUNNING
+    action.status_reason = _('The action is being processed.')
+    action.save(session)
+    # Access the shared context while the session is still open, so that it
+    # is loaded by a lookup on its primary key
+    action.context_ref
+    return action
+
+
+@_retry(max_retries=3, retry_interval=0.5, inc_retry_interval=True,
+        exception_checker=lambda e: isinstance(e, db_exc.DBDuplicateEntry))
 def action_create(context, values):
+    values = dict(values)
+    value = values.pop('context', None)
     with session_for_write() as session:
         action = models.Action()
         action.update(values)
+        if value is not None:
+            action.context_ref = _action_context_ref(session, value)
         session.add(action)
         return action
 
@@ -931,10 +1356,33 @@ def action_update(context, action_id, values):
         if not action:
             raise exception.ResourceNotFound(type='action', id=action_id)
 
+        values = dict(values)
+        if 'context' in values:
+            value = values.pop('context')
+            # Drop the copy kept by an action created before contexts were
+            # shared
+            action.context = None
+            action.context_ref = (None if value is None else
+                                  _action_context_ref(session, value))
         action.update(values)
         action.save(session)
 
 
+def action_context_purge(context):
+    """Delete the shared action contexts no longer used by any action.
+
+    :returns: The number of contexts deleted.
+    """
+    cutoff = timeutils.utcnow(True) - datetime.timedelta(
+        seconds=ACTION_CONTEXT_GRACE)
+    used = sqlalchemy.exists().where(
+        models.Action.context_id == models.ActionContext.id)
+    with session_for_write() as session:
+        query = session.query(models.ActionContext).filter(
+            models.ActionContext.used_at < cutoff).filter(~used)
+        return query.delete(synchronize_session=False)
+
+
 def action_get(context, action_id, project_safe=True, refresh=False):
     with session_for_read() as session:
         action = session.query(models.Action).get(action_id)
@@ -959,6 +1407,11 @@ def action_get_by_short_id(context, short_id, project_safe=True):
                              project_safe=project_safe)
 
 
+def action_find(context, identity, project_safe=True):
+    return query_by_identity(context, models.Action, identity,
+                             project_safe=project_safe)
+
+
 def action_get_all_by_owner(context, owner_id):
     query = model_query(context, models.Action).\
         filter_by(owner=owner_id)
@@ -966,7 +1419,7 @@ def action_get_all_by_owner(context, owner_id):
 
 
 def action_get_all(context, filters=None, limit=None, marker=None, sort=None,
-                   project_safe=True):
+                   project_safe=True, cursor=None):
 
     query = model_query(context, models.Action)
     if project_safe:
@@ -975,11 +1428,86 @@ def action_get_all(context, filters=None, limit=None, marker=None, sort=None,
     if filters:
         query = utils.exact_filter(query, models.Action, filters)
 
-    keys, dirs = utils.get_sort_params(sort, consts.ACTION_CREATED_AT)
-    if marker:
-        marker = model_query(context, models.Action).get(marker)
-    return sa_utils.paginate_query(query, models.Action, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(context, query, models.Action, limit=limit,
+                          marker=marker, cursor=cursor, sort=sort,
+                          default_key=consts.ACTION_CREATED_AT)
+
+
+def action_get_timing(context, since=None, limit=None, cluster_id=None,
+                      actions=None, project_safe=True):
+    """Get the recorded timing of completed actions.
+
+    Only the ``action`` and ``outputs`` columns are queried. The most
+    recently completed actions are returned first.
+
+    :param since: If specified, only the actions completed at or after this
+                  timestamp are returned.
+    :param limit: The maximum number of actions to return.
+    :param cluster_id: If specified, only the actions targeting the cluster
+                       or its current member nodes are returned.
+    :param actions: A list of action names to restrict the result to.
+    :param project_safe: Whether only actions from the requesting project are
+                         returned.
+    :returns: A list of (action name, timing dict) tuples.
+    """
+    with session_for_read() as session:
+        query = session.query(models.Action.action, models.Action.outputs)
+        query = query.filter(models.Action.status.in_(
+            [consts.ACTION_SUCCEEDED, consts.ACTION_FAILED,
+             consts.ACTION_CANCELLED]))
+        if since is not None:
+            query = query.filter(models.Action.end_time >= since)
+        if project_safe:
+            query = query.filter_by(project=context.project)
+        if actions:
+            query = query.filter(models.Action.action.in_(actions))
+        if cluster_id:
+            nodes = session.query(models.Node.id).filter_by(
+                cluster_id=cluster_id)
+            query = query.filter(sqlalchemy.or_(
+                models.Action.target == cluster_id,
+                models.Action.target.in_(nodes)))
+        query = query.order_by(models.Action.end_time.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        rows = query.all()
+
+    return [(action, outputs['timing']) for action, outputs in rows
+            if outputs and outputs.get('timing', None)]
+
+
+def action_count_by_status(context, statuses=None):
+    """Count actions of all projects grouped by their status.
+
+    :param statuses: A list of statuses to restrict the result to.
+    :returns: A dict mapping statuses to numbers of actions.
+    """
+    with session_for_read() as session:
+        query = session.query(models.Action.status,
+                              func.count(models.Action.id))
+        if statuses:
+            query = query.filter(models.Action.status.in_(statuses))
+        rows = query.group_by(models.Action.status).all()
+
+    return dict(rows)
+
+
+def action_count_by_project(context, statuses=None):
+    """Count actions of all projects grouped by their project and status.
+
+    :param statuses: A list of statuses to restrict the result to.
+    :returns: A dict mapping (project, status) tuples to numbers of actions.
+    """
+    with session_for_read() as session:
+        query = session.query(models.Action.project, models.Action.status,
+                              func.count(models.Action.id))
+        if statuses:
+            query = query.filter(models.Action.status.in_(statuses))
+        rows = query.group_by(models.Action.project,
+                              models.Action.status).all()
+
+    return dict(((project, status), count)
+                for project, status, count in rows)
 
 
 def action_check_status(context, action_id, timestamp):
@@ -1022,8 +1550,20 @@ def dependency_get_dependents(context, action_id):
         return [d.dependent for d in q.all()]
 
 
-@oslo_db_api.wrap_db_retry(max_retries=3, retry_on_deadlock=True,
-                           retry_interval=0.5, inc_retry_interval=True)
+def dependency_get_by_actions(context, action_ids):
+    if not action_ids:
+        return []
+
+    model = models.ActionDependency
+    with session_for_read() as session:
+        q = session.query(model.depended, model.dependent).filter(
+            sqlalchemy.or_(model.depended.in_(action_ids),
+                           model.dependent.in_(action_ids)))
+        return [(d.depended, d.dependent) for d in q.all()]
+
+
+@_retry(max_retries=3, retry_on_deadlock=True, retry_interval=0.5,
+        inc_retry_interval=True)
 def dependency_add(context, depended, dependent):
     if isinstance(depended, list) and isinstance(dependent, list):
         raise exception.NotSupport(
@@ -1059,7 +1599,7 @@ def dependency_add(context, depended, dependent):
                  synchronize_session='fetch')
 
 
-def action_mark_succeeded(context, action_id, timestamp):
+def action_mark_succeeded(context, action_id, timestamp, outputs=None):
     with session_for_write() as session:
 
         query = session.query(models.Action).filter_by(id=action_id)
@@ -1069,6 +1609,8 @@ def action_mark_succeeded(context, action_id, timestamp):
             'status_reason': _('Action completed successfully.'),
             'end_time': timestamp,
         }
+        if outputs is not None:
+            values['outputs'] = outputs
         query.update(values, synchronize_session=False)
 
         subquery = session.query(models.ActionDependency).filter_by(
@@ -1076,7 +1618,7 @@ def action_mark_succeeded(context, action_id, timestamp):
         subquery.delete(synchronize_session='fetch')
 
 
-def _mark_failed(session, action_id, timestamp, reason=None):
+def _mark_failed(session, action_id, timestamp, reason=None, outputs=None):
     # mark myself as failed
     query = session.query(models.Action).filter_by(id=action_id)
     values = {
@@ -1086,6 +1628,8 @@ def _mark_failed(session, action_id, timestamp, reason=None):
                           _('Action execution failed')),
         'end_time': timestamp,
     }
+    if outputs is not None:
+        values['outputs'] = outputs
     query.update(values, synchronize_session=False)
 
     query = session.query(models.ActionDependency)
@@ -1097,12 +1641,14 @@ def _mark_failed(session, action_id, timestamp, reason=None):
         _mark_failed(session, d, timestamp)
 
 
-def action_mark_failed(context, action_id, timestamp, reason=None):
+def action_mark_failed(context, action_id, timestamp, reason=None,
+                       outputs=None):
     with session_for_write() as session:
-        _mark_failed(session, action_id, timestamp, reason)
+        _mark_failed(session, action_id, timestamp, reason, outputs)
 
 
-def _mark_cancelled(session, action_id, timestamp, reason=None):
+def _mark_cancelled(session, action_id, timestamp, reason=None,
+                    outputs=None):
     query = session.query(models.Action).filter_by(id=action_id)
     values = {
         'owner': None,
@@ -1111,6 +1657,8 @@ def _mark_cancelled(session, action_id, timestamp, reason=None):
                           _('Action execution failed')),
         'end_time': timestamp,
     }
+    if outputs is not None:
+        values['outputs'] = outputs
     query.update(values, synchronize_session=False)
 
     query = session.query(models.ActionDependency)
@@ -1122,17 +1670,17 @@ def _mark_cancelled(session, action_id, timestamp, reason=None):
         _mark_cancelled(session, d, timestamp)
 
 
-def action_mark_cancelled(context, action_id, timestamp, reason=None):
+def action_mark_cancelled(context, action_id, timestamp, reason=None,
+                          outputs=None):
     with session_for_write() as session:
-        _mark_cancelled(session, action_id, timestamp, reason)
+        _mark_cancelled(session, action_id, timestamp, reason, outputs)
 
 
-@oslo_db_api.wrap_db_retry(max_retries=3, retry_on_deadlock=True,
-                           retry_interval=0.5, inc_retry_interval=True)
+@_retry(max_retries=3, retry_on_deadlock=True, retry_interval=0.5,
+        inc_retry_interval=True)
 def action_acquire(context, action_id, owner, timestamp):
     with session_for_write() as session:
-        action = session.query(models.Action).with_for_update().\
-            get(action_id)
+        action = _action_claim_query(session).get(action_id)
         if not action:
             return None
 
@@ -1144,33 +1692,172 @@ def action_acquire(context, action_id, owner, timestamp):
                     '%s') % action.status
             LOG.warning(msg)
             return None
-        action.owner = owner
-        action.start_time = timestamp
-        action.status = consts.ACTION_RUNNING
-        action.status_reason = _('The action is being processed.')
-        action.save(session)
 
-        return action
+        return _action_claimed(session, action, owner, timestamp)
 
 
-@oslo_db_api.wrap_db_retry(max_retries=3, retry_on_deadlock=True,
-                           retry_interval=0.5, inc_retry_interval=True)
-def action_acquire_random_ready(context, owner, timestamp):
+@_retry(max_retries=3, retry_on_deadlock=True, retry_interval=0.5,
+        inc_retry_interval=True)
+def action_coalesce(context, target, action, inputs, mode, max_count=0):
+    """Merge a new action into a compatible ready action of the same target.
+
+    Only ready actions of the requesting user, project and domain are
+    candidates for the merge.
+
+    :param target: ID of the target of the new action.
+    :param action: Name of the new action.
+    :param inputs: Inputs of the new action.
+    :param mode: 'drop' to merge into a ready action with the same inputs,
+                 'sum' to add the 'count' input of the new action to that of
+                 a ready action whose other inputs are the same.
+    :param max_count: Maximum count resulting from a 'sum', 0 for no limit.
+    :returns: The ID of the action merged into, None if there is none.
+    """
     with session_for_write() as session:
-        action = session.query(models.Action).\
+        # Contexts of the candidates are neither needed nor locked. Only
+        # actions of the same requester are merged, for a merged action runs
+        # with the context and trust of the action it is merged into.
+        candidates = session.query(models.Action).\
+            options(lazyload('context_ref')).\
+            filter_by(target=target, action=action, user=context.user,
+                      project=context.project, domain=context.domain,
+                      status=consts.ACTION_READY, owner=None).\
+            order_by(models.Action.created_at).with_for_update().all()
+
+        for candidate in candidates:
+            existing = candidate.inputs or {}
+            if mode == consts.ACTION_COALESCE_DROP:
+                if existing == inputs:
+                    return candidate.id
+                continue
+
+            count = inputs.get('count')
+            old_count = existing.get('count')
+            if (not isinstance(count, int) or not isinstance(old_count, int)
+                    or dict(existing, count=count) != inputs):
+                continue
+            if max_count > 0 and count + old_count > max_count:
+                continue
+            candidate.inputs = dict(existing, count=count + old_count)
+            candidate.save(session)
+            return candidate.id
+
+    return None
+
+
+def _action_pick_project(session, excluded=None, excluded_clusters=None):
+    """Pick the project whose ready action should be claimed next.
+
+    Projects are weighed by the number of actions owned by engines against
+    their configured weight, the project with the lowest load is picked so
+    that a project firing many actions cannot monopolize the engines.
+    Projects already running ``max_actions_per_project`` actions are skipped.
+
+    :returns: A tuple with a boolean telling whether any ready action can be
+              claimed and the project picked.
+    """
+    # Actions owned by an engine are loading it, whatever their status,
+    # e.g. a parent action which is waiting for its derived actions
+    owned = models.Action.owner.isnot(None)
+    ready = sqlalchemy.case([(sqlalchemy.and_(
+        models.Action.status == consts.ACTION_READY,
+        models.Action.owner.is_(None)), 1)], else_=0)
+    running = sqlalchemy.case([(owned, 1)], else_=0)
+    query = session.query(models.Action.project, func.sum(ready),
+                          func.sum(running)).\
+        filter(models.Action.status.in_([consts.ACTION_READY,
+                                         consts.ACTION_RUNNING,
+                                         consts.ACTION_WAITING])).\
+        filter(sqlalchemy.or_(owned,
+                              models.Action.status == consts.ACTION_READY))
+    for condition in _action_claimable(excluded, excluded_clusters):
+        # Owned actions are still counted, their load is the same
+        query = query.filter(sqlalchemy.or_(owned, condition))
+    rows = query.group_by(models.Action.project).all()
+
+    cap = cfg.CONF.max_actions_per_project
+    weights = cfg.CONF.project_action_weights
+    candidates = []
+    for project, num_ready, num_running in rows:
+        if not num_ready or (cap > 0 and num_running >= cap):
+            continue
+        try:
+            weight = float(weights.get(project, 1))
+        except ValueError:
+            weight = 1.0
+        load = (num_running + 1) / max(weight, 0.001)
+        candidates.append((load, random.random(), project))
+
+    if not candidates:
+        return False, None
+    return True, min(candidates)[2]
+
+
+def _action_claimable(excluded=None, excluded_clusters=None):
+    """Get the conditions for ready actions to be claimed.
+
+    :param excluded: A list of prefixes of the names of actions which must
+                     not be claimed.
+    :param excluded_clusters: A list of IDs of clusters whose node actions
+                              must not be claimed.
+    :returns: A list of SQL conditions.
+    """
+    conditions = [~models.Action.action.startswith(prefix)
+                  for prefix in excluded or []]
+    if excluded_clusters:
+        nodes = sqlalchemy.select([models.Node.id]).where(
+            models.Node.cluster_id.in_(excluded_clusters))
+        conditions.append(~sqlalchemy.and_(
+            models.Action.action.startswith('NODE_'),
+            models.Action.target.in_(nodes)))
+    return conditions
+
+
+@_retry(max_retries=3, retry_on_deadlock=True, retry_interval=0.5,
+        inc_retry_interval=True)
+def action_acquire_random_ready(context, owner, timestamp, excluded=None,
+                                excluded_clusters=None):
+    """Acquire a random ready action among those of the highest priority.
+
+    When ``action_fair_share`` is enabled, the action is picked from the
+    project which is running the fewest actions relative to its weight.
+    Ready actions created more than ``action_starvation_timeout`` seconds ago
+    are acquired before any newer action of the same project regardless of
+    their priority.
+
+    :param excluded: A list of prefixes of the names of actions which must
+                     not be acquired, e.g. ['NODE_'].
+    :param excluded_clusters: A list of IDs of clusters whose node actions
+                              must not be acquired.
+    """
+    project = None
+    if cfg.CONF.action_fair_share:
+        # Projects are weighed before the claim transaction, so that the
+        # aggregate does not hold the locks of the claim
+        with session_for_read() as session:
+            found, project = _action_pick_project(session, excluded,
+                                                  excluded_clusters)
+        if not found:
+            return None
+
+    with session_for_write() as session:
+        query = _action_claim_query(session).\
             filter_by(status=consts.ACTION_READY).\
-            filter_by(owner=None).\
-            order_by(func.random()).\
-            with_for_update().first()
+            filter_by(owner=None)
+        for condition in _action_claimable(excluded, excluded_clusters):
+            query = query.filter(condition)
+        if project is not None:
+            query = query.filter_by(project=project)
+        timeout = cfg.CONF.action_starvation_timeout
+        if timeout > 0:
+            aged = timeutils.utcnow() - datetime.timedelta(seconds=timeout)
+            query = query.order_by(sqlalchemy.case(
+                [(models.Action.created_at < aged, 0)], else_=1))
+        action = query.order_by(models.Action.priority.desc(),
+                                func.random()).first()
 
         if action:
-            action.owner = owner
-            action.start_time = timestamp
-            action.status = consts.ACTION_RUNNING
-            action.status_reason = _('The action is being processed.')
-            action.save(session)
-
-            return action
+            return _action_claimed(session, action, owner, timestamp)
 
 
 def action_abandon(context, action_id):
@@ -1253,7 +1940,7 @@ def receiver_get(context, receiver_id, project_safe=True):
 
 
 def receiver_get_all(context, limit=None, marker=None, filters=None, sort=None,
-                     project_safe=True):
+                     project_safe=True, cursor=None):
     query = model_query(context, models.Receiver)
     if project_safe:
         query = query.filter_by(project=context.project)
@@ -1261,11 +1948,9 @@ def receiver_get_all(context, limit=None, marker=None, filters=None, sort=None,
     if filters:
         query = utils.exact_filter(query, models.Receiver, filters)
 
-    keys, dirs = utils.get_sort_params(sort, consts.RECEIVER_NAME)
-    if marker:
-        marker = model_query(context, models.Receiver).get(marker)
-    return sa_utils.paginate_query(query, models.Receiver, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(context, query, models.Receiver, limit=limit,
+                          marker=marker, cursor=cursor, sort=sort,
+                          default_key=consts.RECEIVER_NAME)
 
 
 def receiver_get_by_name(context, name, project_safe=True):
@@ -1278,6 +1963,11 @@ def receiver_get_by_short_id(context, short_id, project_safe=True):
                              project_safe=project_safe)
 
 
+def receiver_find(context, identity, project_safe=True):
+    return query_by_identity(context, models.Receiver, identity,
+                             project_safe=project_safe)
+
+
 def receiver_delete(context, receiver_id):
     with session_for_write() as session:
         receiver = session.query(models.Receiver).get(receiver_id)
@@ -0,0 +1,36 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from sqlalchemy import Column, Index, MetaData, String, Table
+
+from senlin.db.sqlalchemy import types
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    action_context = Table(
+        'action_context', meta,
+        Column('id', String(64), primary_key=True, nullable=False),
+        Column('context', types.Dict),
+        Column('used_at', types.TZAwareDateTime),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    action_context.create()
+
+    # Existing actions keep their own copy of the context
+    action = Table('action', meta, autoload=True)
+    context_id = Column('context_id', String(64), nullable=True)
+    context_id.create(action)
+    Index('ix_action_context_id', action.c.context_id).create()
@@ -0,0 +1,36 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from sqlalchemy import Column, Index, MetaData, String, Table
+
+from senlin.db.sqlalchemy import types
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    node = Table('node', meta, autoload=True)
+    zone = Column('zone', String(255), nullable=True)
+    zone.create(node)
+    Index('ix_node_cluster_id_zone', node.c.cluster_id, node.c.zone).create()
+
+    # Fill the column from the placement already recorded in node data
+    rows = migrate_engine.execute(
+        node.select().with_only_columns([node.c.id, node.c.data]))
+    for node_id, data in rows.fetchall():
+        data = types.decode_value(data) or {}
+        value = (data.get('placement', None) or {}).get('zone', None)
+        if value:
+            migrate_engine.execute(
+                node.update().where(node.c.id == node_id).values(
+                    zone=value.split(':', 1)[0]))
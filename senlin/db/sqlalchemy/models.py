@@ -21,7 +21,9 @@ from sqlalchemy import String, Text
 from sqlalchemy.ext import declarative
 from sqlalchemy.orm import backref
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm import validates
 
+from senlin.common import consts
 from senlin.db.sqlalchemy import types
 
 BASE = declarative.declarative_base()
@@ -119,6 +121,16 @@ class Node(BASE, TimestampMixin, models.ModelBase):
     meta_data = Column(types.Dict)
     data = Column(types.Dict)
     dependents = Column(types.Dict)
+    # Availability zone recorded in data, kept for counting nodes by zone
+    zone = Column(String(255))
+
+    @validates('data')
+    def _sync_zone(self, key, value):
+        placement = (value or {}).get('placement', None) or {}
+        zone = placement.get('zone', None)
+        # Host-qualified zones, e.g. 'nova:host1', are kept by zone name
+        self.zone = zone.split(':', 1)[0] if zone else None
+        return value
 
 
 class ClusterLock(BASE, models.ModelBase):
@@ -212,6 +224,17 @@ class ActionDependency(BASE, models.ModelBase):
                        nullable=False)
 
 
+class ActionContext(BASE, models.ModelBase):
+    """Request contexts of actions, shared by the actions of a request."""
+    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __tablename__ = 'action_context'
+
+    # SHA-256 digest of the serialized context
+    id = Column('id', String(64), primary_key=True)
+    context = Column(types.Dict)
+    used_at = Column(types.TZAwareDateTime)
+
+
 class Action(BASE, TimestampMixin, models.ModelBase):
     """Action objects."""
     __table_args__ = {'mysql_engine': 'InnoDB'}
@@ -219,7 +242,12 @@ class Action(BASE, TimestampMixin, models.ModelBase):
 
     id = Column('id', String(36), primary_key=True, default=lambda: UUID4())
     name = Column(String(63))
-    context = Column(types.Dict)
+    # Only used by actions created before contexts were shared
+    _context = Column('context', types.Dict)
+    context_id = Column(String(64), index=True)
+    context_ref = relationship(
+        ActionContext, lazy='joined',
+        primaryjoin='foreign(Action.context_id) == ActionContext.id')
     target = Column(String(36))
     action = Column(Text)
     cause = Column(String(255))
@@ -238,6 +266,17 @@ class Action(BASE, TimestampMixin, models.ModelBase):
     user = Column(String(32))
     project = Column(String(32))
     domain = Column(String(32))
+    priority = Column(Integer, default=consts.ACTION_PRIORITY_NORMAL)
+
+    @property
+    def context(self):
+        if self.context_ref is not None:
+            return self.context_ref.context
+        return self._context
+
+    @context.setter
+    def context(self, value):
+        self._context = value
 
 
 class Event(BASE, models.ModelBase):
@@ -278,3 +317,5 @@ class Service(BASE, TimestampMixin, models.ModelBase):
     topic = Column(String(255))
     disabled = Column(Boolean, default=False)
     disabled_reason = Column(String(255))
+    # Number of actions the engine can still start, None means unlimited
+    capacity = Column(Integer, nullable=True)
@@ -10,7 +10,12 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import base64
+import zlib
+
+from oslo_config import cfg
 from oslo_serialization import jsonutils
+from oslo_utils import importutils
 from oslo_utils import timeutils
 import pytz
 
@@ -18,6 +23,16 @@ from sqlalchemy.dialects import mysql
 from sqlalchemy.ext import mutable
 from sqlalchemy import types
 
+from senlin.common import exception
+from senlin.common.i18n import _
+
+# The msgpack codec is optional, it is only needed when enabled or when
+# reading values it has encoded
+msgpack = importutils.try_import('msgpack')
+
+cfg.CONF.import_opt('json_column_encoding', 'senlin.common.config')
+cfg.CONF.import_opt('json_column_compress_threshold', 'senlin.common.config')
+
 
 class MutableList(mutable.Mutable, list):
     @classmethod
@@ -74,6 +89,77 @@ class MutableList(mutable.Mutable, list):
         self.changed()
 
 
+# Values encoded otherwise than as plain JSON start with this marker, which
+# cannot start a JSON document, followed by the name of the codec and ':'
+_CODEC_MARKER = '~'
+_ZLIB_SUFFIX = '+zlib'
+
+
+def _get_msgpack():
+    if msgpack is None:
+        raise exception.Error(message=_(
+            "The msgpack encoding of JSON columns requires the msgpack "
+            "package, which is not installed."))
+    return msgpack
+
+
+def encode_value(value):
+    """Encode a value for storing in a JSON column.
+
+    The encoding is chosen by the 'json_column_encoding' option. Encoded
+    values longer than 'json_column_compress_threshold' are compressed.
+    Values which are not plain JSON are base64 encoded behind a marker so
+    that they can be stored in the existing text columns.
+
+    :param value: A value which can be serialized to JSON.
+    :returns: A string.
+    """
+    encoding = cfg.CONF.json_column_encoding
+    threshold = cfg.CONF.json_column_compress_threshold
+
+    if encoding == 'msgpack':
+        data = _get_msgpack().packb(value, default=jsonutils.to_primitive,
+                                    use_bin_type=False)
+    else:
+        data = jsonutils.dumps(value)
+        if not threshold or len(data) < threshold:
+            return data
+        data = data.encode('utf-8')
+
+    if threshold and len(data) >= threshold:
+        data = zlib.compress(data)
+        encoding += _ZLIB_SUFFIX
+
+    return ''.join([_CODEC_MARKER, encoding, ':',
+                    base64.b64encode(data).decode('ascii')])
+
+
+def decode_value(value):
+    """Decode a value read from a JSON column.
+
+    Values in any of the supported encodings are decoded regardless of the
+    current configuration, so that the encoding can be changed at any time.
+    Rows are converted to the configured encoding when they are next written.
+
+    :param value: A string returned by `encode_value`.
+    :returns: The decoded value.
+    """
+    if value is None:
+        return None
+    if not value.startswith(_CODEC_MARKER):
+        return jsonutils.loads(value)
+
+    encoding, _sep, data = value[len(_CODEC_MARKER):].partition(':')
+    data = base64.b64decode(data)
+    if encoding.endswith(_ZLIB_SUFFIX):
+        data = zlib.decompress(data)
+        encoding = encoding[:-len(_ZLIB_SUFFIX)]
+
+    if encoding == 'msgpack':
+        return _get_msgpack().unpackb(data, raw=False)
+    return jsonutils.loads(data.decode('utf-8'))
+
+
 class Dict(types.TypeDecorator):
     impl = types.Text
 
@@ -84,12 +170,10 @@ class Dict(types.TypeDecorator):
             return self.impl
 
     def process_bind_param(self, value, dialect):
-        return jsonutils.dumps(value)
+        return encode_value(value)
 
     def process_result_value(self, value, dialect):
-        if value is None:
-            return None
-        return jsonutils.loads(value)
+        return decode_value(value)
 
 
 class List(types.TypeDecorator):
@@ -102,12 +186,10 @@ class List(types.TypeDecorator):
             return self.impl
 
     def process_bind_param(self, value, dialect):
-        return jsonutils.dumps(value)
+        return encode_value(value)
 
     def process_result_value(self, value, dialect):
-        if value is None:
-            return None
-        return jsonutils.loads(value)
+        return decode_value(value)
 
 
 class TZAwareDateTime(types.TypeDecorator):
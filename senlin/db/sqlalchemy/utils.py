@@ -10,8 +10,19 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import base64
+import datetime
+
 from oslo_config import cfg
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
+import six
+import sqlalchemy
+
+from senlin.common import exception
+from senlin.common.i18n import _
+
+_CURSOR_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
 
 
 def exact_filter(query, model, filters):
@@ -76,6 +87,124 @@ def get_sort_params(value, default_key=None):
     return keys, dirs
 
 
+def seek_filter(query, model, keys, dirs, values):
+    """Applies a keyset pagination predicate to a query.
+
+    Rows following the given sort key values in the order defined by keys
+    and dirs are kept, i.e. (k1 > v1) or (k1 == v1 and k2 > v2) and so on.
+    The first key is also bounded on its own when possible so that the
+    database can seek an index on it.
+
+    :param query: query to apply the predicate to
+    :param model: model object the query applies to
+    :param keys: list of sort keys, as returned by `get_sort_params`
+    :param dirs: list of sort dirs, as returned by `get_sort_params`
+    :param values: list of sort key values of the last row of the previous
+                   page
+    """
+    criteria = []
+    equals = []
+    for key, sort_dir, value in zip(keys, dirs, values):
+        column = getattr(model, key)
+        sort_dir, _s, nulls = sort_dir.partition('-')
+        if value is None:
+            # Only non-null values follow a null one sorted first
+            after = column.isnot(None) if nulls == 'nullsfirst' else None
+            equal = column.is_(None)
+        else:
+            after = column < value if sort_dir == 'desc' else column > value
+            if nulls == 'nullslast':
+                after = sqlalchemy.or_(after, column.is_(None))
+            equal = column == value
+        if after is not None:
+            criteria.append(sqlalchemy.and_(*(equals + [after])))
+        equals.append(equal)
+
+    if not criteria:
+        return query.filter(sqlalchemy.false())
+
+    value = values[0]
+    if value is not None and not dirs[0].endswith('nullslast'):
+        column = getattr(model, keys[0])
+        if dirs[0].startswith('desc'):
+            query = query.filter(column <= value)
+        else:
+            query = query.filter(column >= value)
+
+    return query.filter(sqlalchemy.or_(*criteria))
+
+
+def encode_cursor(obj, sort, default_key):
+    """Build the pagination cursor pointing after an object.
+
+    The cursor is an opaque token carrying the values of all the keys a list
+    is sorted by, so that the next page can be located by an index seek
+    instead of fetching the row of a marker.
+
+    :param obj: The last object of a page.
+    :param sort: The sort parameter of the list request, if any.
+    :param default_key: The key the list is sorted by when no sort parameter
+                        is given.
+    :returns: A URL safe string.
+    """
+    if sort:
+        keys = [s.partition(':')[0] for s in sort.split(',')]
+    else:
+        keys = [default_key]
+
+    values = {}
+    times = []
+    for key in keys + ['id']:
+        value = getattr(obj, key)
+        if isinstance(value, datetime.datetime):
+            value = timeutils.normalize_time(value).strftime(
+                _CURSOR_TIME_FORMAT)
+            times.append(key)
+        values[key] = value
+
+    data = jsonutils.dumps({'v': values, 't': times}).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Get the sort key values carried by a pagination cursor.
+
+    :param cursor: A cursor built by `encode_cursor`.
+    :returns: A dict mapping sort keys to the values of the last object of
+              the previous page, timestamps being naive datetimes in UTC.
+    :raises: `BadRequest` if the cursor is malformed.
+    """
+    try:
+        data = base64.urlsafe_b64decode(
+            str(cursor) + '=' * (-len(cursor) % 4))
+        data = jsonutils.loads(data.decode('utf-8'))
+        values = data['v']
+        for key in data['t']:
+            values[key] = datetime.datetime.strptime(values[key],
+                                                     _CURSOR_TIME_FORMAT)
+    except Exception:
+        msg = _("Invalid pagination cursor: %s") % cursor
+        raise exception.BadRequest(msg=msg)
+
+    return values
+
+
+def prefix_filter(column, prefix):
+    """Get a criterion matching the values starting with a prefix.
+
+    The prefix is turned into a range so that the database can seek an
+    index on the column, which is not always the case for a LIKE pattern.
+
+    :param column: column to compare
+    :param prefix: string the values have to start with
+    """
+    if not prefix:
+        return column.isnot(None)
+
+    upper = prefix[:-1] + six.unichr(ord(prefix[-1]) + 1)
+    return sqlalchemy.and_(column >= prefix, column < upper)
+
+
 def is_service_dead(service):
     """Check if a given service is dead."""
     cfg.CONF.import_opt("periodic_interval", "senlin.common.config")
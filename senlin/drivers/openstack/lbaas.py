@@ -23,6 +23,10 @@ from senlin.drivers.openstack import neutron_v2 as neutronclient
 
 LOG = logging.getLogger(__name__)
 
+# Initial and maximum interval in seconds for loadbalancer status polling
+LB_POLL_INITIAL = 0.5
+LB_POLL_MAX = 10
+
 
 class LoadBalancerDriver(base.DriverBase):
     """Load-balancing driver based on Neutron LBaaS V2 service."""
@@ -44,13 +48,17 @@ class LoadBalancerDriver(base.DriverBase):
 
         This method will keep waiting until loadbalancer resource specified
         by lb_id becomes ready, i.e. its provisioning_status is ACTIVE and
-        its operating_status is ONLINE.
+        its operating_status is ONLINE. The polling interval starts from
+        ``LB_POLL_INITIAL`` seconds and is doubled after every check, up to
+        ``LB_POLL_MAX`` seconds, so that quick status transitions are not
+        penalized by a long fixed sleep.
 
         :param lb_id: ID of the load-balancer to check.
         :param ignore_not_found: if set to True, nonexistent loadbalancer
             resource is also an acceptable result.
         """
         waited = 0
+        interval = LB_POLL_INITIAL
         while waited < self.lb_status_timeout:
             try:
                 lb = self.nc().loadbalancer_get(lb_id)
@@ -71,8 +79,10 @@ class LoadBalancerDriver(base.DriverBase):
             LOG.debug('Waiting for loadbalancer %(lb)s to become ready',
                       {'lb': lb_id})
 
-            eventlet.sleep(10)
-            waited += 10
+            interval = min(interval, self.lb_status_timeout - waited)
+            eventlet.sleep(interval)
+            waited += interval
+            interval = min(interval * 2, LB_POLL_MAX)
 
         return False
 
@@ -241,15 +251,12 @@ class LoadBalancerDriver(base.DriverBase):
 
         return True, _('LB deletion succeeded')
 
-    def member_add(self, node, lb_id, pool_id, port, subnet):
-        """Add a member to Neutron lbaas pool.
+    def _get_member_network(self, subnet):
+        """Get the subnet object and the name of its network.
 
-        :param node: A node object to be added to the specified pool.
-        :param lb_id: The ID of the loadbalancer.
-        :param pool_id: The ID of the pool for receiving the node.
-        :param port: The port for the new LB member to be created.
-        :param subnet: The subnet to be used by the new LB member.
-        :returns: The ID of the new LB member or None if errors occurred.
+        :param subnet: Name or ID of the subnet for LB members.
+        :returns: A tuple of (subnet object, network name) or (None, None) if
+                  errors occurred.
         """
         try:
             subnet_obj = self.nc().subnet_get(subnet)
@@ -260,74 +267,168 @@ class LoadBalancerDriver(base.DriverBase):
             msg = _LE('Failed in getting %(resource)s: %(msg)s.'
                       ) % {'resource': resource, 'msg': six.text_type(ex)}
             LOG.exception(msg)
-            return None
-        net_name = net.name
+            return None, None
 
-        node_detail = node.get_details(oslo_context.get_current())
-        addresses = node_detail.get('addresses')
-        if net_name not in addresses:
-            msg = _LE('Node is not in subnet %(subnet)s')
-            LOG.error(msg, {'subnet': subnet})
-            return None
+        return subnet_obj, net.name
+
+    def members_add(self, nodes, lb_id, pool_id, port, subnet):
+        """Add a list of members to Neutron lbaas pool.
+
+        Neutron LBaaS V2 can only process one member operation at a time, so
+        the members are still created one after another. However, the subnet
+        and network lookups are done only once and the loadbalancer status is
+        checked only once between two consecutive member creations.
+
+        :param nodes: A list of node objects to be added to the pool.
+        :param lb_id: The ID of the loadbalancer.
+        :param pool_id: The ID of the pool for receiving the nodes.
+        :param port: The port for the new LB members to be created.
+        :param subnet: The subnet to be used by the new LB members.
+        :returns: A dict mapping the ID of each node that was successfully
+                  added to the ID of its LB member.
+        """
+        members = {}
+        if not nodes:
+            return members
+
+        subnet_obj, net_name = self._get_member_network(subnet)
+        if subnet_obj is None:
+            return members
+
+        ctx = oslo_context.get_current()
+        # The member whose creation has not yet been confirmed by a ready
+        # loadbalancer, as a tuple of (node ID, member ID).
+        pending = None
+        for node in nodes:
+            node_detail = node.get_details(ctx)
+            addresses = node_detail.get('addresses')
+            if net_name not in addresses:
+                msg = _LE('Node %(node)s is not in subnet %(subnet)s')
+                LOG.error(msg, {'node': node.id, 'subnet': subnet})
+                continue
+
+            # Use the first IP address if more than one are found in target
+            # network
+            address = addresses[net_name][0]['addr']
 
-        # Use the first IP address if more than one are found in target network
-        address = addresses[net_name][0]['addr']
-        try:
             # FIXME(Yanyan Hu): Currently, Neutron lbaasv2 service can not
             # handle concurrent lb member operations well: new member creation
             # deletion request will directly fail rather than being lined up
             # when another operation is still in progress. In this workaround,
             # loadbalancer status will be checked before creating lb member
             # request is sent out. If loadbalancer keeps unready till waiting
-            # timeout, exception will be raised to fail member_add.
+            # timeout, all remaining nodes are skipped.
             res = self._wait_for_lb_ready(lb_id)
-            if not res:
-                msg = _LE('Loadbalancer %s is not ready.') % lb_id
-                raise exception.Error(msg)
-            member = self.nc().pool_member_create(pool_id, address, port,
-                                                  subnet_obj.id)
-        except (exception.InternalError, exception.Error) as ex:
-            msg = _LE('Failed in creating lb pool member: %s.'
-                      ) % six.text_type(ex)
-            LOG.exception(msg)
-            return None
-        res = self._wait_for_lb_ready(lb_id)
-        if res is False:
-            LOG.error(_LE('Failed in creating pool member (%s).') % member.id)
-            return None
+            if pending is not None:
+                if res is False:
+                    LOG.error(_LE('Failed in creating pool member (%s).'),
+                              pending[1])
+                else:
+                    members[pending[0]] = pending[1]
+                pending = None
+            if res is False:
+                LOG.error(_LE('Loadbalancer %s is not ready.'), lb_id)
+                return members
+
+            try:
+                member = self.nc().pool_member_create(pool_id, address, port,
+                                                      subnet_obj.id)
+            except exception.InternalError as ex:
+                msg = _LE('Failed in creating lb pool member: %s.'
+                          ) % six.text_type(ex)
+                LOG.exception(msg)
+                continue
 
-        return member.id
+            pending = (node.id, member.id)
 
-    def member_remove(self, lb_id, pool_id, member_id):
-        """Delete a member from Neutron lbaas pool.
+        if pending is not None:
+            res = self._wait_for_lb_ready(lb_id)
+            if res is False:
+                LOG.error(_LE('Failed in creating pool member (%s).'),
+                          pending[1])
+            else:
+                members[pending[0]] = pending[1]
+
+        return members
+
+    def member_add(self, node, lb_id, pool_id, port, subnet):
+        """Add a member to Neutron lbaas pool.
+
+        :param node: A node object to be added to the specified pool.
+        :param lb_id: The ID of the loadbalancer.
+        :param pool_id: The ID of the pool for receiving the node.
+        :param port: The port for the new LB member to be created.
+        :param subnet: The subnet to be used by the new LB member.
+        :returns: The ID of the new LB member or None if errors occurred.
+        """
+        members = self.members_add([node], lb_id, pool_id, port, subnet)
+        return members.get(node.id, None)
+
+    def members_remove(self, lb_id, pool_id, member_ids):
+        """Delete a list of members from Neutron lbaas pool.
+
+        Like ``members_add``, the members are deleted one after another, but
+        the loadbalancer status is checked only once between two consecutive
+        member deletions.
 
         :param lb_id: The ID of the loadbalancer the operation is targeted at;
-        :param pool_id: The ID of the pool from which the member is deleted;
-        :param member_id: The ID of the LB member.
-        :returns: True if the operation succeeded or False if errors occurred.
+        :param pool_id: The ID of the pool from which the members are deleted;
+        :param member_ids: A list of IDs of the LB members.
+        :returns: A list of IDs of the members that were successfully removed.
         """
-        try:
+        removed = []
+        pending = None
+        for member_id in member_ids:
             # FIXME(Yanyan Hu): Currently, Neutron lbaasv2 service can not
             # handle concurrent lb member operations well: new member creation
             # deletion request will directly fail rather than being lined up
             # when another operation is still in progress. In this workaround,
             # loadbalancer status will be checked before deleting lb member
             # request is sent out. If loadbalancer keeps unready till waiting
-            # timeout, exception will be raised to fail member_remove.
+            # timeout, all remaining members are skipped.
             res = self._wait_for_lb_ready(lb_id)
-            if not res:
-                msg = _LE('Loadbalancer %s is not ready.') % lb_id
-                raise exception.Error(msg)
-            self.nc().pool_member_delete(pool_id, member_id)
-        except (exception.InternalError, exception.Error) as ex:
-            msg = _LE('Failed in removing member %(m)s from pool %(p)s: '
-                      '%(ex)s') % {'m': member_id, 'p': pool_id,
-                                   'ex': six.text_type(ex)}
-            LOG.exception(msg)
-            return None
-        res = self._wait_for_lb_ready(lb_id)
-        if res is False:
-            LOG.error(_LE('Failed in deleting pool member (%s).') % member_id)
+            if pending is not None:
+                if res is False:
+                    LOG.error(_LE('Failed in deleting pool member (%s).'),
+                              pending)
+                else:
+                    removed.append(pending)
+                pending = None
+            if res is False:
+                LOG.error(_LE('Loadbalancer %s is not ready.'), lb_id)
+                return removed
+
+            try:
+                self.nc().pool_member_delete(pool_id, member_id)
+            except exception.InternalError as ex:
+                msg = _LE('Failed in removing member %(m)s from pool %(p)s: '
+                          '%(ex)s') % {'m': member_id, 'p': pool_id,
+                                       'ex': six.text_type(ex)}
+                LOG.exception(msg)
+                continue
+
+            pending = member_id
+
+        if pending is not None:
+            res = self._wait_for_lb_ready(lb_id)
+            if res is False:
+                LOG.error(_LE('Failed in deleting pool member (%s).'),
+                          pending)
+            else:
+                removed.append(pending)
+
+        return removed
+
+    def member_remove(self, lb_id, pool_id, member_id):
+        """Delete a member from Neutron lbaas pool.
+
+        :param lb_id: The ID of the loadbalancer the operation is targeted at;
+        :param pool_id: The ID of the pool from which the member is deleted;
+        :param member_id: The ID of the LB member.
+        :returns: True if the operation succeeded or None if errors occurred.
+        """
+        removed = self.members_remove(lb_id, pool_id, [member_id])
+        if member_id not in removed:
             return None
 
         return True
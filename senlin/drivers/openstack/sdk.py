@@ -14,6 +14,7 @@
 SDK Client
 '''
 import sys
+import time
 
 import functools
 from oslo_config import cfg
@@ -28,6 +29,7 @@ from oslo_serialization import jsonutils
 from requests import exceptions as req_exc
 
 from senlin.common import exception as senlin_exc
+from senlin.common import metrics
 
 USER_AGENT = 'senlin'
 exc = sdk_exc
@@ -92,11 +94,18 @@ def translate_exception(func):
 
     @functools.wraps(func)
     def invoke_with_catch(driver, *args, **kwargs):
+        labels = {'service': driver.__class__.__name__,
+                  'method': func.__name__}
+        started = time.time()
         try:
             return func(driver, *args, **kwargs)
         except Exception as ex:
+            metrics.DRIVER_CALL_ERRORS.inc(**labels)
             LOG.exception(ex)
             raise parse_exception(ex)
+        finally:
+            metrics.DRIVER_CALL_SECONDS.observe(time.time() - started,
+                                                **labels)
 
     return invoke_with_catch
 
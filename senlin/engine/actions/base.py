@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import contextlib
+import copy
 import six
 import time
 
@@ -20,8 +22,10 @@ from oslo_utils import timeutils
 from senlin.common import consts
 from senlin.common import context as req_context
 from senlin.common import exception
-from senlin.common.i18n import _, _LE
+from senlin.common.i18n import _, _LE, _LI
+from senlin.common import metrics
 from senlin.common import utils
+from senlin.db import api as db_api
 from senlin.engine import cluster_policy as cp_mod
 from senlin.engine import event as EVENT
 from senlin.objects import action as ao
@@ -39,6 +43,14 @@ CAUSES = (
     'Derived Action',
 )
 
+# Phases of action execution whose durations are recorded. The time spent in
+# policy checks is recorded per policy, with keys like 'BEFORE:<policy name>'.
+TIMING_PHASES = (
+    TIMING_CLAIM, TIMING_LOCK, TIMING_DRIVER, TIMING_WAIT, TIMING_STATUS,
+) = (
+    'claim', 'lock', 'driver', 'wait', 'status',
+)
+
 
 class Action(object):
     '''An action can be performed on a cluster or a node of a cluster.'''
@@ -142,16 +154,37 @@ class Action(object):
 
         self.data = kwargs.get('data', {})
 
-    def store(self, context):
-        """Store the action record into database table.
+        # Ready actions with a higher priority are claimed first
+        self.priority = kwargs.get('priority', None)
+        if self.priority is None:
+            self.priority = self.default_priority(action, self.cause)
 
-        :param context: An instance of the request context.
-        :return: The ID of the stored object.
-        """
+        # Seconds spent in each phase of the current execution
+        self.timing = {}
 
-        timestamp = timeutils.utcnow(True)
+        # Values last loaded from or written to the database, if known
+        self._stored = None
+
+    @staticmethod
+    def default_priority(action, cause):
+        """Get the default priority of an action.
+
+        Actions run in the background, e.g. for health checking, get a low
+        priority, other actions requested by users get a high priority and
+        derived actions get a normal priority.
 
-        values = {
+        :param action: Name of the action.
+        :param cause: Why the action is fired.
+        :returns: An integer priority.
+        """
+        if action in consts.BACKGROUND_ACTIONS:
+            return consts.ACTION_PRIORITY_LOW
+        if cause == CAUSE_RPC:
+            return consts.ACTION_PRIORITY_HIGH
+        return consts.ACTION_PRIORITY_NORMAL
+
+    def _store_values(self):
+        return {
             'name': self.name,
             'context': self.context.to_dict(),
             'target': self.target,
@@ -172,18 +205,36 @@ class Action(object):
             'user': self.user,
             'project': self.project,
             'domain': self.domain,
+            'priority': self.priority,
         }
 
+    def store(self, context):
+        """Store the action record into database table.
+
+        An existing action is only updated with the fields changed since it
+        was last loaded or stored, the update is skipped if there are none.
+
+        :param context: An instance of the request context.
+        :return: The ID of the stored object.
+        """
+
+        timestamp = timeutils.utcnow(True)
+        values = self._store_values()
+
         if self.id:
+            changes = utils.changed_values(values, self._stored)
+            if not changes:
+                return self.id
             self.updated_at = timestamp
-            values['updated_at'] = timestamp
-            ao.Action.update(context, self.id, values)
+            values['updated_at'] = changes['updated_at'] = timestamp
+            ao.Action.update(context, self.id, changes)
         else:
             self.created_at = timestamp
             values['created_at'] = timestamp
             action = ao.Action.create(context, values)
             self.id = action.id
 
+        self._stored = copy.deepcopy(values)
         return self.id
 
     @classmethod
@@ -210,9 +261,12 @@ class Action(object):
             'created_at': obj.created_at,
             'updated_at': obj.updated_at,
             'data': obj.data,
+            'priority': obj.priority,
         }
 
-        return cls(obj.target, obj.action, context, **kwargs)
+        action = cls(obj.target, obj.action, context, **kwargs)
+        action._stored = copy.deepcopy(action._store_values())
+        return action
 
     @classmethod
     def load(cls, context, action_id=None, db_action=None):
@@ -259,12 +313,31 @@ class Action(object):
     def create(cls, context, target, action, **kwargs):
         """Create an action object.
 
+        A ready action requested by a user may be merged into a compatible
+        ready action of the same target, according to the rules in the
+        `action_coalescing` option.
+
         :param context: The requesting context.
         :param target: The ID of the target cluster/node.
         :param action: Name of the action.
         :param dict kwargs: Other keyword arguments for the action.
-        :return: ID of the action created.
+        :return: ID of the action created or merged into.
         """
+        mode = cfg.CONF.action_coalescing.get(action)
+        if (mode in consts.ACTION_COALESCE_MODES and
+                kwargs.get('cause') == CAUSE_RPC and
+                kwargs.get('status') == cls.READY):
+            action_id = ao.Action.coalesce(context, target, action,
+                                           kwargs.get('inputs') or {}, mode,
+                                           cfg.CONF.max_coalesced_count)
+            if action_id:
+                LOG.info(_LI('Action %(action)s on %(target)s merged into '
+                             'ready action %(id)s.'),
+                         {'action': action, 'target': target,
+                          'id': action_id})
+                metrics.ACTIONS_COALESCED.inc(action=action)
+                return action_id
+
         params = {
             'user': context.user,
             'project': context.project,
@@ -322,28 +395,75 @@ class Action(object):
         '''
         raise NotImplementedError
 
+    @contextlib.contextmanager
+    def timed(self, phase):
+        """Record the time spent in a phase of the action execution.
+
+        :param phase: One of the TIMING_PHASES or a policy check key.
+        """
+        started = wallclock()
+        try:
+            yield
+        finally:
+            self.add_timing(phase, wallclock() - started)
+
+    def add_timing(self, phase, seconds):
+        """Add the seconds spent in a phase to the timing of the action."""
+        self.timing[phase] = self.timing.get(phase, 0) + seconds
+
+    def get_timing(self):
+        """Get the timing of the action in a compact form for storage.
+
+        :returns: A dict with phases as keys and seconds rounded to the
+                  millisecond as values.
+        """
+        return dict((k, round(v, 3)) for k, v in self.timing.items())
+
     def set_status(self, result, reason=None):
-        """Set action status based on return value from execute."""
+        """Set action status based on return value from execute.
+
+        The timing of the action is stored into its outputs as part of the
+        status update. The time spent in that very update is only reported
+        in the event emitted afterwards.
+        """
 
         timestamp = wallclock()
+        if self.timing:
+            self.outputs['timing'] = self.get_timing()
+
+        # The status update, the release of the dependents and the event are
+        # written in one transaction, retried as a whole on deadlocks
+        status = db_api.run_in_unit_of_work(self._store_status, result,
+                                            reason, timestamp)
+        self.status = status
+        self.status_reason = reason
+
+    def _store_status(self, result, reason, timestamp):
+        """Store the status resulting from the execution of the action.
 
+        :returns: The new status of the action.
+        """
         if result == self.RES_OK:
             status = self.SUCCEEDED
-            ao.Action.mark_succeeded(self.context, self.id, timestamp)
+            ao.Action.mark_succeeded(self.context, self.id, timestamp,
+                                     outputs=self.outputs)
 
         elif result == self.RES_ERROR:
             status = self.FAILED
             ao.Action.mark_failed(self.context, self.id, timestamp,
-                                  reason or 'ERROR')
+                                  reason or 'ERROR',
+                                  outputs=self.outputs)
 
         elif result == self.RES_TIMEOUT:
             status = self.FAILED
             ao.Action.mark_failed(self.context, self.id, timestamp,
-                                  reason or 'TIMEOUT')
+                                  reason or 'TIMEOUT',
+                                  outputs=self.outputs)
 
         elif result == self.RES_CANCEL:
             status = self.CANCELLED
-            ao.Action.mark_cancelled(self.context, self.id, timestamp)
+            ao.Action.mark_cancelled(self.context, self.id, timestamp,
+                                     outputs=self.outputs)
 
         else:  # result == self.RES_RETRY:
             status = self.READY
@@ -351,20 +471,33 @@ class Action(object):
             # We abandon it and then notify other dispatchers to execute it
             ao.Action.abandon(self.context, self.id)
 
+        # The fields written above may not match the ones in memory
+        if self._stored is not None:
+            for key in ('owner', 'status', 'status_reason', 'start_time',
+                        'end_time', 'outputs'):
+                self._stored.pop(key, None)
+
+        timing = self.get_timing()
+        timing[TIMING_STATUS] = round(wallclock() - timestamp, 3)
+        extra = {'timing': timing}
         if status == self.SUCCEEDED:
-            EVENT.info(self, consts.PHASE_END, reason or 'SUCCEEDED')
+            EVENT.info(self, consts.PHASE_END, reason or 'SUCCEEDED',
+                       extra=extra)
         elif status == self.READY:
-            EVENT.warning(self, consts.PHASE_ERROR, reason or 'RETRY')
+            EVENT.warning(self, consts.PHASE_ERROR, reason or 'RETRY',
+                          extra=extra)
         else:
-            EVENT.error(self, consts.PHASE_ERROR, reason or 'ERROR')
+            EVENT.error(self, consts.PHASE_ERROR, reason or 'ERROR',
+                        extra=extra)
 
-        self.status = status
-        self.status_reason = reason
+        return status
 
     def get_status(self):
         timestamp = wallclock()
         status = ao.Action.check_status(self.context, self.id, timestamp)
         self.status = status
+        if self._stored is not None:
+            self._stored['status'] = status
         return status
 
     def is_timeout(self):
@@ -450,7 +583,8 @@ class Action(object):
                 return
 
             if method is not None:
-                method(cluster_id, self)
+                with self.timed('%s:%s' % (target, policy.name)):
+                    method(cluster_id, self)
 
             res = self._check_result(policy.name)
             if res is False:
@@ -486,6 +620,7 @@ class Action(object):
             'data': self.data,
             'user': self.user,
             'project': self.project,
+            'priority': self.priority,
         }
         return action_dict
 
@@ -499,6 +634,9 @@ def ActionProc(context, action_id):
         LOG.error(_LE('Action "%s" could not be found.'), action_id)
         return False
 
+    if action.start_time:
+        # Delay between the action being claimed and its execution
+        action.add_timing(TIMING_CLAIM, wallclock() - action.start_time)
     EVENT.info(action, consts.PHASE_START)
 
     reason = 'Action completed'
@@ -21,6 +21,7 @@ from senlin.common import consts
 from senlin.common.i18n import _, _LI
 from senlin.common import scaleutils
 from senlin.common import utils
+from senlin.db import api as db_api
 from senlin.engine.actions import base
 from senlin.engine import cluster as cluster_mod
 from senlin.engine import dispatcher
@@ -59,11 +60,31 @@ class ClusterAction(base.Action):
         if period:
             eventlet.sleep(period)
 
+    def _add_dependents(self, children):
+        """Make the action depend on new actions and make them ready.
+
+        The dependencies and the status updates are written in one
+        transaction, retried as a whole on deadlocks.
+
+        :param children: A list of IDs of the new actions.
+        """
+        def add():
+            dobj.Dependency.create(self.context, children, self.id)
+            for cid in children:
+                ao.Action.update(self.context, cid,
+                                 {'status': base.Action.READY})
+
+        db_api.run_in_unit_of_work(add)
+
     def _wait_for_dependents(self):
         """Wait for dependent actions to complete.
 
         :returns: A tuple containing the result and the corresponding reason.
         """
+        with self.timed(base.TIMING_WAIT), scheduler.waiting(self.id):
+            return self._wait_for_status()
+
+    def _wait_for_status(self):
         status = self.get_status()
         reason = ''
         while status != self.READY:
@@ -132,6 +153,7 @@ class ClusterAction(base.Action):
             kwargs = {
                 'name': 'node_create_%s' % node.id[:8],
                 'cause': base.CAUSE_DERIVED,
+                'data': {'cluster_id': self.target},
             }
 
             action_id = base.Action.create(self.context, node.id,
@@ -140,10 +162,7 @@ class ClusterAction(base.Action):
 
         if child:
             # Build dependency and make the new action ready
-            dobj.Dependency.create(self.context, [a for a in child], self.id)
-            for cid in child:
-                ao.Action.update(self.context, cid,
-                                 {'status': base.Action.READY})
+            self._add_dependents(child)
             dispatcher.start_action()
 
             # Wait for cluster creation to complete
@@ -186,7 +205,7 @@ class ClusterAction(base.Action):
 
         return result, reason
 
-    def _update_nodes(self, profile_id, nodes_obj):
+    def _update_nodes(self, profile_id, node_ids):
         # Get batching policy data if any
         fmt = _LI("Updating cluster '%(cluster)s': profile='%(profile)s'.")
         LOG.info(fmt, {'cluster': self.entity.id, 'profile': profile_id})
@@ -199,10 +218,7 @@ class ClusterAction(base.Action):
             plan = pd.get('plan')
         else:
             pause_time = 0
-            nodes_list = []
-            for node in self.entity.nodes:
-                nodes_list.append(node.id)
-            plan.append(set(nodes_list))
+            plan.append(set(node_ids))
 
         nodes = []
         for node_set in plan:
@@ -213,6 +229,7 @@ class ClusterAction(base.Action):
                 kwargs = {
                     'name': 'node_update_%s' % node[:8],
                     'cause': base.CAUSE_DERIVED,
+                    'data': {'cluster_id': self.target},
                     'inputs': {
                         'new_profile_id': profile_id,
                     },
@@ -222,11 +239,7 @@ class ClusterAction(base.Action):
                 child.append(action_id)
 
             if child:
-                dobj.Dependency.create(self.context, [c for c in child],
-                                       self.id)
-                for cid in child:
-                    ao.Action.update(self.context, cid,
-                                     {'status': base.Action.READY})
+                self._add_dependents(child)
 
                 dispatcher.start_action()
                 # clear the action list
@@ -278,7 +291,8 @@ class ClusterAction(base.Action):
             return self.RES_OK, reason
 
         # Update nodes with new profile
-        result, reason = self._update_nodes(profile_id, self.entity.nodes)
+        result, reason = self._update_nodes(profile_id,
+                                            self.entity.node_ids())
         return result, reason
 
     def _delete_nodes(self, node_ids):
@@ -295,17 +309,14 @@ class ClusterAction(base.Action):
             kwargs = {
                 'name': 'node_delete_%s' % node_id[:8],
                 'cause': base.CAUSE_DERIVED,
+                'data': {'cluster_id': self.target},
             }
             action_id = base.Action.create(self.context, node_id, action_name,
                                            **kwargs)
             child.append(action_id)
 
         if child:
-            dobj.Dependency.create(self.context, [c for c in child], self.id)
-            for cid in child:
-                # Build dependency and make the new action ready
-                ao.Action.update(self.context, cid,
-                                 {'status': base.Action.READY})
+            self._add_dependents(child)
             dispatcher.start_action()
 
             res, reason = self._wait_for_dependents()
@@ -330,7 +341,7 @@ class ClusterAction(base.Action):
         batch = 0
         reason = _('Deletion in progress.')
         self.entity.set_status(self.context, consts.CS_DELETING, reason)
-        node_ids = [node.id for node in self.entity.nodes]
+        node_ids = self.entity.node_ids()
 
         # For cluster delete, we delete the nodes
         data = {
@@ -413,16 +424,14 @@ class ClusterAction(base.Action):
                 'name': 'node_join_%s' % nid[:8],
                 'cause': base.CAUSE_DERIVED,
                 'inputs': {'cluster_id': self.target},
+                'data': {'cluster_id': self.target},
             }
             action_id = base.Action.create(self.context, nid, consts.NODE_JOIN,
                                            **kwargs)
             child.append(action_id)
 
         if child:
-            dobj.Dependency.create(self.context, [c for c in child], self.id)
-            for cid in child:
-                ao.Action.update(self.context, cid,
-                                 {'status': base.Action.READY})
+            self._add_dependents(child)
             dispatcher.start_action()
 
         # Wait for dependent action if any
@@ -513,6 +522,15 @@ class ClusterAction(base.Action):
 
         return result, reason
 
+    def _start_replacement(self, join_id, leave_id):
+        """Make the actions replacing a node ready in one transaction."""
+        ao.Action.update(self.context, join_id,
+                         {'status': base.Action.READY})
+
+        dobj.Dependency.create(self.context, [join_id], leave_id)
+        ao.Action.update(self.context, leave_id,
+                         {'status': base.Action.READY})
+
     @profiler.trace('ClusterAction.do_replace_nodes', hide_args=False)
     def do_replace_nodes(self):
         """Handler for the CLUSTER_REPLACE_NODES action.
@@ -568,11 +586,13 @@ class ClusterAction(base.Action):
 
             # node_leave action
             kwargs['name'] = 'node_leave_%s' % original[:8]
+            kwargs['data'] = {'cluster_id': self.target}
             leave_action_id = base.Action.create(self.context, original,
                                                  consts.NODE_LEAVE, **kwargs)
             # node_join action
             kwargs['name'] = 'node_join_%s' % replacement[:8]
             kwargs['inputs'] = {'cluster_id': self.target}
+            kwargs['data'] = {'cluster_id': self.target}
             join_action_id = base.Action.create(self.context, replacement,
                                                 consts.NODE_JOIN, **kwargs)
 
@@ -582,15 +602,7 @@ class ClusterAction(base.Action):
             dobj.Dependency.create(self.context, [c[0] for c in children],
                                    self.id)
             for child in children:
-                join_id = child[0]
-                leave_id = child[1]
-                ao.Action.update(self.context, join_id,
-                                 {'status': base.Action.READY})
-
-                dobj.Dependency.create(self.context, [join_id], leave_id)
-                ao.Action.update(self.context, leave_id,
-                                 {'status': base.Action.READY})
-
+                db_api.run_in_unit_of_work(self._start_replacement, *child)
                 dispatcher.start_action()
 
             result, new_reason = self._wait_for_dependents()
@@ -615,20 +627,17 @@ class ClusterAction(base.Action):
         child = []
         res = self.RES_OK
         reason = _('Cluster checking completed.')
-        for node in self.entity.nodes:
-            node_id = node.id
+        for node_id in self.entity.node_ids():
             action_id = base.Action.create(
                 self.context, node_id, consts.NODE_CHECK,
                 name='node_check_%s' % node_id[:8],
                 cause=base.CAUSE_DERIVED,
+                data={'cluster_id': self.target},
             )
             child.append(action_id)
 
         if child:
-            dobj.Dependency.create(self.context, [c for c in child], self.id)
-            for cid in child:
-                ao.Action.update(self.context, cid,
-                                 {'status': base.Action.READY})
+            self._add_dependents(child)
             dispatcher.start_action()
 
             # Wait for dependent action if any
@@ -659,7 +668,7 @@ class ClusterAction(base.Action):
                 inputs['force'] = True
 
         children = []
-        for node in self.entity.nodes:
+        for node in no.Node.iter_all(self.context, cluster_id=self.target):
             if node.status == 'ACTIVE':
                 continue
             node_id = node.id
@@ -667,16 +676,14 @@ class ClusterAction(base.Action):
                 self.context, node_id, consts.NODE_RECOVER,
                 name='node_recover_%s' % node_id[:8],
                 cause=base.CAUSE_DERIVED, inputs=inputs,
+                data={'cluster_id': self.target},
             )
             children.append(action_id)
 
         res = self.RES_OK
         reason = _('Cluster recovery succeeded.')
         if children:
-            dobj.Dependency.create(self.context, [c for c in children],
-                                   self.id)
-            for cid in children:
-                ao.Action.update(self.context, cid, {'status': 'READY'})
+            self._add_dependents(children)
             dispatcher.start_action()
 
             # Wait for dependent action if any
@@ -724,8 +731,9 @@ class ClusterAction(base.Action):
 
             # Choose victims randomly if not already picked
             if not candidates:
-                node_list = self.entity.nodes
-                candidates = scaleutils.nodes_by_random(node_list, count)
+                candidates = no.Node.get_victims(self.context, self.target,
+                                                 count, consts.DELETE_RANDOM,
+                                                 project_safe=False)
 
             self._update_cluster_size(curr_capacity - count)
 
@@ -828,7 +836,9 @@ class ClusterAction(base.Action):
 
         # Choose victims randomly
         if len(candidates) == 0:
-            candidates = scaleutils.nodes_by_random(self.entity.nodes, count)
+            candidates = no.Node.get_victims(self.context, self.target,
+                                             count, consts.DELETE_RANDOM,
+                                             project_safe=False)
 
         #
         self._sleep(grace_period)
@@ -943,10 +953,11 @@ class ClusterAction(base.Action):
         """
         # Try to lock cluster before do real operation
         forced = True if self.action == consts.CLUSTER_DELETE else False
-        res = senlin_lock.cluster_lock_acquire(self.context, self.target,
-                                               self.id, self.owner,
-                                               senlin_lock.CLUSTER_SCOPE,
-                                               forced)
+        with self.timed(base.TIMING_LOCK):
+            res = senlin_lock.cluster_lock_acquire(self.context, self.target,
+                                                   self.id, self.owner,
+                                                   senlin_lock.CLUSTER_SCOPE,
+                                                   forced)
         # Failed to acquire lock, return RES_RETRY
         if not res:
             return self.RES_RETRY, _('Failed in locking cluster.')
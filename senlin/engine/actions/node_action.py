@@ -17,6 +17,7 @@ from osprofiler import profiler
 from senlin.common import consts
 from senlin.common.i18n import _
 from senlin.common import scaleutils as su
+from senlin.db import api as db_api
 from senlin.engine.actions import base
 from senlin.engine import cluster as cm
 from senlin.engine import event as EVENT
@@ -64,7 +65,8 @@ class NodeAction(base.Action):
                                {'cluster_id': ''})
                 return self.RES_ERROR, result
 
-        res = self.entity.do_create(self.context)
+        with self.timed(base.TIMING_DRIVER):
+            res = self.entity.do_create(self.context)
 
         if cluster_id and self.cause == base.CAUSE_RPC:
             # Update cluster's desired_capacity and re-evaluate its status no
@@ -102,7 +104,8 @@ class NodeAction(base.Action):
                 if grace_period:
                     eventlet.sleep(grace_period)
 
-        res = self.entity.do_delete(self.context)
+        with self.timed(base.TIMING_DRIVER):
+            res = self.entity.do_delete(self.context)
 
         if cluster_id and self.cause == base.CAUSE_RPC:
             # check if desired_capacity should be changed
@@ -127,7 +130,8 @@ class NodeAction(base.Action):
         :returns: A tuple containing the result and the corresponding reason.
         """
         params = self.inputs
-        res = self.entity.do_update(self.context, params)
+        with self.timed(base.TIMING_DRIVER):
+            res = self.entity.do_update(self.context, params)
         if res:
             return self.RES_OK, _('Node updated successfully.')
         else:
@@ -145,7 +149,8 @@ class NodeAction(base.Action):
         :returns: A tuple containing the result and the corresponding reason.
         """
         cluster_id = self.inputs.get('cluster_id')
-        result = self.entity.do_join(self.context, cluster_id)
+        with self.timed(base.TIMING_DRIVER):
+            result = self.entity.do_join(self.context, cluster_id)
         if result:
             return self.RES_OK, _('Node successfully joined cluster.')
         else:
@@ -162,7 +167,8 @@ class NodeAction(base.Action):
 
         :returns: A tuple containing the result and the corresponding reason.
         """
-        res = self.entity.do_leave(self.context)
+        with self.timed(base.TIMING_DRIVER):
+            res = self.entity.do_leave(self.context)
         if res:
             return self.RES_OK, _('Node successfully left cluster.')
         else:
@@ -174,7 +180,8 @@ class NodeAction(base.Action):
 
         :returns: A tuple containing the result and the corresponding reason.
         """
-        res = self.entity.do_check(self.context)
+        with self.timed(base.TIMING_DRIVER):
+            res = self.entity.do_check(self.context)
         if res:
             return self.RES_OK, _('Node status is ACTIVE.')
         else:
@@ -186,7 +193,8 @@ class NodeAction(base.Action):
 
         :returns: A tuple containing the result and the corresponding reason.
         """
-        res = self.entity.do_recover(self.context, **self.inputs)
+        with self.timed(base.TIMING_DRIVER):
+            res = self.entity.do_recover(self.context, **self.inputs)
         if res:
             return self.RES_OK, _('Node recovered successfully.')
         else:
@@ -199,7 +207,8 @@ class NodeAction(base.Action):
         :returns: A tuple containing the result and the corresponding reason.
         """
         operation = self.inputs['operation']
-        res = self.entity.do_operation(self.context, **self.inputs)
+        with self.timed(base.TIMING_DRIVER):
+            res = self.entity.do_operation(self.context, **self.inputs)
         if res:
             return self.RES_OK, _("Node operation '%s' succeeded."
                                   ) % operation
@@ -231,9 +240,10 @@ class NodeAction(base.Action):
         # we record it here for policy check and cluster lock release.
         saved_cluster_id = self.entity.cluster_id
         if (saved_cluster_id and self.cause == base.CAUSE_RPC):
-            res = senlin_lock.cluster_lock_acquire(
-                self.context, self.entity.cluster_id, self.id, self.owner,
-                senlin_lock.NODE_SCOPE, False)
+            with self.timed(base.TIMING_LOCK):
+                res = senlin_lock.cluster_lock_acquire(
+                    self.context, self.entity.cluster_id, self.id,
+                    self.owner, senlin_lock.NODE_SCOPE, False)
 
             if not res:
                 return self.RES_RETRY, _('Failed in locking cluster')
@@ -247,8 +257,10 @@ class NodeAction(base.Action):
 
         reason = ''
         try:
-            res = senlin_lock.node_lock_acquire(self.context, self.entity.id,
-                                                self.id, self.owner, False)
+            with self.timed(base.TIMING_LOCK):
+                res = senlin_lock.node_lock_acquire(self.context,
+                                                    self.entity.id, self.id,
+                                                    self.owner, False)
             if not res:
                 res = self.RES_RETRY
                 reason = _('Failed in locking node')
@@ -263,12 +275,16 @@ class NodeAction(base.Action):
                     else:
                         res = self.RES_OK
         finally:
-            senlin_lock.node_lock_release(self.entity.id, self.id)
-            if saved_cluster_id and self.cause == base.CAUSE_RPC:
-                senlin_lock.cluster_lock_release(saved_cluster_id, self.id,
-                                                 senlin_lock.NODE_SCOPE)
+            db_api.run_in_unit_of_work(self._release_locks, saved_cluster_id)
         return res, reason
 
+    def _release_locks(self, cluster_id):
+        """Release the locks of the action in one transaction."""
+        senlin_lock.node_lock_release(self.entity.id, self.id)
+        if cluster_id and self.cause == base.CAUSE_RPC:
+            senlin_lock.cluster_lock_release(cluster_id, self.id,
+                                             senlin_lock.NODE_SCOPE)
+
     def cancel(self):
         """Handler for cancelling the action."""
         return self.RES_OK
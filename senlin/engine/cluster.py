@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
+
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import timeutils
@@ -22,6 +24,7 @@ from senlin.engine import cluster_policy as cpm
 from senlin.engine import node as node_mod
 from senlin.objects import cluster as co
 from senlin.objects import cluster_policy as cpo
+from senlin.objects import node as no
 from senlin.policies import base as pcb
 from senlin.profiles import base as pfb
 
@@ -80,6 +83,9 @@ class Cluster(object):
             'policies': []
         }
 
+        # Values last loaded from or written to the database, if known
+        self._stored = None
+
         if context is not None:
             self._load_runtime_data(context)
 
@@ -94,21 +100,16 @@ class Cluster(object):
             policy = pcb.Policy.load(context, b.policy_id)
             policies.append(policy)
 
-        nodes = node_mod.Node.load_all(context, cluster_id=self.id)
+        # The nodes are only loaded when first needed
+        self._context = context
         self.rt = {
             'profile': pfb.Profile.load(context, profile_id=self.profile_id,
                                         project_safe=False),
-            'nodes': [n for n in nodes],
             'policies': policies
         }
 
-    def store(self, context):
-        '''Store the cluster in database and return its ID.
-
-        If the ID already exists, we do an update.
-        '''
-
-        values = {
+    def _store_values(self):
+        return {
             'name': self.name,
             'profile_id': self.profile_id,
             'user': self.user,
@@ -129,19 +130,37 @@ class Cluster(object):
             'dependents': self.dependents,
         }
 
+    def store(self, context):
+        '''Store the cluster in database and return its ID.
+
+        If the ID already exists, we do an update of the fields changed since
+        the cluster was last loaded or stored, if any.
+        '''
+
+        values = self._store_values()
+
         timestamp = timeutils.utcnow(True)
         if self.id:
-            values['updated_at'] = timestamp
-            co.Cluster.update(context, self.id, values)
+            changes = utils.changed_values(values, self._stored)
+            if changes:
+                self.updated_at = timestamp
+                values['updated_at'] = changes['updated_at'] = timestamp
+                co.Cluster.update(context, self.id, changes)
         else:
             self.init_at = timestamp
             values['init_at'] = timestamp
             cluster = co.Cluster.create(context, values)
             self.id = cluster.id
 
+        self._stored = copy.deepcopy(values)
         self._load_runtime_data(context)
         return self.id
 
+    def _set_stored(self, values):
+        """Record values written to the database by other means."""
+        if self._stored is not None:
+            self._stored.update(copy.deepcopy(values))
+
     @classmethod
     def _from_object(cls, context, obj):
         """Construct a cluster from database object.
@@ -168,8 +187,10 @@ class Cluster(object):
             'dependents': obj.dependents,
         }
 
-        return cls(obj.name, obj.desired_capacity, obj.profile_id,
-                   context=context, **kwargs)
+        cluster = cls(obj.name, obj.desired_capacity, obj.profile_id,
+                      context=context, **kwargs)
+        cluster._stored = copy.deepcopy(cluster._store_values())
+        return cluster
 
     @classmethod
     def load(cls, context, cluster_id=None, dbcluster=None, project_safe=True):
@@ -184,12 +205,12 @@ class Cluster(object):
 
     @classmethod
     def load_all(cls, context, limit=None, marker=None, sort=None,
-                 filters=None, project_safe=True):
+                 filters=None, project_safe=True, cursor=None):
         """Retrieve all clusters from database."""
 
         objs = co.Cluster.get_all(context, limit=limit, marker=marker,
                                   sort=sort, filters=filters,
-                                  project_safe=project_safe)
+                                  project_safe=project_safe, cursor=cursor)
 
         for obj in objs:
             cluster = cls._from_object(context, obj)
@@ -215,7 +236,7 @@ class Cluster(object):
             'metadata': self.metadata,
             'data': self.data,
             'dependents': self.dependents,
-            'nodes': [node.id for node in self.rt['nodes']],
+            'nodes': self.node_ids(),
             'policies': [policy.id for policy in self.rt['policies']],
         }
         if self.rt['profile']:
@@ -262,6 +283,7 @@ class Cluster(object):
             profile = pfb.Profile.load(context, profile_id=self.profile_id)
             self.rt['profile'] = profile
         co.Cluster.update(context, self.id, values)
+        self._set_stored(co.Cluster._transpose_metadata(dict(values)))
         return
 
     def do_create(self, context, **kwargs):
@@ -415,21 +437,41 @@ class Cluster(object):
 
     @property
     def nodes(self):
+        if 'nodes' not in self.rt:
+            self.rt['nodes'] = list(
+                node_mod.Node.load_all(self._context, cluster_id=self.id))
         return self.rt['nodes']
 
+    def node_ids(self):
+        """Get the IDs of the nodes of the cluster.
+
+        The nodes are not loaded if they are not cached yet, only their
+        database records are read chunk by chunk.
+
+        :return: A list of node IDs.
+        """
+        if 'nodes' in self.rt:
+            return [node.id for node in self.rt['nodes']]
+        return [obj.id for obj in
+                no.Node.iter_all(self._context, cluster_id=self.id)]
+
     def add_node(self, node):
         """Append specified node to the cluster cache.
 
+        The cache is left alone if the nodes are not loaded yet since they
+        are then loaded from the database, where the node is stored.
+
         :param node: The node to become a new member of the cluster.
         """
-        self.rt['nodes'].append(node)
+        if 'nodes' in self.rt:
+            self.rt['nodes'].append(node)
 
     def remove_node(self, node_id):
         """Remove node with specified ID from cache.
 
         :param node_id: ID of the node to be removed from cache.
         """
-        for node in self.rt['nodes']:
+        for node in self.rt.get('nodes', []):
             if node.id == node_id:
                 self.rt['nodes'].remove(node)
 
@@ -437,20 +479,19 @@ class Cluster(object):
     def policies(self):
         return self.rt['policies']
 
-    def get_region_distribution(self, regions):
+    def get_region_distribution(self, ctx, regions):
         """Get node distribution regarding given regions.
 
+        :param ctx: context used for DB operations.
         :param regions: list of region names to check.
         :return: a dict containing region and number as key value pairs.
         """
         dist = dict.fromkeys(regions, 0)
 
-        for node in self.nodes:
-            placement = node.data.get('placement', {})
-            if placement:
-                region = placement.get('region_name', None)
-                if region and region in regions:
-                    dist[region] += 1
+        for node in no.Node.get_records(ctx, self.id, project_safe=False):
+            region = node.placement.get('region_name', None)
+            if region and region in regions:
+                dist[region] += 1
 
         return dist
 
@@ -458,54 +499,16 @@ class Cluster(object):
         """Get node distribution regarding the given the availability zones.
 
         The availability zone information is only available for some profiles.
+        It is recorded into node data when a node is created or checked and
+        it is refreshed periodically by the health manager. Nodes without a
+        recorded zone are not counted until their placement is refreshed.
 
         :param ctx: context used to access node details.
         :param zones: list of zone names to check.
         :returns: a dict containing zone and number as key-value pairs.
         """
-        dist = dict.fromkeys(zones, 0)
-
-        for node in self.nodes:
-            placement = node.data.get('placement', {})
-            if placement and 'zone' in placement:
-                zone = placement['zone']
-                dist[zone] += 1
-            else:
-                details = node.get_details(ctx)
-                zname = details.get('OS-EXT-AZ:availability_zone', None)
-                if zname and zname in dist:
-                    dist[zname] += 1
-
-        return dist
-
-    def nodes_by_region(self, region):
-        """Get list of nodes that belong to the specified region.
-
-        :param region: Name of region for filtering.
-        :return: A list of nodes that are from the specified region.
-        """
-        result = []
-        for node in self.nodes:
-            placement = node.data.get('placement', {})
-            if placement and 'region_name' in placement:
-                if region == placement['region_name']:
-                    result.append(node)
-        return result
-
-    def nodes_by_zone(self, zone):
-        """Get list of nodes that reside in the specified availability zone.
-
-        :param zone: Name of availability zone for filtering.
-        :return: A list of nodes that reside in the specified AZ.
-        """
-        # TODO(anyone): Improve this to do a forced refresh via get_details?
-        result = []
-        for node in self.nodes:
-            placement = node.data.get('placement', {})
-            if placement and 'zone' in placement:
-                if zone == placement['zone']:
-                    result.append(node)
-        return result
+        counts = no.Node.count_by_zone(ctx, self.id, project_safe=False)
+        return dict((zone, counts.get(zone, 0)) for zone in zones)
 
     def eval_status(self, ctx, operation, **params):
         """Re-evaluate cluster's health status.
@@ -514,13 +517,8 @@ class Cluster(object):
         :param operation: The operation that triggers this status evaluation.
         :returns: ``None``.
         """
-        nodes = node_mod.Node.load_all(ctx, cluster_id=self.id)
-        self.rt['nodes'] = [n for n in nodes]
-
-        active_count = 0
-        for node in self.nodes:
-            if node.status == 'ACTIVE':
-                active_count += 1
+        counts = no.Node.count_by_status(ctx, self.id)
+        active_count = counts.get(consts.NS_ACTIVE, 0)
 
         # get provided desired_capacity/min_size/max_size
         desired = params.get('desired_capacity', self.desired_capacity)
@@ -549,3 +547,8 @@ class Cluster(object):
 
         values.update({'status': status, 'status_reason': reason})
         co.Cluster.update(ctx, self.id, values)
+
+        # The values written above are not reflected in memory
+        if self._stored is not None:
+            for key in co.Cluster._transpose_metadata(dict(values)):
+                self._stored.pop(key, None)
@@ -10,15 +10,20 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import eventlet
 from oslo_config import cfg
 from oslo_context import context as oslo_context
 from oslo_log import log as logging
 import oslo_messaging
 from oslo_service import service
+from oslo_utils import timeutils
 
 from senlin.common import consts
-from senlin.common.i18n import _LI
+from senlin.common import context
+from senlin.common.i18n import _LE, _LI
 from senlin.common import messaging as messaging
+from senlin.common import metrics
+from senlin.objects import service as service_obj
 
 LOG = logging.getLogger(__name__)
 
@@ -28,6 +33,15 @@ OPERATIONS = (
     'start_action', 'cancel_action', 'stop'
 )
 
+# The RPC client is reused as long as the transport is not changed
+_CLIENT = {'key': None, 'client': None}
+
+# Notifications to start actions waiting to be sent
+_PENDING = {'count': 0, 'timer': None, 'rotation': 0}
+
+# Engines alive as last read from the service records, and when to read again
+_ENGINES = {'services': None, 'expires': 0}
+
 
 class Dispatcher(service.Service):
     """RPC server for dispatching actions.
@@ -93,7 +107,7 @@ def notify(method, engine_id=None, **kwargs):
     :param method: remote method to call
     :param engine_id: dispatcher to notify; None implies broadcast
     """
-    client = messaging.get_rpc_client(consts.DISPATCHER_TOPIC, cfg.CONF.host)
+    client = _get_client()
 
     if engine_id:
         # Notify specific dispatcher identified by engine_id
@@ -102,15 +116,133 @@ def notify(method, engine_id=None, **kwargs):
         # Broadcast to all disptachers
         call_context = client.prepare(fanout=True)
 
+    # We don't use ctext parameter in action progress actually. But since
+    # RPCClient.call needs this param, we use oslo current context here,
+    # or an admin context in threads without a context, e.g. timers.
+    ctx = oslo_context.get_current() or context.get_admin_context()
     try:
-        # We don't use ctext parameter in action progress
-        # actually. But since RPCClient.call needs this param,
-        # we use oslo current context here.
-        call_context.cast(oslo_context.get_current(), method, **kwargs)
+        call_context.cast(ctx, method, **kwargs)
         return True
     except oslo_messaging.MessagingTimeout:
         return False
 
 
+def _get_client():
+    key = (messaging.TRANSPORT, cfg.CONF.host)
+    if _CLIENT['client'] is None or _CLIENT['key'] != key:
+        _CLIENT['client'] = messaging.get_rpc_client(consts.DISPATCHER_TOPIC,
+                                                     cfg.CONF.host)
+        _CLIENT['key'] = key
+    return _CLIENT['client']
+
+
+def _live_engines():
+    """Get the service records of the engines alive.
+
+    Engines refresh their records every ``periodic_interval`` seconds, so
+    the records are read again only once they are that old.
+    """
+    now = timeutils.utcnow_ts(microsecond=True)
+    if _ENGINES['services'] is None or now >= _ENGINES['expires']:
+        ctx = context.get_admin_context()
+        max_interval = 2 * cfg.CONF.periodic_interval
+        _ENGINES['services'] = [
+            svc for svc in service_obj.Service.get_all(ctx)
+            if svc.binary == 'senlin-engine' and not svc.disabled and
+            not timeutils.is_older_than(svc.updated_at, max_interval)]
+        _ENGINES['expires'] = now + cfg.CONF.periodic_interval
+    return _ENGINES['services']
+
+
+def _select_engines(count):
+    """Select the engines to notify of new ready actions.
+
+    Engines reporting no capacity have no bound on the actions they run, so
+    all of them are notified. Engines with free capacity are picked, the
+    least loaded first, until their capacity covers the number of actions,
+    and one more engine is picked as a fallback in case one of them is no
+    longer consuming notifications. Engines with the same capacity are
+    picked in a round-robin way.
+
+    :param count: Number of actions the notification is about.
+    :returns: A list of engine IDs, empty if the notification is to be
+              broadcast, i.e. when no engine reports a capacity or no engine
+              is known to have room.
+    """
+    live = _live_engines()
+    if all(svc.capacity is None for svc in live):
+        return []
+
+    engines = [svc for svc in live
+               if svc.capacity is None or svc.capacity > 0]
+    if not engines:
+        return []
+
+    _PENDING['rotation'] = (_PENDING['rotation'] + 1) % len(engines)
+    engines = engines[_PENDING['rotation']:] + engines[:_PENDING['rotation']]
+    engines.sort(key=lambda svc: (svc.capacity is not None,
+                                  -(svc.capacity or 0)))
+    selected = [svc.id for svc in engines if svc.capacity is None]
+    bounded = [svc for svc in engines if svc.capacity is not None]
+    for index, svc in enumerate(bounded):
+        selected.append(svc.id)
+        count -= svc.capacity
+        if count <= 0:
+            # Notify one more engine in case a picked one is not listening
+            if index + 1 < len(bounded):
+                selected.append(bounded[index + 1].id)
+            break
+    return selected
+
+
+def _flush(ctx=None):
+    """Send the pending notifications to start actions.
+
+    :param ctx: the context of the caller which started the coalescing
+                window, used by the timer thread sending the notifications.
+    """
+    if ctx is not None:
+        ctx.update_store()
+
+    count = _PENDING['count']
+    _PENDING['count'] = 0
+    _PENDING['timer'] = None
+    try:
+        engines = _select_engines(count)
+    except Exception as ex:
+        LOG.error(_LE('Failed selecting engines to notify: %s'), ex)
+        engines = []
+
+    if not engines:
+        metrics.DISPATCH_NOTIFICATIONS.inc(mode='broadcast')
+        return notify(START_ACTION)
+
+    result = True
+    for engine_id in engines:
+        metrics.DISPATCH_NOTIFICATIONS.inc(mode='targeted')
+        result = notify(START_ACTION, engine_id) and result
+    return result
+
+
 def start_action(engine_id=None, **kwargs):
-    return notify(START_ACTION, engine_id, **kwargs)
+    """Notify dispatchers to start actions.
+
+    Notifications which are not about a specific engine or action are
+    coalesced within ``dispatch_coalesce_window`` seconds and sent to the
+    engines with free capacity instead of being broadcast.
+
+    :param engine_id: dispatcher to notify; None implies any dispatcher
+    """
+    if engine_id is not None or kwargs:
+        return notify(START_ACTION, engine_id, **kwargs)
+
+    _PENDING['count'] += 1
+    window = cfg.CONF.dispatch_coalesce_window
+    if window <= 0:
+        return _flush()
+
+    metrics.DISPATCH_NOTIFICATIONS.inc(mode='coalesced')
+    if _PENDING['timer'] is None:
+        _PENDING['timer'] = eventlet.spawn_after(window, _flush,
+                                                 oslo_context.get_current())
+    return True
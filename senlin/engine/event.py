@@ -18,9 +18,15 @@ from stevedore import named
 
 from senlin.common import consts
 from senlin.common.i18n import _LE, _LI, _LW
+from senlin.common import metrics
+from senlin.db import api as db_api
 
 LOG = logging.getLogger(__name__)
 FMT = '%(name)s [%(id)s] %(action)s - %(phase)s: %(reason)s'
+LEVEL_NAMES = dict((v, k) for k, v in consts.EVENT_LEVELS.items())
+# Dispatcher writing events into the database, which takes part in the
+# transaction of a unit of work
+DB_DISPATCHER = 'database'
 dispatchers = None
 
 
@@ -48,7 +54,7 @@ def _event_data(action, phase=None, reason=None):
                 reason=reason)
 
 
-def _dump(level, action, phase, reason, timestamp):
+def _dump(level, action, phase, reason, timestamp, extra=None):
     global dispatchers
 
     if timestamp is None:
@@ -61,34 +67,61 @@ def _dump(level, action, phase, reason, timestamp):
         if level < bound:
             return
 
+    kwargs = {'phase': phase, 'reason': reason, 'timestamp': timestamp}
+    if extra:
+        kwargs['extra'] = extra
+    metrics.EVENTS.inc(level=LEVEL_NAMES.get(level, level))
+    if not db_api.in_unit_of_work():
+        return _dispatch(None, level, action, **kwargs)
+
+    # Other dispatchers publish the event, which must not happen before the
+    # writes it reports are committed
+    names = dispatchers.names()
+    if DB_DISPATCHER in names:
+        _dispatch([DB_DISPATCHER], level, action, **kwargs)
+    others = [n for n in names if n != DB_DISPATCHER]
+    if others:
+        db_api.after_commit(_dispatch, others, level, action, **kwargs)
+
+
+def _dispatch(names, level, action, **kwargs):
+    """Hand an event to dispatchers.
+
+    :param names: Names of the dispatchers, None for all of them.
+    """
     try:
-        dispatchers.map_method("dump", level, action,
-                               phase=phase, reason=reason, timestamp=timestamp)
+        with metrics.EVENT_DISPATCH_SECONDS.time():
+            if names is None:
+                dispatchers.map_method("dump", level, action, **kwargs)
+            else:
+                for name in names:
+                    dispatchers[name].obj.dump(level, action, **kwargs)
     except Exception as ex:
+        metrics.EVENT_DISPATCH_ERRORS.inc()
         LOG.exception(_LE("Dispatcher failed to handle the event: %s"),
                       six.text_type(ex))
 
 
-def critical(action, phase=None, reason=None, timestamp=None):
-    _dump(logging.CRITICAL, action, phase, reason, timestamp)
+def critical(action, phase=None, reason=None, timestamp=None, extra=None):
+    _dump(logging.CRITICAL, action, phase, reason, timestamp, extra)
     LOG.critical(FMT, _event_data(action, phase, reason))
 
 
-def error(action, phase=None, reason=None, timestamp=None):
-    _dump(logging.ERROR, action, phase, reason, timestamp)
+def error(action, phase=None, reason=None, timestamp=None, extra=None):
+    _dump(logging.ERROR, action, phase, reason, timestamp, extra)
     LOG.error(FMT, _event_data(action, phase, reason))
 
 
-def warning(action, phase=None, reason=None, timestamp=None):
-    _dump(logging.WARNING, action, phase, reason, timestamp)
+def warning(action, phase=None, reason=None, timestamp=None, extra=None):
+    _dump(logging.WARNING, action, phase, reason, timestamp, extra)
     LOG.warning(FMT, _event_data(action, phase, reason))
 
 
-def info(action, phase=None, reason=None, timestamp=None):
-    _dump(logging.INFO, action, phase, reason, timestamp)
+def info(action, phase=None, reason=None, timestamp=None, extra=None):
+    _dump(logging.INFO, action, phase, reason, timestamp, extra)
     LOG.info(FMT, _event_data(action, phase, reason))
 
 
-def debug(action, phase=None, reason=None, timestamp=None):
-    _dump(logging.DEBUG, action, phase, reason, timestamp)
+def debug(action, phase=None, reason=None, timestamp=None, extra=None):
+    _dump(logging.DEBUG, action, phase, reason, timestamp, extra)
     LOG.debug(FMT, _event_data(action, phase, reason))
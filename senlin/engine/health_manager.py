@@ -17,18 +17,24 @@ trigger corresponding actions to recover the clusters based on the pre-defined
 health policies.
 """
 
+import time
+
 from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging as messaging
 from oslo_service import service
 from oslo_service import threadgroup
+from oslo_utils import timeutils
+import six
 
 from senlin.common import consts
 from senlin.common import context
 from senlin.common.i18n import _LI, _LW
 from senlin.common import messaging as rpc
+from senlin.common import metrics
 from senlin import objects
 from senlin.objects.requests import clusters as vorc
+from senlin.profiles import base as profile_base
 from senlin.rpc import client as rpc_client
 
 LOG = logging.getLogger(__name__)
@@ -116,6 +122,8 @@ class HealthManager(service.Service):
         self.rt = {
             'registries': [],
         }
+        # Time of the last poll of each cluster, for measuring check lag
+        self.last_polls = {}
 
     def _dummy_task(self):
         """A Dummy task that is queued on the health manager thread group.
@@ -125,15 +133,79 @@ class HealthManager(service.Service):
         """
         pass
 
-    def _poll_cluster(self, cluster_id):
+    def _poll_cluster(self, cluster_id, interval=None):
         """Routine to be executed for polling cluster status.
 
         :param cluster_id: The UUID of the cluster to be checked.
+        :param interval: The expected number of seconds between two polls.
         :returns: Nothing.
         """
+        now = time.time()
+        last = self.last_polls.get(cluster_id, None)
+        self.last_polls[cluster_id] = now
+        if last is not None and interval is not None:
+            metrics.HEALTH_CHECK_LAG_SECONDS.observe(
+                max(now - last - interval, 0))
+
         req = vorc.ClusterCheckRequest(identity=cluster_id)
         self.rpc_client.call2(self.ctx, 'cluster_check2', req)
 
+    def _refresh_placements(self):
+        """Routine to be executed for refreshing stale node placements.
+
+        The availability zone and host of a node are recorded into its data
+        when the node is created or checked. This routine refreshes the data
+        of active nodes that have no placement recorded or whose placement
+        has not been refreshed for ``placement_refresh_interval`` seconds.
+        The nodes of all clusters are refreshed, whether or not they are
+        checked by a health policy, so that zone-aware policies can count
+        them without calling the compute service. Nodes are fetched from
+        database in chunks. Nodes refreshed by the health manager of another
+        engine are fresh and hence skipped.
+
+        :returns: Nothing.
+        """
+        max_age = cfg.CONF.placement_refresh_interval
+        profiles = {}
+        db_nodes = objects.Node.iter_all(
+            self.ctx, filters={'status': consts.NS_ACTIVE}, project_safe=False)
+        for db_node in db_nodes:
+            if not db_node.physical_id:
+                continue
+
+            placement = (db_node.data or {}).get('placement', {})
+            synced_at = placement.get('synced_at', None)
+            if synced_at and not timeutils.is_older_than(
+                    timeutils.parse_isotime(synced_at), max_age):
+                continue
+
+            try:
+                profile_id = db_node.profile_id
+                if profile_id not in profiles:
+                    profiles[profile_id] = profile_base.Profile.load(
+                        self.ctx, profile_id=profile_id,
+                        project_safe=False)
+                profile = profiles[profile_id]
+                if profile is None:
+                    continue
+
+                db_node.data = db_node.data or {}
+                try:
+                    refreshed = profile.do_refresh_placement(db_node)
+                except NotImplementedError:
+                    # Profiles not recording placements are skipped
+                    profiles[profile_id] = None
+                    continue
+                if not refreshed:
+                    # A missing server only skips its own node
+                    continue
+                objects.Node.update(self.ctx, db_node.id,
+                                    {'data': db_node.data})
+            except Exception as ex:
+                LOG.warning(_LW("Failed in refreshing placement of node "
+                                "%(n)s: %(ex)s"),
+                            {'n': db_node.id, 'ex': six.text_type(ex)})
+
     def _add_listener(self, cluster_id):
         """Routine to be executed for adding cluster listener.
 
@@ -157,7 +229,7 @@ class HealthManager(service.Service):
         if entry['check_type'] == consts.NODE_STATUS_POLLING:
             interval = min(entry['interval'], cfg.CONF.periodic_interval_max)
             timer = self.TG.add_timer(interval, self._poll_cluster, None,
-                                      entry['cluster_id'])
+                                      entry['cluster_id'], interval)
             entry['timer'] = timer
         elif entry['check_type'] == consts.VM_LIFECYCLE_EVENTS:
             LOG.info(_LI("Start listening events for cluster (%s)."),
@@ -186,6 +258,7 @@ class HealthManager(service.Service):
         if timer:
             timer.stop()
             self.TG.timer_done(timer)
+            self.last_polls.pop(entry.get('cluster_id', None), None)
             return
 
         listener = entry.get('listener', None)
@@ -226,6 +299,9 @@ class HealthManager(service.Service):
         server = rpc.get_rpc_server(self.target, self)
         server.start()
         self.TG.add_timer(cfg.CONF.periodic_interval, self._dummy_task)
+        if cfg.CONF.placement_refresh_interval > 0:
+            self.TG.add_timer(cfg.CONF.placement_refresh_interval,
+                              self._refresh_placements)
         self._load_runtime_registry()
 
     def stop(self):
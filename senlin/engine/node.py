@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
+
 from oslo_log import log as logging
 from oslo_utils import timeutils
 import six
@@ -65,6 +67,9 @@ class Node(object):
         self.dependents = kwargs.get('dependents', {})
         self.rt = {}
 
+        # Values last loaded from or written to the database, if known
+        self._stored = None
+
         if context is not None:
             if self.user == '':
                 self.user = context.user
@@ -84,16 +89,8 @@ class Node(object):
 
         self.rt = {'profile': profile}
 
-    def store(self, context):
-        """Store the node into database table.
-
-        The invocation of object API could be a node_create or a node_update,
-        depending on whether node has an ID assigned.
-
-        @param context: Request context for node creation.
-        @return: UUID of node created.
-        """
-        values = {
+    def _store_values(self):
+        return {
             'name': self.name,
             'physical_id': self.physical_id,
             'cluster_id': self.cluster_id,
@@ -113,18 +110,40 @@ class Node(object):
             'dependents': self.dependents,
         }
 
+    def store(self, context):
+        """Store the node into database table.
+
+        The invocation of object API could be a node_create or a node_update,
+        depending on whether node has an ID assigned. An existing node is only
+        updated with the fields changed since it was last loaded or stored.
+
+        @param context: Request context for node creation.
+        @return: UUID of node created.
+        """
+        values = self._store_values()
+
         if self.id:
-            no.Node.update(context, self.id, values)
+            changes = utils.changed_values(values, self._stored)
+            if changes:
+                no.Node.update(context, self.id, changes)
         else:
+            changes = values
             init_at = timeutils.utcnow(True)
             self.init_at = init_at
             values['init_at'] = init_at
             node = no.Node.create(context, values)
             self.id = node.id
 
-        self._load_runtime_data(context)
+        self._stored = copy.deepcopy(values)
+        if 'profile_id' in changes or self.rt.get('profile') is None:
+            self._load_runtime_data(context)
         return self.id
 
+    def _set_stored(self, values):
+        """Record values written to the database by other means."""
+        if self._stored is not None:
+            self._stored.update(copy.deepcopy(values))
+
     @classmethod
     def _from_object(cls, context, obj):
         """Construct a node from node object.
@@ -150,8 +169,10 @@ class Node(object):
             'dependents': obj.dependents,
         }
 
-        return cls(obj.name, obj.profile_id, obj.cluster_id,
+        node = cls(obj.name, obj.profile_id, obj.cluster_id,
                    context=context, **kwargs)
+        node._stored = copy.deepcopy(node._store_values())
+        return node
 
     @classmethod
     def load(cls, context, node_id=None, db_node=None, project_safe=True):
@@ -165,12 +186,21 @@ class Node(object):
 
     @classmethod
     def load_all(cls, context, cluster_id=None, limit=None, marker=None,
-                 sort=None, filters=None, project_safe=True):
-        '''Retrieve all nodes of from database.'''
-        objs = no.Node.get_all(context, cluster_id=cluster_id,
-                               filters=filters, sort=sort,
-                               limit=limit, marker=marker,
-                               project_safe=project_safe)
+                 sort=None, filters=None, project_safe=True, cursor=None):
+        '''Retrieve all nodes of from database.
+
+        Nodes are fetched in chunks when no page is requested, so that the
+        nodes of a large cluster are never all held at once.
+        '''
+        if limit is None and marker is None and cursor is None:
+            objs = no.Node.iter_all(context, cluster_id=cluster_id,
+                                    filters=filters, sort=sort,
+                                    project_safe=project_safe)
+        else:
+            objs = no.Node.get_all(context, cluster_id=cluster_id,
+                                   filters=filters, sort=sort,
+                                   limit=limit, marker=marker,
+                                   project_safe=project_safe, cursor=cursor)
 
         for obj in objs:
             node = cls._from_object(context, obj)
@@ -230,6 +260,7 @@ class Node(object):
             setattr(self, p, v)
             values[p] = v
         no.Node.update(context, self.id, values)
+        self._set_stored(no.Node._transpose_metadata(dict(values)))
 
     def get_details(self, context):
         if not self.physical_id:
@@ -250,8 +281,9 @@ class Node(object):
                             physical_id=physical_id)
             return False
 
+        # The profile may have recorded placement data into the node
         self.set_status(context, consts.NS_ACTIVE, _('Creation succeeded'),
-                        physical_id=physical_id)
+                        physical_id=physical_id, data=self.data)
         return True
 
     def do_delete(self, context):
@@ -317,6 +349,8 @@ class Node(object):
         self.cluster_id = cluster_id
         self.updated_at = timestamp
         self.index = db_node.index
+        self._set_stored({'cluster_id': cluster_id, 'updated_at': timestamp,
+                          'index': self.index})
 
         res = pb.Profile.join_cluster(context, self, cluster_id)
         if res:
@@ -327,6 +361,8 @@ class Node(object):
         self.cluster_id = ''
         self.updated_at = timestamp
         self.index = -1
+        self._set_stored({'cluster_id': '', 'updated_at': timestamp,
+                          'index': -1})
 
         return False
 
@@ -341,6 +377,8 @@ class Node(object):
             self.cluster_id = ''
             self.updated_at = timestamp
             self.index = -1
+            self._set_stored({'cluster_id': '', 'updated_at': timestamp,
+                              'index': -1})
             return True
         else:
             return False
@@ -358,7 +396,7 @@ class Node(object):
 
         if res:
             self.set_status(context, consts.NS_ACTIVE,
-                            _("Check: Node is ACTIVE."))
+                            _("Check: Node is ACTIVE."), data=self.data)
         else:
             self.set_status(context, consts.NS_ERROR,
                             _("Check: Node is not ACTIVE."))
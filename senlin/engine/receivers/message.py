@@ -15,7 +15,6 @@ import socket
 from keystoneauth1 import loading as ks_loading
 from oslo_config import cfg
 from oslo_log import log as logging
-from oslo_utils import uuidutils
 
 from senlin.common import consts
 from senlin.common import exception as exc
@@ -144,21 +143,7 @@ class Message(base.Receiver):
 
     def _find_cluster(self, context, identity):
         """Find a cluster with the given identity."""
-        if uuidutils.is_uuid_like(identity):
-            cluster = cluster_obj.Cluster.get(context, identity)
-            if not cluster:
-                cluster = cluster_obj.Cluster.get_by_name(context, identity)
-        else:
-            cluster = cluster_obj.Cluster.get_by_name(context, identity)
-            # maybe it is a short form of UUID
-            if not cluster:
-                cluster = cluster_obj.Cluster.get_by_short_id(context,
-                                                              identity)
-
-        if not cluster:
-            raise exc.ResourceNotFound(type='cluster', id=identity)
-
-        return cluster
+        return cluster_obj.Cluster.find(context, identity)
 
     def _build_action(self, context, message):
         body = message.get('body', None)
@@ -10,6 +10,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import contextlib
 import time
 
 import eventlet
@@ -19,15 +20,70 @@ from oslo_log import log as logging
 from oslo_service import threadgroup
 from osprofiler import profiler
 
+from senlin.common import consts
 from senlin.common import context
-from senlin.common.i18n import _
+from senlin.common import metrics
 from senlin.engine.actions import base as action_mod
 from senlin.objects import action as ao
+from senlin.objects import node as node_obj
 
 LOG = logging.getLogger(__name__)
 
 wallclock = time.time
 
+# Managers running the actions, by action ID
+_MANAGERS = {}
+
+
+class TokenBucket(object):
+    '''A token bucket limiting the rate at which node actions are started.
+
+    :param capacity: Number of tokens available in a burst.
+    :param interval: Seconds needed to refill an empty bucket. 0 means the
+                     bucket is refilled immediately.
+    '''
+
+    def __init__(self, capacity, interval):
+        self.capacity = capacity
+        self.rate = float(capacity) / interval if interval > 0 else None
+        self.tokens = float(capacity)
+        self.updated = wallclock()
+
+    def _refill(self):
+        now = wallclock()
+        if self.rate is None:
+            self.tokens = float(self.capacity)
+        else:
+            self.tokens = min(float(self.capacity),
+                              self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self):
+        '''Get the seconds to wait before a token is available.
+
+        :returns: 0 if a token can be taken immediately.
+        '''
+        self._refill()
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        '''Take a token, which must be available.'''
+        self._refill()
+        self.tokens -= 1
+
+    def idle(self):
+        '''Check whether the bucket is full, i.e. it limits nothing.'''
+        self._refill()
+        return self.tokens >= self.capacity
+
+
+def _start_after(delay, func, *args, **kwargs):
+    '''Run a function after some seconds.'''
+    sleep(delay)
+    return func(*args, **kwargs)
+
 
 class ThreadGroupManager(object):
     '''Thread group manager.'''
@@ -36,6 +92,17 @@ class ThreadGroupManager(object):
         super(ThreadGroupManager, self).__init__()
         self.workers = {}
         self.group = threadgroup.ThreadGroup()
+        # Token buckets throttling node actions, kept across calls of
+        # start_action so that the rate is enforced over time.
+        self.buckets = {}
+        # Number of running actions by class, e.g. 'node'
+        self.running = {}
+        # Worker which stopped claiming actions because it was saturated
+        self.saturated = None
+        # Time at which actions left because of the throttling are claimed
+        self.reclaim_at = None
+        # IDs of the running actions which wait for their dependents
+        self.waiting = set()
 
         # Create dummy service task, because when there is nothing queued
         # on self.tg the process exits
@@ -84,61 +151,231 @@ class ThreadGroupManager(object):
                                      self._serialize_profile_info(),
                                      func, *args, **kwargs)
 
+    def _bucket(self, scope, key, capacity):
+        '''Get the token bucket of a scope, e.g. a cluster.'''
+        bucket = self.buckets.get((scope, key))
+        if bucket is None or bucket.capacity != capacity:
+            if len(self.buckets) > 100:
+                # Forget the buckets which no longer limit anything
+                for k, b in list(self.buckets.items()):
+                    if b.idle():
+                        self.buckets.pop(k)
+            bucket = TokenBucket(capacity, cfg.CONF.batch_interval)
+            self.buckets[(scope, key)] = bucket
+        return bucket
+
+    def _backend_wait(self):
+        '''Get the seconds to wait before node actions can be claimed.
+
+        :returns: 0 if the bucket of the cloud backend has a token available
+                  or if it is not enabled.
+        '''
+        if cfg.CONF.max_actions_per_batch <= 0:
+            return 0
+        return self._bucket('backend', cfg.CONF.cloud_backend,
+                            cfg.CONF.max_actions_per_batch).wait()
+
+    def _cluster_of(self, action):
+        '''Get the ID of the cluster of the target node of an action.'''
+        cluster_id = (action.data or {}).get('cluster_id', None)
+        if cluster_id is None:
+            # Only actions not derived from a cluster action need a lookup
+            node = node_obj.Node.get(self.db_session, action.target)
+            cluster_id = node.cluster_id if node is not None else None
+        return cluster_id
+
+    def _admit(self, action):
+        '''Take the tokens needed to start a node action.
+
+        The action needs a token of the bucket of the cloud backend and, if
+        enabled, one of the bucket of its cluster. No token is taken unless
+        all of them are available.
+
+        :param action: The action object claimed.
+        :returns: 0 if the action can be started, or the seconds to wait
+                  before the tokens are available.
+        '''
+        buckets = []
+        if cfg.CONF.max_actions_per_batch > 0:
+            buckets.append(('backend', self._bucket(
+                'backend', cfg.CONF.cloud_backend,
+                cfg.CONF.max_actions_per_batch)))
+        if cfg.CONF.cluster_actions_per_batch > 0:
+            cluster_id = self._cluster_of(action)
+            if cluster_id:
+                buckets.append(('cluster', self._bucket(
+                    'cluster', cluster_id,
+                    cfg.CONF.cluster_actions_per_batch)))
+
+        delay = 0
+        for scope, bucket in buckets:
+            wait = bucket.wait()
+            metrics.ACTION_ADMISSIONS.inc(
+                limiter=scope, decision='deferred' if wait else 'admitted')
+            delay = max(delay, wait)
+        if delay == 0:
+            for scope, bucket in buckets:
+                bucket.take()
+        return delay
+
+    def _defer(self, worker_id, action):
+        '''Give back a claimed node action exceeding the configured rates.
+
+        Node actions of a high priority are never throttled.
+
+        :param worker_id: ID of the worker which claimed the action.
+        :param action: The action object claimed.
+        :returns: True if the action was given back, or False if it can be
+                  started.
+        '''
+        if (not action.action.startswith('NODE_') or
+                action.priority >= consts.ACTION_PRIORITY_HIGH):
+            return False
+        delay = self._admit(action)
+        if delay <= 0:
+            return False
+
+        ao.Action.abandon(self.db_session, action.id)
+        metrics.ACTION_DEFER_SECONDS.observe(delay)
+        LOG.debug('Engine %(id)s defers node action %(action)s for '
+                  '%(delay).2f seconds.',
+                  {'id': worker_id, 'action': action.id, 'delay': delay})
+        self._reclaim_after(worker_id, delay)
+        return True
+
+    def _reclaim_after(self, worker_id, delay):
+        '''Claim ready actions again once a token bucket is refilled.
+
+        :param worker_id: ID of the worker claiming the actions.
+        :param delay: Seconds to wait before claiming.
+        '''
+        due = wallclock() + delay
+        if self.reclaim_at is not None and self.reclaim_at <= due:
+            # Claims are already planned earlier
+            return
+        self.reclaim_at = due
+        self.start(_start_after, delay, self._reclaim, worker_id, due)
+
+    def _reclaim(self, worker_id, due):
+        if self.reclaim_at == due:
+            self.reclaim_at = None
+        self.start_action(worker_id)
+
+    def capacity(self):
+        '''Get the number of actions the engine can still start.
+
+        :returns: The number of free slots or None if unlimited.
+        '''
+        limit = cfg.CONF.max_actions_per_engine
+        if limit <= 0:
+            return None
+        return max(limit - len(self.workers) + len(self.waiting), 0)
+
+    def _resume(self):
+        '''Claim the actions left while the engine was saturated.'''
+        if self.saturated is not None:
+            worker, self.saturated = self.saturated, None
+            self.start(self.start_action, worker)
+
+    def _saturated_classes(self):
+        '''Get the prefixes of the action classes which are saturated.'''
+        excluded = []
+        for cls, limit in cfg.CONF.max_actions_per_class.items():
+            try:
+                limit = int(limit)
+            except ValueError:
+                continue
+            if limit > 0 and self.running.get(cls.lower(), 0) >= limit:
+                excluded.append(cls.upper() + '_')
+        return sorted(excluded)
+
     def start_action(self, worker_id, action_id=None):
         '''Run action(s) in sub-thread(s).
 
+        Node actions exceeding the configured rates are left to other
+        engines. While the bucket of the cloud backend is empty, no node
+        action is claimed, and a node action claimed or dispatched while the
+        bucket of its cluster or of the backend is empty is abandoned. Once
+        the bucket of a cluster is found empty, no more node actions of that
+        cluster are claimed in this pass, while those of other clusters
+        still are. Ready actions are claimed again once the bucket is
+        refilled. The engine stops claiming actions once it runs as many
+        actions as allowed, leaving ready actions to other engines, and
+        resumes when one of its actions is finished or starts waiting for its
+        dependents.
+
         :param worker_id: ID of the worker thread; we fake workers using
                           senlin engines at the moment.
         :param action_id: ID of the action to be executed. None means all
                           ready actions will be acquired and scheduled to run.
         '''
-        def launch(action_id):
+        def launch(action):
             '''Launch a sub-thread to run given action.'''
-            th = self.start(action_mod.ActionProc, self.db_session, action_id)
-            self.workers[action_id] = th
-            th.link(release, action_id)
+            th = self.start(action_mod.ActionProc, self.db_session,
+                            action.id)
+            cls = action.action.split('_', 1)[0].lower()
+            self.workers[action.id] = th
+            self.running[cls] = self.running.get(cls, 0) + 1
+            _MANAGERS[action.id] = self
+            th.link(release, action.id, cls)
             return th
 
-        def release(thread, action_id):
+        def release(thread, action_id, cls):
             '''Callback function that will be passed to GreenThread.link().'''
             # Remove action thread from thread list
             self.workers.pop(action_id)
+            self.waiting.discard(action_id)
+            _MANAGERS.pop(action_id, None)
+            self.running[cls] -= 1
+            self._resume()
 
-        actions_launched = 0
-        if action_id is not None:
+        if action_id is not None and self.capacity() != 0:
             timestamp = wallclock()
-            action = ao.Action.acquire(self.db_session, action_id, worker_id,
-                                       timestamp)
-            if action:
-                launch(action.id)
-                actions_launched += 1
-
-        batch_size = cfg.CONF.max_actions_per_batch
-        batch_interval = cfg.CONF.batch_interval
+            with metrics.ACTION_CLAIM_SECONDS.time():
+                action = ao.Action.acquire(self.db_session, action_id,
+                                           worker_id, timestamp)
+            if action and not self._defer(worker_id, action):
+                launch(action)
+
+        # Whether node actions are throttled for the rest of this pass, and
+        # the clusters whose node actions are
+        throttled = False
+        clusters = set()
         while True:
+            excluded = self._saturated_classes()
+            if self.capacity() == 0 or excluded:
+                self.saturated = worker_id
+            if self.capacity() == 0:
+                LOG.debug('Engine %s is saturated, stop claiming actions.',
+                          worker_id)
+                break
+
+            if not throttled:
+                wait = self._backend_wait()
+                if wait > 0:
+                    throttled = True
+                    self._reclaim_after(worker_id, wait)
+            if throttled and 'NODE_' not in excluded:
+                excluded = sorted(excluded + ['NODE_'])
+
             timestamp = wallclock()
-            action = ao.Action.acquire_random_ready(self.db_session, worker_id,
-                                                    timestamp)
-            if action:
-                if batch_size > 0 and 'NODE' in action.action:
-                    if actions_launched < batch_size:
-                        launch(action.id)
-                        actions_launched += 1
-                    else:
-                        msg = _('Engine %(id)s has launched %(num)s node '
-                                'actions consecutively, stop scheduling '
-                                'node action for %(interval)s second...'
-                                ) % {'id': worker_id, 'num': batch_size,
-                                     'interval': batch_interval}
-                        LOG.debug(msg)
-                        sleep(batch_interval)
-                        launch(action.id)
-                        actions_launched = 1
-                else:
-                    launch(action.id)
-            else:
+            with metrics.ACTION_CLAIM_SECONDS.time():
+                action = ao.Action.acquire_random_ready(
+                    self.db_session, worker_id, timestamp, excluded=excluded,
+                    excluded_clusters=sorted(clusters))
+            if not action:
                 break
 
+            if self._defer(worker_id, action):
+                cluster_id = self._cluster_of(action)
+                if cluster_id is None or cluster_id in clusters:
+                    # The action is not told apart by its cluster
+                    throttled = True
+                else:
+                    clusters.add(cluster_id)
+                continue
+            launch(action)
+
     def cancel_action(self, action_id):
         '''Cancel an action execution progress.'''
         action = action_mod.Action.load(self.db_session, action_id)
@@ -168,6 +405,9 @@ class ThreadGroupManager(object):
 
     def stop(self, graceful=False):
         '''Stop any active threads belong to this threadgroup.'''
+        # Finished actions must not trigger new claims
+        self.saturated = None
+        self.reclaim_at = None
         # Try to stop all threads gracefully
         self.group.stop(graceful)
         self.group.wait()
@@ -197,6 +437,29 @@ def reschedule(action_id, sleep_time=1):
         eventlet.sleep(sleep_time)
 
 
+@contextlib.contextmanager
+def waiting(action_id):
+    '''Mark an action as waiting for its dependents.
+
+    A waiting action does not occupy a slot of the engine running it, so
+    that parent actions cannot hold all the slots while their dependents
+    are left unclaimed.
+
+    :param action_id: the action waiting for its dependents.
+    '''
+    manager = _MANAGERS.get(action_id)
+    if manager is None:
+        yield
+        return
+
+    manager.waiting.add(action_id)
+    manager._resume()
+    try:
+        yield
+    finally:
+        manager.waiting.discard(action_id)
+
+
 def sleep(sleep_time):
     '''Interface for sleeping.'''
 
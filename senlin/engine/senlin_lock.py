@@ -10,11 +10,14 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import functools
+
 from oslo_config import cfg
 from oslo_log import log as logging
 import time
 
 from senlin.common.i18n import _, _LE, _LI
+from senlin.common import metrics
 from senlin.common import utils
 from senlin.objects import action as ao
 from senlin.objects import cluster_lock as cl_obj
@@ -34,6 +37,24 @@ LOCK_SCOPES = (
 )
 
 
+def _measured(lock_type):
+    """Decorator recording the latency and contention of lock acquisition.
+
+    :param lock_type: The type of the lock, i.e. 'cluster' or 'node'.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            with metrics.LOCK_ACQUIRE_SECONDS.time(scope=lock_type):
+                acquired = func(*args, **kwargs)
+            if not acquired:
+                metrics.LOCK_CONTENTIONS.inc(scope=lock_type)
+            return acquired
+        return wrapped
+    return decorator
+
+
+@_measured('cluster')
 def cluster_lock_acquire(context, cluster_id, action_id, engine=None,
                          scope=CLUSTER_SCOPE, forced=False):
     """Try to lock the specified cluster.
@@ -92,6 +113,7 @@ def cluster_lock_release(cluster_id, action_id, scope):
     return cl_obj.ClusterLock.release(cluster_id, action_id, scope)
 
 
+@_measured('node')
 def node_lock_acquire(context, node_id, action_id, engine=None,
                       forced=False):
     """Try to lock the specified node.
@@ -25,11 +25,13 @@ import six
 from senlin.common import consts
 from senlin.common import context as senlin_context
 from senlin.common import exception
-from senlin.common.i18n import _, _LE, _LI
+from senlin.common.i18n import _, _LE, _LI, _LW
 from senlin.common import messaging as rpc_messaging
+from senlin.common import metrics
 from senlin.common import scaleutils as su
 from senlin.common import schema
 from senlin.common import utils
+from senlin.db import api as db_api
 from senlin.engine.actions import base as action_mod
 from senlin.engine import cluster as cluster_mod
 from senlin.engine import dispatcher
@@ -44,6 +46,7 @@ from senlin.objects import base as obj_base
 from senlin.objects import cluster as co
 from senlin.objects import cluster_policy as cp_obj
 from senlin.objects import credential as cred_obj
+from senlin.objects import dependency as dobj
 from senlin.objects import event as event_obj
 from senlin.objects import node as node_obj
 from senlin.objects import policy as policy_obj
@@ -74,6 +77,43 @@ def request_context(func):
     return wrapped
 
 
+def replica_read(func):
+    """Decorator routing the reads of a read-only request to a replica.
+
+    Requests whose context asks for reading from the primary database are
+    left alone, so that a client can see its own recent changes.
+    """
+    @functools.wraps(func)
+    def wrapped(self, ctx, req):
+        if ctx.read_primary:
+            return func(self, ctx, req)
+        with db_api.replica_reader():
+            return func(self, ctx, req)
+    return wrapped
+
+
+def _paginated(req, objs, items, default_key):
+    """Get the result of a list request.
+
+    Requests carrying a cursor, even a null one for the first page, get a
+    dict with the items listed and the cursor of the next page, which is
+    None after the last page.
+
+    :param req: The list request.
+    :param objs: The objects listed.
+    :param items: The representations of the objects listed.
+    :param default_key: The key the objects are sorted by by default.
+    """
+    if not req.obj_attr_is_set('cursor'):
+        return items
+
+    cursor = None
+    if req.obj_attr_is_set('limit') and req.limit and len(objs) >= req.limit:
+        sort = req.sort if req.obj_attr_is_set('sort') else None
+        cursor = db_api.encode_cursor(objs[-1], sort, default_key)
+    return {'items': items, 'next': cursor}
+
+
 @profiler.trace_cls("rpc")
 class EngineService(service.Service):
     """Lifecycle manager for a running service engine.
@@ -144,6 +184,17 @@ class EngineService(service.Service):
 
         self.TG.add_timer(CONF.periodic_interval,
                           self.service_manage_report)
+        self.TG.add_timer(CONF.periodic_interval,
+                          self.purge_action_contexts)
+
+        if CONF.metrics.enabled:
+            metrics.setup(CONF.metrics.engine_port,
+                          tries=CONF.num_engine_workers)
+            metrics.ACTION_WORKERS.set_function(lambda: len(self.TG.workers))
+            if CONF.max_actions_per_engine > 0:
+                metrics.ACTION_CAPACITY.set_function(self.TG.capacity)
+            self.TG.add_timer(CONF.metrics.sample_interval,
+                              self.sample_metrics)
         super(EngineService, self).start()
 
     def _stop_rpc_server(self):
@@ -176,10 +227,36 @@ class EngineService(service.Service):
 
         super(EngineService, self).stop()
 
+    def sample_metrics(self):
+        """Sample the metrics which need a database query.
+
+        This runs periodically so that scraping the metrics never hits the
+        database.
+        """
+        statuses = [consts.ACTION_READY, consts.ACTION_WAITING,
+                    consts.ACTION_RUNNING]
+        ctx = senlin_context.get_admin_context()
+        try:
+            counts = action_obj.Action.count_by_status(ctx, statuses)
+            queued = action_obj.Action.count_by_project(
+                ctx, [consts.ACTION_READY, consts.ACTION_RUNNING])
+        except Exception as ex:
+            LOG.warning(_LW('Failed sampling metrics: %s'), ex)
+            return
+
+        for status in statuses:
+            metrics.ACTIONS.set(counts.get(status, 0), status=status)
+        # Drop projects which no longer have any ready or running action
+        metrics.PROJECT_ACTIONS.clear()
+        for (project, status), count in queued.items():
+            metrics.PROJECT_ACTIONS.set(count, project=project, status=status)
+
     def service_manage_report(self):
         ctx = senlin_context.get_admin_context()
         try:
-            svc = service_obj.Service.update(ctx, self.engine_id)
+            # Report the free capacity of the engine with its heartbeat
+            values = {'capacity': self.TG.capacity()}
+            svc = service_obj.Service.update(ctx, self.engine_id, values)
             # if svc is None, means it's not created.
             if svc is None:
                 service_obj.Service.create(ctx, self.engine_id, self.host,
@@ -188,6 +265,18 @@ class EngineService(service.Service):
             LOG.error(_LE('Service %(service_id)s update failed: %(error)s'),
                       {'service_id': self.engine_id, 'error': ex})
 
+    def purge_action_contexts(self):
+        """Delete the request contexts no longer used by any action."""
+        ctx = senlin_context.get_admin_context()
+        try:
+            count = action_obj.Action.purge_contexts(ctx)
+        except Exception as ex:
+            LOG.warning(_LW('Failed purging action contexts: %s'), ex)
+            return
+
+        if count:
+            LOG.debug('Purged %s action contexts.', count)
+
     def _service_manage_cleanup(self):
         ctx = senlin_context.get_admin_context()
         time_window = (2 * CONF.periodic_interval)
@@ -305,6 +394,7 @@ class EngineService(service.Service):
         return {'operations': pt.get_ops()}
 
     @request_context
+    @replica_read
     def profile_list2(self, ctx, req):
         """List profiles matching the specified criteria.
 
@@ -321,6 +411,8 @@ class EngineService(service.Service):
             query['limit'] = req.limit
         if req.obj_attr_is_set('marker'):
             query['marker'] = req.marker
+        if req.obj_attr_is_set('cursor'):
+            query['cursor'] = req.cursor
         if req.obj_attr_is_set('sort') and req.sort is not None:
             query['sort'] = req.sort
         filters = {}
@@ -332,7 +424,8 @@ class EngineService(service.Service):
             query['filters'] = filters
 
         profiles = profile_obj.Profile.get_all(ctx, **query)
-        return [p.to_dict() for p in profiles]
+        return _paginated(req, profiles, [p.to_dict() for p in profiles],
+                          consts.PROFILE_CREATED_AT)
 
     def _validate_profile(self, context, spec, name=None,
                           metadata=None, validate_props=False):
@@ -418,6 +511,7 @@ class EngineService(service.Service):
         return profile.to_dict()
 
     @request_context
+    @replica_read
     def profile_get2(self, ctx, req):
         """Retrieve the details about a profile.
 
@@ -509,6 +603,7 @@ class EngineService(service.Service):
         }
 
     @request_context
+    @replica_read
     def policy_list2(self, ctx, req):
         """List policies matching the specified criteria
 
@@ -525,6 +620,8 @@ class EngineService(service.Service):
             query['limit'] = req.limit
         if req.obj_attr_is_set('marker'):
             query['marker'] = req.marker
+        if req.obj_attr_is_set('cursor'):
+            query['cursor'] = req.cursor
         if req.obj_attr_is_set('sort') and req.sort is not None:
             query['sort'] = req.sort
         filters = {}
@@ -535,7 +632,9 @@ class EngineService(service.Service):
         if filters:
             query['filters'] = filters
 
-        return [p.to_dict() for p in policy_obj.Policy.get_all(ctx, **query)]
+        policies = policy_obj.Policy.get_all(ctx, **query)
+        return _paginated(req, policies, [p.to_dict() for p in policies],
+                          consts.POLICY_CREATED_AT)
 
     def _validate_policy(self, context, spec, name=None, validate_props=False):
         """Validate a policy.
@@ -598,6 +697,7 @@ class EngineService(service.Service):
         return policy.to_dict()
 
     @request_context
+    @replica_read
     def policy_get2(self, ctx, req):
         """Retrieve the details about a policy.
 
@@ -668,6 +768,7 @@ class EngineService(service.Service):
         return policy.to_dict()
 
     @request_context
+    @replica_read
     def cluster_list2(self, ctx, req):
         """List clusters matching the specified criteria.
 
@@ -684,6 +785,8 @@ class EngineService(service.Service):
             query['limit'] = req.limit
         if req.obj_attr_is_set('marker'):
             query['marker'] = req.marker
+        if req.obj_attr_is_set('cursor'):
+            query['cursor'] = req.cursor
         if req.obj_attr_is_set('sort') and req.sort is not None:
             query['sort'] = req.sort
         filters = {}
@@ -694,10 +797,12 @@ class EngineService(service.Service):
         if filters:
             query['filters'] = filters
 
-        return [c.to_dict()
-                for c in cluster_mod.Cluster.load_all(ctx, **query)]
+        clusters = list(cluster_mod.Cluster.load_all(ctx, **query))
+        return _paginated(req, clusters, [c.to_dict() for c in clusters],
+                          consts.CLUSTER_INIT_AT)
 
     @request_context
+    @replica_read
     def cluster_get2(self, context, req):
         """Retrieve the cluster specified.
 
@@ -1416,6 +1521,7 @@ class EngineService(service.Service):
         return {'action': action_id}
 
     @request_context
+    @replica_read
     def node_list2(self, ctx, req):
         """List node records matching the specified criteria.
 
@@ -1432,6 +1538,8 @@ class EngineService(service.Service):
             query['limit'] = req.limit
         if req.obj_attr_is_set('marker'):
             query['marker'] = req.marker
+        if req.obj_attr_is_set('cursor'):
+            query['cursor'] = req.cursor
         if req.obj_attr_is_set('sort') and req.sort is not None:
             query['sort'] = req.sort
         if req.obj_attr_is_set('cluster_id') and req.cluster_id:
@@ -1450,8 +1558,9 @@ class EngineService(service.Service):
         if filters:
             query['filters'] = filters
 
-        nodes = node_mod.Node.load_all(ctx, **query)
-        return [node.to_dict() for node in nodes]
+        nodes = list(node_mod.Node.load_all(ctx, **query))
+        return _paginated(req, nodes, [node.to_dict() for node in nodes],
+                          consts.NODE_INIT_AT)
 
     @request_context
     def node_create2(self, ctx, req):
@@ -1527,6 +1636,7 @@ class EngineService(service.Service):
         return result
 
     @request_context
+    @replica_read
     def node_get2(self, ctx, req):
         """Retrieve the node specified.
 
@@ -1743,6 +1853,7 @@ class EngineService(service.Service):
         return {'action': action_id}
 
     @request_context
+    @replica_read
     def cluster_policy_list2(self, ctx, req):
         """List cluster-policy bindings given the cluster identity.
 
@@ -1768,6 +1879,7 @@ class EngineService(service.Service):
         return [binding.to_dict() for binding in bindings]
 
     @request_context
+    @replica_read
     def cluster_policy_get2(self, ctx, req):
         """Get the binding record giving the cluster and policy identity.
 
@@ -1916,6 +2028,7 @@ class EngineService(service.Service):
         return {'action': action_id}
 
     @request_context
+    @replica_read
     def action_list(self, ctx, req):
         """List action records matching the specified criteria.
 
@@ -1933,6 +2046,8 @@ class EngineService(service.Service):
             query['limit'] = req.limit
         if req.obj_attr_is_set('marker'):
             query['marker'] = req.marker
+        if req.obj_attr_is_set('cursor'):
+            query['cursor'] = req.cursor
         if req.obj_attr_is_set('sort') and req.sort is not None:
             query['sort'] = req.sort
 
@@ -1949,7 +2064,10 @@ class EngineService(service.Service):
             query['filters'] = filters
 
         actions = action_obj.Action.get_all(ctx, **query)
-        return [a.to_dict() for a in actions]
+        deps = dobj.Dependency.get_by_actions(ctx, [a.id for a in actions])
+        return _paginated(req, actions, [a.to_dict(deps[a.id])
+                                         for a in actions],
+                          consts.ACTION_CREATED_AT)
 
     @request_context
     def action_create(self, ctx, req):
@@ -1987,6 +2105,7 @@ class EngineService(service.Service):
         return {'action': action_id}
 
     @request_context
+    @replica_read
     def action_get(self, ctx, req):
         """Retrieve the action specified.
 
@@ -2001,6 +2120,80 @@ class EngineService(service.Service):
 
         return action.to_dict()
 
+    @request_context
+    def action_update(self, ctx, req):
+        """Update the priority of an action which has not been started.
+
+        :param ctx: An instance of the request context.
+        :param req: An instance of the ActionUpdateRequest object.
+        :return: A dictionary containing the details of the updated action.
+        """
+        if req.priority > consts.ACTION_PRIORITY_MAX:
+            msg = _("The priority must be between 0 and "
+                    "%s") % consts.ACTION_PRIORITY_MAX
+            raise exception.BadRequest(msg=msg)
+
+        db_action = action_obj.Action.find(ctx, req.identity)
+        if db_action.status not in (consts.ACTION_INIT, consts.ACTION_WAITING,
+                                    consts.ACTION_READY):
+            msg = _("The priority of an action in status %s cannot be "
+                    "changed") % db_action.status
+            raise exception.BadRequest(msg=msg)
+
+        LOG.info(_LI("Updating priority of action '%(id)s' to %(p)s."),
+                 {'id': req.identity, 'p': req.priority})
+        action_obj.Action.update(ctx, db_action.id,
+                                 {'priority': req.priority})
+        db_action.priority = req.priority
+        return db_action.to_dict()
+
+    @request_context
+    def action_timing(self, ctx, req):
+        """Aggregate the timing recorded by completed actions.
+
+        Only the actions completed within the last ``since`` seconds are
+        aggregated, up to ``limit`` of them, most recent first.
+
+        :param ctx: An instance of the request context.
+        :param req: An instance of the ActionTimingRequest object.
+        :return: A dictionary with action names as keys. Each value contains
+                 the number of actions and, for each phase recorded, the
+                 number of actions having the phase together with the mean,
+                 the maximum and the total of the seconds spent.
+        """
+        req.obj_set_defaults()
+        if not req.project_safe and not ctx.is_admin:
+            raise exception.Forbidden()
+
+        query = {
+            'since': action_mod.wallclock() - req.since,
+            'limit': req.limit,
+            'project_safe': req.project_safe,
+        }
+        if req.obj_attr_is_set('cluster') and req.cluster:
+            db_cluster = co.Cluster.find(ctx, req.cluster)
+            query['cluster_id'] = db_cluster.id
+        if req.obj_attr_is_set('action') and req.action:
+            query['actions'] = req.action
+
+        result = {}
+        for action, timing in action_obj.Action.get_timing(ctx, **query):
+            entry = result.setdefault(action, {'count': 0, 'phases': {}})
+            entry['count'] += 1
+            for phase, seconds in timing.items():
+                stat = entry['phases'].setdefault(
+                    phase, {'count': 0, 'total': 0, 'max': 0})
+                stat['count'] += 1
+                stat['total'] += seconds
+                stat['max'] = max(stat['max'], seconds)
+
+        for entry in result.values():
+            for stat in entry['phases'].values():
+                stat['mean'] = round(stat['total'] / stat['count'], 3)
+                stat['total'] = round(stat['total'], 3)
+
+        return result
+
     @request_context
     def action_delete(self, ctx, req):
         """Delete the specified action object.
@@ -2022,6 +2215,7 @@ class EngineService(service.Service):
         LOG.info(_LI("Action '%s' is deleted."), req.identity)
 
     @request_context
+    @replica_read
     def receiver_list(self, ctx, req):
         """List receivers matching the specified criteria.
 
@@ -2038,6 +2232,8 @@ class EngineService(service.Service):
             query['limit'] = req.limit
         if req.obj_attr_is_set('marker'):
             query['marker'] = req.marker
+        if req.obj_attr_is_set('cursor'):
+            query['cursor'] = req.cursor
         if req.obj_attr_is_set('sort') and req.sort is not None:
             query['sort'] = req.sort
 
@@ -2054,7 +2250,8 @@ class EngineService(service.Service):
             query['filters'] = filters
 
         receivers = receiver_obj.Receiver.get_all(ctx, **query)
-        return [r.to_dict() for r in receivers]
+        return _paginated(req, receivers, [r.to_dict() for r in receivers],
+                          consts.RECEIVER_NAME)
 
     @request_context
     def receiver_create(self, ctx, req):
@@ -2117,6 +2314,7 @@ class EngineService(service.Service):
         return receiver.to_dict()
 
     @request_context
+    @replica_read
     def receiver_get(self, ctx, req):
         """Get the details about a receiver.
 
@@ -2205,6 +2403,7 @@ class EngineService(service.Service):
         return {'action': action_id}
 
     @request_context
+    @replica_read
     def event_list2(self, ctx, req):
         """List event records matching the specified criteria.
 
@@ -2222,6 +2421,8 @@ class EngineService(service.Service):
             query['limit'] = req.limit
         if req.obj_attr_is_set('marker'):
             query['marker'] = req.marker
+        if req.obj_attr_is_set('cursor'):
+            query['cursor'] = req.cursor
         if req.obj_attr_is_set('sort') and req.sort is not None:
             query['sort'] = req.sort
 
@@ -2256,9 +2457,10 @@ class EngineService(service.Service):
             evt['level'] = level
             results.append(evt)
 
-        return results
+        return _paginated(req, all_events, results, consts.EVENT_TIMESTAMP)
 
     @request_context
+    @replica_read
     def event_get2(self, ctx, req):
         """Retrieve the event specified.
 
@@ -12,8 +12,6 @@
 
 """Action object."""
 
-from oslo_utils import uuidutils
-
 from senlin.common import exception
 from senlin.common import utils
 from senlin.db import api as db_api
@@ -49,6 +47,7 @@ class Action(base.SenlinObject, base.VersionedObjectDictCompat):
         'user': fields.StringField(),
         'project': fields.StringField(),
         'domain': fields.StringField(nullable=True),
+        'priority': fields.IntegerField(nullable=True),
     }
 
     @classmethod
@@ -66,16 +65,9 @@ class Action(base.SenlinObject, base.VersionedObjectDictCompat):
         :return: A DB object of action or an exception `ResourceNotFound` if
                  no matching action is found.
         """
-        if uuidutils.is_uuid_like(identity):
-            action = cls.get(context, identity, **kwargs)
-            if not action:
-                action = cls.get_by_name(context, identity, **kwargs)
-        else:
-            action = cls.get_by_name(context, identity, **kwargs)
-            if not action:
-                action = cls.get_by_short_id(context, identity, **kwargs)
-
-        if not action:
+        obj = db_api.action_find(context, identity, **kwargs)
+        action = cls._from_db_object(context, cls(), obj)
+        if action is None:
             raise exception.ResourceNotFound(type='action', id=identity)
 
         return action
@@ -105,29 +97,53 @@ class Action(base.SenlinObject, base.VersionedObjectDictCompat):
         objs = db_api.action_get_all_by_owner(context, owner)
         return [cls._from_db_object(context, cls(), obj) for obj in objs]
 
+    @classmethod
+    def get_timing(cls, context, **kwargs):
+        return db_api.action_get_timing(context, **kwargs)
+
+    @classmethod
+    def count_by_status(cls, context, statuses=None):
+        return db_api.action_count_by_status(context, statuses=statuses)
+
+    @classmethod
+    def count_by_project(cls, context, statuses=None):
+        return db_api.action_count_by_project(context, statuses=statuses)
+
     @classmethod
     def check_status(cls, context, action_id, timestamp):
         return db_api.action_check_status(context, action_id, timestamp)
 
     @classmethod
-    def mark_succeeded(cls, context, action_id, timestamp):
-        return db_api.action_mark_succeeded(context, action_id, timestamp)
+    def mark_succeeded(cls, context, action_id, timestamp, outputs=None):
+        return db_api.action_mark_succeeded(context, action_id, timestamp,
+                                            outputs=outputs)
 
     @classmethod
-    def mark_failed(cls, context, action_id, timestamp, reason=None):
-        return db_api.action_mark_failed(context, action_id, timestamp, reason)
+    def mark_failed(cls, context, action_id, timestamp, reason=None,
+                    outputs=None):
+        return db_api.action_mark_failed(context, action_id, timestamp, reason,
+                                         outputs=outputs)
 
     @classmethod
-    def mark_cancelled(cls, context, action_id, timestamp):
-        return db_api.action_mark_cancelled(context, action_id, timestamp)
+    def mark_cancelled(cls, context, action_id, timestamp, outputs=None):
+        return db_api.action_mark_cancelled(context, action_id, timestamp,
+                                            outputs=outputs)
 
     @classmethod
     def acquire(cls, context, action_id, owner, timestamp):
         return db_api.action_acquire(context, action_id, owner, timestamp)
 
     @classmethod
-    def acquire_random_ready(cls, context, owner, timestamp):
-        return db_api.action_acquire_random_ready(context, owner, timestamp)
+    def coalesce(cls, context, target, action, inputs, mode, max_count=0):
+        return db_api.action_coalesce(context, target, action, inputs, mode,
+                                      max_count=max_count)
+
+    @classmethod
+    def acquire_random_ready(cls, context, owner, timestamp, excluded=None,
+                             excluded_clusters=None):
+        return db_api.action_acquire_random_ready(
+            context, owner, timestamp, excluded=excluded,
+            excluded_clusters=excluded_clusters)
 
     @classmethod
     def abandon(cls, context, action_id):
@@ -153,8 +169,22 @@ class Action(base.SenlinObject, base.VersionedObjectDictCompat):
     def delete(cls, context, action_id):
         db_api.action_delete(context, action_id)
 
-    def to_dict(self):
-        if self.id:
+    @classmethod
+    def purge_contexts(cls, context):
+        return db_api.action_context_purge(context)
+
+    def to_dict(self, dependencies=None):
+        """Get a dict representation of the action.
+
+        :param dependencies: An optional tuple of the IDs of the actions
+                             this action depends on and of the actions
+                             depending on it, e.g. fetched for a list of
+                             actions at once. They are retrieved from the
+                             database if not provided.
+        """
+        if dependencies is not None:
+            dep_on, dep_by = dependencies
+        elif self.id:
             dep_on = dobj.Dependency.get_depended(self.context, self.id)
             dep_by = dobj.Dependency.get_dependents(self.context, self.id)
         else:
@@ -182,5 +212,6 @@ class Action(base.SenlinObject, base.VersionedObjectDictCompat):
             'data': self.data,
             'user': self.user,
             'project': self.project,
+            'priority': self.priority,
         }
         return action_dict
@@ -12,8 +12,6 @@
 
 """Cluster object."""
 
-from oslo_utils import uuidutils
-
 from senlin.common import exception as exc
 from senlin.db import api as db_api
 from senlin.objects import base
@@ -55,21 +53,9 @@ class Cluster(base.SenlinObject, base.VersionedObjectDictCompat):
 
     @classmethod
     def find(cls, context, identity, project_safe=True):
-        cluster = None
-        if uuidutils.is_uuid_like(identity):
-            cluster = cls.get(context, identity, project_safe=project_safe)
-            if not cluster:
-                cluster = cls.get_by_name(context, identity,
-                                          project_safe=project_safe)
-        else:
-            cluster = cls.get_by_name(context, identity,
-                                      project_safe=project_safe)
-            # maybe it is a short form of UUID
-            if not cluster:
-                cluster = cls.get_by_short_id(context, identity,
-                                              project_safe=project_safe)
-
-        if not cluster:
+        obj = db_api.cluster_find(context, identity, project_safe=project_safe)
+        cluster = cls._from_db_object(context, cls(), obj)
+        if cluster is None:
             raise exc.ResourceNotFound(type='cluster', id=identity)
 
         return cluster
@@ -38,3 +38,21 @@ class Dependency(base.SenlinObject, base.VersionedObjectDictCompat):
     @classmethod
     def get_dependents(cls, context, action_id):
         return db_api.dependency_get_dependents(context, action_id)
+
+    @classmethod
+    def get_by_actions(cls, context, action_ids):
+        """Get the dependencies of a list of actions in one query.
+
+        :param context: The request context.
+        :param action_ids: A list of action IDs.
+        :returns: A dict mapping each action ID to a tuple of the IDs of the
+                  actions it depends on and of the actions depending on it.
+        """
+        result = dict((a, ([], [])) for a in action_ids)
+        for depended, dependent in db_api.dependency_get_by_actions(
+                context, action_ids):
+            if dependent in result:
+                result[dependent][0].append(depended)
+            if depended in result:
+                result[depended][1].append(dependent)
+        return result
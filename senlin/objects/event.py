@@ -12,8 +12,6 @@
 
 """Event object."""
 
-from oslo_utils import uuidutils
-
 from senlin.common import exception
 from senlin.db import api as db_api
 from senlin.objects import base
@@ -55,12 +53,8 @@ class Event(base.SenlinObject, base.VersionedObjectDictCompat):
 
         :return: A dictionary containing the details of the event.
         """
-        event = None
-        if uuidutils.is_uuid_like(identity):
-            event = cls.get(context, identity, **kwargs)
-        if not event:
-            event = cls.get_by_short_id(context, identity, **kwargs)
-        if not event:
+        event = db_api.event_find(context, identity, **kwargs)
+        if event is None:
             raise exception.ResourceNotFound(type='event', id=identity)
 
         return event
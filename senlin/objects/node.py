@@ -12,13 +12,56 @@
 
 """Node object."""
 
-from oslo_utils import uuidutils
+from oslo_config import cfg
 
+from senlin.common import consts
 from senlin.common import exception
 from senlin.db import api as db_api
 from senlin.objects import base
 from senlin.objects import fields
 
+cfg.CONF.import_opt('node_chunk_size', 'senlin.common.config')
+
+
+class NodeRecord(object):
+    """Read-only record of the node fields used when planning operations.
+
+    Policies and scaling utilities only look at a few fields of the nodes of
+    a cluster. A record carries just those, without the runtime data of an
+    engine node or the field machinery of a versioned object, so that the
+    nodes of a large cluster can be held at a small cost.
+    """
+
+    __slots__ = ('id', 'status', 'created_at', 'profile_id',
+                 'profile_created_at', 'placement')
+
+    def __init__(self, node_id, status, created_at, profile_id,
+                 profile_created_at, placement):
+        setter = super(NodeRecord, self).__setattr__
+        setter('id', node_id)
+        setter('status', status)
+        setter('created_at', created_at)
+        setter('profile_id', profile_id)
+        setter('profile_created_at', profile_created_at)
+        setter('placement', placement)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("NodeRecord is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("NodeRecord is immutable")
+
+    def __repr__(self):
+        return 'NodeRecord(id=%r, status=%r)' % (self.id, self.status)
+
+    @classmethod
+    def from_row(cls, row):
+        # Trailing columns only serve to locate the next chunk
+        (node_id, status, created_at, profile_id, profile_created_at,
+         data) = row[:6]
+        return cls(node_id, status, created_at, profile_id,
+                   profile_created_at, (data or {}).get('placement') or {})
+
 
 @base.SenlinObjectRegistry.register
 class Node(base.SenlinObject, base.VersionedObjectDictCompat):
@@ -66,19 +109,8 @@ class Node(base.SenlinObject, base.VersionedObjectDictCompat):
                  or an exception of ``MultipleChoices`` more than one node
                  found matching the criteria.
         """
-        node = None
-        if uuidutils.is_uuid_like(identity):
-            node = cls.get(context, identity, project_safe=project_safe)
-            if not node:
-                node = cls.get_by_name(context, identity,
-                                       project_safe=project_safe)
-        else:
-            node = cls.get_by_name(context, identity,
-                                   project_safe=project_safe)
-            if not node:
-                node = cls.get_by_short_id(context, identity,
-                                           project_safe=project_safe)
-
+        obj = db_api.node_find(context, identity, project_safe=project_safe)
+        node = cls._from_db_object(context, cls(), obj)
         if node is None:
             raise exception.ResourceNotFound(type='node', id=identity)
 
@@ -104,6 +136,32 @@ class Node(base.SenlinObject, base.VersionedObjectDictCompat):
         objs = db_api.node_get_all(context, **kwargs)
         return [cls._from_db_object(context, cls(), obj) for obj in objs]
 
+    @classmethod
+    def iter_all(cls, context, sort=None, chunk_size=None, **kwargs):
+        """Iterate over nodes fetched from the database in chunks.
+
+        Each chunk is a page located by a cursor on the sort keys, so that
+        only one chunk of nodes is held at a time whatever the number of
+        nodes.
+
+        :param sort: The sort parameter, as for `get_all`.
+        :param chunk_size: The number of nodes in a chunk, which defaults to
+                           the 'node_chunk_size' option.
+        :param kwargs: The other parameters of `get_all`, except the
+                       pagination ones.
+        """
+        chunk_size = chunk_size or cfg.CONF.node_chunk_size
+        cursor = None
+        while True:
+            objs = db_api.node_get_all(context, limit=chunk_size, sort=sort,
+                                       cursor=cursor, **kwargs)
+            for obj in objs:
+                yield cls._from_db_object(context, cls(), obj)
+            if len(objs) < chunk_size:
+                return
+            cursor = db_api.encode_cursor(objs[-1], sort,
+                                          consts.NODE_INIT_AT)
+
     @classmethod
     def get_all_by_cluster(cls, context, cluster_id, **kwargs):
         objs = db_api.node_get_all_by_cluster(context, cluster_id, **kwargs)
@@ -113,11 +171,67 @@ class Node(base.SenlinObject, base.VersionedObjectDictCompat):
     def count_by_cluster(cls, context, cluster_id, **kwargs):
         return db_api.node_count_by_cluster(context, cluster_id, **kwargs)
 
+    @classmethod
+    def count_by_status(cls, context, cluster_id, **kwargs):
+        return db_api.node_count_by_status(context, cluster_id, **kwargs)
+
+    @classmethod
+    def count_by_zone(cls, context, cluster_id, **kwargs):
+        return db_api.node_count_by_zone(context, cluster_id, **kwargs)
+
+    @classmethod
+    def get_victims(cls, context, cluster_id, count, criteria, **kwargs):
+        return db_api.node_get_victims(context, cluster_id, count, criteria,
+                                       **kwargs)
+
+    @classmethod
+    def get_records(cls, context, cluster_id, **kwargs):
+        """Get the planning records of the nodes of a cluster.
+
+        :param cluster_id: ID of the cluster.
+        :returns: A list of `NodeRecord` in the order nodes were initialized.
+        """
+        rows = db_api.node_get_records(context, cluster_id, **kwargs)
+        return [NodeRecord.from_row(row) for row in rows]
+
+    @classmethod
+    def iter_records(cls, context, cluster_id, chunk_size=None, **kwargs):
+        """Iterate over the planning records of the nodes of a cluster.
+
+        The records are fetched in chunks, each located by a cursor on the
+        sort keys, so that only one chunk of records is held at a time
+        whatever the number of nodes.
+
+        :param cluster_id: ID of the cluster.
+        :param chunk_size: The number of records in a chunk, which defaults
+                           to the 'node_chunk_size' option.
+        :returns: An iterator of `NodeRecord` in the order nodes were
+                  initialized.
+        """
+        chunk_size = chunk_size or cfg.CONF.node_chunk_size
+        cursor = None
+        while True:
+            rows = db_api.node_get_records(context, cluster_id,
+                                           limit=chunk_size, cursor=cursor,
+                                           **kwargs)
+            for row in rows:
+                yield NodeRecord.from_row(row)
+            if len(rows) < chunk_size:
+                return
+            cursor = db_api.encode_cursor(rows[-1], None,
+                                          consts.NODE_INIT_AT)
+
     @classmethod
     def update(cls, context, obj_id, values):
         values = cls._transpose_metadata(values)
         db_api.node_update(context, obj_id, values)
 
+    @classmethod
+    def update_batch(cls, context, values):
+        values = dict((node_id, cls._transpose_metadata(v))
+                      for node_id, v in values.items())
+        db_api.node_update_batch(context, values)
+
     @classmethod
     def migrate(cls, context, obj_id, to_cluster, timestamp, role=None):
         return db_api.node_migrate(context, obj_id, to_cluster, timestamp,
@@ -12,8 +12,6 @@
 
 """Receiver object."""
 
-from oslo_utils import uuidutils
-
 from senlin.common import exception
 from senlin.common import utils
 from senlin.db import api as db_api
@@ -58,16 +56,9 @@ class Receiver(base.SenlinObject, base.VersionedObjectDictCompat):
         :return: A DB object of receiver or an exception `ResourceNotFound`
                  if no matching receiver is found.
         """
-        if uuidutils.is_uuid_like(identity):
-            receiver = cls.get(context, identity, **kwargs)
-            if not receiver:
-                receiver = cls.get_by_name(context, identity, **kwargs)
-        else:
-            receiver = cls.get_by_name(context, identity, **kwargs)
-            if not receiver:
-                receiver = cls.get_by_short_id(context, identity, **kwargs)
-
-        if not receiver:
+        obj = db_api.receiver_find(context, identity, **kwargs)
+        receiver = cls._from_db_object(context, cls(), obj)
+        if receiver is None:
             raise exception.ResourceNotFound(type='receiver', id=identity)
 
         return receiver
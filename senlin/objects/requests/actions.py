@@ -35,6 +35,12 @@ class ActionCreateRequest(base.SenlinObject):
 
 @base.SenlinObjectRegistry.register
 class ActionListRequest(base.SenlinObject):
+
+    VERSION = '1.1'
+    VERSION_MAP = {
+        '1.5': '1.1'
+    }
+
     action_name_list = list(consts.CLUSTER_ACTION_NAMES)
     action_name_list.extend(list(consts.NODE_ACTION_NAMES))
 
@@ -47,6 +53,7 @@ class ActionListRequest(base.SenlinObject):
             valid_values=list(consts.ACTION_STATUSES), nullable=True),
         'limit': fields.NonNegativeIntegerField(nullable=True),
         'marker': fields.UUIDField(nullable=True),
+        'cursor': fields.StringField(nullable=True),
         'sort': fields.SortField(
             valid_keys=list(consts.ACTION_SORT_KEYS), nullable=True),
         'project_safe': fields.FlexibleBooleanField(default=True)
@@ -61,6 +68,30 @@ class ActionGetRequest(base.SenlinObject):
     }
 
 
+@base.SenlinObjectRegistry.register
+class ActionTimingRequest(base.SenlinObject):
+    action_name_list = list(consts.CLUSTER_ACTION_NAMES)
+    action_name_list.extend(list(consts.NODE_ACTION_NAMES))
+
+    fields = {
+        'cluster': fields.StringField(nullable=True),
+        'action': fields.ListOfEnumField(
+            valid_values=action_name_list, nullable=True),
+        'since': fields.NonNegativeIntegerField(default=3600),
+        'limit': fields.NonNegativeIntegerField(default=1000),
+        'project_safe': fields.FlexibleBooleanField(default=True)
+    }
+
+
+@base.SenlinObjectRegistry.register
+class ActionUpdateRequest(base.SenlinObject):
+
+    fields = {
+        'identity': fields.StringField(),
+        'priority': fields.NonNegativeIntegerField(),
+    }
+
+
 @base.SenlinObjectRegistry.register
 class ActionDeleteRequest(base.SenlinObject):
 
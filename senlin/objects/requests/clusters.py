@@ -23,12 +23,18 @@ CONF.import_opt('default_action_timeout', 'senlin.common.config')
 @base.SenlinObjectRegistry.register
 class ClusterListRequest(base.SenlinObject):
 
+    VERSION = '1.1'
+    VERSION_MAP = {
+        '1.5': '1.1'
+    }
+
     fields = {
         'name': fields.ListOfStringsField(nullable=True),
         'status': fields.ListOfEnumField(
             valid_values=list(consts.CLUSTER_STATUSES), nullable=True),
         'limit': fields.NonNegativeIntegerField(nullable=True),
         'marker': fields.UUIDField(nullable=True),
+        'cursor': fields.StringField(nullable=True),
         'sort': fields.SortField(
             valid_keys=list(consts.CLUSTER_SORT_KEYS), nullable=True),
         'project_safe': fields.FlexibleBooleanField(default=True),
@@ -18,6 +18,11 @@ from senlin.objects import fields
 @base.SenlinObjectRegistry.register
 class EventListRequest(base.SenlinObject):
 
+    VERSION = '1.1'
+    VERSION_MAP = {
+        '1.5': '1.1'
+    }
+
     action_name_list = list(consts.CLUSTER_ACTION_NAMES)
     action_name_list.extend(list(consts.NODE_ACTION_NAMES))
 
@@ -32,6 +37,7 @@ class EventListRequest(base.SenlinObject):
             valid_values=list(consts.EVENT_LEVELS.keys()), nullable=True),
         'limit': fields.NonNegativeIntegerField(nullable=True),
         'marker': fields.UUIDField(nullable=True),
+        'cursor': fields.StringField(nullable=True),
         'sort': fields.SortField(
             valid_keys=list(consts.EVENT_SORT_KEYS), nullable=True),
         'project_safe': fields.FlexibleBooleanField(default=True)
@@ -38,6 +38,11 @@ class NodeCreateRequest(base.SenlinObject):
 @base.SenlinObjectRegistry.register
 class NodeListRequest(base.SenlinObject):
 
+    VERSION = '1.1'
+    VERSION_MAP = {
+        '1.5': '1.1'
+    }
+
     fields = {
         'cluster_id': fields.StringField(nullable=True),
         'name': fields.ListOfStringsField(nullable=True),
@@ -45,6 +50,7 @@ class NodeListRequest(base.SenlinObject):
             valid_values=list(consts.NODE_STATUSES), nullable=True),
         'limit': fields.NonNegativeIntegerField(nullable=True),
         'marker': fields.UUIDField(nullable=True),
+        'cursor': fields.StringField(nullable=True),
         'sort': fields.SortField(
             valid_keys=list(consts.NODE_SORT_KEYS), nullable=True),
         'project_safe': fields.FlexibleBooleanField(default=True)
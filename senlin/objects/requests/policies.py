@@ -18,11 +18,17 @@ from senlin.objects import fields
 @base.SenlinObjectRegistry.register
 class PolicyListRequest(base.SenlinObject):
 
+    VERSION = '1.1'
+    VERSION_MAP = {
+        '1.5': '1.1'
+    }
+
     fields = {
         'name': fields.ListOfStringsField(nullable=True),
         'type': fields.ListOfStringsField(nullable=True),
         'limit': fields.NonNegativeIntegerField(nullable=True),
         'marker': fields.UUIDField(nullable=True),
+        'cursor': fields.StringField(nullable=True),
         'sort': fields.SortField(
             valid_keys=list(consts.POLICY_SORT_KEYS), nullable=True),
         'project_safe': fields.FlexibleBooleanField(default=True),
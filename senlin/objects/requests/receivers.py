@@ -39,6 +39,11 @@ class ReceiverCreateRequest(base.SenlinObject):
 @base.SenlinObjectRegistry.register
 class ReceiverListRequest(base.SenlinObject):
 
+    VERSION = '1.1'
+    VERSION_MAP = {
+        '1.5': '1.1'
+    }
+
     fields = {
         'name': fields.ListOfStringsField(nullable=True),
         'type': fields.ListOfEnumField(
@@ -48,6 +53,7 @@ class ReceiverListRequest(base.SenlinObject):
         'cluster_id': fields.ListOfStringsField(nullable=True),
         'limit': fields.NonNegativeIntegerField(nullable=True),
         'marker': fields.UUIDField(nullable=True),
+        'cursor': fields.StringField(nullable=True),
         'sort': fields.SortField(
             valid_keys=list(consts.RECEIVER_SORT_KEYS), nullable=True),
         'project_safe': fields.FlexibleBooleanField(default=True)
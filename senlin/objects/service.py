@@ -28,6 +28,7 @@ class Service(base.SenlinObject, base.VersionedObjectDictCompat):
         'topic': fields.StringField(),
         'disabled': fields.BooleanField(),
         'disabled_reason': fields.StringField(nullable=True),
+        'capacity': fields.IntegerField(nullable=True),
         'created_at': fields.DateTimeField(),
         'updated_at': fields.DateTimeField(),
     }
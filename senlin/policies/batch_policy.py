@@ -120,7 +120,7 @@ class BatchPolicy(base.Policy):
         :param batch_size: the number of nodes of each batch.
         :param batch_num: the number of batches.
         :param candidates: a list of IDs for 'ERROR' nodes.
-        :param good: a list of active node objects.
+        :param good: a list of IDs for active nodes.
         :returns: a list of sets containing the nodes' IDs we
                   selected based on the input params.
         """
@@ -129,8 +129,7 @@ class BatchPolicy(base.Policy):
         # NOTE: we leave the nodes known to be good (ACTIVE)
         # at the end of the list so that we have a better
         # chance to ensure 'min_in_service' constraint
-        for node in good:
-            candidates.append(node.id)
+        candidates.extend(good)
 
         for start in range(0, len(candidates), batch_size):
             end = start + batch_size
@@ -158,8 +157,10 @@ class BatchPolicy(base.Policy):
             plan['batch_size'] = batch_size
             return True, plan
 
-        nodes_list = cluster.nodes
-        bad_list, good_list = su.filter_error_nodes(nodes_list)
+        # The records are read chunk by chunk and only the node IDs are
+        # kept, which the plan lists anyway
+        records = no.Node.iter_records(action.context, cluster.id)
+        bad_list, good_list = su.filter_error_nodes(records, ids_only=True)
         plan_list = self._pick_nodes(batch_size, batch_num, bad_list,
                                      good_list)
         plan['plan'] = plan_list
@@ -23,7 +23,6 @@ from senlin.common import consts
 from senlin.common.i18n import _
 from senlin.common import scaleutils
 from senlin.common import schema
-from senlin.engine import cluster as cm
 from senlin.objects import cluster as co
 from senlin.objects import node as no
 from senlin.policies import base
@@ -53,9 +52,7 @@ class DeletionPolicy(base.Policy):
 
     CRITERIA_VALUES = (
         OLDEST_FIRST, OLDEST_PROFILE_FIRST, YOUNGEST_FIRST, RANDOM,
-    ) = (
-        'OLDEST_FIRST', 'OLDEST_PROFILE_FIRST', 'YOUNGEST_FIRST', 'RANDOM',
-    )
+    ) = consts.DELETION_CRITERIA
 
     TARGET = [
         ('BEFORE', consts.CLUSTER_SCALE_IN),
@@ -102,39 +99,31 @@ class DeletionPolicy(base.Policy):
         self.reduce_desired_capacity = self.properties[
             self.REDUCE_DESIRED_CAPACITY]
 
-    def _victims_by_regions(self, cluster, regions):
+    def _select(self, nodes, count):
+        if self.criteria == self.RANDOM:
+            return scaleutils.nodes_by_random(nodes, count)
+        elif self.criteria == self.OLDEST_PROFILE_FIRST:
+            return scaleutils.nodes_by_profile_age(nodes, count)
+        elif self.criteria == self.OLDEST_FIRST:
+            return scaleutils.nodes_by_age(nodes, count, True)
+        else:
+            return scaleutils.nodes_by_age(nodes, count, False)
+
+    def _victims_by_regions(self, nodes_by_region, regions):
         victims = []
         for region in sorted(regions.keys()):
             count = regions[region]
-            nodes = cluster.nodes_by_region(region)
-            if self.criteria == self.RANDOM:
-                candidates = scaleutils.nodes_by_random(nodes, count)
-            elif self.criteria == self.OLDEST_PROFILE_FIRST:
-                candidates = scaleutils.nodes_by_profile_age(nodes, count)
-            elif self.criteria == self.OLDEST_FIRST:
-                candidates = scaleutils.nodes_by_age(nodes, count, True)
-            else:
-                candidates = scaleutils.nodes_by_age(nodes, count, False)
-
-            victims.extend(candidates)
+            nodes = nodes_by_region.get(region, [])
+            victims.extend(self._select(nodes, count))
 
         return victims
 
-    def _victims_by_zones(self, cluster, zones):
+    def _victims_by_zones(self, nodes_by_zone, zones):
         victims = []
         for zone in sorted(zones.keys()):
             count = zones[zone]
-            nodes = cluster.nodes_by_zone(zone)
-            if self.criteria == self.RANDOM:
-                candidates = scaleutils.nodes_by_random(nodes, count)
-            elif self.criteria == self.OLDEST_PROFILE_FIRST:
-                candidates = scaleutils.nodes_by_profile_age(nodes, count)
-            elif self.criteria == self.OLDEST_FIRST:
-                candidates = scaleutils.nodes_by_age(nodes, count, True)
-            else:
-                candidates = scaleutils.nodes_by_age(nodes, count, False)
-
-            victims.extend(candidates)
+            nodes = nodes_by_zone.get(zone, [])
+            victims.extend(self._select(nodes, count))
 
         return victims
 
@@ -168,7 +157,6 @@ class DeletionPolicy(base.Policy):
             self._update_action(action, [action.node.id])
             return
 
-        db_cluster = None
         regions = None
         zones = None
 
@@ -198,31 +186,25 @@ class DeletionPolicy(base.Policy):
                 return
             count = action.data['deletion']['count']
 
-        cluster = cm.Cluster.load(action.context, dbcluster=db_cluster,
-                                  cluster_id=cluster_id)
-        # Cross-region
-        if regions:
-            victims = self._victims_by_regions(cluster, regions)
-            self._update_action(action, victims)
-            return
-
-        # Cross-AZ
-        if zones:
-            victims = self._victims_by_zones(cluster, zones)
+        if regions or zones:
+            # The node records are fetched once and grouped by placement
+            records = no.Node.get_records(action.context, cluster_id,
+                                          project_safe=False)
+            key = 'region_name' if regions else 'zone'
+            groups = {}
+            for record in records:
+                groups.setdefault(record.placement.get(key), []).append(record)
+            # Cross-region
+            if regions:
+                victims = self._victims_by_regions(groups, regions)
+            # Cross-AZ
+            else:
+                victims = self._victims_by_zones(groups, zones)
             self._update_action(action, victims)
             return
 
-        if count > len(cluster.nodes):
-            count = len(cluster.nodes)
-
-        if self.criteria == self.RANDOM:
-            victims = scaleutils.nodes_by_random(cluster.nodes, count)
-        elif self.criteria == self.OLDEST_PROFILE_FIRST:
-            victims = scaleutils.nodes_by_profile_age(cluster.nodes, count)
-        elif self.criteria == self.OLDEST_FIRST:
-            victims = scaleutils.nodes_by_age(cluster.nodes, count, True)
-        else:
-            victims = scaleutils.nodes_by_age(cluster.nodes, count, False)
-
+        # The victims are chosen by the database, no node is loaded
+        victims = no.Node.get_victims(action.context, cluster_id, count,
+                                      self.criteria, project_safe=False)
         self._update_action(action, victims)
         return
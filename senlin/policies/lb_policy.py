@@ -325,19 +325,18 @@ class LoadBalancingPolicy(base.Policy):
         port = self.pool_spec.get(self.POOL_PROTOCOL_PORT)
         subnet = self.pool_spec.get(self.POOL_SUBNET)
 
-        for node in nodes:
-            member_id = lb_driver.member_add(node, data['loadbalancer'],
-                                             data['pool'], port, subnet)
-            if member_id is None:
-                # When failed in adding member, remove all lb resources that
-                # were created and return the failure reason.
-                # TODO(anyone): May need to "roll-back" changes caused by any
-                # successful member_add() calls.
-                lb_driver.lb_delete(**data)
-                return False, 'Failed in adding node into lb pool'
-
-            node.data.update({'lb_member': member_id})
-            node.store(oslo_context.get_current())
+        nodes = list(nodes)
+        members = lb_driver.members_add(nodes, data['loadbalancer'],
+                                        data['pool'], port, subnet)
+        if len(members) != len(nodes):
+            # When failed in adding member, remove all lb resources that
+            # were created and return the failure reason.
+            # TODO(anyone): May need to "roll-back" changes caused by any
+            # successful members_add() calls.
+            lb_driver.lb_delete(**data)
+            return False, 'Failed in adding node into lb pool'
+
+        self._save_lb_members(oslo_context.get_current(), nodes, members)
 
         cluster_data_lb = cluster.data.get('loadbalancers', {})
         cluster_data_lb[self.id] = {'vip_address': data.pop('vip_address')}
@@ -373,10 +372,12 @@ class LoadBalancingPolicy(base.Policy):
 
         nodes = nm.Node.load_all(oslo_context.get_current(),
                                  cluster_id=cluster.id, project_safe=False)
+        values = {}
         for node in nodes:
             if 'lb_member' in node.data:
                 node.data.pop('lb_member')
-                node.store(oslo_context.get_current())
+                values[node.id] = {'data': node.data}
+        no.Node.update_batch(oslo_context.get_current(), values)
 
         lb_data = cluster.data.get('loadbalancers', {})
         if lb_data and isinstance(lb_data, dict):
@@ -388,6 +389,23 @@ class LoadBalancingPolicy(base.Policy):
 
         return True, reason
 
+    def _save_lb_members(self, context, nodes, members):
+        """Record LB member IDs into node data with a single bulk update.
+
+        :param context: The context for DB operations.
+        :param nodes: A list of node objects that were added into the pool.
+        :param members: A dict mapping node IDs to their LB member IDs.
+        """
+        values = {}
+        for node in nodes:
+            member_id = members.get(node.id, None)
+            if member_id is None:
+                continue
+            node.data.update({'lb_member': member_id})
+            values[node.id] = {'data': node.data}
+
+        no.Node.update_batch(context, values)
+
     def _get_delete_candidates(self, cluster_id, action):
         deletion = action.data.get('deletion', None)
         # No deletion field in action.data which means no scaling
@@ -420,7 +438,7 @@ class LoadBalancingPolicy(base.Policy):
         if candidates is None:
             if count == 0:
                 return []
-            nodes = no.Node.get_all_by_cluster(action.context, cluster_id)
+            nodes = no.Node.get_records(action.context, cluster_id)
             if count > len(nodes):
                 count = len(nodes)
             candidates = scaleutils.nodes_by_random(nodes, count)
@@ -459,6 +477,7 @@ class LoadBalancingPolicy(base.Policy):
         pool_id = policy_data['pool']
 
         # Remove nodes that will be deleted from lb pool
+        member_ids = []
         for node_id in candidates:
             node = nm.Node.load(action.context, node_id=node_id)
             member_id = node.data.get('lb_member', None)
@@ -466,13 +485,17 @@ class LoadBalancingPolicy(base.Policy):
                 LOG.warning(_LW('Node %(n)s not found in lb pool %(p)s.'),
                             {'n': node_id, 'p': pool_id})
                 continue
+            member_ids.append(member_id)
 
-            res = lb_driver.member_remove(lb_id, pool_id, member_id)
-            if res is not True:
-                action.data['status'] = base.CHECK_ERROR
-                action.data['reason'] = _('Failed in removing deleted '
-                                          'node(s) from lb pool.')
-                return
+        if not member_ids:
+            return
+
+        removed = lb_driver.members_remove(lb_id, pool_id, member_ids)
+        if len(removed) != len(member_ids):
+            action.data['status'] = base.CHECK_ERROR
+            action.data['reason'] = _('Failed in removing deleted '
+                                      'node(s) from lb pool.')
+            return
 
         return
 
@@ -509,6 +532,7 @@ class LoadBalancingPolicy(base.Policy):
         subnet = self.pool_spec.get(self.POOL_SUBNET)
 
         # Add new nodes to lb pool
+        nodes = []
         for node_id in nodes_added:
             node = nm.Node.load(action.context, node_id=node_id)
             member_id = node.data.get('lb_member', None)
@@ -516,16 +540,17 @@ class LoadBalancingPolicy(base.Policy):
                 LOG.warning(_LW('Node %(n)s already in lb pool %(p)s.'),
                             {'n': node_id, 'p': pool_id})
                 continue
+            nodes.append(node)
 
-            member_id = lb_driver.member_add(node, lb_id, pool_id, port,
-                                             subnet)
-            if member_id is None:
-                action.data['status'] = base.CHECK_ERROR
-                action.data['reason'] = _('Failed in adding new node(s) '
-                                          'into lb pool.')
-                return
+        if not nodes:
+            return
 
-            node.data.update({'lb_member': member_id})
-            node.store(action.context)
+        members = lb_driver.members_add(nodes, lb_id, pool_id, port, subnet)
+        self._save_lb_members(action.context, nodes, members)
+        if len(members) != len(nodes):
+            action.data['status'] = base.CHECK_ERROR
+            action.data['reason'] = _('Failed in adding new node(s) '
+                                      'into lb pool.')
+            return
 
         return
@@ -258,7 +258,8 @@ class RegionPlacementPolicy(base.Policy):
             if r[0] in regions_good:
                 regions[r[0]] = r[1]
 
-        current_dist = cluster.get_region_distribution(regions_good)
+        current_dist = cluster.get_region_distribution(action.context,
+                                                       regions_good)
         result = self._create_plan(current_dist, regions, count, expand)
         if not result:
             action.data['status'] = base.CHECK_ERROR
@@ -270,6 +270,12 @@ class Profile(object):
         profile = cls.load(ctx, profile_id=obj.profile_id)
         return profile.do_check(obj)
 
+    @classmethod
+    @profiler.trace('Profile.refresh_placement', hide_args=False)
+    def refresh_placement(cls, ctx, obj):
+        profile = cls.load(ctx, profile_id=obj.profile_id)
+        return profile.do_refresh_placement(obj)
+
     @classmethod
     @profiler.trace('Profile.recover_object', hide_args=False)
     def recover_object(cls, ctx, obj, **options):
@@ -393,6 +399,17 @@ class Profile(object):
         LOG.warning(_LW("Get_details operation not supported."))
         return {}
 
+    def do_refresh_placement(self, obj):
+        """For subclass to override.
+
+        :param obj: The node object to operate on.
+        :returns: True if the placement data in node's ``data`` has been
+                  updated, or False otherwise.
+        :raises: `NotImplementedError` if the profile does not record the
+                 placement of its nodes.
+        """
+        raise NotImplementedError
+
     def do_join(self, obj, cluster_id):
         """For subclass to override to perform extra operations."""
         LOG.warning(_LW("Join operation not specialized."))
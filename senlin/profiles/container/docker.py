@@ -172,7 +172,7 @@ class DockerProfile(base.Profile):
             msg = ex.enhance_msg('host', ex)
             raise exc.InternalError(message=msg)
 
-        nodes = self.cluster.rt['nodes']
+        nodes = self.cluster.nodes
         if len(nodes) == 0:
             msg = _("The cluster (%s) contains no nodes") % host_cluster
             raise exc.InternalError(message=msg)
@@ -13,15 +13,20 @@
 import base64
 import copy
 
+from oslo_log import log as logging
 from oslo_utils import encodeutils
+from oslo_utils import timeutils
 import six
 
 from senlin.common import constraints
 from senlin.common import exception as exc
-from senlin.common.i18n import _
+from senlin.common.i18n import _, _LW
 from senlin.common import schema
+from senlin.common import utils
 from senlin.profiles import base
 
+LOG = logging.getLogger(__name__)
+
 
 class ServerProfile(base.Profile):
     """Profile for an OpenStack Nova server."""
@@ -518,13 +523,46 @@ class ServerProfile(base.Profile):
         try:
             server = self.compute(obj).server_create(**kwargs)
             self.compute(obj).wait_for_server(server.id)
-            return server.id
         except exc.InternalError as ex:
             if server and server.id:
                 resource_id = server.id
             raise exc.EResourceCreation(type='server', message=ex.message,
                                         resource_id=resource_id)
 
+        # Record the placement as reported by nova. A failure here is not
+        # fatal because the placement data will be refreshed later.
+        try:
+            self._update_placement(obj,
+                                   self.compute(obj).server_get(server.id))
+        except exc.InternalError as ex:
+            LOG.warning(_LW('Failed in getting placement of server %(s)s: '
+                            '%(ex)s'), {'s': server.id, 'ex': ex.message})
+
+        return server.id
+
+    def _update_placement(self, obj, server):
+        """Record the availability zone and host of a server into node data.
+
+        :param obj: The node object whose ``data`` will be updated.
+        :param server: The server object returned from the compute service.
+        :returns: ``None``.
+        """
+        if server is None:
+            return
+
+        placement = obj.data.get('placement', {})
+        zone = getattr(server, 'availability_zone', None)
+        if zone:
+            # Keep host-qualified zones (e.g. 'nova:host1') set by policies
+            old_zone = placement.get('zone', None)
+            if not old_zone or old_zone.split(':', 1)[0] != zone:
+                placement['zone'] = zone
+        host = getattr(server, 'hypervisor_hostname', None)
+        if host:
+            placement['host'] = host
+        placement['synced_at'] = utils.isotime(timeutils.utcnow(True))
+        obj.data['placement'] = placement
+
     def do_delete(self, obj, **params):
         """Delete the physical resource associated with the specified node.
 
@@ -1015,6 +1053,28 @@ class ServerProfile(base.Profile):
         if (server is None or server.status != 'ACTIVE'):
             return False
 
+        self._update_placement(obj, server)
+        return True
+
+    def do_refresh_placement(self, obj):
+        """Refresh the placement data of the server from the compute service.
+
+        :param obj: The node object to operate on.
+        :returns: True if the node data has been updated, or False otherwise.
+        """
+        if not obj.physical_id:
+            return False
+
+        try:
+            server = self.compute(obj).server_get(obj.physical_id)
+        except exc.InternalError as ex:
+            raise exc.EResourceOperation(op='checking', type='server',
+                                         id=obj.physical_id,
+                                         message=six.text_type(ex))
+        if server is None:
+            return False
+
+        self._update_placement(obj, server)
         return True
 
     def do_recover(self, obj, **options):
@@ -0,0 +1,52 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import argparse
+import sys
+
+from oslo_serialization import jsonutils
+
+
+def per_call(seconds, count):
+    """Get the time spent in one of a number of calls in microseconds."""
+    return seconds / count * 1e6
+
+
+def make_parser(description):
+    """Get the parser of the options of a benchmark command.
+
+    The parser comes with an '--output' option, the other options are to be
+    added by the command.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--output', default=None,
+                        help='File to write the JSON result to.')
+    return parser
+
+
+def run_command(parser, run, argv=None):
+    """Run a benchmark command and print its result as JSON.
+
+    :param parser: The parser built by `make_parser`.
+    :param run: A callable which runs the benchmark with the parsed options
+                and returns its result.
+    :param argv: The command line arguments, `sys.argv` by default.
+    :returns: The result of the benchmark.
+    """
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    result = run(args)
+    output = jsonutils.dumps(result, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    return result
@@ -0,0 +1,203 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Benchmark of the encodings of the JSON columns of the database.
+
+Example::
+
+  python -m senlin.tests.benchmark.encoding --rows 1000000
+
+For each combination of the 'json_column_encoding' and
+'json_column_compress_threshold' options, the size of the JSON columns of a
+synthetic action row in bytes and the time spent encoding and decoding them
+in microseconds are reported, together with the size in bytes of a SQLite
+database holding the given number of such actions.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+from oslo_config import cfg
+from oslo_utils import uuidutils
+import sqlalchemy
+
+from senlin.db.sqlalchemy import models
+from senlin.db.sqlalchemy import types
+from senlin.tests import benchmark
+
+COLUMNS = ('context', 'inputs', 'outputs', 'data')
+
+CONFIGS = [
+    ('json', 0),
+    ('json', 256),
+    ('msgpack', 0),
+    ('msgpack', 256),
+]
+
+
+def action_values(index=0):
+    """Get the values of the JSON columns of a synthetic action.
+
+    The values mimic those of a node action derived from a cluster scaling
+    action, i.e. the request context, a handful of inputs, the outputs of a
+    node creation and the data left by policies.
+    """
+    return {
+        'context': {
+            'auth_token': None,
+            'user': uuidutils.generate_uuid(dashed=False),
+            'user_name': 'demo',
+            'user_domain': 'default',
+            'user_domain_name': 'Default',
+            'project': uuidutils.generate_uuid(dashed=False),
+            'project_name': 'demo',
+            'project_domain': 'default',
+            'project_domain_name': 'Default',
+            'domain': None,
+            'domain_name': None,
+            'trusts': None,
+            'region_name': 'RegionOne',
+            'roles': ['member', 'reader', 'anotherrole'],
+            'show_deleted': False,
+            'is_admin': False,
+            'request_id': 'req-' + uuidutils.generate_uuid(),
+            'api_version': '1.5',
+            'password': None,
+            'auth_url': 'http://192.168.1.10/identity/v3',
+        },
+        'inputs': {
+            'count': 1,
+            'node_index': index,
+            'placement': {'zone': 'nova', 'region': 'RegionOne'},
+        },
+        'outputs': {
+            'timing': {'claim': 0.012, 'lock': 0.004, 'policy_pre': 0.031,
+                       'execute': 12.418, 'policy_post': 0.022},
+            'status': 'SUCCEEDED',
+        },
+        'data': {
+            'creation': {'count': 1, 'nodes': [uuidutils.generate_uuid()]},
+            'placement': {
+                'count': 1,
+                'placements': [{'zone': 'nova', 'region': 'RegionOne'}],
+            },
+            'deletion': {'destroy_after_deletion': True,
+                         'grace_period': 60, 'reduce_desired_capacity': True},
+            'health': {'recover_action': [{'name': 'REBUILD',
+                                           'params': None}],
+                       'fencing': ['COMPUTE']},
+            'status': 'OK',
+            'reason': 'Completed policy checking.',
+        },
+    }
+
+
+def _configure(encoding, threshold):
+    cfg.CONF.set_override('json_column_encoding', encoding)
+    cfg.CONF.set_override('json_column_compress_threshold', threshold)
+
+
+def measure(encoding, threshold, iterations):
+    """Measure the encoding of the JSON columns of an action.
+
+    :param encoding: Value of the 'json_column_encoding' option.
+    :param threshold: Value of the 'json_column_compress_threshold' option.
+    :param iterations: Number of times each measurement is repeated.
+    :returns: A dict with the size of the encoded row in bytes and the
+              encoding and decoding times in microseconds per row.
+    """
+    _configure(encoding, threshold)
+    values = action_values()
+    encoded = dict((k, types.encode_value(v)) for k, v in values.items())
+
+    def encode():
+        for key in COLUMNS:
+            types.encode_value(values[key])
+
+    def decode():
+        for key in COLUMNS:
+            types.decode_value(encoded[key])
+
+    return {
+        'row_size': sum(len(v) for v in encoded.values()),
+        'encode': benchmark.per_call(
+            timeit.timeit(encode, number=iterations), iterations),
+        'decode': benchmark.per_call(
+            timeit.timeit(decode, number=iterations), iterations),
+    }
+
+
+def table_size(encoding, threshold, rows, batch=1000):
+    """Measure the size of a database holding synthetic actions.
+
+    :param encoding: Value of the 'json_column_encoding' option.
+    :param threshold: Value of the 'json_column_compress_threshold' option.
+    :param rows: Number of actions to create.
+    :param batch: Number of actions inserted in each statement.
+    :returns: The size of the SQLite database file in bytes.
+    """
+    _configure(encoding, threshold)
+    workdir = tempfile.mkdtemp(prefix='senlin-bench-')
+    try:
+        path = os.path.join(workdir, 'senlin.db')
+        engine = sqlalchemy.create_engine('sqlite:///%s' % path)
+        table = models.Action.__table__
+        table.create(engine)
+
+        with engine.begin() as conn:
+            done = 0
+            while done < rows:
+                count = min(batch, rows - done)
+                records = []
+                for i in range(done, done + count):
+                    record = action_values(i)
+                    record.update(id=uuidutils.generate_uuid(),
+                                  name='node_create_%08d' % i,
+                                  action='NODE_CREATE', status='SUCCEEDED')
+                    records.append(record)
+                conn.execute(table.insert(), records)
+                done += count
+
+        engine.dispose()
+        return os.path.getsize(path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(args):
+    result = {}
+    for encoding, threshold in CONFIGS:
+        res = measure(encoding, threshold, args.iterations)
+        if args.rows:
+            res['table_size'] = table_size(encoding, threshold, args.rows)
+        result['%s/%d' % (encoding, threshold)] = res
+    return result
+
+
+def main(argv=None):
+    parser = benchmark.make_parser(
+        'Benchmark the encodings of the JSON columns.')
+    parser.add_argument('--iterations', type=int, default=1000,
+                        help='Repetitions of each measurement.')
+    parser.add_argument('--rows', type=int, default=10000,
+                        help='Number of actions in the measured table, 0 '
+                             'to skip the measurement.')
+    benchmark.run_command(parser, run, argv)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
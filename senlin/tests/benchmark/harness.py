@@ -0,0 +1,289 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+In-process senlin engine for benchmarking.
+
+The harness boots an `EngineService`, together with its dispatcher, thread
+group manager and health manager, on top of the 'fake' messaging driver and
+the 'memory' cloud backend. Requests are sent through the regular RPC client
+so the whole path from the RPC server to the drivers is exercised.
+"""
+
+import calendar
+import math
+import os
+import resource
+import shutil
+import tempfile
+import threading
+import time
+
+import eventlet
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import timeutils
+import sqlalchemy
+
+from senlin.common import consts
+from senlin.common import context
+from senlin.common import messaging
+from senlin.db import api as db_api
+from senlin.engine import dispatcher
+from senlin.engine import service
+from senlin import objects
+from senlin.objects import action as ao
+from senlin.objects import base as obj_base
+from senlin.objects import credential as co
+from senlin.rpc import client as rpc_client
+from senlin.tests.drivers.memory import cloud
+
+FINAL_STATUSES = ('SUCCEEDED', 'FAILED', 'CANCELLED')
+
+
+def percentile(values, pct):
+    """Get a percentile of a list of values using the nearest-rank method.
+
+    :param values: A list of numbers.
+    :param pct: The percentile wanted, from 0 to 100.
+    :returns: The percentile or None if the list is empty.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = int(math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[max(rank, 1) - 1]
+
+
+def summarize(values):
+    """Get the percentiles commonly reported for a list of durations."""
+    return {
+        'count': len(values),
+        'p50': percentile(values, 50),
+        'p90': percentile(values, 90),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else None,
+    }
+
+
+def _epoch(dt):
+    return calendar.timegm(dt.utctimetuple()) + dt.microsecond / 1e6
+
+
+class QueryCounter(object):
+    """Count the SQL statements executed by the engine.
+
+    Statements executed by the harness itself, e.g. for polling action
+    status, are excluded by running them inside `paused()`.
+    """
+
+    def __init__(self, engine):
+        self.count = 0
+        self._local = threading.local()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute',
+                                self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context,
+                    executemany):
+        if not getattr(self._local, 'paused', False):
+            self.count += 1
+
+    def paused(self):
+        counter = self
+
+        class _Paused(object):
+            def __enter__(self):
+                counter._local.paused = True
+
+            def __exit__(self, *args):
+                counter._local.paused = False
+
+        return _Paused()
+
+    def reset(self):
+        self.count = 0
+
+
+class Harness(object):
+    """An in-process senlin engine driven through its RPC API."""
+
+    def __init__(self, db_url=None, poll_interval=0.2):
+        self.db_url = db_url
+        self.poll_interval = poll_interval
+        self.workdir = None
+        self.engine = None
+        self.client = None
+        self.counter = None
+        self.ctx = None
+        self.nudges = 0
+
+    def setup(self, overrides=None):
+        """Configure and start the engine.
+
+        :param overrides: A dict of configuration options to override, with
+                          keys in the form of 'group.option' or 'option'.
+        """
+        logging.register_options(cfg.CONF)
+        cfg.CONF([], project='senlin', default_config_files=[])
+        # Keep stdout clean for the results
+        cfg.CONF.set_override('use_stderr', True)
+        logging.setup(cfg.CONF, 'senlin-bench')
+
+        if self.db_url is None:
+            # An in-memory SQLite database cannot be shared by green threads
+            self.workdir = tempfile.mkdtemp(prefix='senlin-bench-')
+            self.db_url = 'sqlite:///%s' % os.path.join(self.workdir,
+                                                        'senlin.db')
+        cfg.CONF.set_override('connection', self.db_url, group='database')
+        cfg.CONF.set_override('cloud_backend', 'memory')
+        for key, value in (overrides or {}).items():
+            group, _sep, name = key.rpartition('.')
+            cfg.CONF.set_override(name, value, group=group or None)
+
+        objects.register_all()
+        messaging.setup('fake://')
+        engine = db_api.get_engine()
+        db_api.db_sync(engine)
+        self.counter = QueryCounter(engine)
+        cloud.reset()
+
+        self.engine = service.EngineService(cfg.CONF.host,
+                                            consts.ENGINE_TOPIC)
+        self.engine.start()
+        self.client = rpc_client.EngineClient()
+
+        self.ctx = context.RequestContext(user='bench-user',
+                                          project='bench-project',
+                                          is_admin=False)
+        co.Credential.update_or_create(self.ctx, {
+            'user': self.ctx.user,
+            'project': self.ctx.project,
+            'cred': {'openstack': {'trust': 'bench-trust'}},
+        })
+
+    def teardown(self):
+        if self.engine is not None:
+            self.engine.stop()
+            self.engine = None
+        messaging.cleanup()
+        if self.workdir is not None:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
+
+    @staticmethod
+    def request(request_name, **params):
+        """Build a versioned request object.
+
+        :param request_name: Name of the versioned request object.
+        :param params: Fields of the request.
+        """
+        req_cls = obj_base.SenlinObject.obj_class_from_name(request_name)
+        return req_cls(**params)
+
+    def call(self, method, request_name, **params):
+        """Invoke an engine RPC method.
+
+        :param method: Name of the engine method, e.g. 'cluster_create2'.
+        :param request_name: Name of the versioned request object.
+        :param params: Fields of the request.
+        """
+        return self.client.call2(self.ctx, method,
+                                 self.request(request_name, **params))
+
+    def wait_for_actions(self, action_ids, timeout=None):
+        """Wait for a list of actions to reach a final status.
+
+        :returns: A dict mapping action IDs to their final status.
+        """
+        timeout = timeout or cfg.CONF.default_action_timeout
+        deadline = time.time() + timeout
+        pending = set(action_ids)
+        result = {}
+        admin = context.get_admin_context()
+        while pending:
+            ready = False
+            with self.counter.paused():
+                for action_id in list(pending):
+                    action = ao.Action.get(admin, action_id)
+                    if action.status in FINAL_STATUSES:
+                        result[action_id] = action.status
+                        pending.discard(action_id)
+                    elif action.status == 'READY':
+                        ready = True
+            if not pending:
+                break
+            if ready:
+                # Actions which failed to grab a lock are put back to READY
+                # and only picked up again when the dispatcher is notified.
+                self.nudges += 1
+                dispatcher.start_action()
+            if time.time() > deadline:
+                raise RuntimeError('Timeout waiting for %d actions'
+                                   % len(pending))
+            eventlet.sleep(self.poll_interval)
+
+        return result
+
+    def measure(self, func):
+        """Run a workload and collect metrics about it.
+
+        :param func: A callable firing engine requests. It returns the IDs
+                     of the actions to wait for.
+        :returns: A dict of metrics.
+        """
+        self.counter.reset()
+        self.nudges = 0
+        started_at = timeutils.utcnow(True)
+        started = time.time()
+
+        action_ids = func()
+        statuses = self.wait_for_actions(action_ids)
+
+        finished = time.time()
+        queries = self.counter.count
+        admin = context.get_admin_context()
+        with self.counter.paused():
+            actions = [a for a in ao.Action.get_all(admin,
+                                                    project_safe=False)
+                       if a.created_at and a.created_at >= started_at]
+
+        latencies = []
+        run_times = []
+        ended = []
+        for action in actions:
+            if action.status not in FINAL_STATUSES or not action.end_time:
+                continue
+            ended.append(action)
+            latencies.append(action.end_time - _epoch(action.created_at))
+            if action.start_time:
+                run_times.append(action.end_time - action.start_time)
+
+        top = [a for a in ended if a.id in statuses]
+        duration = finished - started
+        return {
+            'duration': duration,
+            'requests': len(action_ids),
+            'actions': len(ended),
+            'succeeded': len([a for a in ended if a.status == 'SUCCEEDED']),
+            'failed': len([a for a in ended if a.status != 'SUCCEEDED']),
+            'actions_per_sec': len(ended) / duration if duration else None,
+            'latency': summarize(latencies),
+            'run_time': summarize(run_times),
+            'request_latency': summarize(
+                [a.end_time - _epoch(a.created_at) for a in top]),
+            'dispatcher_nudges': self.nudges,
+            'db_queries': queries,
+            'db_queries_per_action': (float(queries) / len(ended)
+                                      if ended else None),
+            'peak_rss_kb': resource.getrusage(
+                resource.RUSAGE_SELF).ru_maxrss,
+        }
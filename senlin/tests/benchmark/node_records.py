@@ -0,0 +1,176 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Benchmark of the memory held by the nodes of a cluster used for planning.
+
+Example::
+
+  python -m senlin.tests.benchmark.node_records --nodes 10000
+
+For each representation of a node, i.e. an engine node, a node object and a
+node record, the memory allocated per node while holding the given number of
+nodes is reported in bytes, together with the time spent building one node
+in microseconds. Engine nodes are built without loading their profile, so
+their actual cost is higher. Where tracemalloc is not available, e.g. on
+Python 2.7, the memory is estimated from the sizes of the objects reachable
+from the nodes.
+"""
+
+import copy
+import datetime
+import gc
+import sys
+import timeit
+
+from oslo_utils import uuidutils
+
+from senlin.engine import node as node_mod
+from senlin.objects import node as node_obj
+from senlin.tests import benchmark
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def node_values(index=0):
+    """Get the values of a synthetic node of a cluster.
+
+    The values mimic those of a nova server node created by a cluster
+    scaling action with a placement policy attached.
+    """
+    now = datetime.datetime(2016, 10, 1, 12, 0, 0)
+    return {
+        'id': uuidutils.generate_uuid(),
+        'name': 'node-%08d' % index,
+        'profile_id': uuidutils.generate_uuid(),
+        'cluster_id': uuidutils.generate_uuid(),
+        'physical_id': uuidutils.generate_uuid(),
+        'index': index,
+        'role': None,
+        'init_at': now,
+        'created_at': now,
+        'updated_at': None,
+        'status': 'ACTIVE',
+        'status_reason': 'Creation succeeded',
+        'metadata': {'tier': 'web'},
+        'data': {'placement': {'zone': 'nova', 'region_name': 'RegionOne'}},
+        'user': uuidutils.generate_uuid(dashed=False),
+        'project': uuidutils.generate_uuid(dashed=False),
+        'domain': 'default',
+        'dependents': {},
+    }
+
+
+def build_engine_node(values):
+    kwargs = dict(values)
+    return node_mod.Node(kwargs.pop('name'), kwargs.pop('profile_id'),
+                         kwargs.pop('cluster_id'), **kwargs)
+
+
+def build_node_object(values):
+    return node_obj.Node(**values)
+
+
+def build_node_record(values):
+    return node_obj.NodeRecord.from_row(
+        (values['id'], values['status'], values['created_at'],
+         values['profile_id'], values['init_at'], values['data']))
+
+
+BUILDERS = {
+    'engine_node': build_engine_node,
+    'node_object': build_node_object,
+    'node_record': build_node_record,
+}
+
+
+def _deep_size(obj, seen):
+    """Get the size of an object and of the objects it refers to."""
+    if id(obj) in seen or isinstance(obj, type):
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen)
+                    for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(i, seen) for i in obj)
+    if hasattr(obj, '__dict__'):
+        size += _deep_size(obj.__dict__, seen)
+    for name in getattr(type(obj), '__slots__', ()):
+        if hasattr(obj, name):
+            size += _deep_size(getattr(obj, name), seen)
+    return size
+
+
+def held_memory(build, values):
+    """Get the memory held by the nodes built from values in bytes."""
+    if tracemalloc is None:
+        nodes = [build(copy.deepcopy(v)) for v in values]
+        seen = set()
+        return sum(_deep_size(n, seen) for n in nodes)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # Values are copied as rows are decoded afresh, so that only the parts
+    # kept by a node are counted
+    held = [build(copy.deepcopy(v)) for v in values]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return after - before
+
+
+def measure(kind, nodes, iterations):
+    """Measure the memory and construction time of nodes.
+
+    :param kind: A key of `BUILDERS`.
+    :param nodes: Number of nodes held at once.
+    :param iterations: Number of nodes built for the timing.
+    :returns: A dict with the memory allocated per node in bytes and the
+              construction time in microseconds per node.
+    """
+    build = BUILDERS[kind]
+    values = [node_values(i) for i in range(nodes)]
+
+    sample = values[0]
+    return {
+        'memory': float(held_memory(build, values)) / nodes,
+        'build': benchmark.per_call(timeit.timeit(lambda: build(sample),
+                                                  number=iterations),
+                                    iterations),
+    }
+
+
+def run(args):
+    return dict((kind, measure(kind, args.nodes, args.iterations))
+                for kind in sorted(BUILDERS))
+
+
+def main(argv=None):
+    parser = benchmark.make_parser(
+        'Benchmark the memory held by the nodes of a cluster.')
+    parser.add_argument('--nodes', type=int, default=10000,
+                        help='Number of nodes held at once.')
+    parser.add_argument('--iterations', type=int, default=10000,
+                        help='Number of nodes built for the timing.')
+    benchmark.run_command(parser, run, argv)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Run a benchmark scenario against an in-process senlin engine.
+
+Example::
+
+  python -m senlin.tests.benchmark.run --scenario scale_storm \\
+      --clusters 10 --nodes 20 --rounds 5 --output result.json
+
+The result is printed as JSON, so that the numbers from two commits can be
+compared mechanically.
+"""
+
+import eventlet
+eventlet.monkey_patch(os=False)
+
+import os  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+
+from senlin.tests import benchmark  # noqa: E402
+from senlin.tests.benchmark import harness  # noqa: E402
+from senlin.tests.benchmark import scenarios  # noqa: E402
+
+
+def _git_revision():
+    path = os.path.dirname(os.path.abspath(__file__))
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=path,
+            stderr=subprocess.STDOUT).decode('utf-8').strip()
+    except Exception:
+        return None
+
+
+def _make_parser():
+    parser = benchmark.make_parser(
+        'Benchmark the senlin engine with an in-memory cloud.')
+    parser.add_argument('--scenario', choices=sorted(scenarios.SCENARIOS),
+                        default='cluster_create')
+    parser.add_argument('--clusters', type=int, default=5,
+                        help='Number of clusters.')
+    parser.add_argument('--nodes', type=int, default=10,
+                        help='Number of nodes in each cluster.')
+    parser.add_argument('--rounds', type=int, default=3,
+                        help='Repetitions of the scenario operation.')
+    parser.add_argument('--db-url', default=None,
+                        help='Database connection, a temporary SQLite '
+                             'database is used by default.')
+    parser.add_argument('--latency-mean', type=float, default=0.0,
+                        help='Mean latency of cloud API calls in seconds.')
+    parser.add_argument('--latency-distribution', default='fixed',
+                        help='Distribution of cloud API call latencies.')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Ratio of cloud API calls failing.')
+    parser.add_argument('--build-time', type=float, default=0.5,
+                        help='Seconds for a server to become ACTIVE.')
+    parser.add_argument('--set', action='append', default=[],
+                        metavar='GROUP.OPTION=VALUE',
+                        help='Override a configuration option. This can be '
+                             'specified multiple times.')
+    return parser
+
+
+def _run(args):
+    overrides = {
+        'memory_backend.latency_mean': args.latency_mean,
+        'memory_backend.latency_distribution': args.latency_distribution,
+        'memory_backend.error_rate': args.error_rate,
+        'memory_backend.server_build_time': args.build_time,
+        'memory_backend.server_delete_time': args.build_time / 2,
+    }
+    for item in args.set:
+        key, _sep, value = item.partition('=')
+        overrides[key] = value
+
+    bench = harness.Harness(db_url=args.db_url)
+    bench.setup(overrides)
+    try:
+        scenario = scenarios.SCENARIOS[args.scenario](
+            bench, args.clusters, args.nodes, args.rounds)
+        prepared = time.time()
+        scenario.prepare()
+        prepare_time = time.time() - prepared
+        metrics = bench.measure(scenario.run)
+    finally:
+        bench.teardown()
+
+    return {
+        'scenario': args.scenario,
+        'revision': _git_revision(),
+        'parameters': {
+            'clusters': args.clusters,
+            'nodes': args.nodes,
+            'rounds': args.rounds,
+            'overrides': overrides,
+        },
+        'prepare_time': prepare_time,
+        'metrics': metrics,
+    }
+
+
+def main(argv=None):
+    result = benchmark.run_command(_make_parser(), _run, argv)
+    return 0 if result['metrics']['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Benchmark scenarios.
+
+Each scenario is a class with a `prepare` method, whose cost is not
+measured, and a `run` method which fires the requests to be measured and
+returns the IDs of the resulting actions.
+"""
+
+from senlin.common import consts
+from senlin.common import utils
+
+
+def server_spec(flavor='m1.tiny'):
+    return {
+        'type': 'os.nova.server',
+        'version': '1.0',
+        'properties': {
+            'flavor': flavor,
+            'image': 'cirros-0.3.5-x86_64-disk',
+            'networks': [{'network': 'private'}],
+        },
+    }
+
+
+class Scenario(object):
+    """Base class for benchmark scenarios.
+
+    :param harness: The `Harness` running the engine.
+    :param clusters: Number of clusters to operate on.
+    :param nodes: Number of nodes in each cluster.
+    :param rounds: Number of repetitions of the scenario specific operation.
+    """
+
+    def __init__(self, harness, clusters, nodes, rounds):
+        self.harness = harness
+        self.clusters = clusters
+        self.nodes = nodes
+        self.rounds = rounds
+        self.profile_id = None
+        self.cluster_ids = []
+
+    def create_profile(self, flavor='m1.tiny'):
+        body = self.harness.request('ProfileCreateRequestBody',
+                                    name=utils.random_name(), metadata={},
+                                    spec=server_spec(flavor))
+        profile = self.harness.call('profile_create2', 'ProfileCreateRequest',
+                                    profile=body)
+        return profile['id']
+
+    def create_clusters(self):
+        """Fire the creation of all clusters.
+
+        :returns: A list of action IDs.
+        """
+        actions = []
+        for i in range(self.clusters):
+            cluster = self.harness.call(
+                'cluster_create2', 'ClusterCreateRequestBody',
+                name='bench-%s' % i, profile_id=self.profile_id,
+                desired_capacity=self.nodes, min_size=0, max_size=-1,
+                metadata={})
+            self.cluster_ids.append(cluster['id'])
+            actions.append(cluster['action'])
+        return actions
+
+    def prepare(self):
+        self.profile_id = self.create_profile()
+        self.harness.wait_for_actions(self.create_clusters())
+
+    def run(self):
+        raise NotImplementedError
+
+
+class ClusterCreate(Scenario):
+    """Create clusters of nodes."""
+
+    def prepare(self):
+        self.profile_id = self.create_profile()
+
+    def run(self):
+        return self.create_clusters()
+
+
+class ScaleStorm(Scenario):
+    """Fire many scale-out and scale-in requests at all clusters at once."""
+
+    def run(self):
+        actions = []
+        for i in range(self.rounds):
+            for cluster_id in self.cluster_ids:
+                res = self.harness.call('cluster_scale_out2',
+                                        'ClusterScaleOutRequest',
+                                        identity=cluster_id, count=1)
+                actions.append(res['action'])
+                res = self.harness.call('cluster_scale_in2',
+                                        'ClusterScaleInRequest',
+                                        identity=cluster_id, count=1)
+                actions.append(res['action'])
+        return actions
+
+
+class RollingUpdate(Scenario):
+    """Update the profile of all clusters under a batch policy."""
+
+    def prepare(self):
+        super(RollingUpdate, self).prepare()
+        policy = self.harness.call(
+            'policy_create2', 'PolicyCreateRequestBody',
+            name=utils.random_name(),
+            spec={
+                'type': 'senlin.policy.batch',
+                'version': '1.0',
+                'properties': {
+                    'min_in_service': 1,
+                    'max_batch_size': max(1, self.nodes // 4),
+                    'pause_time': 0,
+                },
+            })
+        actions = []
+        for cluster_id in self.cluster_ids:
+            res = self.harness.call('cluster_policy_attach2',
+                                    'ClusterAttachPolicyRequest',
+                                    identity=cluster_id,
+                                    policy_id=policy['id'], enabled=True)
+            actions.append(res['action'])
+        self.harness.wait_for_actions(actions)
+
+    def run(self):
+        actions = []
+        for i in range(self.rounds):
+            flavor = 'm1.small' if i % 2 == 0 else 'm1.tiny'
+            profile_id = self.create_profile(flavor)
+            for cluster_id in self.cluster_ids:
+                res = self.harness.call('cluster_update2',
+                                        'ClusterUpdateRequest',
+                                        identity=cluster_id,
+                                        profile_id=profile_id)
+                actions.append(res['action'])
+            # Updates of the same cluster cannot run concurrently
+            self.harness.wait_for_actions(actions)
+        return actions
+
+
+class WebhookBurst(Scenario):
+    """Trigger scale-out webhooks of all clusters in a burst."""
+
+    def prepare(self):
+        super(WebhookBurst, self).prepare()
+        self.receiver_ids = []
+        for cluster_id in self.cluster_ids:
+            receiver = self.harness.call(
+                'receiver_create', 'ReceiverCreateRequestBody',
+                name=utils.random_name(), type=consts.RECEIVER_WEBHOOK,
+                cluster_id=cluster_id, action=consts.CLUSTER_SCALE_OUT,
+                actor={}, params={'count': 1})
+            self.receiver_ids.append(receiver['id'])
+
+    def run(self):
+        actions = []
+        for i in range(self.rounds):
+            for receiver_id in self.receiver_ids:
+                body = self.harness.request('WebhookTriggerRequestBody',
+                                            params={})
+                res = self.harness.call('webhook_trigger',
+                                        'WebhookTriggerRequest',
+                                        identity=receiver_id, body=body)
+                actions.append(res['action'])
+        return actions
+
+
+SCENARIOS = {
+    'cluster_create': ClusterCreate,
+    'scale_storm': ScaleStorm,
+    'rolling_update': RollingUpdate,
+    'webhook_burst': WebhookBurst,
+}
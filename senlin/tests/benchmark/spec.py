@@ -0,0 +1,144 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Micro-benchmark of the resolution of profile specs.
+
+Example::
+
+  python -m senlin.tests.benchmark.spec --iterations 2000
+
+For each profile type, the time spent building and validating a `Spec` and
+the time spent reading all its properties a number of times are reported in
+microseconds, together with the time the same reads take when every one of
+them resolves the raw value again.
+"""
+
+import sys
+import timeit
+
+from senlin.common import schema
+from senlin.profiles.container import docker
+from senlin.profiles.os.heat import stack
+from senlin.profiles.os.nova import server
+from senlin.tests import benchmark
+
+SPECS = {
+    'os.nova.server': (server.ServerProfile, {
+        'context': {},
+        'admin_pass': 'adminpass',
+        'auto_disk_config': True,
+        'availability_zone': 'nova',
+        'block_device_mapping_v2': [{
+            'uuid': 'cirros-0.3.5-x86_64-disk',
+            'source_type': 'image',
+            'destination_type': 'volume',
+            'volume_size': 1,
+            'boot_index': 0,
+        }],
+        'config_drive': False,
+        'flavor': 'm1.tiny',
+        'image': 'cirros-0.3.5-x86_64-disk',
+        'key_name': 'oskey',
+        'metadata': {'role': 'web', 'tier': 'frontend'},
+        'name': 'web-server',
+        'networks': [
+            {'network': 'private', 'port': 'web-port'},
+            {'network': 'public', 'fixed_ip': '172.24.4.10'},
+        ],
+        'personality': [{'path': '/etc/motd', 'contents': 'hello'}],
+        'scheduler_hints': {'same_host': 'HOST_ID'},
+        'security_groups': ['default', 'web'],
+        'user_data': '#!/bin/sh\necho hello\n',
+    }),
+    'os.heat.stack': (stack.StackProfile, {
+        'context': {},
+        'template': {
+            'heat_template_version': '2014-10-16',
+            'parameters': {'flavor': {'type': 'string'}},
+            'resources': {
+                'server': {
+                    'type': 'OS::Nova::Server',
+                    'properties': {'flavor': {'get_param': 'flavor'}},
+                },
+            },
+        },
+        'template_url': '',
+        'parameters': {'flavor': 'm1.tiny'},
+        'files': {},
+        'timeout': 60,
+        'disable_rollback': True,
+        'environment': {},
+    }),
+    'container.dockerinc.docker': (docker.DockerProfile, {
+        'context': {'region_name': 'RegionOne'},
+        'name': 'docker_container',
+        'image': 'hello-world',
+        'command': '/bin/sleep 30',
+        'host_node': 'fake_node',
+        'port': 2375,
+    }),
+}
+
+
+def measure(profile_type, iterations, reads=10):
+    """Measure the resolution of the properties of a profile type.
+
+    :param profile_type: A key of `SPECS`.
+    :param iterations: Number of times each measurement is repeated.
+    :param reads: Number of times all properties are read from one spec.
+    :returns: A dict of timings in microseconds per spec.
+    """
+    profile_cls, data = SPECS[profile_type]
+    props_schema = profile_cls.properties_schema
+
+    def build():
+        spec = schema.Spec(props_schema, data, '1.0')
+        spec.validate()
+        return spec
+
+    def read_all(spec, get):
+        for i in range(reads):
+            for key in props_schema:
+                get(spec, key)
+
+    spec = build()
+    return {
+        'build_validate': benchmark.per_call(
+            timeit.timeit(build, number=iterations), iterations),
+        'reads': benchmark.per_call(timeit.timeit(
+            lambda: read_all(spec, lambda s, k: s[k]),
+            number=iterations), iterations),
+        'reads_unmemoized': benchmark.per_call(timeit.timeit(
+            lambda: read_all(spec, lambda s, k: s.resolve_value(k)),
+            number=iterations), iterations),
+    }
+
+
+def run(args):
+    return dict((name, measure(name, args.iterations, args.reads))
+                for name in SPECS)
+
+
+def main(argv=None):
+    parser = benchmark.make_parser(
+        'Benchmark the resolution of profile specs.')
+    parser.add_argument('--iterations', type=int, default=1000,
+                        help='Repetitions of each measurement.')
+    parser.add_argument('--reads', type=int, default=10,
+                        help='Reads of all properties of a spec.')
+    benchmark.run_command(parser, run, argv)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,487 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+In-memory cloud shared by all drivers of the 'memory' backend.
+
+All resources live in process memory. Status transitions, e.g. a server going
+from BUILD to ACTIVE, are evaluated lazily against the current time when a
+resource is read, so no background thread is needed. Every driver call goes
+through a per-service injector which can add latency, fail randomly and
+enforce a rate limit.
+"""
+
+import copy
+import datetime
+import functools
+import math
+import random
+
+import eventlet
+from oslo_config import cfg
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+import six
+
+from senlin.common import exception
+from senlin.drivers import base
+from senlin.tests.drivers.openstack import sdk
+
+SERVICES = (
+    COMPUTE, IDENTITY, NETWORK, ORCHESTRATION,
+) = (
+    'compute', 'identity', 'network', 'orchestration',
+)
+
+LATENCY_DISTRIBUTIONS = (
+    FIXED, UNIFORM, NORMAL, EXPONENTIAL, LOGNORMAL,
+) = (
+    'fixed', 'uniform', 'normal', 'exponential', 'lognormal',
+)
+
+memory_group = cfg.OptGroup('memory_backend')
+memory_opts = [
+    cfg.StrOpt('latency_distribution', default=FIXED,
+               choices=LATENCY_DISTRIBUTIONS,
+               help='Distribution of the latency added to each API call.'),
+    cfg.FloatOpt('latency_mean', default=0.0, min=0.0,
+                 help='Mean latency in seconds of each API call.'),
+    cfg.FloatOpt('latency_stddev', default=0.0, min=0.0,
+                 help='Standard deviation of the API call latency in '
+                      'seconds. For the uniform distribution, this is the '
+                      'half width of the interval.'),
+    cfg.FloatOpt('error_rate', default=0.0, min=0.0, max=1.0,
+                 help='Probability for an API call to fail with an '
+                      'internal server error.'),
+    cfg.ListOpt('error_operations', default=[],
+                help='Names of driver methods subject to error injection. '
+                     'An empty list means all methods.'),
+    cfg.FloatOpt('rate_limit', default=0.0, min=0.0,
+                 help='Maximum number of API calls per second for each '
+                      'service. Calls over the limit fail with code 429. '
+                      '0 means no limit.'),
+    cfg.IntOpt('rate_limit_burst', default=10, min=1,
+               help='Number of API calls that can be made in a burst when '
+                    'rate limiting is enabled.'),
+    cfg.FloatOpt('build_error_rate', default=0.0, min=0.0, max=1.0,
+                 help='Probability for a server or stack to end up in an '
+                      'error status after it is created.'),
+    cfg.FloatOpt('server_build_time', default=2.0, min=0.0,
+                 help='Seconds for a server to go from BUILD to ACTIVE.'),
+    cfg.FloatOpt('server_delete_time', default=1.0, min=0.0,
+                 help='Seconds for a deleted server to disappear.'),
+    cfg.FloatOpt('stack_build_time', default=2.0, min=0.0,
+                 help='Seconds for a stack operation to complete.'),
+    cfg.FloatOpt('lb_provision_time', default=0.5, min=0.0,
+                 help='Seconds for a load-balancer to become ACTIVE again '
+                      'after one of its components is changed.'),
+    cfg.ListOpt('availability_zones', default=['nova'],
+                help='Availability zones of the fake compute service.'),
+    cfg.IntOpt('hosts_per_zone', default=4, min=1,
+               help='Number of compute hosts in each availability zone.'),
+    cfg.ListOpt('networks', default=['private'],
+                help='Names of the networks pre-created in the fake '
+                     'network service, each with one subnet named '
+                     '<network>-subnet.'),
+    cfg.ListOpt('flavors', default=['m1.tiny', 'm1.small', 'm1.medium'],
+                help='Names of the flavors known to the fake compute '
+                     'service.'),
+    cfg.ListOpt('images', default=['cirros-0.3.5-x86_64-disk'],
+                help='Names of the images known to the fake compute '
+                     'service.'),
+    cfg.IntOpt('random_seed',
+               help='Seed for the random generator, for reproducible runs.'),
+]
+cfg.CONF.register_opts(memory_opts, group=memory_group)
+
+CONF = cfg.CONF
+
+
+def not_found(kind, ident):
+    return exception.InternalError(
+        code=404, message='No %s found for %s' % (kind, ident))
+
+
+class FaultInjector(object):
+    """Latency, failure and rate limit injection for one service."""
+
+    def __init__(self, rand, latency_distribution=None, latency_mean=None,
+                 latency_stddev=None, error_rate=None, error_operations=None,
+                 rate_limit=None, rate_limit_burst=None):
+        opts = CONF.memory_backend
+
+        def _pick(value, default):
+            return default if value is None else value
+
+        self.rand = rand
+        self.latency_distribution = _pick(latency_distribution,
+                                          opts.latency_distribution)
+        self.latency_mean = _pick(latency_mean, opts.latency_mean)
+        self.latency_stddev = _pick(latency_stddev, opts.latency_stddev)
+        self.error_rate = _pick(error_rate, opts.error_rate)
+        self.error_operations = set(_pick(error_operations,
+                                          opts.error_operations))
+        self.rate_limit = _pick(rate_limit, opts.rate_limit)
+        self.burst = _pick(rate_limit_burst, opts.rate_limit_burst)
+        self.tokens = float(self.burst)
+        self.refilled_at = None
+
+    def latency(self):
+        """Sample the latency in seconds of one API call."""
+        mean = self.latency_mean
+        stddev = self.latency_stddev
+        if mean <= 0:
+            return 0.0
+
+        dist = self.latency_distribution
+        if dist == UNIFORM:
+            value = self.rand.uniform(mean - stddev, mean + stddev)
+        elif dist == NORMAL:
+            value = self.rand.gauss(mean, stddev)
+        elif dist == EXPONENTIAL:
+            value = self.rand.expovariate(1.0 / mean)
+        elif dist == LOGNORMAL:
+            # Parameters of the underlying normal distribution are derived
+            # so that the samples have the requested mean and deviation.
+            sigma2 = math.log(1 + (stddev * stddev) / (mean * mean))
+            value = self.rand.lognormvariate(math.log(mean) - sigma2 / 2,
+                                             math.sqrt(sigma2))
+        else:
+            value = mean
+
+        return max(0.0, value)
+
+    def _acquire(self):
+        """Take one token from the bucket.
+
+        :returns: True if a token was taken or False if the bucket is empty.
+        """
+        if not self.rate_limit:
+            return True
+
+        now = timeutils.utcnow()
+        if self.refilled_at is not None:
+            elapsed = timeutils.delta_seconds(self.refilled_at, now)
+            self.tokens = min(float(self.burst),
+                              self.tokens + elapsed * self.rate_limit)
+        self.refilled_at = now
+
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def __call__(self, service, operation):
+        """Apply the faults configured to an API call.
+
+        :param service: Name of the service being called.
+        :param operation: Name of the driver method being called.
+        :raises: `InternalError` if the call is rate limited or is chosen to
+                 fail.
+        """
+        delay = self.latency()
+        if delay:
+            eventlet.sleep(delay)
+
+        if not self._acquire():
+            raise exception.InternalError(
+                code=429, message='Rate limit exceeded for %s service.'
+                                  % service)
+
+        if (self.error_rate and (not self.error_operations or
+                                 operation in self.error_operations)):
+            if self.rand.random() < self.error_rate:
+                raise exception.InternalError(
+                    code=500, message='Injected failure of %s.%s.'
+                                      % (service, operation))
+
+
+class Store(object):
+    """A collection of resources of the same kind.
+
+    Each resource is a dict. Keys starting with an underscore are private to
+    the store and never returned to callers.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.items = {}
+
+    def _refresh(self, record):
+        """Apply the pending transition of a resource if it is due.
+
+        :returns: The record or None if the resource is gone.
+        """
+        pending = record.get('_next', None)
+        if pending is None:
+            return record
+
+        at, changes, delete = pending
+        if timeutils.utcnow() < at:
+            return record
+
+        record.pop('_next')
+        if delete:
+            self.items.pop(record['id'], None)
+            return None
+        record.update(changes)
+        return record
+
+    def add(self, record):
+        record.setdefault('id', uuidutils.generate_uuid())
+        self.items[record['id']] = record
+        return record
+
+    def schedule(self, record, delay, delete=False, **changes):
+        """Schedule a change to a resource.
+
+        :param record: The resource to change.
+        :param delay: Seconds after which the change takes effect.
+        :param delete: Whether the resource disappears when the change is due.
+        :param changes: Attribute values to set when the change is due.
+        """
+        if delay <= 0:
+            record.pop('_next', None)
+            if delete:
+                self.items.pop(record['id'], None)
+            else:
+                record.update(changes)
+            return
+
+        at = timeutils.utcnow() + datetime.timedelta(seconds=delay)
+        record['_next'] = (at, changes, delete)
+
+    def due_in(self, record):
+        """Seconds before the pending change of a resource is due."""
+        pending = record.get('_next', None)
+        if pending is None:
+            return 0
+        return max(0, timeutils.delta_seconds(timeutils.utcnow(), pending[0]))
+
+    def get(self, ident, ignore_missing=False):
+        """Get a resource by ID or by name.
+
+        :param ident: ID or name of the resource.
+        :param ignore_missing: Whether to return None rather than raising an
+                               exception if the resource is not found.
+        """
+        record = self.items.get(ident, None)
+        if record is not None:
+            record = self._refresh(record)
+        else:
+            for item in list(self.items.values()):
+                if item.get('name', None) == ident:
+                    record = self._refresh(item)
+                    if record is not None:
+                        break
+
+        if record is None and not ignore_missing:
+            raise not_found(self.kind, ident)
+        return record
+
+    def list(self, **filters):
+        result = []
+        for item in list(self.items.values()):
+            record = self._refresh(item)
+            if record is None:
+                continue
+            if all(record.get(k, None) == v for k, v in filters.items()):
+                result.append(record)
+        return result
+
+    def remove(self, ident, ignore_missing=True):
+        record = self.get(ident, ignore_missing=ignore_missing)
+        if record is not None:
+            self.items.pop(record['id'], None)
+        return record
+
+
+def to_object(record):
+    """Convert a resource to an object with attributes."""
+    if record is None:
+        return None
+    return sdk.FakeResourceObject(
+        dict((k, copy.deepcopy(v)) for k, v in record.items()
+             if not k.startswith('_')))
+
+
+class Cloud(object):
+    """State of the fake cloud."""
+
+    def __init__(self):
+        seed = CONF.memory_backend.random_seed
+        self.rand = random.Random(seed)
+        self.injectors = {}
+
+        self.flavors = Store('Flavor')
+        self.images = Store('Image')
+        self.keypairs = Store('Keypair')
+        self.servers = Store('Server')
+        self.server_groups = Store('ServerGroup')
+        self.networks = Store('Network')
+        self.subnets = Store('Subnet')
+        self.ports = Store('Port')
+        self.loadbalancers = Store('LoadBalancer')
+        self.listeners = Store('Listener')
+        self.pools = Store('Pool')
+        self.members = Store('Member')
+        self.healthmonitors = Store('HealthMonitor')
+        self.stacks = Store('Stack')
+        self.trusts = Store('Trust')
+        self.users = {}
+
+        self._seed()
+
+    def _seed(self):
+        opts = CONF.memory_backend
+        for i, name in enumerate(opts.flavors):
+            self.flavors.add({'id': six.text_type(i + 1), 'name': name,
+                              'vcpus': 2 ** i, 'ram': 512 * 2 ** i,
+                              'disk': 1 + 10 * i, 'is_disabled': False})
+        for name in opts.images:
+            self.images.add({'name': name, 'status': 'ACTIVE',
+                             'min_disk': 0, 'min_ram': 0, 'metadata': {}})
+
+        self.hosts = {}
+        self.host_load = {}
+        for zone in opts.availability_zones:
+            self.hosts[zone] = ['%s-host%d' % (zone, i)
+                                for i in range(opts.hosts_per_zone)]
+
+        for i, name in enumerate(opts.networks):
+            net = self.networks.add({'name': name, 'status': 'ACTIVE',
+                                     'admin_state_up': True, 'shared': True,
+                                     'subnets': []})
+            subnet = self.subnets.add({
+                'name': '%s-subnet' % name, 'network_id': net['id'],
+                'ip_version': 4, 'cidr': '10.%d.0.0/16' % i,
+                '_next_ip': 2})
+            net['subnets'].append(subnet['id'])
+
+    def injector(self, service):
+        if service not in self.injectors:
+            self.injectors[service] = FaultInjector(self.rand)
+        return self.injectors[service]
+
+    def configure(self, service, **kwargs):
+        """Override the fault injection settings of a service.
+
+        :param service: Name of the service, one of ``SERVICES``.
+        :param kwargs: Keyword arguments accepted by `FaultInjector`.
+        """
+        self.injectors[service] = FaultInjector(self.rand, **kwargs)
+
+    def build_failed(self):
+        rate = CONF.memory_backend.build_error_rate
+        return bool(rate) and self.rand.random() < rate
+
+    def allocate_ip(self, subnet):
+        index = subnet['_next_ip']
+        subnet['_next_ip'] += 1
+        prefix = subnet['cidr'].split('.')[:2]
+        return '%s.%s.%d.%d' % (prefix[0], prefix[1], index // 256,
+                                index % 256)
+
+
+_CLOUD = None
+
+
+def get_cloud():
+    """Get the cloud shared by all drivers, creating it if needed."""
+    global _CLOUD
+    if _CLOUD is None:
+        _CLOUD = Cloud()
+    return _CLOUD
+
+
+def reset():
+    """Drop all resources, e.g. between two test runs."""
+    global _CLOUD
+    _CLOUD = None
+
+
+def wait_for(store, ident, status, failures=None, interval=2, timeout=None):
+    """Wait for a resource to reach a status.
+
+    Since transitions are scheduled, the wait sleeps until the next change
+    is due rather than polling at a fixed interval.
+
+    :param store: The store holding the resource.
+    :param ident: ID or name of the resource.
+    :param status: The expected status.
+    :param failures: A list of status values regarded as failures.
+    :param interval: Maximum seconds to sleep between two checks.
+    :param timeout: Maximum seconds to wait.
+    """
+    if timeout is None:
+        timeout = CONF.default_action_timeout
+    failures = failures or []
+
+    waited = 0
+    while True:
+        record = store.get(ident)
+        if record['status'] == status:
+            return record
+        if record['status'] in failures:
+            raise exception.InternalError(
+                code=500, message='%s %s transitioned to failure state %s.'
+                                  % (store.kind, ident, record['status']))
+        if waited >= timeout or '_next' not in record:
+            raise exception.InternalError(
+                code=500, message='Timeout waiting for %s %s to reach %s.'
+                                  % (store.kind, ident, status))
+
+        delay = min(max(store.due_in(record), 0.01), interval,
+                    timeout - waited)
+        eventlet.sleep(delay)
+        waited += delay
+
+
+def wait_for_delete(store, ident, timeout=None):
+    """Wait for a resource to disappear."""
+    if timeout is None:
+        timeout = CONF.default_action_timeout
+
+    waited = 0
+    while True:
+        record = store.get(ident, ignore_missing=True)
+        if record is None:
+            return
+        if waited >= timeout or '_next' not in record:
+            raise exception.InternalError(
+                code=500, message='Timeout waiting for %s %s to be deleted.'
+                                  % (store.kind, ident))
+
+        delay = min(max(store.due_in(record), 0.01), timeout - waited)
+        eventlet.sleep(delay)
+        waited += delay
+
+
+class MemoryDriver(base.DriverBase):
+    """Base class for drivers of the memory backend."""
+
+    service = None
+
+    def __init__(self, params):
+        super(MemoryDriver, self).__init__(params)
+        self.cloud = get_cloud()
+
+
+def operation(func):
+    """Decorator for driver methods subject to fault injection."""
+
+    @functools.wraps(func)
+    def invoke_with_faults(driver, *args, **kwargs):
+        driver.cloud.injector(driver.service)(driver.service, func.__name__)
+        return func(driver, *args, **kwargs)
+
+    return invoke_with_faults
@@ -0,0 +1,105 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_utils import timeutils
+
+from senlin.common import utils
+from senlin.tests.drivers.memory import cloud
+
+CONF = cloud.CONF
+
+
+class HeatClient(cloud.MemoryDriver):
+    '''In-memory Heat V1 driver.'''
+
+    service = cloud.ORCHESTRATION
+
+    def _transit(self, stack_id, action):
+        """Start a stack action which completes after some time."""
+        record = self.cloud.stacks.get(stack_id)
+        status = '%s_IN_PROGRESS' % action
+        record.update({
+            'status': status,
+            'stack_status': status,
+            'updated_time': utils.isotime(timeutils.utcnow(True)),
+        })
+        result = 'FAILED' if self.cloud.build_failed() else 'COMPLETE'
+        final = '%s_%s' % (action, result)
+        self.cloud.stacks.schedule(
+            record, CONF.memory_backend.stack_build_time,
+            status=final, stack_status=final)
+        return record
+
+    @cloud.operation
+    def stack_create(self, **params):
+        if params.get('preview', False):
+            return cloud.to_object({'id': None,
+                                    'name': params.get('stack_name')})
+
+        record = self.cloud.stacks.add({
+            'name': params.get('stack_name'),
+            'stack_name': params.get('stack_name'),
+            'description': '',
+            'parameters': dict(params.get('parameters', None) or {}),
+            'outputs': [],
+            'timeout_mins': params.get('timeout_mins', None),
+            'disable_rollback': params.get('disable_rollback', True),
+            'creation_time': utils.isotime(timeutils.utcnow(True)),
+            'updated_time': None,
+        })
+        record = self._transit(record['id'], 'CREATE')
+        return cloud.to_object({'id': record['id'], 'links': []})
+
+    @cloud.operation
+    def stack_get(self, stack_id):
+        return cloud.to_object(self.cloud.stacks.get(stack_id))
+
+    @cloud.operation
+    def stack_find(self, name_or_id):
+        return cloud.to_object(self.cloud.stacks.get(name_or_id, True))
+
+    @cloud.operation
+    def stack_list(self):
+        return [cloud.to_object(s) for s in self.cloud.stacks.list()]
+
+    @cloud.operation
+    def stack_update(self, stack_id, **params):
+        record = self._transit(stack_id, 'UPDATE')
+        if params.get('parameters', None):
+            record['parameters'].update(params['parameters'])
+        return cloud.to_object(record)
+
+    @cloud.operation
+    def stack_delete(self, stack_id, ignore_missing=True):
+        record = self.cloud.stacks.get(stack_id, ignore_missing)
+        if record is None:
+            return
+        record.update({'status': 'DELETE_IN_PROGRESS',
+                       'stack_status': 'DELETE_IN_PROGRESS'})
+        self.cloud.stacks.schedule(
+            record, CONF.memory_backend.stack_build_time, delete=True)
+
+    @cloud.operation
+    def stack_check(self, stack_id):
+        return cloud.to_object(self._transit(stack_id, 'CHECK'))
+
+    @cloud.operation
+    def wait_for_stack(self, stack_id, status, failures=None, interval=2,
+                       timeout=None):
+        cloud.wait_for(self.cloud.stacks, stack_id, status, failures,
+                       interval, timeout)
+
+    @cloud.operation
+    def wait_for_stack_delete(self, stack_id, timeout=None):
+        '''Wait for stack deleting complete'''
+        cloud.wait_for_delete(self.cloud.stacks, stack_id, timeout)
+        return
@@ -0,0 +1,85 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_utils import uuidutils
+
+from senlin.drivers.openstack import keystone_v3
+from senlin.tests.drivers.memory import cloud
+
+
+class KeystoneClient(cloud.MemoryDriver):
+    '''In-memory Keystone V3 driver.
+
+    Any credential is accepted. A user is identified by its user ID or, if no
+    ID is given, by its name.
+    '''
+
+    service = cloud.IDENTITY
+
+    @cloud.operation
+    def trust_get_by_trustor(self, trustor, trustee=None, project=None):
+        for trust in self.cloud.trusts.list(trustor_user_id=trustor):
+            if trustee and trust['trustee_user_id'] != trustee:
+                continue
+            if project and trust['project_id'] != project:
+                continue
+            return cloud.to_object(trust)
+
+        return None
+
+    @cloud.operation
+    def trust_create(self, trustor, trustee, project, roles=None,
+                     impersonation=True):
+        trust = self.cloud.trusts.add({
+            'trustor_user_id': trustor,
+            'trustee_user_id': trustee,
+            'project_id': project,
+            'impersonation': impersonation,
+            'allow_redelegation': True,
+            'roles': [{'name': role} for role in roles or []],
+        })
+        return cloud.to_object(trust)
+
+    @classmethod
+    def _user_id(cls, creds):
+        cc = cloud.get_cloud()
+        cc.injector(cloud.IDENTITY)(cloud.IDENTITY, 'authenticate')
+        if creds.get('user_id', None):
+            return creds['user_id']
+        name = creds.get('username', None) or creds.get('trust_id', '')
+        return cc.users.setdefault(name, uuidutils.generate_uuid())
+
+    @classmethod
+    def get_token(cls, **creds):
+        '''Get token using given credential'''
+        cls._user_id(creds)
+        return uuidutils.generate_uuid(dashed=False)
+
+    @classmethod
+    def get_user_id(cls, **creds):
+        '''Get ID of the user with given credential'''
+        return cls._user_id(creds)
+
+    @classmethod
+    def get_service_credentials(cls, **kwargs):
+        '''Senlin service credential to use with Keystone.'''
+        return keystone_v3.KeystoneClient.get_service_credentials(**kwargs)
+
+    @cloud.operation
+    def validate_regions(self, regions):
+        # There is only one region in the memory cloud, and it has any name.
+        return list(regions)
+
+    @cloud.operation
+    def get_senlin_endpoint(self):
+        '''Get Senlin service endpoint.'''
+        return 'http://127.0.0.1:8778/v1'
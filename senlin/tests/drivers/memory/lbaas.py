@@ -0,0 +1,29 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from senlin.drivers.openstack import lbaas
+from senlin.tests.drivers.memory import neutron_v2
+
+
+class LoadBalancerDriver(lbaas.LoadBalancerDriver):
+    """Load-balancing driver on top of the in-memory Neutron driver.
+
+    The real driver logic, including status polling, runs unchanged so that
+    its cost is part of the measurements.
+    """
+
+    def nc(self):
+        if self._nc:
+            return self._nc
+
+        self._nc = neutron_v2.NeutronClient(self.conn_params)
+        return self._nc
@@ -0,0 +1,194 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from senlin.common import exception
+from senlin.tests.drivers.memory import cloud
+
+CONF = cloud.CONF
+
+
+class NeutronClient(cloud.MemoryDriver):
+    '''In-memory Neutron V2 driver.
+
+    Like Neutron LBaaS V2, a load-balancer is immutable while it is in a
+    PENDING_* provisioning status. Any change to a listener, a pool, a member
+    or a health monitor puts the load-balancer into PENDING_UPDATE for
+    ``lb_provision_time`` seconds.
+    '''
+
+    service = cloud.NETWORK
+
+    def _lock_lb(self, lb_id):
+        """Put a load-balancer into PENDING_UPDATE for a while."""
+        lb = self.cloud.loadbalancers.get(lb_id)
+        if lb['provisioning_status'] != 'ACTIVE':
+            raise exception.InternalError(
+                code=409, message='Invalid state %s of loadbalancer resource '
+                                  '%s' % (lb['provisioning_status'], lb_id))
+        lb['provisioning_status'] = 'PENDING_UPDATE'
+        self.cloud.loadbalancers.schedule(
+            lb, CONF.memory_backend.lb_provision_time,
+            provisioning_status='ACTIVE')
+
+    def _delete_child(self, store, ident, ignore_missing):
+        record = store.get(ident, ignore_missing)
+        if record is None:
+            return
+        self._lock_lb(record['loadbalancer_id'])
+        store.remove(record['id'])
+
+    @cloud.operation
+    def network_get(self, name_or_id, ignore_missing=False):
+        return cloud.to_object(self.cloud.networks.get(name_or_id,
+                                                       ignore_missing))
+
+    @cloud.operation
+    def port_find(self, name_or_id, ignore_missing=False):
+        return cloud.to_object(self.cloud.ports.get(name_or_id,
+                                                    ignore_missing))
+
+    @cloud.operation
+    def subnet_get(self, name_or_id, ignore_missing=False):
+        return cloud.to_object(self.cloud.subnets.get(name_or_id,
+                                                      ignore_missing))
+
+    @cloud.operation
+    def loadbalancer_get(self, name_or_id, ignore_missing=False):
+        return cloud.to_object(self.cloud.loadbalancers.get(name_or_id,
+                                                            ignore_missing))
+
+    @cloud.operation
+    def loadbalancer_create(self, vip_subnet_id, vip_address=None,
+                            admin_state_up=True, name=None, description=None):
+        subnet = self.cloud.subnets.get(vip_subnet_id)
+        lb = self.cloud.loadbalancers.add({
+            'name': name or '',
+            'description': description or '',
+            'vip_subnet_id': subnet['id'],
+            'vip_address': vip_address or self.cloud.allocate_ip(subnet),
+            'admin_state_up': admin_state_up,
+            'provisioning_status': 'PENDING_CREATE',
+            'operating_status': 'ONLINE',
+        })
+        self.cloud.loadbalancers.schedule(
+            lb, CONF.memory_backend.lb_provision_time,
+            provisioning_status='ACTIVE')
+        return cloud.to_object(lb)
+
+    @cloud.operation
+    def loadbalancer_delete(self, lb_id, ignore_missing=True):
+        lb = self.cloud.loadbalancers.get(lb_id, ignore_missing)
+        if lb is None:
+            return
+        if self.cloud.listeners.list(loadbalancer_id=lb['id']):
+            raise exception.InternalError(
+                code=409, message='Loadbalancer %s is in use.' % lb_id)
+        lb['provisioning_status'] = 'PENDING_DELETE'
+        self.cloud.loadbalancers.schedule(
+            lb, CONF.memory_backend.lb_provision_time, delete=True)
+        return
+
+    @cloud.operation
+    def listener_create(self, loadbalancer_id, protocol, protocol_port,
+                        connection_limit=None,
+                        admin_state_up=True, name=None, description=None):
+        self._lock_lb(loadbalancer_id)
+        listener = self.cloud.listeners.add({
+            'loadbalancer_id': loadbalancer_id,
+            'protocol': protocol,
+            'protocol_port': protocol_port,
+            'connection_limit': connection_limit,
+            'admin_state_up': admin_state_up,
+            'name': name or '',
+            'description': description or '',
+        })
+        return cloud.to_object(listener)
+
+    @cloud.operation
+    def listener_delete(self, listener_id, ignore_missing=True):
+        self._delete_child(self.cloud.listeners, listener_id, ignore_missing)
+        return
+
+    @cloud.operation
+    def pool_create(self, lb_algorithm, listener_id, protocol,
+                    admin_state_up=True, name=None, description=None):
+        listener = self.cloud.listeners.get(listener_id)
+        self._lock_lb(listener['loadbalancer_id'])
+        pool = self.cloud.pools.add({
+            'loadbalancer_id': listener['loadbalancer_id'],
+            'listener_id': listener_id,
+            'lb_algorithm': lb_algorithm,
+            'protocol': protocol,
+            'admin_state_up': admin_state_up,
+            'name': name or '',
+            'description': description or '',
+        })
+        return cloud.to_object(pool)
+
+    @cloud.operation
+    def pool_delete(self, pool_id, ignore_missing=True):
+        self._delete_child(self.cloud.pools, pool_id, ignore_missing)
+        return
+
+    @cloud.operation
+    def pool_member_create(self, pool_id, address, protocol_port, subnet_id,
+                           weight=None, admin_state_up=True):
+        pool = self.cloud.pools.get(pool_id)
+        if self.cloud.members.list(pool_id=pool['id'], address=address,
+                                   protocol_port=protocol_port):
+            raise exception.InternalError(
+                code=409, message='Member with address %s and port %s '
+                                  'already present in pool %s'
+                                  % (address, protocol_port, pool_id))
+        self._lock_lb(pool['loadbalancer_id'])
+        member = self.cloud.members.add({
+            'loadbalancer_id': pool['loadbalancer_id'],
+            'pool_id': pool['id'],
+            'address': address,
+            'protocol_port': protocol_port,
+            'subnet_id': subnet_id,
+            'weight': 1 if weight is None else weight,
+            'admin_state_up': admin_state_up,
+            'operating_status': 'ONLINE',
+        })
+        return cloud.to_object(member)
+
+    @cloud.operation
+    def pool_member_delete(self, pool_id, member_id, ignore_missing=True):
+        self._delete_child(self.cloud.members, member_id, ignore_missing)
+        return
+
+    @cloud.operation
+    def healthmonitor_create(self, hm_type, delay, timeout, max_retries,
+                             pool_id, admin_state_up=True,
+                             http_method=None, url_path=None,
+                             expected_codes=None):
+        pool = self.cloud.pools.get(pool_id)
+        self._lock_lb(pool['loadbalancer_id'])
+        hm = self.cloud.healthmonitors.add({
+            'loadbalancer_id': pool['loadbalancer_id'],
+            'pool_id': pool['id'],
+            'type': hm_type,
+            'delay': delay,
+            'timeout': timeout,
+            'max_retries': max_retries,
+            'admin_state_up': admin_state_up,
+            'http_method': http_method,
+            'url_path': url_path,
+            'expected_codes': expected_codes,
+        })
+        return cloud.to_object(hm)
+
+    @cloud.operation
+    def healthmonitor_delete(self, hm_id, ignore_missing=True):
+        self._delete_child(self.cloud.healthmonitors, hm_id, ignore_missing)
+        return
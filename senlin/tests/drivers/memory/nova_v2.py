@@ -0,0 +1,476 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_log import log
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+
+from senlin.common import exception
+from senlin.common.i18n import _LW
+from senlin.common import utils
+from senlin.tests.drivers.memory import cloud
+
+LOG = log.getLogger(__name__)
+CONF = cloud.CONF
+
+
+class NovaClient(cloud.MemoryDriver):
+    '''In-memory Nova V2 driver.'''
+
+    service = cloud.COMPUTE
+
+    def _server(self, server):
+        server_id = getattr(server, 'id', server)
+        return self.cloud.servers.get(server_id)
+
+    def _transit(self, server, busy, final, delay=None):
+        """Put a server into a transient status for some time."""
+        record = self._server(server)
+        if delay is None:
+            delay = CONF.memory_backend.server_build_time
+        record['status'] = busy
+        record['updated_at'] = utils.isotime(timeutils.utcnow(True))
+        self.cloud.servers.schedule(record, delay, status=final)
+        return record
+
+    def _pick_host(self, zone=None, host=None):
+        """Choose the least loaded host, optionally in a given zone."""
+        if zone and zone not in self.cloud.hosts:
+            raise exception.InternalError(
+                code=400, message='The requested availability zone is not '
+                                  'available')
+        zones = [zone] if zone else sorted(self.cloud.hosts)
+        load = self.cloud.host_load
+        candidates = [(load.get(h, 0), z, h)
+                      for z in zones for h in self.cloud.hosts[z]
+                      if host is None or h == host]
+        if not candidates:
+            raise exception.InternalError(
+                code=400, message='No valid host was found.')
+        _load, zone, host = min(candidates)
+        return zone, host
+
+    def _plug(self, record, net_spec):
+        """Plug a server into a network, returning the port used."""
+        ports = self.cloud.ports
+        if net_spec.get('port', None) or net_spec.get('port_id', None):
+            port = ports.get(net_spec.get('port', None) or
+                             net_spec['port_id'])
+            owned = False
+        else:
+            net_id = net_spec.get('uuid', None) or net_spec.get('net_id')
+            net = self.cloud.networks.get(net_id)
+            subnet = self.cloud.subnets.get(net['subnets'][0])
+            fixed_ip = net_spec.get('fixed_ip', None)
+            if not fixed_ip and net_spec.get('fixed_ips', None):
+                fixed_ip = net_spec['fixed_ips'][0]['ip_address']
+            port = ports.add({
+                'name': '', 'network_id': net['id'], 'status': 'DOWN',
+                'device_id': '', 'device_owner': '',
+                'fixed_ips': [{
+                    'subnet_id': subnet['id'],
+                    'ip_address': fixed_ip or self.cloud.allocate_ip(subnet),
+                }],
+            })
+            owned = True
+
+        port['status'] = 'ACTIVE'
+        port['device_id'] = record['id']
+        port['device_owner'] = 'compute:%s' % record['availability_zone']
+        record['_ports'].append((port['id'], owned))
+
+        net = self.cloud.networks.get(port['network_id'])
+        addrs = record['addresses'].setdefault(net['name'], [])
+        for ip in port['fixed_ips']:
+            addrs.append({'addr': ip['ip_address'], 'version': 4})
+        return port
+
+    def _unplug(self, record, port_id):
+        owned = dict(record['_ports']).get(port_id, False)
+        record['_ports'] = [p for p in record['_ports'] if p[0] != port_id]
+        port = self.cloud.ports.get(port_id, ignore_missing=True)
+        if port is None:
+            return
+
+        net = self.cloud.networks.get(port['network_id'])
+        ips = [ip['ip_address'] for ip in port['fixed_ips']]
+        addrs = [a for a in record['addresses'].get(net['name'], [])
+                 if a['addr'] not in ips]
+        if addrs:
+            record['addresses'][net['name']] = addrs
+        else:
+            record['addresses'].pop(net['name'], None)
+
+        if owned:
+            self.cloud.ports.remove(port_id)
+        else:
+            port.update({'status': 'DOWN', 'device_id': '',
+                         'device_owner': ''})
+
+    @cloud.operation
+    def flavor_find(self, name_or_id, ignore_missing=False):
+        return cloud.to_object(self.cloud.flavors.get(name_or_id,
+                                                      ignore_missing))
+
+    @cloud.operation
+    def image_find(self, name_or_id, ignore_missing=False):
+        return cloud.to_object(self.cloud.images.get(name_or_id,
+                                                     ignore_missing))
+
+    @cloud.operation
+    def keypair_find(self, name_or_id, ignore_missing=False):
+        keypair = self.cloud.keypairs.get(name_or_id, ignore_missing=True)
+        if keypair is None:
+            # Any key pair is accepted so that specs need no preparation.
+            keypair = self.cloud.keypairs.add({
+                'id': name_or_id, 'name': name_or_id, 'type': 'ssh',
+                'public_key': 'fake', 'fingerprint': 'fake'})
+        return cloud.to_object(keypair)
+
+    @cloud.operation
+    def server_create(self, **attrs):
+        flavor = self.cloud.flavors.get(attrs.get('flavorRef'),
+                                        ignore_missing=True)
+        if flavor is None:
+            raise exception.InternalError(
+                code=400, message='Flavor %s could not be found.'
+                                  % attrs.get('flavorRef'))
+        image_id = attrs.get('imageRef', None)
+        if image_id and not self.cloud.images.get(image_id, True):
+            raise exception.InternalError(
+                code=400, message='Image %s could not be found.' % image_id)
+
+        zone = attrs.get('availability_zone', None)
+        host = None
+        if zone and ':' in zone:
+            zone, host = zone.split(':', 1)
+        zone, host = self._pick_host(zone or None, host)
+        self.cloud.host_load[host] = self.cloud.host_load.get(host, 0) + 1
+
+        now = utils.isotime(timeutils.utcnow(True))
+        record = self.cloud.servers.add({
+            'id': uuidutils.generate_uuid(),
+            'name': attrs.get('name', ''),
+            'status': 'BUILD',
+            'flavor': {'id': flavor['id']},
+            'image': {'id': image_id or ''},
+            'key_name': attrs.get('key_name', None),
+            'metadata': dict(attrs.get('metadata', None) or {}),
+            'security_groups': [
+                {'name': sg['name']}
+                for sg in attrs.get('security_groups', None) or []],
+            'addresses': {},
+            'availability_zone': zone,
+            'hypervisor_hostname': host,
+            'host_id': uuidutils.generate_uuid(dashed=False),
+            'project_id': self.conn_params.get('project_id', None),
+            'user_id': self.conn_params.get('user_id', None),
+            'created_at': now,
+            'updated_at': now,
+            'progress': 0,
+            '_ports': [],
+        })
+
+        networks = attrs.get('networks', None)
+        if not networks:
+            first = sorted(self.cloud.networks.list(),
+                           key=lambda n: n['name'])[:1]
+            networks = [{'uuid': n['id']} for n in first]
+        try:
+            for net_spec in networks:
+                self._plug(record, net_spec)
+        except exception.InternalError:
+            for port_id, _owned in list(record['_ports']):
+                self._unplug(record, port_id)
+            self.cloud.servers.remove(record['id'])
+            self.cloud.host_load[host] -= 1
+            raise
+
+        group = (attrs.get('scheduler_hints', None) or {}).get('group')
+        if group:
+            sg = self.cloud.server_groups.get(group, ignore_missing=True)
+            if sg is not None:
+                sg['members'].append(record['id'])
+
+        if self.cloud.build_failed():
+            final = {'status': 'ERROR',
+                     'fault': {'code': 500, 'message': 'Injected failure.'}}
+        else:
+            final = {'status': 'ACTIVE', 'progress': 100}
+        self.cloud.servers.schedule(
+            record, CONF.memory_backend.server_build_time, **final)
+
+        return cloud.to_object(record)
+
+    @cloud.operation
+    def server_get(self, server):
+        return cloud.to_object(self._server(server))
+
+    @cloud.operation
+    def server_update(self, server, **attrs):
+        record = self._server(server)
+        record.update(attrs)
+        return cloud.to_object(record)
+
+    def _delete(self, server, ignore_missing):
+        server_id = getattr(server, 'id', server)
+        record = self.cloud.servers.get(server_id, ignore_missing)
+        if record is None:
+            return
+
+        for port_id, _owned in list(record['_ports']):
+            self._unplug(record, port_id)
+        for sg in self.cloud.server_groups.list():
+            if record['id'] in sg['members']:
+                sg['members'].remove(record['id'])
+
+        if record['status'] != 'DELETED':
+            self.cloud.host_load[record['hypervisor_hostname']] -= 1
+        record['status'] = 'DELETED'
+        self.cloud.servers.schedule(
+            record, CONF.memory_backend.server_delete_time, delete=True)
+
+    @cloud.operation
+    def server_delete(self, server, ignore_missing=True):
+        self._delete(server, ignore_missing)
+
+    @cloud.operation
+    def server_force_delete(self, server, ignore_missing=True):
+        self._delete(server, ignore_missing)
+
+    @cloud.operation
+    def server_rebuild(self, server, image, name=None, admin_password=None,
+                       **attrs):
+        record = self._transit(server, 'REBUILD', 'ACTIVE')
+        record['image'] = {'id': image}
+        if name is not None:
+            record['name'] = name
+        return cloud.to_object(record)
+
+    @cloud.operation
+    def server_resize(self, server, flavor):
+        flavor = self.cloud.flavors.get(flavor)
+        record = self._transit(server, 'RESIZE', 'VERIFY_RESIZE')
+        record['_old_flavor'] = record['flavor']
+        record['flavor'] = {'id': flavor['id']}
+
+    @cloud.operation
+    def server_resize_confirm(self, server):
+        record = self._server(server)
+        record.pop('_old_flavor', None)
+        record['status'] = 'ACTIVE'
+
+    @cloud.operation
+    def server_resize_revert(self, server):
+        record = self._server(server)
+        record['flavor'] = record.pop('_old_flavor', record['flavor'])
+        record['status'] = 'ACTIVE'
+
+    @cloud.operation
+    def server_reboot(self, server, reboot_type):
+        busy = 'HARD_REBOOT' if reboot_type == 'HARD' else 'REBOOT'
+        self._transit(server, busy, 'ACTIVE')
+
+    @cloud.operation
+    def server_change_password(self, server, new_password):
+        self._server(server)
+
+    @cloud.operation
+    def server_pause(self, server):
+        self._server(server)['status'] = 'PAUSED'
+
+    @cloud.operation
+    def server_unpause(self, server):
+        self._server(server)['status'] = 'ACTIVE'
+
+    @cloud.operation
+    def server_suspend(self, server):
+        self._server(server)['status'] = 'SUSPENDED'
+
+    @cloud.operation
+    def server_resume(self, server):
+        self._server(server)['status'] = 'ACTIVE'
+
+    @cloud.operation
+    def server_lock(self, server):
+        self._server(server)['locked'] = True
+
+    @cloud.operation
+    def server_unlock(self, server):
+        self._server(server)['locked'] = False
+
+    @cloud.operation
+    def server_start(self, server):
+        self._server(server)['status'] = 'ACTIVE'
+
+    @cloud.operation
+    def server_stop(self, server):
+        self._server(server)['status'] = 'SHUTOFF'
+
+    @cloud.operation
+    def server_rescue(self, server, admin_pass=None, image_ref=None):
+        self._server(server)['status'] = 'RESCUE'
+
+    @cloud.operation
+    def server_unrescue(self, server):
+        self._server(server)['status'] = 'ACTIVE'
+
+    @cloud.operation
+    def server_evacuate(self, server, host=None, admin_pass=None, force=None):
+        record = self._server(server)
+        zone, host = self._pick_host(record['availability_zone'], host)
+        load = self.cloud.host_load
+        load[record['hypervisor_hostname']] -= 1
+        load[host] = load.get(host, 0) + 1
+        record = self._transit(server, 'REBUILD', 'ACTIVE')
+        record['hypervisor_hostname'] = host
+
+    @cloud.operation
+    def wait_for_server(self, server, status='ACTIVE', failures=['ERROR'],
+                        interval=2, timeout=None):
+        '''Wait for server creation complete'''
+        cloud.wait_for(self.cloud.servers, getattr(server, 'id', server),
+                       status, failures, interval, timeout)
+        return
+
+    @cloud.operation
+    def wait_for_server_delete(self, server, timeout=None):
+        '''Wait for server deleting complete'''
+        cloud.wait_for_delete(self.cloud.servers,
+                              getattr(server, 'id', server), timeout)
+        return
+
+    def _interface(self, port_id):
+        port = self.cloud.ports.get(port_id)
+        return cloud.to_object({
+            'id': port['id'],
+            'port_id': port['id'],
+            'net_id': port['network_id'],
+            'fixed_ips': port['fixed_ips'],
+            'port_state': port['status'],
+            'server_id': port['device_id'],
+        })
+
+    @cloud.operation
+    def server_interface_create(self, server, **attrs):
+        port = self._plug(self._server(server), attrs)
+        return self._interface(port['id'])
+
+    @cloud.operation
+    def server_interface_list(self, server, **query):
+        record = self._server(server)
+        return [self._interface(port_id) for port_id, _o in record['_ports']]
+
+    @cloud.operation
+    def server_interface_delete(self, interface, server, ignore_missing=True):
+        record = self._server(server)
+        port_id = getattr(interface, 'port_id', interface)
+        if port_id not in dict(record['_ports']):
+            if ignore_missing:
+                return
+            raise cloud.not_found('Interface', port_id)
+        self._unplug(record, port_id)
+
+    @cloud.operation
+    def server_metadata_get(self, server):
+        return dict(self._server(server)['metadata'])
+
+    @cloud.operation
+    def server_metadata_update(self, server, metadata):
+        record = self._server(server)
+        record['metadata'] = dict(metadata or {})
+        return cloud.to_object(record)
+
+    @cloud.operation
+    def server_metadata_delete(self, server, keys):
+        record = self._server(server)
+        for key in keys:
+            record['metadata'].pop(key, None)
+
+    @cloud.operation
+    def availability_zone_list(self, **query):
+        return [cloud.to_object({'zoneName': zone,
+                                 'zoneState': {'available': True},
+                                 'hosts': None})
+                for zone in sorted(self.cloud.hosts)]
+
+    def validate_azs(self, azs):
+        """check whether availability zones provided are valid.
+
+        :param azs: A list of availability zone names for checking.
+        :returns: A list of zones that are found available on Nova.
+        """
+        known = [az.zoneName for az in self.availability_zone_list()]
+        found = []
+        for az in azs:
+            if az in known:
+                found.append(az)
+            else:
+                LOG.warning(_LW("Availability zone '%s' is not available."),
+                            az)
+        return found
+
+    @cloud.operation
+    def server_group_create(self, **attrs):
+        record = self.cloud.server_groups.add({
+            'name': attrs.get('name', ''),
+            'policies': list(attrs.get('policies', None) or []),
+            'members': [],
+            'metadata': {},
+        })
+        return cloud.to_object(record)
+
+    @cloud.operation
+    def server_group_delete(self, server_group, ignore_missing=True):
+        self.cloud.server_groups.remove(getattr(server_group, 'id',
+                                                server_group),
+                                        ignore_missing)
+
+    @cloud.operation
+    def server_group_find(self, name_or_id, ignore_missing=True):
+        return cloud.to_object(self.cloud.server_groups.get(name_or_id,
+                                                            ignore_missing))
+
+    def _hypervisors(self):
+        load = self.cloud.host_load
+        result = []
+        for zone in sorted(self.cloud.hosts):
+            for host in self.cloud.hosts[zone]:
+                result.append({
+                    'id': host, 'name': host, 'hypervisor_hostname': host,
+                    'availability_zone': zone, 'status': 'enabled',
+                    'state': 'up', 'running_vms': load.get(host, 0)})
+        return result
+
+    @cloud.operation
+    def hypervisor_list(self, **query):
+        return [cloud.to_object(h) for h in self._hypervisors()]
+
+    @cloud.operation
+    def hypervisor_get(self, hypervisor):
+        hypervisor = getattr(hypervisor, 'id', hypervisor)
+        for h in self._hypervisors():
+            if hypervisor in (h['id'], h['name']):
+                return cloud.to_object(h)
+        raise cloud.not_found('Hypervisor', hypervisor)
+
+    @cloud.operation
+    def service_list(self):
+        return [cloud.to_object({'id': h['id'], 'binary': 'nova-compute',
+                                 'host': h['name'], 'status': 'enabled',
+                                 'state': 'up', 'forced_down': False,
+                                 'zone': h['availability_zone']})
+                for h in self._hypervisors()]
+
+    @cloud.operation
+    def service_force_down(self, service):
+        return
@@ -11,6 +11,7 @@
 # under the License.
 
 import mock
+from oslo_serialization import jsonutils
 import six
 from webob import exc
 
@@ -274,6 +275,40 @@ class ActionControllerTest(shared.ControllerTest, base.SenlinTestCase):
         mock_call.assert_called_once_with(
             req.context, 'action_get', obj)
 
+    @mock.patch.object(util, 'parse_request')
+    @mock.patch.object(rpc_client.EngineClient, 'call2')
+    def test_action_get_priority(self, mock_call, mock_parse, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'get', True,
+                                 expected_request_count=2)
+
+        # The priority is only shown since the version of action_update
+        for version, expected in [('1.3', {'id': 'AID'}),
+                                  ('1.4', {'id': 'AID', 'priority': 50})]:
+            req = self._get('/actions/AID', version=version)
+            mock_call.return_value = {'id': 'AID', 'priority': 50}
+
+            response = self.controller.get(req, action_id='AID')
+
+            self.assertEqual(expected, response['action'])
+
+    @mock.patch.object(util, 'parse_request')
+    @mock.patch.object(rpc_client.EngineClient, 'call2')
+    def test_action_index_priority(self, mock_call, mock_parse,
+                                   mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'index', True,
+                                 expected_request_count=2)
+
+        req = self._get('/actions', version='1.3')
+        mock_call.return_value = [{'id': 'AID', 'priority': 50}]
+        result = self.controller.index(req)
+        self.assertEqual([{'id': 'AID'}], result['actions'])
+
+        req = self._get('/actions', params={'cursor': 'C'}, version='1.5')
+        mock_call.return_value = {'items': [{'id': 'AID', 'priority': 50}],
+                                  'next': None}
+        result = self.controller.index(req)
+        self.assertEqual([{'id': 'AID', 'priority': 50}], result['actions'])
+
     @mock.patch.object(util, 'parse_request')
     @mock.patch.object(rpc_client.EngineClient, 'call2')
     def test_action_get_not_found(self, mock_call, mock_parse,
@@ -309,3 +344,110 @@ class ActionControllerTest(shared.ControllerTest, base.SenlinTestCase):
 
         self.assertEqual(403, resp.status_int)
         self.assertIn('403 Forbidden', six.text_type(resp))
+
+    @mock.patch.object(util, 'parse_request')
+    @mock.patch.object(rpc_client.EngineClient, 'call2')
+    def test_action_timing(self, mock_call, mock_parse, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'timing', True)
+        params = {'action': 'NODE_CREATE', 'cluster': 'c1', 'since': '600',
+                  'limit': '10', 'global_project': 'True'}
+        req = self._get('/action-timing', params=params, version='1.6')
+        engine_resp = {'NODE_CREATE': {'count': 1, 'phases': {}}}
+        mock_call.return_value = engine_resp
+        obj = mock.Mock()
+        mock_parse.return_value = obj
+
+        result = self.controller.timing(req)
+
+        self.assertEqual({'timing': engine_resp}, result)
+        mock_parse.assert_called_once_with(
+            'ActionTimingRequest', req,
+            {'action': ['NODE_CREATE'], 'cluster': 'c1', 'since': '600',
+             'limit': '10', 'project_safe': False})
+        mock_call.assert_called_once_with(req.context, 'action_timing', obj)
+
+    @mock.patch.object(rpc_client.EngineClient, 'call2')
+    def test_action_timing_invalid_param(self, mock_call, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'timing', True)
+        req = self._get('/action-timing', params={'bogus': 'foo'},
+                        version='1.6')
+
+        ex = self.assertRaises(exc.HTTPBadRequest,
+                               self.controller.timing, req)
+
+        self.assertEqual('Invalid parameter bogus', six.text_type(ex))
+        self.assertFalse(mock_call.called)
+
+    @mock.patch.object(rpc_client.EngineClient, 'call2')
+    def test_action_timing_version_mismatch(self, mock_call, mock_enforce):
+        req = self._get('/action-timing', version='1.5')
+
+        ex = self.assertRaises(senlin_exc.MethodVersionNotFound,
+                               self.controller.timing, req)
+
+        self.assertFalse(mock_call.called)
+        self.assertEqual('API version 1.5 is not supported on this method.',
+                         six.text_type(ex))
+
+    @mock.patch.object(util, 'parse_request')
+    @mock.patch.object(rpc_client.EngineClient, 'call2')
+    def test_action_update(self, mock_call, mock_parse, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'update', True)
+        action_id = 'aaaa-bbbb-cccc'
+        body = {'action': {'priority': 90}}
+        req = self._patch('/actions/%(action_id)s' % {'action_id': action_id},
+                          jsonutils.dumps(body), version='1.4')
+        engine_resp = {'id': action_id, 'priority': 90}
+        mock_call.return_value = engine_resp
+        obj = mock.Mock()
+        mock_parse.return_value = obj
+
+        result = self.controller.update(req, action_id=action_id, body=body)
+
+        self.assertEqual(engine_resp, result['action'])
+        mock_parse.assert_called_once_with(
+            'ActionUpdateRequest', req,
+            {'identity': action_id, 'priority': 90})
+        mock_call.assert_called_once_with(req.context, 'action_update', obj)
+
+    @mock.patch.object(rpc_client.EngineClient, 'call2')
+    def test_action_update_malformed(self, mock_call, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'update', True)
+        body = {'priority': 90}
+        req = self._patch('/actions/aaaa', jsonutils.dumps(body),
+                          version='1.4')
+
+        ex = self.assertRaises(exc.HTTPBadRequest, self.controller.update,
+                               req, action_id='aaaa', body=body)
+
+        self.assertEqual("Malformed request data, missing 'action' key in "
+                         "request body.", six.text_type(ex))
+        self.assertFalse(mock_call.called)
+
+    @mock.patch.object(rpc_client.EngineClient, 'call2')
+    def test_action_update_version_mismatch(self, mock_call, mock_enforce):
+        body = {'action': {'priority': 90}}
+        req = self._patch('/actions/aaaa', jsonutils.dumps(body),
+                          version='1.3')
+
+        ex = self.assertRaises(senlin_exc.MethodVersionNotFound,
+                               self.controller.update,
+                               req, action_id='aaaa', body=body)
+
+        self.assertFalse(mock_call.called)
+        self.assertEqual('API version 1.3 is not supported on this method.',
+                         six.text_type(ex))
+
+    def test_action_update_denied_policy(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'update', False)
+        body = {'action': {'priority': 90}}
+        req = self._patch('/actions/aaaa', jsonutils.dumps(body),
+                          version='1.4')
+
+        resp = shared.request_with_middleware(fault.FaultWrapper,
+                                              self.controller.update,
+                                              req, action_id='aaaa',
+                                              body=body)
+
+        self.assertEqual(403, resp.status_int)
+        self.assertIn('403 Forbidden', six.text_type(resp))
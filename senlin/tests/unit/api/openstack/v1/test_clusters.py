@@ -100,6 +100,62 @@ class ClusterControllerTest(shared.ControllerTest, base.SenlinTestCase):
 
         mock_call.assert_called_once_with(req.context, 'cluster_list2', obj)
 
+    @mock.patch.object(util, 'parse_request')
+    @mock.patch.object(rpc_client.EngineClient, 'call2')
+    def test_index_with_cursor(self, mock_call, mock_parse, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'index', True)
+        params = {'limit': '1', 'cursor': 'CURSOR', 'name': 'name1'}
+        req = self._get('/clusters', params=params, version='1.5')
+        obj = vorc.ClusterListRequest()
+        mock_parse.return_value = obj
+        mock_call.return_value = {'items': [{'foo': 'bar'}], 'next': 'NEXT'}
+
+        result = self.controller.index(req)
+
+        self.assertEqual([{'foo': 'bar'}], result['clusters'])
+        links = result['clusters_links']
+        self.assertEqual(1, len(links))
+        self.assertEqual('next', links[0]['rel'])
+        href = links[0]['href']
+        self.assertTrue(href.startswith(req.path_url + '?'))
+        self.assertIn('cursor=NEXT', href)
+        self.assertIn('limit=1', href)
+        self.assertIn('name=name1', href)
+        self.assertNotIn('CURSOR', href)
+        mock_parse.assert_called_once_with(
+            'ClusterListRequest', req,
+            {
+                'name': ['name1'],
+                'limit': '1',
+                'cursor': 'CURSOR',
+                'project_safe': True
+            })
+
+    @mock.patch.object(util, 'parse_request')
+    @mock.patch.object(rpc_client.EngineClient, 'call2')
+    def test_index_first_page(self, mock_call, mock_parse, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'index', True)
+        req = self._get('/clusters', version='1.5')
+        obj = vorc.ClusterListRequest()
+        mock_parse.return_value = obj
+        mock_call.return_value = {'items': [{'foo': 'bar'}], 'next': None}
+
+        result = self.controller.index(req)
+
+        self.assertEqual({'clusters': [{'foo': 'bar'}]}, result)
+        mock_parse.assert_called_once_with(
+            'ClusterListRequest', req,
+            {'cursor': None, 'project_safe': True})
+
+    def test_index_cursor_unsupported(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'index', True)
+        req = self._get('/clusters', params={'cursor': 'CURSOR'},
+                        version='1.4')
+
+        ex = self.assertRaises(exc.HTTPBadRequest,
+                               self.controller.index, req)
+        self.assertEqual("Invalid parameter 'cursor'", six.text_type(ex))
+
     @mock.patch.object(util, 'parse_request')
     @mock.patch.object(rpc_client.EngineClient, 'call2')
     def test_index_failed_with_exception(self, mock_call, mock_parse,
@@ -361,6 +361,13 @@ class RoutesTest(base.SenlinTestCase):
                 'action_id': 'bbbb'
             })
 
+        self.assertRoute(
+            self.m,
+            '/action-timing',
+            'GET',
+            'timing',
+            'ActionController')
+
     def test_receiver_collection(self):
         self.assertRoute(
             self.m,
@@ -10,13 +10,20 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
 import time
 
+import mock
+from oslo_config import cfg
+from oslo_db import exception as db_exc
+from oslo_utils import timeutils
 import six
+import sqlalchemy
 
 from senlin.common import consts
 from senlin.common import exception
 from senlin.db.sqlalchemy import api as db_api
+from senlin.db.sqlalchemy import models
 from senlin.engine import parser
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
@@ -55,6 +62,89 @@ class DBAPIActionTest(base.SenlinTestCase):
         self.assertEqual(self.ctx.domain, action.domain)
         self.assertIsNone(action.outputs)
 
+    def test_action_encoding_changed(self):
+        action1 = _create_action(self.ctx, data={'key': 'value'})
+        cfg.CONF.set_override('json_column_encoding', 'msgpack')
+        cfg.CONF.set_override('json_column_compress_threshold', 1)
+        action2 = _create_action(self.ctx, data={'key': 'value'})
+
+        for action in (action1, action2):
+            action = db_api.action_get(self.ctx, action.id)
+            self.assertEqual(10, action.inputs['max_size'])
+            self.assertEqual({'key': 'value'}, action.data)
+
+    def _create_with_context(self, ctx, **kwargs):
+        data = parser.simple_parse(shared.sample_action)
+        data.update(user=self.ctx.user, project=self.ctx.project,
+                    context=ctx, **kwargs)
+        return db_api.action_create(self.ctx, data)
+
+    def _contexts(self):
+        with db_api.session_for_read() as session:
+            return dict((c.id, c.context)
+                        for c in session.query(models.ActionContext))
+
+    def test_action_context_shared(self):
+        ctx1 = self.ctx.to_dict()
+        ctx2 = dict(ctx1, request_id='req-other')
+        action1 = self._create_with_context(ctx1)
+        action2 = self._create_with_context(dict(ctx1))
+        action3 = self._create_with_context(ctx2)
+
+        self.assertEqual(action1.context_id, action2.context_id)
+        self.assertNotEqual(action1.context_id, action3.context_id)
+        self.assertEqual(
+            {action1.context_id: ctx1, action3.context_id: ctx2},
+            self._contexts())
+        for action, ctx in ((action1, ctx1), (action2, ctx1),
+                            (action3, ctx2)):
+            self.assertEqual(ctx, action.context)
+            self.assertEqual(ctx, db_api.action_get(self.ctx,
+                                                    action.id).context)
+
+    def test_action_context_update(self):
+        ctx1 = self.ctx.to_dict()
+        ctx2 = dict(ctx1, request_id='req-other')
+        action = self._create_with_context(ctx1)
+
+        db_api.action_update(self.ctx, action.id, {'context': ctx2})
+
+        self.assertEqual(ctx2, db_api.action_get(self.ctx, action.id).context)
+        self.assertEqual(2, len(self._contexts()))
+
+    def test_action_context_legacy(self):
+        action = models.Action()
+        action.context = {'user': 'USER'}
+
+        self.assertIsNone(action.context_ref)
+        self.assertEqual({'user': 'USER'}, action.context)
+
+    def test_action_context_purge(self):
+        ctx1 = self.ctx.to_dict()
+        ctx2 = dict(ctx1, request_id='req-other')
+        ctx3 = dict(ctx1, request_id='req-recent')
+        action1 = self._create_with_context(ctx1, status='SUCCEEDED')
+        action2 = self._create_with_context(ctx2, status='SUCCEEDED')
+        action3 = self._create_with_context(ctx3, status='SUCCEEDED')
+        db_api.action_delete(self.ctx, action2.id)
+        db_api.action_delete(self.ctx, action3.id)
+        old = timeutils.utcnow(True) - datetime.timedelta(
+            seconds=db_api.ACTION_CONTEXT_GRACE + 10)
+        with db_api.session_for_write() as session:
+            session.query(models.ActionContext).filter(
+                models.ActionContext.id.in_(
+                    [action1.context_id, action2.context_id])).update(
+                {'used_at': old}, synchronize_session=False)
+
+        res = db_api.action_context_purge(self.ctx)
+
+        # contexts in use or used recently are kept
+        self.assertEqual(1, res)
+        self.assertEqual(set([action1.context_id, action3.context_id]),
+                         set(self._contexts()))
+        self.assertEqual(ctx1, db_api.action_get(self.ctx,
+                                                 action1.id).context)
+
     def test_action_update(self):
         action = _create_action(self.ctx)
         values = {
@@ -123,6 +213,207 @@ class DBAPIActionTest(base.SenlinTestCase):
         self.assertEqual(consts.ACTION_RUNNING, action.status)
         self.assertEqual(timestamp, action.start_time)
 
+    def test_action_acquire_random_ready_priority(self):
+        cfg.CONF.set_override('action_starvation_timeout', 0)
+        specs = [
+            {'name': 'A01', 'status': 'READY', 'priority': 25},
+            {'name': 'A02', 'status': 'READY', 'priority': 75},
+            {'name': 'A03', 'status': 'INIT', 'priority': 100},
+            {'name': 'A04', 'status': 'READY', 'priority': 50},
+        ]
+        for spec in specs:
+            _create_action(self.ctx, **spec)
+
+        names = [db_api.action_acquire_random_ready(self.ctx, 'worker',
+                                                    time.time()).name
+                 for i in range(3)]
+        self.assertEqual(['A02', 'A04', 'A01'], names)
+        self.assertIsNone(db_api.action_acquire_random_ready(
+            self.ctx, 'worker', time.time()))
+
+    def test_action_acquire_random_ready_starving(self):
+        cfg.CONF.set_override('action_starvation_timeout', 60)
+        aged = timeutils.utcnow() - datetime.timedelta(seconds=120)
+        _create_action(self.ctx, name='A01', status='READY', priority=25,
+                       created_at=aged)
+        _create_action(self.ctx, name='A02', status='READY', priority=75)
+
+        action = db_api.action_acquire_random_ready(self.ctx, 'worker',
+                                                    time.time())
+        self.assertEqual('A01', action.name)
+
+    def test_action_acquire_random_ready_fair_share(self):
+        cfg.CONF.set_override('action_fair_share', True)
+        small_ctx = utils.dummy_context(project='small-project')
+        for i in range(3):
+            _create_action(self.ctx, status='RUNNING', owner='worker')
+            _create_action(self.ctx, status='READY', priority=75)
+        _create_action(small_ctx, name='SMALL', status='READY', priority=25)
+
+        action = db_api.action_acquire_random_ready(self.ctx, 'worker',
+                                                    time.time())
+        self.assertEqual('SMALL', action.name)
+
+        # Without fair share, actions of the highest priority are claimed
+        cfg.CONF.set_override('action_fair_share', False)
+        _create_action(small_ctx, name='SMALL', status='READY', priority=25)
+        action = db_api.action_acquire_random_ready(self.ctx, 'worker',
+                                                    time.time())
+        self.assertEqual(self.ctx.project, action.project)
+
+    def test_action_acquire_random_ready_owned_load(self):
+        cfg.CONF.set_override('action_fair_share', True)
+        cfg.CONF.set_override('max_actions_per_project', 2)
+        # A parent waiting for its dependents and an owned ready action are
+        # loading the project, neither of them can be claimed
+        _create_action(self.ctx, status='WAITING', owner='worker')
+        _create_action(self.ctx, status='READY', owner='worker')
+        _create_action(self.ctx, name='A01', status='READY')
+
+        self.assertIsNone(db_api.action_acquire_random_ready(
+            self.ctx, 'worker', time.time()))
+
+        cfg.CONF.set_override('max_actions_per_project', 0)
+        action = db_api.action_acquire_random_ready(self.ctx, 'worker',
+                                                    time.time())
+        self.assertEqual('A01', action.name)
+        self.assertIsNone(db_api.action_acquire_random_ready(
+            self.ctx, 'worker', time.time()))
+
+    def test_action_acquire_random_ready_owned_not_ready(self):
+        cfg.CONF.set_override('action_fair_share', True)
+        other_ctx = utils.dummy_context(project='other-project')
+        _create_action(self.ctx, status='READY', owner='worker')
+        for i in range(3):
+            _create_action(other_ctx, status='RUNNING', owner='worker')
+        _create_action(other_ctx, name='A01', status='READY')
+
+        action = db_api.action_acquire_random_ready(self.ctx, 'worker',
+                                                    time.time())
+        self.assertEqual('A01', action.name)
+
+    def test_action_acquire_random_ready_excluded(self):
+        cfg.CONF.set_override('action_fair_share', True)
+        other_ctx = utils.dummy_context(project='other-project')
+        _create_action(self.ctx, name='A01', action='NODE_CREATE',
+                       status='READY')
+        _create_action(other_ctx, name='A02', action='CLUSTER_CREATE',
+                       status='READY')
+
+        action = db_api.action_acquire_random_ready(
+            self.ctx, 'worker', time.time(), excluded=['NODE_'])
+        self.assertEqual('A02', action.name)
+        self.assertIsNone(db_api.action_acquire_random_ready(
+            self.ctx, 'worker', time.time(), excluded=['NODE_']))
+
+    def test_action_acquire_random_ready_excluded_clusters(self):
+        profile = shared.create_profile(self.ctx)
+        cluster1 = shared.create_cluster(self.ctx, profile)
+        cluster2 = shared.create_cluster(self.ctx, profile)
+        node1 = shared.create_node(self.ctx, cluster1, profile)
+        node2 = shared.create_node(self.ctx, cluster2, profile)
+        _create_action(self.ctx, name='A01', action='NODE_CREATE',
+                       target=node1.id, status='READY')
+        _create_action(self.ctx, name='A02', action='CLUSTER_CHECK',
+                       target=cluster1.id, status='READY')
+
+        for fair_share in [False, True]:
+            cfg.CONF.set_override('action_fair_share', fair_share)
+            _create_action(self.ctx, name='A03', action='NODE_CREATE',
+                           target=node2.id, status='READY')
+
+            # Node actions of other clusters and other actions are claimed
+            names = [db_api.action_acquire_random_ready(
+                self.ctx, 'worker', time.time(),
+                excluded_clusters=[cluster1.id]).name for i in range(2)]
+            self.assertEqual(['A02', 'A03'], sorted(names))
+            self.assertIsNone(db_api.action_acquire_random_ready(
+                self.ctx, 'worker', time.time(),
+                excluded_clusters=[cluster1.id]))
+            db_api.action_abandon(self.ctx, db_api.action_get_by_name(
+                self.ctx, 'A02').id)
+
+    def test_action_coalesce_drop(self):
+        action = _create_action(self.ctx, target='CLUSTER',
+                                action='CLUSTER_CHECK', status='READY',
+                                inputs={})
+        _create_action(self.ctx, target='CLUSTER', action='CLUSTER_CHECK',
+                       status='RUNNING', inputs={})
+
+        res = db_api.action_coalesce(self.ctx, 'CLUSTER', 'CLUSTER_CHECK',
+                                     {}, 'drop')
+        self.assertEqual(action.id, res)
+
+        res = db_api.action_coalesce(self.ctx, 'CLUSTER', 'CLUSTER_CHECK',
+                                     {'detail': True}, 'drop')
+        self.assertIsNone(res)
+        res = db_api.action_coalesce(self.ctx, 'OTHER', 'CLUSTER_CHECK',
+                                     {}, 'drop')
+        self.assertIsNone(res)
+
+    def test_action_coalesce_sum(self):
+        action = _create_action(self.ctx, target='CLUSTER',
+                                action='CLUSTER_SCALE_OUT', status='READY',
+                                inputs={'count': 2})
+
+        res = db_api.action_coalesce(self.ctx, 'CLUSTER', 'CLUSTER_SCALE_OUT',
+                                     {'count': 3}, 'sum', max_count=5)
+        self.assertEqual(action.id, res)
+        action = db_api.action_get(self.ctx, action.id)
+        self.assertEqual({'count': 5}, action.inputs)
+
+        # Beyond the maximum count
+        res = db_api.action_coalesce(self.ctx, 'CLUSTER', 'CLUSTER_SCALE_OUT',
+                                     {'count': 1}, 'sum', max_count=5)
+        self.assertIsNone(res)
+        # No count to add up
+        res = db_api.action_coalesce(self.ctx, 'CLUSTER', 'CLUSTER_SCALE_OUT',
+                                     {}, 'sum')
+        self.assertIsNone(res)
+
+    def test_action_coalesce_other_user(self):
+        other_ctx = utils.dummy_context(user_id='other-user')
+        self.assertEqual(self.ctx.project, other_ctx.project)
+        action = _create_action(self.ctx, target='CLUSTER',
+                                action='CLUSTER_SCALE_OUT', status='READY',
+                                inputs={'count': 2})
+
+        res = db_api.action_coalesce(other_ctx, 'CLUSTER',
+                                     'CLUSTER_SCALE_OUT', {'count': 2}, 'drop')
+        self.assertIsNone(res)
+        res = db_api.action_coalesce(other_ctx, 'CLUSTER',
+                                     'CLUSTER_SCALE_OUT', {'count': 1}, 'sum')
+        self.assertIsNone(res)
+        action = db_api.action_get(self.ctx, action.id)
+        self.assertEqual({'count': 2}, action.inputs)
+
+    def test_action_acquire_random_ready_project_cap(self):
+        cfg.CONF.set_override('action_fair_share', True)
+        cfg.CONF.set_override('max_actions_per_project', 2)
+        _create_action(self.ctx, status='RUNNING', owner='worker')
+        _create_action(self.ctx, status='READY')
+        _create_action(self.ctx, status='READY')
+
+        self.assertIsNotNone(db_api.action_acquire_random_ready(
+            self.ctx, 'worker', time.time()))
+        self.assertIsNone(db_api.action_acquire_random_ready(
+            self.ctx, 'worker', time.time()))
+
+    def test_action_acquire_random_ready_project_weights(self):
+        cfg.CONF.set_override('action_fair_share', True)
+        cfg.CONF.set_override('project_action_weights',
+                              {self.ctx.project: '4'})
+        small_ctx = utils.dummy_context(project='small-project')
+        for i in range(2):
+            _create_action(self.ctx, status='RUNNING', owner='worker')
+        _create_action(self.ctx, name='BIG', status='READY')
+        _create_action(small_ctx, status='RUNNING', owner='worker')
+        _create_action(small_ctx, name='SMALL', status='READY')
+
+        action = db_api.action_acquire_random_ready(self.ctx, 'worker',
+                                                    time.time())
+        self.assertEqual('BIG', action.name)
+
     def test_action_get_all_by_owner(self):
         specs = [
             {'name': 'A01', 'owner': 'work1'},
@@ -276,6 +567,18 @@ class DBAPIActionTest(base.SenlinTestCase):
     def test_dependency_add_dependent_list(self):
         self._check_dependency_add_dependent_list()
 
+    def test_dependency_get_by_actions(self):
+        id_of = self._check_dependency_add_dependent_list()
+        other = _create_action(self.ctx, name='A05')
+
+        res = db_api.dependency_get_by_actions(
+            self.ctx, [id_of['A01'], id_of['A02'], other.id])
+
+        self.assertEqual(
+            sorted([(id_of['A01'], id_of[n]) for n in ('A02', 'A03', 'A04')]),
+            sorted(res))
+        self.assertEqual([], db_api.dependency_get_by_actions(self.ctx, []))
+
     def test_action_mark_succeeded(self):
         timestamp = time.time()
         id_of = self._check_dependency_add_dependent_list()
@@ -293,6 +596,17 @@ class DBAPIActionTest(base.SenlinTestCase):
             res = db_api.dependency_get_dependents(self.ctx, aid)
             self.assertEqual(0, len(res))
 
+    def test_action_mark_succeeded_with_outputs(self):
+        action = _create_action(self.ctx)
+        outputs = {'nodes_added': ['NODE1'], 'timing': {'lock': 0.1}}
+
+        db_api.action_mark_succeeded(self.ctx, action.id, time.time(),
+                                     outputs=outputs)
+
+        action = db_api.action_get(self.ctx, action.id)
+        self.assertEqual(consts.ACTION_SUCCEEDED, action.status)
+        self.assertEqual(outputs, action.outputs)
+
     def _prepare_action_mark_failed_cancel(self):
         specs = [
             {'name': 'A01', 'status': 'INIT', 'target': 'cluster_001'},
@@ -378,6 +692,101 @@ class DBAPIActionTest(base.SenlinTestCase):
         result = db_api.dependency_get_dependents(self.ctx, id_of['A01'])
         self.assertEqual(0, len(result))
 
+    def test_action_mark_failed_cancelled_with_outputs(self):
+        id_of = self._prepare_action_mark_failed_cancel()
+        outputs = {'timing': {'lock': 0.1}}
+
+        db_api.action_mark_failed(self.ctx, id_of['A01'], time.time(),
+                                  outputs=outputs)
+        db_api.action_mark_cancelled(self.ctx, id_of['A02'], time.time(),
+                                     outputs=outputs)
+
+        self.assertEqual(outputs,
+                         db_api.action_get(self.ctx, id_of['A01']).outputs)
+        self.assertEqual(outputs,
+                         db_api.action_get(self.ctx, id_of['A02']).outputs)
+        # outputs of dependents are not touched
+        self.assertIsNone(db_api.action_get(self.ctx, id_of['A05']).outputs)
+
+    def test_action_get_timing(self):
+        profile = shared.create_profile(self.ctx)
+        cluster = shared.create_cluster(self.ctx, profile)
+        node = shared.create_node(self.ctx, cluster, profile)
+        other = shared.create_node(self.ctx, None, profile)
+        specs = [
+            {'target': cluster.id, 'action': 'CLUSTER_SCALE_OUT',
+             'status': 'SUCCEEDED', 'outputs': {'timing': {'lock': 0.1}}},
+            {'target': node.id, 'action': 'NODE_CREATE',
+             'status': 'FAILED', 'outputs': {'timing': {'driver': 2.0}}},
+            {'target': other.id, 'action': 'NODE_CREATE',
+             'status': 'SUCCEEDED', 'outputs': {'timing': {'driver': 1.0}}},
+            {'target': node.id, 'action': 'NODE_UPDATE',
+             'status': 'RUNNING', 'outputs': {'timing': {'driver': 3.0}}},
+            {'target': node.id, 'action': 'NODE_CHECK',
+             'status': 'SUCCEEDED', 'outputs': {}},
+        ]
+        for spec in specs:
+            _create_action(self.ctx, **spec)
+
+        res = db_api.action_get_timing(self.ctx)
+        self.assertEqual(3, len(res))
+
+        res = db_api.action_get_timing(self.ctx, cluster_id=cluster.id)
+        self.assertEqual(
+            sorted([('CLUSTER_SCALE_OUT', {'lock': 0.1}),
+                    ('NODE_CREATE', {'driver': 2.0})]),
+            sorted(res))
+
+        res = db_api.action_get_timing(self.ctx, actions=['NODE_CREATE'])
+        self.assertEqual(2, len(res))
+
+        new_ctx = utils.dummy_context(project='another-project')
+        self.assertEqual([], db_api.action_get_timing(new_ctx))
+        res = db_api.action_get_timing(new_ctx, project_safe=False)
+        self.assertEqual(3, len(res))
+
+    def test_action_get_timing_window(self):
+        specs = [
+            {'action': 'NODE_CREATE', 'status': 'SUCCEEDED', 'end_time': 10,
+             'outputs': {'timing': {'driver': 1.0}}},
+            {'action': 'NODE_CREATE', 'status': 'SUCCEEDED', 'end_time': 30,
+             'outputs': {'timing': {'driver': 3.0}}},
+            {'action': 'NODE_CREATE', 'status': 'SUCCEEDED', 'end_time': 20,
+             'outputs': {'timing': {'driver': 2.0}}},
+        ]
+        for spec in specs:
+            _create_action(self.ctx, **spec)
+
+        res = db_api.action_get_timing(self.ctx, since=20)
+        self.assertEqual([('NODE_CREATE', {'driver': 3.0}),
+                          ('NODE_CREATE', {'driver': 2.0})], res)
+
+        res = db_api.action_get_timing(self.ctx, limit=1)
+        self.assertEqual([('NODE_CREATE', {'driver': 3.0})], res)
+
+    def test_action_count_by_status(self):
+        for status in ['READY', 'READY', 'RUNNING', 'SUCCEEDED']:
+            _create_action(self.ctx, status=status)
+        new_ctx = utils.dummy_context(project='another-project')
+        _create_action(new_ctx, status='READY')
+
+        res = db_api.action_count_by_status(self.ctx)
+        self.assertEqual({'READY': 3, 'RUNNING': 1, 'SUCCEEDED': 1}, res)
+
+        res = db_api.action_count_by_status(self.ctx, ['READY', 'WAITING'])
+        self.assertEqual({'READY': 3}, res)
+
+    def test_action_count_by_project(self):
+        for status in ['READY', 'READY', 'RUNNING', 'SUCCEEDED']:
+            _create_action(self.ctx, status=status)
+        new_ctx = utils.dummy_context(project='another-project')
+        _create_action(new_ctx, status='READY')
+
+        res = db_api.action_count_by_project(self.ctx, ['READY', 'RUNNING'])
+        self.assertEqual({(self.ctx.project, 'READY'): 2,
+                          (self.ctx.project, 'RUNNING'): 1,
+                          ('another-project', 'READY'): 1}, res)
+
     def test_action_acquire(self):
         action = _create_action(self.ctx)
         db_api.action_update(self.ctx, action.id, {'status': 'READY'})
@@ -400,6 +809,39 @@ class DBAPIActionTest(base.SenlinTestCase):
                                        timestamp)
         self.assertIsNone(action)
 
+    def test_action_claims_not_joined_to_context(self):
+        ctx_value = {'user': 'fake_user', 'project': 'fake_project'}
+        values = parser.simple_parse(shared.sample_action)
+        values.update(user=self.ctx.user, project=self.ctx.project,
+                      context=ctx_value, status=consts.ACTION_READY)
+        action1 = db_api.action_create(self.ctx, values)
+        action2 = db_api.action_create(self.ctx, values)
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            if statement.startswith('SELECT') and statement != 'SELECT 1':
+                statements.append(statement)
+
+        engine = db_api.get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', _record)
+        self.addCleanup(sqlalchemy.event.remove, engine,
+                        'before_cursor_execute', _record)
+
+        timestamp = time.time()
+        res1 = db_api.action_acquire(self.ctx, action1.id, 'worker1',
+                                     timestamp)
+        res2 = db_api.action_acquire_random_ready(self.ctx, 'worker1',
+                                                  timestamp)
+
+        # The locked action rows are selected without their contexts, which
+        # are loaded by separate queries
+        self.assertEqual(action1.id, res1.id)
+        self.assertEqual(action2.id, res2.id)
+        self.assertEqual(ctx_value, res1.context)
+        self.assertEqual(ctx_value, res2.context)
+        for statement in statements:
+            self.assertNotIn('JOIN action_context', statement)
+
     def test_action_delete(self):
         action = _create_action(self.ctx)
         self.assertIsNotNone(action)
@@ -444,3 +886,123 @@ class DBAPIActionTest(base.SenlinTestCase):
         actions = db_api.action_get_all(self.ctx)
         self.assertEqual(1, len(actions))
         self.assertEqual('CLUSTER_DELETE', actions[0].action)
+
+
+class DBAPIUnitOfWorkTest(base.SenlinTestCase):
+    def setUp(self):
+        super(DBAPIUnitOfWorkTest, self).setUp()
+        self.ctx = utils.dummy_context()
+
+    def _event(self, **kwargs):
+        values = {'level': 20, 'timestamp': timeutils.utcnow(True),
+                  'project': self.ctx.project}
+        values.update(kwargs)
+        return db_api.event_create(self.ctx, values)
+
+    def test_unit_of_work_commit(self):
+        action = _create_action(self.ctx)
+
+        with db_api.unit_of_work():
+            with db_api.unit_of_work():
+                db_api.action_update(self.ctx, action.id,
+                                     {'status': 'READY'})
+                self.assertTrue(db_api.in_unit_of_work())
+            self._event(oid=action.id)
+
+        self.assertFalse(db_api.in_unit_of_work())
+        action = db_api.action_get(self.ctx, action.id)
+        self.assertEqual('READY', action.status)
+        self.assertEqual(1, len(db_api.event_get_all(self.ctx)))
+
+    def test_unit_of_work_rollback(self):
+        action = _create_action(self.ctx)
+
+        def update():
+            with db_api.unit_of_work():
+                db_api.action_update(self.ctx, action.id,
+                                     {'status': 'READY'})
+                self._event(oid=action.id)
+                raise exception.ResourceNotFound(type='node', id='FAKE')
+
+        self.assertRaises(exception.ResourceNotFound, update)
+        self.assertFalse(db_api.in_unit_of_work())
+        action = db_api.action_get(self.ctx, action.id)
+        self.assertEqual('INIT', action.status)
+        self.assertEqual(0, len(db_api.event_get_all(self.ctx)))
+
+    def test_unit_of_work_event_failure(self):
+        action = _create_action(self.ctx)
+
+        with db_api.unit_of_work():
+            db_api.action_update(self.ctx, action.id, {'status': 'READY'})
+            self.assertRaises(db_exc.DBError, self._event, timestamp=None)
+            self._event(oid=action.id)
+
+        action = db_api.action_get(self.ctx, action.id)
+        self.assertEqual('READY', action.status)
+        self.assertEqual(1, len(db_api.event_get_all(self.ctx)))
+
+    @mock.patch('time.sleep')
+    def test_unit_of_work_no_retry(self, mock_sleep):
+        action = _create_action(self.ctx)
+        mock_write = self.patchobject(db_api, 'session_for_write',
+                                      side_effect=db_exc.DBDeadlock)
+
+        self.assertRaises(db_exc.DBDeadlock, db_api.dependency_add,
+                          self.ctx, [action.id], 'FAKE_ID')
+        self.assertEqual(4, mock_write.call_count)
+
+        mock_write.reset_mock()
+        with mock.patch.object(db_api, 'in_unit_of_work',
+                               return_value=True):
+            self.assertRaises(db_exc.DBDeadlock, db_api.dependency_add,
+                              self.ctx, [action.id], 'FAKE_ID')
+        self.assertEqual(1, mock_write.call_count)
+
+    @mock.patch('time.sleep')
+    def test_run_in_unit_of_work_retry(self, mock_sleep):
+        action = _create_action(self.ctx)
+        attempts = []
+
+        def update(status):
+            # The status seen shows the rollback of a failed attempt
+            attempts.append(db_api.action_get(self.ctx, action.id).status)
+            db_api.action_update(self.ctx, action.id, {'status': status})
+            if len(attempts) == 1:
+                raise db_exc.DBDeadlock()
+            return len(attempts)
+
+        self.assertEqual(2, db_api.run_in_unit_of_work(update, 'READY'))
+        self.assertEqual(['INIT', 'INIT'], attempts)
+        action = db_api.action_get(self.ctx, action.id)
+        self.assertEqual('READY', action.status)
+
+        # Nested units are retried by the outermost one only
+        del attempts[:]
+        with db_api.unit_of_work():
+            self.assertRaises(db_exc.DBDeadlock, db_api.run_in_unit_of_work,
+                              update, 'READY')
+        self.assertEqual(['READY'], attempts)
+
+    def test_after_commit(self):
+        calls = []
+
+        db_api.after_commit(calls.append, 'outside')
+        self.assertEqual(['outside'], calls)
+
+        with db_api.unit_of_work():
+            with db_api.unit_of_work():
+                db_api.after_commit(calls.append, 'nested')
+            db_api.after_commit(calls.append, 'outer')
+            self.assertEqual(['outside'], calls)
+        self.assertEqual(['outside', 'nested', 'outer'], calls)
+
+        def rollback():
+            with db_api.unit_of_work():
+                db_api.after_commit(calls.append, 'rolled back')
+                raise exception.ResourceNotFound(type='node', id='FAKE')
+
+        self.assertRaises(exception.ResourceNotFound, rollback)
+        with db_api.unit_of_work():
+            pass
+        self.assertEqual(['outside', 'nested', 'outer'], calls)
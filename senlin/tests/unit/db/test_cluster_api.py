@@ -14,9 +14,12 @@ import mock
 
 from oslo_db.sqlalchemy import utils as sa_utils
 from oslo_utils import timeutils as tu
+import six
+import sqlalchemy
 
 from senlin.common import exception
 from senlin.db.sqlalchemy import api as db_api
+from senlin.db.sqlalchemy import utils as db_utils
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 from senlin.tests.unit.db import shared
@@ -161,6 +164,96 @@ class DBAPIClusterTest(base.SenlinTestCase):
         res = db_api.cluster_get_by_short_id(ctx_new, UUID1[:11])
         self.assertIsNone(res)
 
+    def test_cluster_find(self):
+        id1 = 'aaaa1111-0000-0000-0000-000000000001'
+        id2 = 'bbbb2222-0000-0000-0000-000000000002'
+        shared.create_cluster(self.ctx, self.profile, id=id1, name='c1')
+        # a name looking like the ID of another cluster
+        shared.create_cluster(self.ctx, self.profile, id=id2, name=id1)
+        # a name looking like a short ID of another cluster
+        shared.create_cluster(self.ctx, self.profile, id='c3', name='bbbb')
+        shared.create_cluster(self.ctx, self.profile, id='c4', name='twin')
+        shared.create_cluster(self.ctx, self.profile, id='c5', name='twin')
+
+        self.assertEqual(id1, db_api.cluster_find(self.ctx, id1).id)
+        self.assertEqual(id1, db_api.cluster_find(self.ctx, 'c1').id)
+        self.assertEqual(id1, db_api.cluster_find(self.ctx, 'aaaa').id)
+        self.assertEqual('c3', db_api.cluster_find(self.ctx, 'bbbb').id)
+        self.assertEqual(id2, db_api.cluster_find(self.ctx, 'bbbb2').id)
+        self.assertIsNone(db_api.cluster_find(self.ctx, 'non-existent'))
+        self.assertRaises(exception.MultipleChoices,
+                          db_api.cluster_find, self.ctx, 'twin')
+        self.assertRaises(exception.MultipleChoices,
+                          db_api.cluster_find, self.ctx, 'c')
+
+        ctx_new = utils.dummy_context(project='different_project_id')
+        self.assertIsNone(db_api.cluster_find(ctx_new, id1))
+        self.assertEqual(
+            id1, db_api.cluster_find(ctx_new, id1, project_safe=False).id)
+
+    def test_cluster_find_one_query(self):
+        cluster = shared.create_cluster(self.ctx, self.profile, id=UUID1)
+        statements = []
+
+        def _count(conn, cursor, statement, *args):
+            # Skip connection pings and transaction markers
+            if statement.startswith('SELECT') and statement != 'SELECT 1':
+                statements.append(statement)
+
+        engine = db_api.get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', _count)
+        self.addCleanup(sqlalchemy.event.remove, engine,
+                        'before_cursor_execute', _count)
+
+        for identity in (UUID1, 'db_test_cluster_name', UUID1[:8], 'bogus'):
+            del statements[:]
+            res = db_api.cluster_find(utils.dummy_context(), identity)
+            self.assertEqual(1, len(statements), statements)
+            if identity != 'bogus':
+                self.assertEqual(cluster.id, res.id)
+
+    def test_cluster_find_resolved_once(self):
+        cluster = shared.create_cluster(self.ctx, self.profile,
+                                        name='cluster-1')
+        self.assertEqual(cluster.id,
+                         db_api.cluster_find(self.ctx, 'cluster-1').id)
+
+        # the name is remembered as resolved for this context only
+        shared.create_cluster(self.ctx, self.profile, name='cluster-1')
+        self.assertEqual(cluster.id,
+                         db_api.cluster_find(self.ctx, 'cluster-1').id)
+        self.assertRaises(exception.MultipleChoices, db_api.cluster_find,
+                          utils.dummy_context(), 'cluster-1')
+
+        # a resolved ID no longer matching the name is forgotten
+        db_api.cluster_update(self.ctx, cluster.id, {'name': 'renamed'})
+        res = db_api.cluster_find(self.ctx, 'cluster-1')
+        self.assertNotEqual(cluster.id, res.id)
+
+    def test_cluster_get_all_replica(self):
+        shared.create_cluster(self.ctx, self.profile, name='cluster1')
+
+        with db_api.replica_reader():
+            with db_api.replica_reader():
+                pass
+            ret_clusters = db_api.cluster_get_all(self.ctx)
+            # reads are still routed to the replica after a nested block
+            self.assertTrue(db_api._REPLICA.enabled)
+
+        self.assertFalse(db_api._REPLICA.enabled)
+        self.assertEqual(['cluster1'], [c.name for c in ret_clusters])
+
+    @mock.patch.object(db_api, '_get_main_context_manager')
+    def test_session_for_read_replica(self, mock_manager):
+        reader = mock_manager.return_value.reader
+
+        db_api.session_for_read()
+        with db_api.replica_reader():
+            db_api.session_for_read()
+
+        reader.using.assert_called_once_with(db_api._CONTEXT)
+        reader.async_.using.assert_called_once_with(db_api._CONTEXT)
+
     def test_cluster_get_all(self):
         values = [
             {'name': 'cluster1'},
@@ -290,6 +383,73 @@ class DBAPIClusterTest(base.SenlinTestCase):
         self.assertEqual(1, len(cl_db))
         self.assertEqual(clusters[2].id, cl_db[0].id)
 
+    def test_cluster_get_all_cursor(self):
+        clusters = [shared.create_cluster(self.ctx, self.profile,
+                                          init_at=tu.utcnow(True))
+                    for x in range(5)]
+
+        seen = []
+        cursor = None
+        while True:
+            page = db_api.cluster_get_all(self.ctx, limit=2, cursor=cursor)
+            seen.extend(c.id for c in page)
+            if len(page) < 2:
+                break
+            cursor = db_utils.encode_cursor(page[-1], None, 'init_at')
+
+        self.assertEqual([c.id for c in clusters], seen)
+
+    def test_cluster_get_all_cursor_null_values(self):
+        updated = tu.utcnow(True)
+        clusters = [
+            shared.create_cluster(self.ctx, self.profile, name='c1',
+                                  updated_at=updated),
+            shared.create_cluster(self.ctx, self.profile, name='c2'),
+            shared.create_cluster(self.ctx, self.profile, name='c3'),
+            shared.create_cluster(self.ctx, self.profile, name='c4',
+                                  updated_at=updated),
+        ]
+        expected = db_api.cluster_get_all(self.ctx, sort='updated_at')
+
+        seen = []
+        cursor = None
+        for i in range(4):
+            page = db_api.cluster_get_all(self.ctx, limit=1, cursor=cursor,
+                                          sort='updated_at')
+            seen.extend(c.id for c in page)
+            cursor = db_utils.encode_cursor(page[-1], 'updated_at', None)
+
+        self.assertEqual([c.id for c in expected], seen)
+        self.assertEqual(set(c.id for c in clusters), set(seen))
+        self.assertEqual([], db_api.cluster_get_all(
+            self.ctx, limit=1, cursor=cursor, sort='updated_at'))
+
+    @mock.patch.object(db_api, 'model_query')
+    def test_cluster_get_all_cursor_no_marker_fetch(self, mock_query):
+        cluster = shared.create_cluster(self.ctx, self.profile,
+                                        init_at=tu.utcnow(True))
+        cursor = db_utils.encode_cursor(cluster, None, 'init_at')
+
+        db_api.cluster_get_all(self.ctx, limit=1, cursor=cursor,
+                               project_safe=False)
+
+        mock_query.assert_called_once_with(self.ctx, db_api.models.Cluster)
+
+    def test_cluster_get_all_cursor_sort_mismatch(self):
+        cluster = shared.create_cluster(self.ctx, self.profile)
+        cursor = db_utils.encode_cursor(cluster, None, 'init_at')
+
+        ex = self.assertRaises(exception.BadRequest, db_api.cluster_get_all,
+                               self.ctx, cursor=cursor, sort='name')
+        self.assertEqual("The request is malformed: The pagination cursor "
+                         "does not match the sort keys.", six.text_type(ex))
+
+    def test_cluster_get_all_invalid_cursor(self):
+        ex = self.assertRaises(exception.BadRequest, db_api.cluster_get_all,
+                               self.ctx, cursor='bogus')
+        self.assertEqual("The request is malformed: Invalid pagination "
+                         "cursor: bogus.", six.text_type(ex))
+
     def test_cluster_get_all_non_existing_marker(self):
         [shared.create_cluster(self.ctx, self.profile) for x in range(3)]
         uuid = "this cluster doesn't exist"
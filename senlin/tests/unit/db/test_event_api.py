@@ -16,6 +16,7 @@ from oslo_utils import timeutils as tu
 
 from senlin.common import utils as common_utils
 from senlin.db.sqlalchemy import api as db_api
+from senlin.db.sqlalchemy import utils as db_utils
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 from senlin.tests.unit.db import shared
@@ -192,6 +193,29 @@ class DBAPIEventTest(base.SenlinTestCase):
         self.assertEqual(1, len(events))
         self.assertEqual(event2_id, events[0].id)
 
+    def test_event_get_all_with_cursor(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile)
+        for i in range(3):
+            self.create_event(self.ctx, entity=cluster1)
+        self.create_event(self.ctx, entity=cluster1,
+                          timestamp=tu.utcnow(True))
+
+        for sort in (None, 'timestamp:desc', 'level,oname:desc'):
+            expected = [e.id for e in db_api.event_get_all(self.ctx,
+                                                           sort=sort)]
+            seen = []
+            cursor = None
+            for i in range(4):
+                events = db_api.event_get_all(self.ctx, limit=1, sort=sort,
+                                              cursor=cursor)
+                seen.extend(e.id for e in events)
+                cursor = db_utils.encode_cursor(events[-1], sort,
+                                                'timestamp')
+
+            self.assertEqual(expected, seen)
+            self.assertEqual([], db_api.event_get_all(self.ctx, sort=sort,
+                                                      cursor=cursor))
+
     def test_event_get_all_with_sorting(self):
         cluster1 = shared.create_cluster(self.ctx, self.profile)
 
@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
+
 import mock
 from oslo_db.sqlalchemy import utils as sa_utils
 from oslo_serialization import jsonutils
@@ -19,6 +21,7 @@ import six
 from senlin.common import consts
 from senlin.common import exception
 from senlin.db.sqlalchemy import api as db_api
+from senlin.db.sqlalchemy import utils as db_utils
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 from senlin.tests.unit.db import shared
@@ -451,6 +454,139 @@ class DBAPINodeTest(base.SenlinTestCase):
                                            status='ERROR')
         self.assertEqual(1, res)
 
+    def test_node_count_by_status(self):
+        cluster2 = shared.create_cluster(self.ctx, self.profile)
+        for status in ('ACTIVE', 'ACTIVE', 'ERROR', 'ACTIVE', 'WARNING'):
+            shared.create_node(self.ctx, self.cluster, self.profile,
+                               status=status)
+        shared.create_node(self.ctx, cluster2, self.profile, status='ERROR')
+
+        res = db_api.node_count_by_status(self.ctx, self.cluster.id)
+        self.assertEqual({'ACTIVE': 3, 'ERROR': 1, 'WARNING': 1}, res)
+        res = db_api.node_count_by_status(self.ctx, 'FAKE_CLUSTER')
+        self.assertEqual({}, res)
+
+    def test_node_count_by_status_diff_project(self):
+        ctx_new = utils.dummy_context(project='a_different_project')
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           status='ACTIVE')
+
+        res = db_api.node_count_by_status(ctx_new, self.cluster.id)
+        self.assertEqual({}, res)
+        res = db_api.node_count_by_status(ctx_new, self.cluster.id,
+                                          project_safe=False)
+        self.assertEqual({'ACTIVE': 1}, res)
+
+    def _create_victims(self):
+        now = tu.utcnow(True)
+        profile = shared.create_profile(self.ctx, created_at=now)
+        old_profile = shared.create_profile(
+            self.ctx, created_at=now - datetime.timedelta(days=1))
+        specs = [
+            # name, status, created_at, profile
+            ('N1', 'ACTIVE', now - datetime.timedelta(hours=3), profile),
+            ('N2', 'ERROR', now - datetime.timedelta(hours=1), profile),
+            ('N3', 'ACTIVE', now - datetime.timedelta(hours=2), old_profile),
+            ('N4', 'CREATING', None, profile),
+            ('N5', 'ACTIVE', now - datetime.timedelta(hours=4), profile),
+            ('N6', 'ERROR', None, profile),
+        ]
+        ids = {}
+        for i, (name, status, created_at, prof) in enumerate(specs):
+            node = shared.create_node(
+                self.ctx, self.cluster, prof, name=name, status=status,
+                created_at=created_at,
+                init_at=now - datetime.timedelta(hours=10 - i))
+            ids[node.id] = name
+        return ids
+
+    def _victims(self, ids, count, criteria):
+        res = db_api.node_get_victims(self.ctx, self.cluster.id, count,
+                                      criteria)
+        return [ids[node_id] for node_id in res]
+
+    def test_node_get_victims(self):
+        ids = self._create_victims()
+
+        # ERROR nodes first, then nodes not created yet, by initialization
+        self.assertEqual(['N2', 'N6', 'N4'],
+                         self._victims(ids, 3, consts.DELETE_OLDEST_FIRST))
+        self.assertEqual(['N2', 'N6', 'N4', 'N5', 'N1', 'N3'],
+                         self._victims(ids, 10, consts.DELETE_OLDEST_FIRST))
+        self.assertEqual(['N2', 'N6', 'N4', 'N3', 'N1'],
+                         self._victims(ids, 5, consts.DELETE_YOUNGEST_FIRST))
+        self.assertEqual(['N2', 'N6', 'N4', 'N3'],
+                         self._victims(ids, 4,
+                                       consts.DELETE_OLDEST_PROFILE_FIRST))
+
+    def test_node_get_victims_random(self):
+        ids = self._create_victims()
+
+        res = self._victims(ids, 5, consts.DELETE_RANDOM)
+        self.assertEqual(['N2', 'N6', 'N4'], res[:3])
+        self.assertEqual(2, len(set(res[3:]) & set(['N1', 'N3', 'N5'])))
+
+    def test_node_get_victims_diff_project(self):
+        ctx_new = utils.dummy_context(project='a_different_project')
+        node = shared.create_node(self.ctx, self.cluster, self.profile)
+
+        res = db_api.node_get_victims(ctx_new, self.cluster.id, 1,
+                                      consts.DELETE_RANDOM)
+        self.assertEqual([], res)
+        res = db_api.node_get_victims(ctx_new, self.cluster.id, 1,
+                                      consts.DELETE_RANDOM,
+                                      project_safe=False)
+        self.assertEqual([node.id], res)
+
+    def test_node_get_records(self):
+        now = tu.utcnow(True)
+        profile = shared.create_profile(self.ctx, created_at=now)
+        node1 = shared.create_node(
+            self.ctx, self.cluster, profile, created_at=now,
+            init_at=now - datetime.timedelta(hours=2),
+            data={'placement': {'zone': 'AZ1'}, 'foo': 'bar'})
+        node2 = shared.create_node(
+            self.ctx, self.cluster, profile, status='ERROR', data={},
+            init_at=now - datetime.timedelta(hours=1))
+        cluster2 = shared.create_cluster(self.ctx, self.profile)
+        shared.create_node(self.ctx, cluster2, self.profile)
+
+        res = db_api.node_get_records(self.ctx, self.cluster.id)
+
+        self.assertEqual(2, len(res))
+        self.assertEqual((node1.id, 'ACTIVE', node1.created_at, profile.id,
+                          profile.created_at,
+                          {'placement': {'zone': 'AZ1'}, 'foo': 'bar'},
+                          node1.init_at),
+                         res[0])
+        self.assertEqual((node2.id, 'ERROR', None, profile.id),
+                         res[1][:4])
+        self.assertEqual(res[0][4], res[1][4])
+        self.assertEqual({}, res[1][5])
+
+    def test_node_get_records_paginated(self):
+        now = tu.utcnow(True)
+        nodes = [shared.create_node(
+            self.ctx, self.cluster, self.profile,
+            init_at=now + datetime.timedelta(seconds=i)) for i in range(3)]
+
+        res = db_api.node_get_records(self.ctx, self.cluster.id, limit=2)
+        self.assertEqual([nodes[0].id, nodes[1].id], [r[0] for r in res])
+        cursor = db_utils.encode_cursor(res[-1], None, 'init_at')
+        res = db_api.node_get_records(self.ctx, self.cluster.id, limit=2,
+                                      cursor=cursor)
+        self.assertEqual([nodes[2].id], [r[0] for r in res])
+
+    def test_node_get_records_diff_project(self):
+        ctx_new = utils.dummy_context(project='a_different_project')
+        node = shared.create_node(self.ctx, self.cluster, self.profile)
+
+        res = db_api.node_get_records(ctx_new, self.cluster.id)
+        self.assertEqual([], res)
+        res = db_api.node_get_records(ctx_new, self.cluster.id,
+                                      project_safe=False)
+        self.assertEqual([node.id], [r[0] for r in res])
+
     def test_node_count_by_cluster_diff_project(self):
         ctx_new = utils.dummy_context(project='a_different_project')
         shared.create_cluster(self.ctx, self.profile)
@@ -525,6 +661,73 @@ class DBAPINodeTest(base.SenlinTestCase):
         reason = 'Node new_name: Something is wrong'
         self.assertEqual(reason, cluster.status_reason)
 
+    def test_node_update_batch(self):
+        node1 = shared.create_node(self.ctx, self.cluster, self.profile)
+        node2 = shared.create_node(self.ctx, self.cluster, self.profile)
+        values = {
+            node1.id: {'data': {'lb_member': 'M1'}},
+            node2.id: {'data': {'lb_member': 'M2'}, 'role': 'new role'},
+        }
+
+        db_api.node_update_batch(self.ctx, values)
+
+        node1 = db_api.node_get(self.ctx, node1.id)
+        node2 = db_api.node_get(self.ctx, node2.id)
+        self.assertEqual({'lb_member': 'M1'}, node1.data)
+        self.assertEqual({'lb_member': 'M2'}, node2.data)
+        self.assertEqual('new role', node2.role)
+
+    def test_node_update_batch_not_found(self):
+        node = shared.create_node(self.ctx, self.cluster, self.profile)
+        values = {
+            node.id: {'name': 'new_name'},
+            'BogusId': {'name': 'new_name'},
+        }
+        ex = self.assertRaises(exception.ResourceNotFound,
+                               db_api.node_update_batch,
+                               self.ctx, values)
+        self.assertEqual('The node (BogusId) could not be found.',
+                         six.text_type(ex))
+
+    def test_node_count_by_zone(self):
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           data={'placement': {'zone': 'AZ1'}})
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           data={'placement': {'zone': 'AZ1:host1'}})
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           data={'placement': {'zone': 'AZ2'}})
+        shared.create_node(self.ctx, self.cluster, self.profile, data={})
+        shared.create_node(self.ctx, None, self.profile,
+                           data={'placement': {'zone': 'AZ2'}})
+
+        res = db_api.node_count_by_zone(self.ctx, self.cluster.id)
+
+        self.assertEqual({'AZ1': 2, 'AZ2': 1}, res)
+
+    def test_node_count_by_zone_project_safe(self):
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           data={'placement': {'zone': 'AZ1'}})
+        new_ctx = utils.dummy_context(project='a-different-project')
+
+        res = db_api.node_count_by_zone(new_ctx, self.cluster.id)
+        self.assertEqual({}, res)
+
+        res = db_api.node_count_by_zone(new_ctx, self.cluster.id,
+                                        project_safe=False)
+        self.assertEqual({'AZ1': 1}, res)
+
+    def test_node_zone_synced_with_data(self):
+        node = shared.create_node(self.ctx, self.cluster, self.profile,
+                                  data={'placement': {'zone': 'AZ1:host1'}})
+        self.assertEqual('AZ1', node.zone)
+
+        db_api.node_update(self.ctx, node.id,
+                           {'data': {'placement': {'zone': 'AZ2'}}})
+        self.assertEqual('AZ2', db_api.node_get(self.ctx, node.id).zone)
+
+        db_api.node_update_batch(self.ctx, {node.id: {'data': {}}})
+        self.assertIsNone(db_api.node_get(self.ctx, node.id).zone)
+
     def test_node_migrate_from_none(self):
         node_orphan = shared.create_node(self.ctx, None, self.profile)
         timestamp = tu.utcnow(True)
@@ -65,6 +65,14 @@ class DBAPIServiceTest(base.SenlinTestCase):
         self.assertEqual('host-updated', new_service.host)
         self.assertGreater(new_service.updated_at, old_updated_time)
 
+    def test_service_update_capacity(self):
+        service = self._create_service()
+        self.assertIsNone(service.capacity)
+
+        new_service = db_api.service_update(self.ctx, service.id,
+                                            {'capacity': 10})
+        self.assertEqual(10, new_service.capacity)
+
     def test_service_update_values_none(self):
         old_service = self._create_service()
         old_updated_time = old_service.updated_at
@@ -13,14 +13,19 @@
 
 
 import mock
+from oslo_config import cfg
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
 import pytz
+import six
 from sqlalchemy.dialects.mysql import base as mysql_base
 from sqlalchemy.dialects.sqlite import base as sqlite_base
 from sqlalchemy import types
 import testtools
 
+from senlin.common import exception
 from senlin.db.sqlalchemy import types as db_types
+from senlin.tests.unit.common import base
 
 
 class DictTest(testtools.TestCase):
@@ -101,6 +106,100 @@ class ListTest(testtools.TestCase):
         self.assertIsNone(result)
 
 
+class EncodingTest(base.SenlinTestCase):
+
+    value = {
+        'name': u'n\u00e9e',
+        'count': 3,
+        'ratio': 0.5,
+        'flag': True,
+        'empty': None,
+        'items': ['a', {'b': [1, 2]}],
+        'text': 'x' * 100,
+    }
+
+    def test_json(self):
+        result = db_types.encode_value(self.value)
+
+        self.assertEqual('{', result[0])
+        self.assertEqual(self.value, db_types.decode_value(result))
+
+    def test_json_compressed(self):
+        cfg.CONF.set_override('json_column_compress_threshold', 50)
+
+        result = db_types.encode_value(self.value)
+
+        self.assertTrue(result.startswith('~json+zlib:'))
+        self.assertEqual(self.value, db_types.decode_value(result))
+
+    def test_json_below_threshold(self):
+        cfg.CONF.set_override('json_column_compress_threshold', 1000)
+
+        result = db_types.encode_value(self.value)
+
+        self.assertEqual('{', result[0])
+
+    def test_msgpack(self):
+        cfg.CONF.set_override('json_column_encoding', 'msgpack')
+
+        result = db_types.encode_value(self.value)
+
+        self.assertTrue(result.startswith('~msgpack:'))
+        self.assertEqual(self.value, db_types.decode_value(result))
+
+    def test_msgpack_compressed(self):
+        cfg.CONF.set_override('json_column_encoding', 'msgpack')
+        cfg.CONF.set_override('json_column_compress_threshold', 50)
+
+        result = db_types.encode_value(self.value)
+
+        self.assertTrue(result.startswith('~msgpack+zlib:'))
+        self.assertEqual(self.value, db_types.decode_value(result))
+
+    def test_msgpack_primitives(self):
+        cfg.CONF.set_override('json_column_encoding', 'msgpack')
+        value = {'at': timeutils.parse_isotime('2016-11-01T10:00:00Z'),
+                 'pair': (1, 2)}
+
+        result = db_types.decode_value(db_types.encode_value(value))
+
+        self.assertEqual(jsonutils.loads(jsonutils.dumps(value)), result)
+
+    def test_msgpack_not_installed(self):
+        encoded = db_types.encode_value(self.value)
+        cfg.CONF.set_override('json_column_encoding', 'msgpack')
+        packed = db_types.encode_value(self.value)
+        self.patchobject(db_types, 'msgpack', new=None)
+
+        ex = self.assertRaises(exception.Error, db_types.encode_value,
+                               self.value)
+        self.assertIn('requires the msgpack package', six.text_type(ex))
+        self.assertRaises(exception.Error, db_types.decode_value, packed)
+        # Plain JSON values are still read
+        self.assertEqual(self.value, db_types.decode_value(encoded))
+
+    def test_decode_any_encoding(self):
+        encoded = []
+        for encoding in ('json', 'msgpack'):
+            for threshold in (0, 1):
+                cfg.CONF.set_override('json_column_encoding', encoding)
+                cfg.CONF.set_override('json_column_compress_threshold',
+                                      threshold)
+                encoded.append(db_types.encode_value(self.value))
+
+        cfg.CONF.clear_override('json_column_encoding')
+        cfg.CONF.clear_override('json_column_compress_threshold')
+        for value in encoded:
+            self.assertEqual(self.value, db_types.decode_value(value))
+
+    def test_null(self):
+        cfg.CONF.set_override('json_column_encoding', 'msgpack')
+
+        self.assertIsNone(db_types.decode_value(None))
+        self.assertIsNone(
+            db_types.decode_value(db_types.encode_value(None)))
+
+
 class TZAwareDateTimeTest(testtools.TestCase):
 
     def setUp(self):
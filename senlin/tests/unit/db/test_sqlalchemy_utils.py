@@ -10,10 +10,16 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
+
 import mock
 from oslo_config import cfg
 from oslo_utils import timeutils
+import pytz
+import six
+import sqlalchemy
 
+from senlin.common import exception
 from senlin.db.sqlalchemy import utils
 from senlin.tests.unit.common import base
 
@@ -99,6 +105,51 @@ class SortParamTest(base.SenlinTestCase):
                           'asc-nullsfirst'], dirs)
 
 
+class CursorTest(base.SenlinTestCase):
+
+    def test_round_trip(self):
+        init_at = datetime.datetime(2016, 11, 2, 8, 3, 4, 5678)
+        obj = mock.Mock(id='FAKE_ID', status='ACTIVE',
+                        init_at=init_at.replace(tzinfo=pytz.utc),
+                        updated_at=None)
+
+        cursor = utils.encode_cursor(obj, 'status:desc,updated_at', None)
+
+        self.assertNotIn('=', cursor)
+        self.assertEqual({'id': 'FAKE_ID', 'status': 'ACTIVE',
+                          'updated_at': None},
+                         utils.decode_cursor(cursor))
+
+        cursor = utils.encode_cursor(obj, None, 'init_at')
+
+        self.assertEqual({'id': 'FAKE_ID', 'init_at': init_at},
+                         utils.decode_cursor(cursor))
+
+    def test_decode_invalid(self):
+        err = self.assertRaises(exception.BadRequest,
+                                utils.decode_cursor, 'bogus')
+        self.assertEqual("The request is malformed: Invalid pagination "
+                         "cursor: bogus.", six.text_type(err))
+
+
+class PrefixFilterTest(base.SenlinTestCase):
+
+    def test_prefix_filter(self):
+        column = sqlalchemy.column('id')
+
+        criterion = utils.prefix_filter(column, 'ab9')
+
+        self.assertEqual('id >= :id_1 AND id < :id_2', str(criterion))
+        self.assertEqual({'id_1': 'ab9', 'id_2': 'ab:'},
+                         criterion.compile().params)
+
+    def test_prefix_filter_empty(self):
+        column = sqlalchemy.column('id')
+
+        self.assertEqual('id IS NOT NULL',
+                         str(utils.prefix_filter(column, '')))
+
+
 class ServiceAliveTest(base.SenlinTestCase):
 
     def test_alive(self):
@@ -120,7 +120,27 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         res = self.lb_driver._wait_for_lb_ready(lb_id)
 
         self.assertFalse(res)
-        mock_sleep.assert_called_once_with(10)
+        mock_sleep.assert_has_calls([mock.call(0.5), mock.call(1),
+                                     mock.call(2), mock.call(4),
+                                     mock.call(2.5)])
+        self.assertEqual(5, mock_sleep.call_count)
+
+    @mock.patch.object(eventlet, 'sleep')
+    def test_wait_for_lb_ready_backoff(self, mock_sleep):
+        lb_id = 'LB_ID'
+        lb_unready = mock.Mock(id=lb_id, provisioning_status='PENDING_UPDATE',
+                               operating_status='OFFLINE')
+        lb_ready = mock.Mock(id=lb_id, provisioning_status='ACTIVE',
+                             operating_status='ONLINE')
+        self.nc.loadbalancer_get.side_effect = [lb_unready] * 6 + [lb_ready]
+        self.lb_driver.lb_status_timeout = 600
+
+        res = self.lb_driver._wait_for_lb_ready(lb_id)
+
+        self.assertTrue(res)
+        mock_sleep.assert_has_calls([mock.call(0.5), mock.call(1),
+                                     mock.call(2), mock.call(4),
+                                     mock.call(8), mock.call(10)])
 
     def test_lb_create_succeeded(self):
         lb_obj = mock.Mock()
@@ -468,7 +488,7 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
     def test_member_add_subnet_get_failed(self, mock_get_current):
         self.nc.subnet_get.side_effect = exception.InternalError(
             code=500, message="Can't find subnet")
-        res = self.lb_driver.member_add('node', 'LB_ID', 'POOL_ID', 80,
+        res = self.lb_driver.member_add(mock.Mock(), 'LB_ID', 'POOL_ID', 80,
                                         'subnet')
         self.assertIsNone(res)
 
@@ -483,7 +503,7 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         self.nc.subnet_get.return_value = subnet_obj
         self.nc.network_get.side_effect = exception.InternalError(
             code=500, message="Can't find NETWORK_ID")
-        res = self.lb_driver.member_add('node', 'LB_ID', 'POOL_ID', 80,
+        res = self.lb_driver.member_add(mock.Mock(), 'LB_ID', 'POOL_ID', 80,
                                         'subnet')
         self.assertIsNone(res)
 
@@ -644,3 +664,111 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         self.assertIsNone(res)
         self.lb_driver._wait_for_lb_ready.assert_has_calls(
             [mock.call('LB_ID'), mock.call('LB_ID')])
+
+    def _prepare_members_add(self):
+        subnet_obj = mock.Mock(id='SUBNET_ID', network_id='NETWORK_ID')
+        subnet_obj.name = 'subnet'
+        network_obj = mock.Mock(id='NETWORK_ID')
+        network_obj.name = 'network1'
+        self.nc.subnet_get.return_value = subnet_obj
+        self.nc.network_get.return_value = network_obj
+
+        nodes = []
+        for i in range(3):
+            node = mock.Mock(id='NODE%s' % i)
+            node.get_details.return_value = {
+                'addresses': {
+                    'network1': [{'addr': 'ipaddr%s' % i}],
+                }
+            }
+            nodes.append(node)
+        self.nc.pool_member_create.side_effect = [
+            mock.Mock(id='MEMBER%s' % i) for i in range(3)]
+        self.lb_driver._wait_for_lb_ready = mock.Mock()
+        return nodes
+
+    @mock.patch.object(oslo_context, 'get_current')
+    def test_members_add_succeeded(self, mock_get_current):
+        nodes = self._prepare_members_add()
+        self.lb_driver._wait_for_lb_ready.return_value = True
+
+        res = self.lb_driver.members_add(nodes, 'LB_ID', 'POOL_ID', 80,
+                                         'subnet')
+
+        self.assertEqual({'NODE0': 'MEMBER0', 'NODE1': 'MEMBER1',
+                          'NODE2': 'MEMBER2'}, res)
+        self.nc.subnet_get.assert_called_once_with('subnet')
+        self.nc.network_get.assert_called_once_with('NETWORK_ID')
+        self.nc.pool_member_create.assert_has_calls([
+            mock.call('POOL_ID', 'ipaddr0', 80, 'SUBNET_ID'),
+            mock.call('POOL_ID', 'ipaddr1', 80, 'SUBNET_ID'),
+            mock.call('POOL_ID', 'ipaddr2', 80, 'SUBNET_ID'),
+        ])
+        # one check before each creation plus a final one
+        self.assertEqual(4, self.lb_driver._wait_for_lb_ready.call_count)
+
+    @mock.patch.object(oslo_context, 'get_current')
+    def test_members_add_member_create_failed(self, mock_get_current):
+        nodes = self._prepare_members_add()
+        self.lb_driver._wait_for_lb_ready.return_value = True
+        self.nc.pool_member_create.side_effect = [
+            mock.Mock(id='MEMBER0'),
+            exception.InternalError(code=500, message='CREATE FAILED'),
+            mock.Mock(id='MEMBER2'),
+        ]
+
+        res = self.lb_driver.members_add(nodes, 'LB_ID', 'POOL_ID', 80,
+                                         'subnet')
+
+        self.assertEqual({'NODE0': 'MEMBER0', 'NODE2': 'MEMBER2'}, res)
+
+    @mock.patch.object(oslo_context, 'get_current')
+    def test_members_add_lb_unready(self, mock_get_current):
+        nodes = self._prepare_members_add()
+        self.lb_driver._wait_for_lb_ready.side_effect = [True, True, False]
+
+        res = self.lb_driver.members_add(nodes, 'LB_ID', 'POOL_ID', 80,
+                                         'subnet')
+
+        # The second member was not confirmed and the third was not created
+        self.assertEqual({'NODE0': 'MEMBER0'}, res)
+        self.assertEqual(2, self.nc.pool_member_create.call_count)
+
+    def test_members_add_subnet_get_failed(self):
+        self.nc.subnet_get.side_effect = exception.InternalError(
+            code=500, message="Can't find subnet")
+
+        res = self.lb_driver.members_add([mock.Mock()], 'LB_ID', 'POOL_ID',
+                                         80, 'subnet')
+
+        self.assertEqual({}, res)
+
+    def test_members_add_empty(self):
+        res = self.lb_driver.members_add([], 'LB_ID', 'POOL_ID', 80,
+                                         'subnet')
+
+        self.assertEqual({}, res)
+        self.assertEqual(0, self.nc.subnet_get.call_count)
+
+    def test_members_remove_succeeded(self):
+        self.lb_driver._wait_for_lb_ready = mock.Mock(return_value=True)
+
+        res = self.lb_driver.members_remove('LB_ID', 'POOL_ID',
+                                            ['MEMBER1', 'MEMBER2'])
+
+        self.assertEqual(['MEMBER1', 'MEMBER2'], res)
+        self.nc.pool_member_delete.assert_has_calls([
+            mock.call('POOL_ID', 'MEMBER1'),
+            mock.call('POOL_ID', 'MEMBER2'),
+        ])
+        self.assertEqual(3, self.lb_driver._wait_for_lb_ready.call_count)
+
+    def test_members_remove_partially_failed(self):
+        self.lb_driver._wait_for_lb_ready = mock.Mock(return_value=True)
+        self.nc.pool_member_delete.side_effect = [
+            exception.InternalError(code=500, message=''), None]
+
+        res = self.lb_driver.members_remove('LB_ID', 'POOL_ID',
+                                            ['MEMBER1', 'MEMBER2'])
+
+        self.assertEqual(['MEMBER2'], res)
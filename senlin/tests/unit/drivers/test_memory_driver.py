@@ -0,0 +1,275 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import random
+
+import eventlet
+import mock
+from oslo_config import cfg
+from oslo_utils import timeutils
+
+from senlin.common import exception as exc
+from senlin.drivers import base as driver_base
+from senlin.profiles.os.nova import server
+from senlin.tests.drivers import memory
+from senlin.tests.drivers.memory import cloud
+from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
+
+
+class MemoryTestCase(base.SenlinTestCase):
+
+    def setUp(self):
+        super(MemoryTestCase, self).setUp()
+        cloud.reset()
+        self.addCleanup(cloud.reset)
+        timeutils.set_time_override()
+        self.addCleanup(timeutils.clear_time_override)
+        # Sleeping only moves the clock forward
+        self.patchobject(eventlet, 'sleep',
+                         side_effect=timeutils.advance_time_seconds)
+        self.conn_params = utils.dummy_context().to_dict()
+
+
+class TestFaultInjector(MemoryTestCase):
+
+    def test_latency_fixed(self):
+        fi = cloud.FaultInjector(random.Random(1), latency_mean=0.5)
+        self.assertEqual(0.5, fi.latency())
+
+    def test_latency_distributions(self):
+        for dist in cloud.LATENCY_DISTRIBUTIONS:
+            fi = cloud.FaultInjector(random.Random(1),
+                                     latency_distribution=dist,
+                                     latency_mean=0.2, latency_stddev=0.1)
+            samples = [fi.latency() for i in range(2000)]
+            self.assertTrue(all(s >= 0 for s in samples))
+            self.assertAlmostEqual(0.2, sum(samples) / len(samples),
+                                   delta=0.02)
+
+    def test_call_sleeps(self):
+        fi = cloud.FaultInjector(random.Random(1), latency_mean=0.5)
+
+        fi('compute', 'server_get')
+
+        eventlet.sleep.assert_called_once_with(0.5)
+
+    def test_call_error_rate(self):
+        fi = cloud.FaultInjector(random.Random(1), error_rate=1.0)
+
+        ex = self.assertRaises(exc.InternalError, fi, 'compute', 'server_get')
+
+        self.assertEqual(500, ex.code)
+
+    def test_call_error_operations(self):
+        fi = cloud.FaultInjector(random.Random(1), error_rate=1.0,
+                                 error_operations=['server_create'])
+
+        fi('compute', 'server_get')
+        self.assertRaises(exc.InternalError, fi, 'compute', 'server_create')
+
+    def test_call_rate_limit(self):
+        fi = cloud.FaultInjector(random.Random(1), rate_limit=2,
+                                 rate_limit_burst=2)
+
+        fi('compute', 'server_get')
+        fi('compute', 'server_get')
+        ex = self.assertRaises(exc.InternalError, fi, 'compute', 'server_get')
+        self.assertEqual(429, ex.code)
+
+        timeutils.advance_time_seconds(0.5)
+        fi('compute', 'server_get')
+
+    def test_configure(self):
+        cc = cloud.get_cloud()
+        cc.configure(cloud.COMPUTE, error_rate=1.0)
+        nc = memory.compute(self.conn_params)
+
+        self.assertRaises(exc.InternalError, nc.flavor_find, 'm1.tiny')
+        memory.network(self.conn_params).network_get('private')
+
+
+class TestMemoryBackend(MemoryTestCase):
+
+    def test_registered(self):
+        sd = driver_base.SenlinDriver('memory')
+
+        self.assertEqual(memory.compute, sd.compute)
+        self.assertEqual(memory.loadbalancing, sd.loadbalancing)
+
+    def test_server_lifecycle(self):
+        nc = memory.compute(self.conn_params)
+        net = memory.network(self.conn_params).network_get('private')
+
+        server = nc.server_create(name='s1', flavorRef='1',
+                                  imageRef='cirros-0.3.5-x86_64-disk',
+                                  networks=[{'uuid': net.id}])
+        self.assertEqual('BUILD', server.status)
+        self.assertEqual('nova', server.availability_zone)
+        self.assertEqual(['private'], list(server.addresses.keys()))
+
+        nc.wait_for_server(server.id)
+        server = nc.server_get(server.id)
+        self.assertEqual('ACTIVE', server.status)
+        self.assertEqual(cfg.CONF.memory_backend.server_build_time,
+                         sum(c[0][0] for c in eventlet.sleep.call_args_list))
+
+        port_id = nc.server_interface_list(server.id)[0].port_id
+        nc.server_delete(server.id)
+        nc.wait_for_server_delete(server.id)
+        ex = self.assertRaises(exc.InternalError, nc.server_get, server.id)
+        self.assertEqual(404, ex.code)
+        self.assertIsNone(cloud.get_cloud().ports.get(port_id, True))
+
+    def test_server_placement(self):
+        cfg.CONF.set_override('availability_zones', ['az1', 'az2'],
+                              group='memory_backend')
+        cfg.CONF.set_override('hosts_per_zone', 2, group='memory_backend')
+        nc = memory.compute(self.conn_params)
+
+        servers = [nc.server_create(flavorRef='m1.tiny') for i in range(4)]
+        hosts = set(s.hypervisor_hostname for s in servers)
+        self.assertEqual(4, len(hosts))
+
+        server = nc.server_create(flavorRef='m1.tiny',
+                                  availability_zone='az2')
+        self.assertEqual('az2', server.availability_zone)
+        ex = self.assertRaises(exc.InternalError, nc.server_create,
+                               flavorRef='m1.tiny', availability_zone='az3')
+        self.assertEqual(400, ex.code)
+        self.assertEqual(['az1'], nc.validate_azs(['az1', 'az3']))
+
+    def test_server_build_failure(self):
+        cfg.CONF.set_override('build_error_rate', 1.0,
+                              group='memory_backend')
+        nc = memory.compute(self.conn_params)
+        server = nc.server_create(flavorRef='m1.tiny')
+
+        self.assertRaises(exc.InternalError, nc.wait_for_server, server.id)
+        self.assertEqual('ERROR', nc.server_get(server.id).status)
+
+    def test_server_bad_flavor(self):
+        nc = memory.compute(self.conn_params)
+
+        ex = self.assertRaises(exc.InternalError, nc.server_create,
+                               flavorRef='m1.huge')
+        self.assertEqual(400, ex.code)
+
+    def test_server_metadata(self):
+        nc = memory.compute(self.conn_params)
+        server = nc.server_create(flavorRef='m1.tiny', metadata={'k': 'v'})
+
+        nc.server_metadata_update(server.id, {'a': 'b', 'c': 'd'})
+        nc.server_metadata_delete(server.id, ['a'])
+
+        self.assertEqual({'c': 'd'}, nc.server_metadata_get(server.id))
+
+    def test_stack_lifecycle(self):
+        hc = memory.orchestration(self.conn_params)
+
+        stack = hc.stack_create(stack_name='st1', parameters={})
+        self.assertEqual('CREATE_IN_PROGRESS', hc.stack_get(stack.id).status)
+        hc.wait_for_stack(stack.id, 'CREATE_COMPLETE')
+        self.assertEqual('CREATE_COMPLETE', hc.stack_find('st1').status)
+
+        hc.stack_delete(stack.id)
+        hc.wait_for_stack_delete(stack.id)
+        self.assertIsNone(hc.stack_find(stack.id))
+
+    def test_trust(self):
+        kc = memory.identity(self.conn_params)
+        user = kc.get_user_id(username='senlin', password='secret')
+
+        self.assertEqual(user, kc.get_user_id(username='senlin'))
+        self.assertIsNone(kc.trust_get_by_trustor('USER', user, 'PROJECT'))
+        trust = kc.trust_create('USER', user, 'PROJECT', ['admin'])
+        self.assertEqual(trust.id,
+                         kc.trust_get_by_trustor('USER', user, 'PROJECT').id)
+
+    def test_lb_members(self):
+        ctx = utils.dummy_context()
+        lb_driver = memory.loadbalancing(self.conn_params)
+        nc = memory.compute(self.conn_params)
+        vip = {'subnet': 'private-subnet', 'address': None,
+               'connection_limit': -1, 'protocol': 'HTTP',
+               'protocol_port': 80, 'admin_state_up': True}
+        pool = {'lb_method': 'ROUND_ROBIN', 'protocol': 'HTTP',
+                'admin_state_up': True}
+
+        res, result = lb_driver.lb_create(vip, pool)
+        self.assertTrue(res)
+
+        nodes = []
+        for i in range(3):
+            server = nc.server_create(flavorRef='m1.tiny')
+            details = {'addresses': nc.server_get(server.id).addresses}
+            nodes.append(mock.Mock(id='NODE%d' % i,
+                                   get_details=mock.Mock(
+                                       return_value=details)))
+        with mock.patch('oslo_context.context.get_current',
+                        return_value=ctx):
+            members = lb_driver.members_add(nodes, result['loadbalancer'],
+                                            result['pool'], 80,
+                                            'private-subnet')
+
+        self.assertEqual(3, len(members))
+        self.assertEqual(
+            3, len(cloud.get_cloud().members.list(pool_id=result['pool'])))
+
+        removed = lb_driver.members_remove(result['loadbalancer'],
+                                           result['pool'],
+                                           list(members.values()))
+        self.assertEqual(3, len(removed))
+
+        lb_driver.lb_delete(**result)
+        self.assertEqual([], cloud.get_cloud().loadbalancers.list())
+        self.assertEqual([], cloud.get_cloud().listeners.list())
+
+    def test_lb_immutable(self):
+        nc = memory.network(self.conn_params)
+        subnet = nc.subnet_get('private-subnet')
+        lb = nc.loadbalancer_create(subnet.id)
+
+        ex = self.assertRaises(exc.InternalError, nc.listener_create,
+                               lb.id, 'HTTP', 80)
+        self.assertEqual(409, ex.code)
+
+        timeutils.advance_time_seconds(
+            cfg.CONF.memory_backend.lb_provision_time)
+        nc.listener_create(lb.id, 'HTTP', 80)
+        self.assertEqual('PENDING_UPDATE',
+                         nc.loadbalancer_get(lb.id).provisioning_status)
+
+    def test_server_profile(self):
+        spec = {
+            'type': 'os.nova.server',
+            'version': '1.0',
+            'properties': {
+                'flavor': 'm1.small',
+                'image': 'cirros-0.3.5-x86_64-disk',
+                'name': 'FAKE_SERVER_NAME',
+                'networks': [{'network': 'private'}],
+            }
+        }
+        profile = server.ServerProfile('t', spec)
+        profile._computeclient = memory.compute(self.conn_params)
+        profile._networkclient = memory.network(self.conn_params)
+        node = mock.Mock(id='NODE_ID', data={}, index=1, cluster_id='')
+        node.name = 'node1'
+
+        node.physical_id = profile.do_create(node)
+
+        self.assertEqual('nova', node.data['placement']['zone'])
+        details = profile.do_get_details(node)
+        self.assertEqual('ACTIVE', details['status'])
+        self.assertIn('private', details['addresses'])
+        self.assertTrue(profile.do_delete(node))
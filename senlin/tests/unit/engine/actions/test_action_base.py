@@ -123,6 +123,22 @@ class ActionBaseTest(base.SenlinTestCase):
         self.assertEqual('FAKE_UPDATED_TIME', obj.updated_at)
         self.assertEqual({'data_key': 'data_value'}, obj.data)
 
+    def test_action_priority(self):
+        obj = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, priority=90)
+        self.assertEqual(90, obj.priority)
+
+        obj = ab.Action(OBJID, consts.NODE_CHECK, self.ctx,
+                        cause=ab.CAUSE_RPC)
+        self.assertEqual(consts.ACTION_PRIORITY_LOW, obj.priority)
+
+        obj = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx,
+                        cause=ab.CAUSE_RPC)
+        self.assertEqual(consts.ACTION_PRIORITY_HIGH, obj.priority)
+
+        obj = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx,
+                        cause=ab.CAUSE_DERIVED)
+        self.assertEqual(consts.ACTION_PRIORITY_NORMAL, obj.priority)
+
     def test_action_store_for_create(self):
         values = copy.deepcopy(self.action_values)
         obj = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, **values)
@@ -147,13 +163,45 @@ class ActionBaseTest(base.SenlinTestCase):
         self.assertIsNotNone(obj.created_at)
         self.assertIsNone(obj.updated_at)
 
-        # store for creation
+        # store for update
+        obj.data = {'key': 'value'}
         res = obj.store(self.ctx)
         self.assertIsNotNone(res)
         self.assertEqual(obj_id, res)
         self.assertEqual(obj.id, res)
         self.assertIsNotNone(obj.created_at)
         self.assertIsNotNone(obj.updated_at)
+        self.assertEqual({'key': 'value'}, ao.Action.get(self.ctx, res).data)
+
+    @mock.patch.object(ao.Action, 'update')
+    def test_action_store_changed_only(self, mock_update):
+        values = copy.deepcopy(self.action_values)
+        obj = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, **values)
+        obj.store(self.ctx)
+        obj = ab.Action.load(self.ctx, obj.id)
+
+        obj.data['key'] = 'value'
+        obj.status = obj.RUNNING
+        obj.store(self.ctx)
+
+        mock_update.assert_called_once_with(
+            self.ctx, obj.id,
+            {'data': {'data_key': 'data_value', 'key': 'value'},
+             'status': obj.RUNNING, 'updated_at': obj.updated_at})
+
+    @mock.patch.object(ao.Action, 'update')
+    def test_action_store_unchanged(self, mock_update):
+        values = copy.deepcopy(self.action_values)
+        obj = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, **values)
+        obj.store(self.ctx)
+        obj = ab.Action.load(self.ctx, obj.id)
+        updated_at = obj.updated_at
+
+        res = obj.store(self.ctx)
+
+        self.assertEqual(obj.id, res)
+        self.assertEqual(updated_at, obj.updated_at)
+        self.assertEqual(0, mock_update.call_count)
 
     def test_from_db_record(self):
         values = copy.deepcopy(self.action_values)
@@ -273,6 +321,45 @@ class ActionBaseTest(base.SenlinTestCase):
         self.assertEqual('FAKE_ID', result)
         mock_store.assert_called_once_with(self.ctx)
 
+    @mock.patch.object(ab.Action, 'store')
+    @mock.patch.object(ao.Action, 'coalesce')
+    def test_action_create_coalesced(self, mock_coalesce, mock_store):
+        cfg.CONF.set_override('action_coalescing',
+                              {'CLUSTER_SCALE_OUT': 'sum'})
+        mock_coalesce.return_value = 'EXISTING_ID'
+
+        result = ab.Action.create(self.ctx, OBJID, 'CLUSTER_SCALE_OUT',
+                                  cause=ab.CAUSE_RPC, status=ab.Action.READY,
+                                  inputs={'count': 2})
+
+        self.assertEqual('EXISTING_ID', result)
+        mock_coalesce.assert_called_once_with(
+            self.ctx, OBJID, 'CLUSTER_SCALE_OUT', {'count': 2}, 'sum',
+            cfg.CONF.max_coalesced_count)
+        self.assertEqual(0, mock_store.call_count)
+
+    @mock.patch.object(ab.Action, 'store')
+    @mock.patch.object(ao.Action, 'coalesce')
+    def test_action_create_not_coalesced(self, mock_coalesce, mock_store):
+        cfg.CONF.set_override('action_coalescing', {'CLUSTER_CHECK': 'drop'})
+        mock_coalesce.return_value = None
+        mock_store.return_value = 'FAKE_ID'
+
+        result = ab.Action.create(self.ctx, OBJID, 'CLUSTER_CHECK',
+                                  cause=ab.CAUSE_RPC, status=ab.Action.READY)
+        self.assertEqual('FAKE_ID', result)
+        mock_coalesce.assert_called_once_with(
+            self.ctx, OBJID, 'CLUSTER_CHECK', {}, 'drop',
+            cfg.CONF.max_coalesced_count)
+
+        # Derived actions and actions of other types are never merged
+        mock_coalesce.reset_mock()
+        ab.Action.create(self.ctx, OBJID, 'CLUSTER_CHECK',
+                         cause=ab.CAUSE_DERIVED, status=ab.Action.READY)
+        ab.Action.create(self.ctx, OBJID, 'CLUSTER_RECOVER',
+                         cause=ab.CAUSE_RPC, status=ab.Action.READY)
+        self.assertEqual(0, mock_coalesce.call_count)
+
     def test_action_delete(self):
         result = ab.Action.delete(self.ctx, 'non-existent')
         self.assertIsNone(result)
@@ -387,27 +474,27 @@ class ActionBaseTest(base.SenlinTestCase):
         self.assertEqual(action.SUCCEEDED, action.status)
         self.assertEqual('FAKE_REASON', action.status_reason)
         mark_succeed.assert_called_once_with(action.context, 'FAKE_ID',
-                                             mock.ANY)
+                                             mock.ANY, outputs={})
 
         action.set_status(action.RES_ERROR, 'FAKE_ERROR')
         self.assertEqual(action.FAILED, action.status)
         self.assertEqual('FAKE_ERROR', action.status_reason)
         mark_fail.assert_called_once_with(action.context, 'FAKE_ID', mock.ANY,
-                                          'FAKE_ERROR')
+                                          'FAKE_ERROR', outputs={})
 
         mark_fail.reset_mock()
         action.set_status(action.RES_TIMEOUT, 'TIMEOUT_ERROR')
         self.assertEqual(action.FAILED, action.status)
         self.assertEqual('TIMEOUT_ERROR', action.status_reason)
         mark_fail.assert_called_once_with(action.context, 'FAKE_ID', mock.ANY,
-                                          'TIMEOUT_ERROR')
+                                          'TIMEOUT_ERROR', outputs={})
 
         mark_fail.reset_mock()
         action.set_status(action.RES_CANCEL, 'CANCELLED')
         self.assertEqual(action.CANCELLED, action.status)
         self.assertEqual('CANCELLED', action.status_reason)
         mark_cancel.assert_called_once_with(action.context, 'FAKE_ID',
-                                            mock.ANY)
+                                            mock.ANY, outputs={})
 
         mark_fail.reset_mock()
         action.set_status(action.RES_RETRY, 'BUSY')
@@ -429,15 +516,76 @@ class ActionBaseTest(base.SenlinTestCase):
 
         action.set_status(action.RES_OK)
         mock_info.assert_called_once_with(action, consts.PHASE_END,
-                                          'SUCCEEDED')
+                                          'SUCCEEDED', extra=mock.ANY)
 
         action.set_status(action.RES_ERROR)
         mock_error.assert_called_once_with(action, consts.PHASE_ERROR,
-                                           'ERROR')
+                                           'ERROR', extra=mock.ANY)
 
         action.set_status(action.RES_RETRY)
         mock_warning.assert_called_once_with(action, consts.PHASE_ERROR,
-                                             'RETRY')
+                                             'RETRY', extra=mock.ANY)
+
+    @mock.patch.object(EVENT, 'info')
+    @mock.patch.object(ao.Action, 'mark_succeeded')
+    def test_set_status_unit_of_work(self, mark_succeed, mock_info):
+        calls = []
+
+        def run(func, *args, **kwargs):
+            calls.append('begin')
+            res = func(*args, **kwargs)
+            calls.append('commit')
+            return res
+
+        self.patchobject(ab.db_api, 'run_in_unit_of_work', side_effect=run)
+        mark_succeed.side_effect = lambda *args, **kw: calls.append('status')
+        mock_info.side_effect = lambda *args, **kw: calls.append('event')
+        action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, id='FAKE_ID')
+
+        action.set_status(action.RES_OK)
+
+        self.assertEqual(['begin', 'status', 'event', 'commit'], calls)
+        self.assertEqual(action.SUCCEEDED, action.status)
+
+    @mock.patch.object(ab, 'wallclock')
+    def test_timed(self, mock_time):
+        mock_time.side_effect = [10, 10.5, 20, 20.25]
+        action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx)
+
+        with action.timed(ab.TIMING_LOCK):
+            pass
+        with action.timed(ab.TIMING_LOCK):
+            pass
+
+        self.assertEqual({'lock': 0.75}, action.timing)
+
+    def test_get_timing(self):
+        action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx)
+        action.add_timing(ab.TIMING_DRIVER, 1.23456)
+        action.add_timing('BEFORE:lb-policy', 0.0004)
+
+        self.assertEqual({'driver': 1.235, 'BEFORE:lb-policy': 0.0},
+                         action.get_timing())
+
+    @mock.patch.object(EVENT, 'info')
+    @mock.patch.object(ao.Action, 'mark_succeeded')
+    @mock.patch.object(ab, 'wallclock')
+    def test_set_status_with_timing(self, mock_time, mark_succeed,
+                                    mock_info):
+        mock_time.side_effect = [100, 100.2]
+        action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, id='FAKE_ID',
+                           outputs={'nodes_added': ['NODE_ID']})
+        action.entity = mock.Mock()
+        action.add_timing(ab.TIMING_LOCK, 0.5)
+
+        action.set_status(action.RES_OK, 'FAKE_REASON')
+
+        mark_succeed.assert_called_once_with(
+            action.context, 'FAKE_ID', 100,
+            outputs={'nodes_added': ['NODE_ID'], 'timing': {'lock': 0.5}})
+        mock_info.assert_called_once_with(
+            action, consts.PHASE_END, 'FAKE_REASON',
+            extra={'timing': {'lock': 0.5, 'status': 0.2}})
 
     @mock.patch.object(ao.Action, 'check_status')
     def test_get_status(self, mock_get):
@@ -587,6 +735,7 @@ class ActionBaseTest(base.SenlinTestCase):
             'timeout': 120,
             'status': 'FAKE_STATUS',
             'status_reason': 'FAKE_STATUS_REASON',
+            'priority': consts.ACTION_PRIORITY_NORMAL,
             'inputs': {'param': 'value'},
             'outputs': {'key': 'output_value'},
             'depends_on': ['ACTION_1'],
@@ -701,6 +850,7 @@ class ActionPolicyCheckTest(base.SenlinTestCase):
         mock_load.assert_called_once_with(action.context, policy.id)
         # last_op was not updated
         self.assertIsNone(pb.last_op)
+        self.assertEqual(['BEFORE:test-policy'], list(action.timing.keys()))
 
     @mock.patch.object(EVENT, 'debug')
     @mock.patch.object(cp_mod.ClusterPolicy, 'load_all')
@@ -836,6 +986,24 @@ class ActionProcTest(base.SenlinTestCase):
         mock_load.assert_called_once_with(self.ctx, action_id='ACTION_ID')
         mock_event_info.assert_called_once_with(action, 'start')
         mock_status.assert_called_once_with(action.RES_OK, 'BIG SUCCESS')
+        self.assertEqual({}, action.timing)
+
+    @mock.patch.object(EVENT, 'info')
+    @mock.patch.object(ab.Action, 'load')
+    @mock.patch.object(ab, 'wallclock')
+    def test_action_proc_claim_timing(self, mock_time, mock_load,
+                                      mock_event_info):
+        mock_time.return_value = 101.5
+        action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, start_time=100)
+        action.entity = mock.Mock()
+        self.patchobject(action, 'execute',
+                         return_value=(action.RES_OK, 'BIG SUCCESS'))
+        self.patchobject(action, 'set_status')
+        mock_load.return_value = action
+
+        ab.ActionProc(self.ctx, 'ACTION_ID')
+
+        self.assertEqual({'claim': 1.5}, action.timing)
 
     @mock.patch.object(EVENT, 'info')
     @mock.patch.object(ab.Action, 'load')
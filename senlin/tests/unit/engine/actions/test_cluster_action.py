@@ -155,7 +155,8 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_action.assert_called_once_with(action.context, 'NODE_ID',
                                             'NODE_CREATE',
                                             name='node_create_NODE_ID',
-                                            cause='Derived Action')
+                                            cause='Derived Action',
+                                            data={'cluster_id': 'CLUSTER_ID'})
         mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
                                          'CLUSTER_ACTION_ID')
         mock_update.assert_called_once_with(
@@ -363,10 +364,8 @@ class ClusterActionTest(base.SenlinTestCase):
 
     @mock.patch.object(ca.ClusterAction, '_update_nodes')
     def test_do_update_multi(self, mock_update, mock_load):
-        node1 = mock.Mock(id='fake id 1')
-        node2 = mock.Mock(id='fake id 2')
-        cluster = mock.Mock(id='FAKE_ID', nodes=[node1, node2],
-                            ACTIVE='ACTIVE')
+        cluster = mock.Mock(id='FAKE_ID', ACTIVE='ACTIVE')
+        cluster.node_ids.return_value = ['fake id 1', 'fake id 2']
         mock_load.return_value = cluster
 
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
@@ -380,14 +379,12 @@ class ClusterActionTest(base.SenlinTestCase):
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual(reason, res_msg)
         mock_update.assert_called_once_with('FAKE_PROFILE',
-                                            [node1, node2])
+                                            ['fake id 1', 'fake id 2'])
 
     @mock.patch.object(ca.ClusterAction, '_update_nodes')
     def test_do_update_multi_failed(self, mock_update, mock_load):
-        node1 = mock.Mock(id='fake id 1')
-        node2 = mock.Mock(id='fake id 2')
-        cluster = mock.Mock(id='FAKE_ID', nodes=[node1, node2],
-                            ACTIVE='ACTIVE')
+        cluster = mock.Mock(id='FAKE_ID', ACTIVE='ACTIVE')
+        cluster.node_ids.return_value = ['fake id 1', 'fake id 2']
         mock_load.return_value = cluster
 
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
@@ -401,10 +398,11 @@ class ClusterActionTest(base.SenlinTestCase):
         self.assertEqual(action.RES_ERROR, res_code)
         self.assertEqual(reason, res_msg)
         mock_update.assert_called_once_with('FAKE_PROFILE',
-                                            [node1, node2])
+                                            ['fake id 1', 'fake id 2'])
 
     def test_do_update_not_profile(self, mock_load):
-        cluster = mock.Mock(id='FAKE_ID', nodes=[], ACTIVE='ACTIVE')
+        cluster = mock.Mock(id='FAKE_ID', ACTIVE='ACTIVE')
+        cluster.node_ids.return_value = []
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.inputs = {}
@@ -416,7 +414,8 @@ class ClusterActionTest(base.SenlinTestCase):
             action.context, consts.CLUSTER_UPDATE, updated_at=mock.ANY)
 
     def test_do_update_empty_cluster(self, mock_load):
-        cluster = mock.Mock(id='FAKE_ID', nodes=[], ACTIVE='ACTIVE')
+        cluster = mock.Mock(id='FAKE_ID', ACTIVE='ACTIVE')
+        cluster.node_ids.return_value = []
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.inputs = {'new_profile_id': 'FAKE_PROFILE'}
@@ -451,7 +450,7 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_action.side_effect = ['NODE_ACTION1', 'NODE_ACTION2']
 
         res_code, reason = action._update_nodes('FAKE_PROFILE',
-                                                [node1, node2])
+                                                [node1.id, node2.id])
         self.assertEqual(res_code, action.RES_OK)
         self.assertEqual(reason, 'Cluster update completed.')
         self.assertEqual(2, mock_action.call_count)
@@ -490,7 +489,7 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_action.side_effect = ['NODE_ACTION1', 'NODE_ACTION2']
 
         res_code, reason = action._update_nodes('FAKE_PROFILE',
-                                                [node1, node2])
+                                                [node1.id, node2.id])
         self.assertEqual(res_code, action.RES_OK)
         self.assertEqual(reason, 'Cluster update completed.')
         self.assertEqual(2, mock_action.call_count)
@@ -522,7 +521,7 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_action.side_effect = ['NODE_ACTION1', 'NODE_ACTION2']
 
         res_code, reason = action._update_nodes('FAKE_PROFILE',
-                                                [node1, node2])
+                                                [node1.id, node2.id])
         self.assertEqual(res_code, action.RES_ERROR)
         self.assertEqual(reason, 'Failed in updating nodes.')
         self.assertEqual(2, mock_action.call_count)
@@ -558,7 +557,8 @@ class ClusterActionTest(base.SenlinTestCase):
         self.assertEqual('All dependents completed', res_msg)
         mock_action.assert_called_once_with(
             action.context, 'NODE_ID', 'NODE_DELETE',
-            name='node_delete_NODE_ID', cause='Derived Action')
+            name='node_delete_NODE_ID', cause='Derived Action',
+            data={'cluster_id': 'FAKE_CLUSTER'})
         mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
                                          'CLUSTER_ACTION_ID')
         mock_update.assert_called_once_with(action.context, 'NODE_ACTION_ID',
@@ -649,7 +649,8 @@ class ClusterActionTest(base.SenlinTestCase):
         self.assertEqual('All dependents completed', res_msg)
         mock_action.assert_called_once_with(
             action.context, 'NODE_ID', 'NODE_LEAVE',
-            name='node_delete_NODE_ID', cause='Derived Action')
+            name='node_delete_NODE_ID', cause='Derived Action',
+            data={'cluster_id': 'CLUSTER_ID'})
 
     @mock.patch.object(ao.Action, 'update')
     @mock.patch.object(ab.Action, 'create')
@@ -678,10 +679,8 @@ class ClusterActionTest(base.SenlinTestCase):
         self.assertEqual({}, action.data)
 
     def test_do_delete_success(self, mock_load):
-        node1 = mock.Mock(id='NODE_1')
-        node2 = mock.Mock(id='NODE_2')
-        cluster = mock.Mock(id='FAKE_CLUSTER', nodes=[node1, node2],
-                            DELETING='DELETING')
+        cluster = mock.Mock(id='FAKE_CLUSTER', DELETING='DELETING')
+        cluster.node_ids.return_value = ['NODE_1', 'NODE_2']
         cluster.do_delete.return_value = True
         mock_load.return_value = cluster
 
@@ -704,10 +703,8 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.do_delete.assert_called_once_with(action.context)
 
     def test_do_delete_with_batch_policy(self, mock_load):
-        node1 = mock.Mock(id='NODE_1')
-        node2 = mock.Mock(id='NODE_2')
-        cluster = mock.Mock(id='FAKE_CLUSTER', nodes=[node1, node2],
-                            DELETING='DELETING')
+        cluster = mock.Mock(id='FAKE_CLUSTER', DELETING='DELETING')
+        cluster.node_ids.return_value = ['NODE_1', 'NODE_2']
         cluster.do_delete.return_value = True
         mock_load.return_value = cluster
 
@@ -746,9 +743,9 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.do_delete.assert_called_once_with(action.context)
 
     def test_do_delete_failed_delete_nodes_timeout(self, mock_load):
-        node = mock.Mock(id='NODE_1')
-        cluster = mock.Mock(id='CID', nodes=[node], ACTIVE='ACTIVE',
-                            DELETING='DELETING', WARNING='WARNING')
+        cluster = mock.Mock(id='CID', ACTIVE='ACTIVE', DELETING='DELETING',
+                            WARNING='WARNING')
+        cluster.node_ids.return_value = ['NODE_1']
         mock_load.return_value = cluster
 
         action = ca.ClusterAction(cluster.id, 'CLUSTER_DELETE', self.ctx)
@@ -766,9 +763,9 @@ class ClusterActionTest(base.SenlinTestCase):
             action.context, consts.CLUSTER_DELETE)
 
     def test_do_delete_failed_delete_nodes_with_error(self, mock_load):
-        node = mock.Mock(id='NODE_1')
-        cluster = mock.Mock(id='CID', nodes=[node], ACTIVE='ACTIVE',
-                            DELETING='DELETING', WARNING='WARNING')
+        cluster = mock.Mock(id='CID', ACTIVE='ACTIVE', DELETING='DELETING',
+                            WARNING='WARNING')
+        cluster.node_ids.return_value = ['NODE_1']
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_DELETE', self.ctx)
         action.data = {}
@@ -785,9 +782,9 @@ class ClusterActionTest(base.SenlinTestCase):
             action.context, consts.CLUSTER_DELETE)
 
     def test_do_delete_failed_delete_nodes_with_cancel(self, mock_load):
-        node = mock.Mock(id='NODE_1')
-        cluster = mock.Mock(id='CID', nodes=[node], ACTIVE='ACTIVE',
-                            DELETING='DELETING', WARNING='WARNING')
+        cluster = mock.Mock(id='CID', ACTIVE='ACTIVE', DELETING='DELETING',
+                            WARNING='WARNING')
+        cluster.node_ids.return_value = ['NODE_1']
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_DELETE', self.ctx)
         action.data = {}
@@ -804,9 +801,9 @@ class ClusterActionTest(base.SenlinTestCase):
             action.context, consts.CLUSTER_DELETE)
 
     def test_do_delete_failed_delete_nodes_with_retry(self, mock_load):
-        node = mock.Mock(id='NODE_1')
-        cluster = mock.Mock(id='CID', nodes=[node], ACTIVE='ACTIVE',
-                            DELETING='DELETING', WARNING='WARNING')
+        cluster = mock.Mock(id='CID', ACTIVE='ACTIVE', DELETING='DELETING',
+                            WARNING='WARNING')
+        cluster.node_ids.return_value = ['NODE_1']
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_DELETE', self.ctx)
         action.data = {}
@@ -823,8 +820,8 @@ class ClusterActionTest(base.SenlinTestCase):
             action.context, consts.CLUSTER_DELETE)
 
     def test_do_delete_failed_delete_cluster(self, mock_load):
-        node = mock.Mock(id='NODE_1')
-        cluster = mock.Mock(id='CID', nodes=[node], DELETING='DELETING')
+        cluster = mock.Mock(id='CID', DELETING='DELETING')
+        cluster.node_ids.return_value = ['NODE_1']
         cluster.do_delete.return_value = False
         mock_load.return_value = cluster
 
@@ -880,7 +877,8 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_action.assert_called_once_with(
             action.context, 'NODE_1', 'NODE_JOIN',
             name='node_join_NODE_1', cause='Derived Action',
-            inputs={'cluster_id': 'CLUSTER_ID'})
+            inputs={'cluster_id': 'CLUSTER_ID'},
+            data={'cluster_id': 'CLUSTER_ID'})
         mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
                                          'CLUSTER_ACTION_ID')
         mock_update.assert_called_once_with(
@@ -941,10 +939,12 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_action.assert_has_calls([
             mock.call(action.context, 'NODE_1', 'NODE_JOIN',
                       name='node_join_NODE_1', cause='Derived Action',
-                      inputs={'cluster_id': 'CLUSTER_ID'}),
+                      inputs={'cluster_id': 'CLUSTER_ID'},
+                      data={'cluster_id': 'CLUSTER_ID'}),
             mock.call(action.context, 'NODE_2', 'NODE_JOIN',
                       name='node_join_NODE_2', cause='Derived Action',
-                      inputs={'cluster_id': 'CLUSTER_ID'})])
+                      inputs={'cluster_id': 'CLUSTER_ID'},
+                      data={'cluster_id': 'CLUSTER_ID'})])
 
         mock_dep.assert_called_once_with(
             action.context,
@@ -1089,7 +1089,8 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_action.assert_called_once_with(
             action.context, 'NODE_1', 'NODE_JOIN',
             name='node_join_NODE_1', cause='Derived Action',
-            inputs={'cluster_id': 'CLUSTER_ID'})
+            inputs={'cluster_id': 'CLUSTER_ID'},
+            data={'cluster_id': 'CLUSTER_ID'})
         mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
                                          'CLUSTER_ACTION_ID')
         mock_update.assert_called_once_with(
@@ -1143,11 +1144,13 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_action.assert_has_calls([
             mock.call(action.context, 'O_NODE_1', 'NODE_LEAVE',
                       name='node_leave_O_NODE_1',
-                      cause='Derived Action'),
+                      cause='Derived Action',
+                      data={'cluster_id': 'CLUSTER_ID'}),
             mock.call(action.context, 'R_NODE_1', 'NODE_JOIN',
                       name='node_join_R_NODE_1',
                       cause='Derived Action',
-                      inputs={'cluster_id': 'CLUSTER_ID'})])
+                      inputs={'cluster_id': 'CLUSTER_ID'},
+                      data={'cluster_id': 'CLUSTER_ID'})])
 
         mock_dep.assert_has_calls([
             mock.call(action.context,
@@ -1327,11 +1330,13 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_action.assert_has_calls([
             mock.call(action.context, 'O_NODE_1', 'NODE_LEAVE',
                       name='node_leave_O_NODE_1',
-                      cause='Derived Action'),
+                      cause='Derived Action',
+                      data={'cluster_id': 'CLUSTER_ID'}),
             mock.call(action.context, 'R_NODE_1', 'NODE_JOIN',
                       name='node_join_R_NODE_1',
                       cause='Derived Action',
-                      inputs={'cluster_id': 'CLUSTER_ID'})])
+                      inputs={'cluster_id': 'CLUSTER_ID'},
+                      data={'cluster_id': 'CLUSTER_ID'})])
 
         mock_dep.assert_has_calls([
             mock.call(action.context,
@@ -1556,7 +1561,7 @@ class ClusterActionTest(base.SenlinTestCase):
         node2 = mock.Mock(id='NODE_2')
         cluster = mock.Mock(id='FAKE_ID', status='old status',
                             status_reason='old reason')
-        cluster.nodes = [node1, node2]
+        cluster.node_ids.return_value = [node1.id, node2.id]
         cluster.do_check.return_value = True
         mock_load.return_value = cluster
         mock_action.side_effect = ['NODE_ACTION_1', 'NODE_ACTION_2']
@@ -1578,10 +1583,12 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_action.assert_has_calls([
             mock.call(action.context, 'NODE_1', 'NODE_CHECK',
                       name='node_check_NODE_1',
-                      cause=ab.CAUSE_DERIVED),
+                      cause=ab.CAUSE_DERIVED,
+                      data={'cluster_id': 'FAKE_CLUSTER'}),
             mock.call(action.context, 'NODE_2', 'NODE_CHECK',
                       name='node_check_NODE_2',
-                      cause=ab.CAUSE_DERIVED)
+                      cause=ab.CAUSE_DERIVED,
+                      data={'cluster_id': 'FAKE_CLUSTER'})
         ])
         mock_dep.assert_called_once_with(action.context,
                                          ['NODE_ACTION_1', 'NODE_ACTION_2'],
@@ -1596,8 +1603,9 @@ class ClusterActionTest(base.SenlinTestCase):
             action.context, consts.CLUSTER_CHECK)
 
     def test_do_check_cluster_empty(self, mock_load):
-        cluster = mock.Mock(id='FAKE_ID', nodes=[], status='old status',
+        cluster = mock.Mock(id='FAKE_ID', status='old status',
                             status_reason='old reason')
+        cluster.node_ids.return_value = []
         cluster.do_check.return_value = True
         mock_load.return_value = cluster
 
@@ -1623,7 +1631,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster = mock.Mock(id='CLUSTER_ID', status='old status',
                             status_reason='old reason')
         cluster.do_recover.return_value = True
-        cluster.nodes = [node]
+        cluster.node_ids.return_value = [node.id]
         mock_load.return_value = cluster
         mock_action.return_value = 'NODE_ACTION_ID'
 
@@ -1643,6 +1651,7 @@ class ClusterActionTest(base.SenlinTestCase):
             action.context, 'NODE_1', 'NODE_CHECK',
             name='node_check_NODE_1',
             cause=ab.CAUSE_DERIVED,
+            data={'cluster_id': 'FAKE_CLUSTER'},
         )
         mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
                                          'CLUSTER_ACTION_ID')
@@ -1661,12 +1670,13 @@ class ClusterActionTest(base.SenlinTestCase):
     def test_do_recover(self, mock_wait, mock_start, mock_dep, mock_action,
                         mock_update, mock_load):
         node1 = mock.Mock(id='NODE_1', cluster_id='FAKE_ID', status='ACTIVE')
-        node2 = mock.Mock(id='NODE_2', cluster_id='FAKE_ID', statu='ERROR')
+        node2 = mock.Mock(id='NODE_2', cluster_id='FAKE_ID', status='ERROR')
 
         cluster = mock.Mock(id='FAKE_ID', RECOVERING='RECOVERING')
         cluster.do_recover.return_value = True
         mock_load.return_value = cluster
-        cluster.nodes = [node1, node2]
+        mock_nodes = self.patchobject(no.Node, 'iter_all',
+                                      return_value=[node1, node2])
 
         action = ca.ClusterAction(cluster.id, 'CLUSTER_RECOVER', self.ctx)
         action.id = 'CLUSTER_ACTION_ID'
@@ -1683,11 +1693,14 @@ class ClusterActionTest(base.SenlinTestCase):
         self.assertEqual('Cluster recovery succeeded.', res_msg)
 
         cluster.do_recover.assert_called_once_with(action.context)
+        mock_nodes.assert_called_once_with(action.context,
+                                           cluster_id='FAKE_ID')
         mock_action.assert_called_once_with(
             action.context, 'NODE_2', 'NODE_RECOVER',
             name='node_recover_NODE_2',
             cause=ab.CAUSE_DERIVED,
-            inputs={}
+            inputs={},
+            data={'cluster_id': 'FAKE_ID'}
         )
         mock_dep.assert_called_once_with(action.context, ['NODE_RECOVER_ID'],
                                          'CLUSTER_ACTION_ID')
@@ -1707,7 +1720,7 @@ class ClusterActionTest(base.SenlinTestCase):
                                   mock_action, mock_update, mock_load):
         node1 = mock.Mock(id='NODE_1', cluster_id='FAKE_ID', status='ERROR')
         cluster = mock.Mock(id='FAKE_ID', RECOVERING='RECOVERING')
-        cluster.nodes = [node1]
+        self.patchobject(no.Node, 'iter_all', return_value=[node1])
         cluster.do_recover.return_value = True
         mock_load.return_value = cluster
 
@@ -1734,7 +1747,8 @@ class ClusterActionTest(base.SenlinTestCase):
             action.context, 'NODE_1', 'NODE_RECOVER',
             name='node_recover_NODE_1',
             cause=ab.CAUSE_DERIVED,
-            inputs={'operation': ['REBOOT']}
+            inputs={'operation': ['REBOOT']},
+            data={'cluster_id': 'FAKE_ID'}
         )
         mock_dep.assert_called_once_with(action.context, ['NODE_RECOVER_ID'],
                                          'CLUSTER_ACTION_ID')
@@ -1752,7 +1766,7 @@ class ClusterActionTest(base.SenlinTestCase):
 
         node1 = mock.Mock(id='NODE_1', cluster_id='FAKE_ID', status='ACTIVE')
         node2 = mock.Mock(id='NODE_2', cluster_id='FAKE_ID', status='ACTIVE')
-        cluster.nodes = [node1, node2]
+        self.patchobject(no.Node, 'iter_all', return_value=[node1, node2])
 
         action = ca.ClusterAction(cluster.id, 'CLUSTER_RECOVER', self.ctx)
 
@@ -1775,7 +1789,7 @@ class ClusterActionTest(base.SenlinTestCase):
         node = mock.Mock(id='NODE_1', cluster_id='CID', status='ERROR')
         cluster = mock.Mock(id='CID')
         cluster.do_recover.return_value = True
-        cluster.nodes = [node]
+        self.patchobject(no.Node, 'iter_all', return_value=[node])
         mock_load.return_value = cluster
         mock_action.return_value = 'NODE_ACTION_ID'
 
@@ -1795,7 +1809,8 @@ class ClusterActionTest(base.SenlinTestCase):
             action.context, 'NODE_1', 'NODE_RECOVER',
             name='node_recover_NODE_1',
             cause=ab.CAUSE_DERIVED,
-            inputs={}
+            inputs={},
+            data={'cluster_id': 'FAKE_CLUSTER'}
         )
         mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
                                          'CLUSTER_ACTION_ID')
@@ -1832,15 +1847,12 @@ class ClusterActionTest(base.SenlinTestCase):
 
     @mock.patch.object(no.Node, 'count_by_cluster')
     @mock.patch.object(ca.ClusterAction, '_update_cluster_size')
-    @mock.patch.object(scaleutils, 'nodes_by_random')
+    @mock.patch.object(no.Node, 'get_victims')
     @mock.patch.object(ca.ClusterAction, '_sleep')
     @mock.patch.object(ca.ClusterAction, '_delete_nodes')
     def test_do_resize_shrink(self, mock_delete, mock_sleep, mock_select,
                               mock_size, mock_count, mock_load):
-        cluster = mock.Mock(id='CID', nodes=[], RESIZING='RESIZING')
-        for n in range(10):
-            node = mock.Mock(id='NODE-ID-%s' % (n + 1))
-            cluster.nodes.append(node)
+        cluster = mock.Mock(id='CID', RESIZING='RESIZING')
         mock_load.return_value = cluster
         mock_count.return_value = 10
         action = ca.ClusterAction(
@@ -1862,7 +1874,9 @@ class ClusterActionTest(base.SenlinTestCase):
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('Cluster resize succeeded.', res_msg)
 
-        mock_select.assert_called_once_with(cluster.nodes, 2)
+        mock_select.assert_called_once_with(action.context, 'CID', 2,
+                                            consts.DELETE_RANDOM,
+                                            project_safe=False)
         mock_size.assert_called_once_with(8)
         mock_sleep.assert_called_once_with(2)
         mock_delete.assert_called_once_with(mock_select.return_value)
@@ -1871,7 +1885,7 @@ class ClusterActionTest(base.SenlinTestCase):
 
     @mock.patch.object(no.Node, 'count_by_cluster')
     @mock.patch.object(ca.ClusterAction, '_update_cluster_size')
-    @mock.patch.object(scaleutils, 'nodes_by_random')
+    @mock.patch.object(no.Node, 'get_victims')
     @mock.patch.object(ca.ClusterAction, '_sleep')
     @mock.patch.object(scaleutils, 'parse_resize_params')
     @mock.patch.object(ca.ClusterAction, '_delete_nodes')
@@ -1884,10 +1898,7 @@ class ClusterActionTest(base.SenlinTestCase):
             action.data = {'deletion': {'count': 1}}
             return action.RES_OK, ''
 
-        cluster = mock.Mock(id='CID', nodes=[], RESIZING='RESIZING')
-        for n in range(10):
-            node = mock.Mock(id='NODE-ID-%s' % (n + 1))
-            cluster.nodes.append(node)
+        cluster = mock.Mock(id='CID', RESIZING='RESIZING')
         mock_count.return_value = 10
         mock_load.return_value = cluster
         mock_parse.side_effect = fake_parse
@@ -1900,7 +1911,9 @@ class ClusterActionTest(base.SenlinTestCase):
 
         self.assertEqual({'deletion': {'count': 1}}, action.data)
         mock_parse.assert_called_once_with(action, cluster, 10)
-        mock_select.assert_called_once_with(cluster.nodes, 1)
+        mock_select.assert_called_once_with(action.context, 'CID', 1,
+                                            consts.DELETE_RANDOM,
+                                            project_safe=False)
         mock_size.assert_called_once_with(9)
         mock_sleep.assert_called_once_with(0)
         mock_delete.assert_called_once_with(mock_select.return_value)
@@ -2217,7 +2230,7 @@ class ClusterActionTest(base.SenlinTestCase):
         self.assertEqual(1, cluster.eval_status.call_count)
         mock_create.assert_called_once_with(2)
 
-    @mock.patch.object(scaleutils, 'nodes_by_random')
+    @mock.patch.object(no.Node, 'get_victims')
     @mock.patch.object(ca.ClusterAction, '_delete_nodes')
     @mock.patch.object(no.Node, 'count_by_cluster')
     def test_do_scale_in_no_pd_no_inputs(self, mock_count, mock_delete,
@@ -2239,7 +2252,9 @@ class ClusterActionTest(base.SenlinTestCase):
         # deleting 1 nodes
         mock_count.assert_called_once_with(action.context, 'CID')
         mock_delete.assert_called_once_with(mock.ANY)
-        mock_select.assert_called_once_with(cluster.nodes, 1)
+        mock_select.assert_called_once_with(action.context, 'CID', 1,
+                                            consts.DELETE_RANDOM,
+                                            project_safe=False)
         cluster.set_status.assert_called_once_with(
             action.context, consts.CS_RESIZING, 'Cluster scale in started.',
             desired_capacity=9)
@@ -2285,7 +2300,7 @@ class ClusterActionTest(base.SenlinTestCase):
             action.context, consts.CLUSTER_SCALE_IN)
         mock_sleep.assert_called_once_with(2)
 
-    @mock.patch.object(scaleutils, 'nodes_by_random')
+    @mock.patch.object(no.Node, 'get_victims')
     @mock.patch.object(ca.ClusterAction, '_delete_nodes')
     @mock.patch.object(no.Node, 'count_by_cluster')
     def test_do_scale_in_no_pd_with_input(self, mock_count, mock_delete,
@@ -2307,7 +2322,9 @@ class ClusterActionTest(base.SenlinTestCase):
         # deleting 3 nodes
         mock_count.assert_called_once_with(action.context, 'CID')
         mock_delete.assert_called_once_with(mock.ANY)
-        mock_select.assert_called_once_with(cluster.nodes, 3)
+        mock_select.assert_called_once_with(action.context, 'CID', 3,
+                                            consts.DELETE_RANDOM,
+                                            project_safe=False)
         cluster.set_status.assert_called_once_with(
             action.context, consts.CS_RESIZING, 'Cluster scale in started.',
             desired_capacity=8)
@@ -2363,7 +2380,7 @@ class ClusterActionTest(base.SenlinTestCase):
         self.assertEqual(0, cluster.set_status.call_count)
         self.assertEqual(0, cluster.eval_status.call_count)
 
-    @mock.patch.object(scaleutils, 'nodes_by_random')
+    @mock.patch.object(no.Node, 'get_victims')
     @mock.patch.object(ca.ClusterAction, '_delete_nodes')
     @mock.patch.object(no.Node, 'count_by_cluster')
     def test_do_scale_in_failed_delete_nodes(self, mock_count, mock_delete,
@@ -2649,6 +2666,7 @@ class ClusterActionTest(base.SenlinTestCase):
             senlin_lock.CLUSTER_SCOPE, False)
         mock_release.assert_called_once_with(
             'FAKE_CLUSTER', 'ACTION_ID', senlin_lock.CLUSTER_SCOPE)
+        self.assertIn('lock', action.timing)
 
     @mock.patch.object(senlin_lock, 'cluster_lock_acquire')
     def test_execute_failed_locking(self, mock_acquire, mock_load):
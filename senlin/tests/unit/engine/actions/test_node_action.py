@@ -393,6 +393,7 @@ class NodeActionTest(base.SenlinTestCase):
         self.assertEqual(action.RES_ERROR, res_code)
         self.assertEqual('Node update failed.', res_msg)
         node.do_update.assert_called_once_with(action.context, inputs)
+        self.assertIn('driver', action.timing)
         node.reset_mock()
 
         # Test node update success path
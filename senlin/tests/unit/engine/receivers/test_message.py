@@ -16,7 +16,6 @@ import socket
 
 from keystoneauth1 import loading as ks_loading
 from oslo_config import cfg
-from oslo_utils import uuidutils
 
 from senlin.common import exception
 from senlin.common.i18n import _
@@ -432,70 +431,26 @@ class TestMessage(base.SenlinTestCase):
         mock_kc.trust_get_by_trustor.assert_called_once_with(
             'user1', 'zaqar-trustee-user-id', 'project1')
 
-    @mock.patch.object(co.Cluster, 'get')
-    def test_find_cluster_by_uuid(self, mock_get):
+    @mock.patch.object(co.Cluster, 'find')
+    def test_find_cluster(self, mock_find):
         x_cluster = mock.Mock()
-        mock_get.return_value = x_cluster
+        mock_find.return_value = x_cluster
 
-        aid = uuidutils.generate_uuid()
         message = mmod.Message('message', None, None, id=UUID)
-        result = message._find_cluster(self.context, aid)
+        result = message._find_cluster(self.context, 'CLUSTER')
 
         self.assertEqual(x_cluster, result)
-        mock_get.assert_called_once_with(self.context, aid)
+        mock_find.assert_called_once_with(self.context, 'CLUSTER')
 
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    @mock.patch.object(co.Cluster, 'get')
-    def test_find_cluster_by_uuid_as_name(self, mock_get, mock_get_name):
-        x_cluster = mock.Mock()
-        mock_get_name.return_value = x_cluster
-        mock_get.return_value = None
-
-        aid = uuidutils.generate_uuid()
-        message = mmod.Message('message', None, None, id=UUID)
-        result = message._find_cluster(self.context, aid)
-
-        self.assertEqual(x_cluster, result)
-        mock_get.assert_called_once_with(self.context, aid)
-        mock_get_name.assert_called_once_with(self.context, aid)
-
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    def test_find_cluster_by_name(self, mock_get_name):
-        x_cluster = mock.Mock()
-        mock_get_name.return_value = x_cluster
-
-        aid = 'this-is-not-uuid'
-        message = mmod.Message('message', None, None, id=UUID)
-        result = message._find_cluster(self.context, aid)
-
-        self.assertEqual(x_cluster, result)
-        mock_get_name.assert_called_once_with(self.context, aid)
-
-    @mock.patch.object(co.Cluster, 'get_by_short_id')
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    def test_find_cluster_by_shortid(self, mock_get_name, mock_get_shortid):
-        x_cluster = mock.Mock()
-        mock_get_shortid.return_value = x_cluster
-        mock_get_name.return_value = None
-
-        aid = 'abcd-1234-abcd'
-        message = mmod.Message('message', None, None, id=UUID)
-        result = message._find_cluster(self.context, aid)
-
-        self.assertEqual(x_cluster, result)
-        mock_get_name.assert_called_once_with(self.context, aid)
-        mock_get_shortid.assert_called_once_with(self.context, aid)
-
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    def test_find_cluster_not_found(self, mock_get_name):
-        mock_get_name.return_value = None
+    @mock.patch.object(co.Cluster, 'find')
+    def test_find_cluster_not_found(self, mock_find):
+        mock_find.side_effect = exception.ResourceNotFound(type='cluster',
+                                                           id='bogus')
 
         message = mmod.Message('message', None, None, id=UUID)
         self.assertRaises(exception.ResourceNotFound, message._find_cluster,
                           self.context, 'bogus')
 
-        mock_get_name.assert_called_once_with(self.context, 'bogus')
-
     @mock.patch.object(dispatcher, 'start_action')
     @mock.patch.object(mmod.Message, '_build_action')
     @mock.patch.object(mmod.Message, 'zaqar')
@@ -12,16 +12,21 @@
 
 import mock
 from oslo_messaging.rpc import dispatcher as rpc
+from oslo_utils import timeutils
 import six
+import sqlalchemy
 
 from senlin.common import exception as exc
+from senlin.db.sqlalchemy import api as db_api
 from senlin.engine.actions import base as ab
 from senlin.engine import service
 from senlin.objects import action as ao
 from senlin.objects import cluster as co
+from senlin.objects import dependency as dobj
 from senlin.objects.requests import actions as orao
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
+from senlin.tests.unit.db import shared
 
 
 class ActionTest(base.SenlinTestCase):
@@ -32,13 +37,15 @@ class ActionTest(base.SenlinTestCase):
         self.eng = service.EngineService('host-a', 'topic-a')
         self.eng.init_tgm()
 
+    @mock.patch.object(dobj.Dependency, 'get_by_actions')
     @mock.patch.object(ao.Action, 'get_all')
-    def test_action_list(self, mock_get):
-        x_1 = mock.Mock()
+    def test_action_list(self, mock_get, mock_deps):
+        x_1 = mock.Mock(id='A1')
         x_1.to_dict.return_value = {'k': 'v1'}
-        x_2 = mock.Mock()
+        x_2 = mock.Mock(id='A2')
         x_2.to_dict.return_value = {'k': 'v2'}
         mock_get.return_value = [x_1, x_2]
+        mock_deps.return_value = {'A1': (['A2'], []), 'A2': ([], ['A1'])}
 
         req = orao.ActionListRequest()
         result = self.eng.action_list(self.ctx, req.obj_to_primitive())
@@ -46,14 +53,35 @@ class ActionTest(base.SenlinTestCase):
         self.assertEqual(expected, result)
 
         mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_deps.assert_called_once_with(self.ctx, ['A1', 'A2'])
+        x_1.to_dict.assert_called_once_with((['A2'], []))
+        x_2.to_dict.assert_called_once_with(([], ['A1']))
 
+    @mock.patch.object(dobj.Dependency, 'get_by_actions')
     @mock.patch.object(ao.Action, 'get_all')
-    def test_action_list_with_params(self, mock_get):
-        x_1 = mock.Mock()
+    def test_action_list_replica(self, mock_get, mock_deps):
+        replica = []
+        mock_get.side_effect = lambda *a, **k: replica.append(
+            db_api._REPLICA.enabled) or []
+        mock_deps.return_value = {}
+        req = orao.ActionListRequest().obj_to_primitive()
+
+        self.eng.action_list(self.ctx, req)
+        self.ctx.read_primary = True
+        self.eng.action_list(self.ctx, req)
+
+        self.assertEqual([True, False], replica)
+        self.assertFalse(db_api._REPLICA.enabled)
+
+    @mock.patch.object(dobj.Dependency, 'get_by_actions')
+    @mock.patch.object(ao.Action, 'get_all')
+    def test_action_list_with_params(self, mock_get, mock_deps):
+        x_1 = mock.Mock(id='A1')
         x_1.to_dict.return_value = {'status': 'READY'}
-        x_2 = mock.Mock()
+        x_2 = mock.Mock(id='A2')
         x_2.to_dict.return_value = {'status': 'SUCCESS'}
         mock_get.return_value = [x_1, x_2]
+        mock_deps.return_value = {'A1': ([], []), 'A2': ([], [])}
 
         req = orao.ActionListRequest(status=['READY', 'SUCCEEDED'],
                                      limit=100,
@@ -71,6 +99,38 @@ class ActionTest(base.SenlinTestCase):
                                          project_safe=True
                                          )
 
+    def test_action_list_query_count(self):
+        ids = [shared.create_action(self.ctx, name='action-%s' % i,
+                                    action='OBJECT_ACTION',
+                                    target=shared.UUID1, status='INIT',
+                                    context={}, data={},
+                                    user=self.ctx.user,
+                                    project=self.ctx.project,
+                                    created_at=timeutils.utcnow(True)).id
+               for i in range(10)]
+        db_api.dependency_add(self.ctx, ids[1:], ids[0])
+        db_api.dependency_add(self.ctx, ids[2], ids[1])
+        expected = [ao.Action.get(self.ctx, i).to_dict() for i in ids]
+
+        statements = []
+
+        def _count(conn, cursor, statement, *args):
+            # Skip connection pings and transaction markers
+            if statement.startswith('SELECT') and statement != 'SELECT 1':
+                statements.append(statement)
+
+        engine = db_api.get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', _count)
+        self.addCleanup(sqlalchemy.event.remove, engine,
+                        'before_cursor_execute', _count)
+
+        req = orao.ActionListRequest()
+        result = self.eng.action_list(self.ctx, req.obj_to_primitive())
+
+        # One query for the actions and one for all their dependencies
+        self.assertEqual(2, len(statements), statements)
+        self.assertEqual(expected, result)
+
     def test_action_list_with_bad_params(self):
         req = orao.ActionListRequest(project_safe=False)
         ex = self.assertRaises(rpc.ExpectedException,
@@ -160,6 +220,111 @@ class ActionTest(base.SenlinTestCase):
         self.assertEqual(exc.ResourceNotFound, ex.exc_info[0])
         mock_find.assert_called_once_with(self.ctx, 'Bogus')
 
+    @mock.patch.object(ao.Action, 'update')
+    @mock.patch.object(ao.Action, 'find')
+    def test_action_update(self, mock_find, mock_update):
+        x_obj = mock.Mock(id='ACTION_ID', status='READY')
+        x_obj.to_dict.return_value = {'k': 'v'}
+        mock_find.return_value = x_obj
+
+        req = orao.ActionUpdateRequest(identity='A1', priority=90)
+        result = self.eng.action_update(self.ctx, req.obj_to_primitive())
+
+        self.assertEqual({'k': 'v'}, result)
+        self.assertEqual(90, x_obj.priority)
+        mock_find.assert_called_once_with(self.ctx, 'A1')
+        mock_update.assert_called_once_with(self.ctx, 'ACTION_ID',
+                                            {'priority': 90})
+
+    @mock.patch.object(ao.Action, 'update')
+    @mock.patch.object(ao.Action, 'find')
+    def test_action_update_started(self, mock_find, mock_update):
+        mock_find.return_value = mock.Mock(id='ACTION_ID', status='RUNNING')
+
+        req = orao.ActionUpdateRequest(identity='A1', priority=90)
+        ex = self.assertRaises(rpc.ExpectedException,
+                               self.eng.action_update,
+                               self.ctx, req.obj_to_primitive())
+
+        self.assertEqual(exc.BadRequest, ex.exc_info[0])
+        self.assertEqual("The request is malformed: The priority of an "
+                         "action in status RUNNING cannot be changed.",
+                         six.text_type(ex.exc_info[1]))
+        self.assertEqual(0, mock_update.call_count)
+
+    @mock.patch.object(ao.Action, 'find')
+    def test_action_update_out_of_range(self, mock_find):
+        req = orao.ActionUpdateRequest(identity='A1', priority=101)
+        ex = self.assertRaises(rpc.ExpectedException,
+                               self.eng.action_update,
+                               self.ctx, req.obj_to_primitive())
+
+        self.assertEqual(exc.BadRequest, ex.exc_info[0])
+        self.assertEqual("The request is malformed: The priority must be "
+                         "between 0 and 100.", six.text_type(ex.exc_info[1]))
+        self.assertEqual(0, mock_find.call_count)
+
+    @mock.patch.object(ao.Action, 'get_timing')
+    def test_action_timing(self, mock_get):
+        self.patchobject(ab, 'wallclock', return_value=4600.0)
+        mock_get.return_value = [
+            ('NODE_CREATE', {'lock': 0.1, 'driver': 2.0}),
+            ('NODE_CREATE', {'driver': 1.0}),
+            ('CLUSTER_SCALE_OUT', {'lock': 0.2, 'wait': 3.0}),
+        ]
+
+        req = orao.ActionTimingRequest()
+        result = self.eng.action_timing(self.ctx, req.obj_to_primitive())
+
+        self.assertEqual({
+            'NODE_CREATE': {
+                'count': 2,
+                'phases': {
+                    'lock': {'count': 1, 'total': 0.1, 'max': 0.1,
+                             'mean': 0.1},
+                    'driver': {'count': 2, 'total': 3.0, 'max': 2.0,
+                               'mean': 1.5},
+                },
+            },
+            'CLUSTER_SCALE_OUT': {
+                'count': 1,
+                'phases': {
+                    'lock': {'count': 1, 'total': 0.2, 'max': 0.2,
+                             'mean': 0.2},
+                    'wait': {'count': 1, 'total': 3.0, 'max': 3.0,
+                             'mean': 3.0},
+                },
+            },
+        }, result)
+        mock_get.assert_called_once_with(self.ctx, since=1000.0, limit=1000,
+                                         project_safe=True)
+
+    @mock.patch.object(ao.Action, 'get_timing')
+    @mock.patch.object(co.Cluster, 'find')
+    def test_action_timing_with_params(self, mock_find, mock_get):
+        self.patchobject(ab, 'wallclock', return_value=4600.0)
+        mock_find.return_value = mock.Mock(id='CLUSTER_ID')
+        mock_get.return_value = []
+
+        req = orao.ActionTimingRequest(cluster='c1',
+                                       action=['NODE_CREATE'],
+                                       since=600, limit=10)
+        result = self.eng.action_timing(self.ctx, req.obj_to_primitive())
+
+        self.assertEqual({}, result)
+        mock_find.assert_called_once_with(self.ctx, 'c1')
+        mock_get.assert_called_once_with(self.ctx, since=4000.0, limit=10,
+                                         project_safe=True,
+                                         cluster_id='CLUSTER_ID',
+                                         actions=['NODE_CREATE'])
+
+    def test_action_timing_forbidden(self):
+        req = orao.ActionTimingRequest(project_safe=False)
+        ex = self.assertRaises(rpc.ExpectedException,
+                               self.eng.action_timing,
+                               self.ctx, req.obj_to_primitive())
+        self.assertEqual(exc.Forbidden, ex.exc_info[0])
+
     @mock.patch.object(ab.Action, 'delete')
     @mock.patch.object(ao.Action, 'find')
     def test_action_delete(self, mock_find, mock_delete):
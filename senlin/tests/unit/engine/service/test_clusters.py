@@ -21,6 +21,7 @@ from senlin.common import exception as exc
 from senlin.common.i18n import _
 from senlin.common import scaleutils as su
 from senlin.common import utils as common_utils
+from senlin.db import api as db_api
 from senlin.engine.actions import base as am
 from senlin.engine import cluster as cm
 from senlin.engine import dispatcher
@@ -78,6 +79,7 @@ class ClusterTest(base.SenlinTestCase):
         req_obj = mock.Mock()
         for k, v in req.items():
             setattr(req_obj, k, v)
+        req_obj.obj_attr_is_set.side_effect = lambda k: k in req
         req_base.obj_from_primitive.return_value = req_obj
 
     @mock.patch.object(cm.Cluster, 'load_all')
@@ -116,6 +118,40 @@ class ClusterTest(base.SenlinTestCase):
             filters={'name': ['test_cluster'], 'status': ['ACTIVE']},
             project_safe=True)
 
+    @mock.patch.object(db_api, 'encode_cursor')
+    @mock.patch.object(cm.Cluster, 'load_all')
+    def test_cluster_list2_with_cursor(self, mock_load, mock_encode):
+        x_obj_1 = mock.Mock()
+        x_obj_1.to_dict.return_value = {'k': 'v1'}
+        x_obj_2 = mock.Mock()
+        x_obj_2.to_dict.return_value = {'k': 'v2'}
+        mock_load.return_value = [x_obj_1, x_obj_2]
+        mock_encode.return_value = 'NEXT'
+        req = orco.ClusterListRequest(limit=2, cursor='CURSOR',
+                                      sort='name', project_safe=True)
+
+        result = self.eng.cluster_list2(self.ctx, req.obj_to_primitive())
+
+        self.assertEqual({'items': [{'k': 'v1'}, {'k': 'v2'}],
+                          'next': 'NEXT'}, result)
+        mock_load.assert_called_once_with(self.ctx, limit=2, cursor='CURSOR',
+                                          sort='name', project_safe=True)
+        mock_encode.assert_called_once_with(x_obj_2, 'name',
+                                            consts.CLUSTER_INIT_AT)
+
+    @mock.patch.object(cm.Cluster, 'load_all')
+    def test_cluster_list2_with_cursor_last_page(self, mock_load):
+        x_obj = mock.Mock()
+        x_obj.to_dict.return_value = {'k': 'v1'}
+        mock_load.return_value = [x_obj]
+        req = orco.ClusterListRequest(limit=2, cursor=None, project_safe=True)
+
+        result = self.eng.cluster_list2(self.ctx, req.obj_to_primitive())
+
+        self.assertEqual({'items': [{'k': 'v1'}], 'next': None}, result)
+        mock_load.assert_called_once_with(self.ctx, limit=2, cursor=None,
+                                          project_safe=True)
+
     @mock.patch.object(service.EngineService, 'check_cluster_quota')
     @mock.patch.object(su, 'check_size_params')
     @mock.patch.object(am.Action, 'create')
@@ -22,6 +22,7 @@ from senlin.engine import cluster_policy as cpm
 from senlin.engine import node as node_mod
 from senlin.objects import cluster as co
 from senlin.objects import cluster_policy as cpo
+from senlin.objects import node as no
 from senlin.policies import base as pcb
 from senlin.profiles import base as pfb
 from senlin.tests.unit.common import base
@@ -104,9 +105,7 @@ class TestCluster(base.SenlinTestCase):
 
         rt = cluster.rt
         self.assertEqual(x_profile, rt['profile'])
-        self.assertEqual([x_node_1, x_node_2], rt['nodes'])
-        self.assertEqual(2, len(rt['nodes']))
-        self.assertTrue(isinstance(rt['nodes'], list))
+        self.assertNotIn('nodes', rt)
         self.assertEqual([x_policy], rt['policies'])
 
         mock_pb.assert_called_once_with(self.context, CLUSTER_ID)
@@ -114,6 +113,12 @@ class TestCluster(base.SenlinTestCase):
         mock_profile.assert_called_once_with(self.context,
                                              profile_id=PROFILE_ID,
                                              project_safe=False)
+        self.assertEqual(0, mock_nodes.call_count)
+
+        # nodes are loaded when first accessed
+        self.assertEqual([x_node_1, x_node_2], cluster.nodes)
+        self.assertEqual([x_node_1, x_node_2], cluster.nodes)
+        self.assertTrue(isinstance(rt['nodes'], list))
         mock_nodes.assert_called_once_with(self.context,
                                            cluster_id=CLUSTER_ID)
 
@@ -203,6 +208,65 @@ class TestCluster(base.SenlinTestCase):
         self.assertEqual({'FOO': 'BAR'}, result.data)
         self.assertEqual({'KEY': 'VALUE'}, result.metadata)
 
+    @mock.patch.object(co.Cluster, 'update')
+    def test_store_changed_only(self, mock_update):
+        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID,
+                             user=self.context.user,
+                             project=self.context.project)
+        self.patchobject(cm.Cluster, '_load_runtime_data')
+        cluster_id = cluster.store(self.context)
+        cluster = cm.Cluster.load(self.context, cluster_id)
+
+        cluster.desired_capacity = 2
+        cluster.data['FOO'] = 'BAR'
+        cluster.store(self.context)
+
+        mock_update.assert_called_once_with(
+            self.context, cluster_id,
+            {'desired_capacity': 2, 'data': {'FOO': 'BAR'},
+             'updated_at': cluster.updated_at})
+        self.assertIsNotNone(cluster.updated_at)
+
+    @mock.patch.object(co.Cluster, 'update')
+    def test_store_unchanged(self, mock_update):
+        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID,
+                             user=self.context.user,
+                             project=self.context.project)
+        self.patchobject(cm.Cluster, '_load_runtime_data')
+        cluster_id = cluster.store(self.context)
+        cluster = cm.Cluster.load(self.context, cluster_id)
+
+        cluster.set_status(self.context, consts.CS_ACTIVE, 'Ready',
+                           desired_capacity=2)
+        mock_update.reset_mock()
+        res = cluster.store(self.context)
+
+        self.assertEqual(cluster_id, res)
+        self.assertEqual(0, mock_update.call_count)
+        self.assertIsNone(cluster.updated_at)
+
+    @mock.patch.object(co.Cluster, 'update')
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_store_after_eval_status(self, mock_count, mock_update):
+        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID,
+                             user=self.context.user,
+                             project=self.context.project)
+        self.patchobject(cm.Cluster, '_load_runtime_data')
+        cluster_id = cluster.store(self.context)
+        cluster = cm.Cluster.load(self.context, cluster_id)
+        mock_count.return_value = {}
+
+        cluster.eval_status(self.context, 'TEST', desired_capacity=1)
+        mock_update.reset_mock()
+        cluster.store(self.context)
+
+        # the in-memory values overwrite the evaluated ones as before
+        mock_update.assert_called_once_with(
+            self.context, cluster_id,
+            {'desired_capacity': 0, 'status': 'INIT',
+             'status_reason': 'Initializing',
+             'updated_at': cluster.updated_at})
+
     @mock.patch.object(cm.Cluster, '_from_object')
     def test_load_via_db_object(self, mock_init):
         x_obj = mock.Mock()
@@ -253,7 +317,7 @@ class TestCluster(base.SenlinTestCase):
         mock_get.assert_called_once_with(self.context,
                                          limit=None, marker=None,
                                          sort=None, filters=None,
-                                         project_safe=True)
+                                         project_safe=True, cursor=None)
         mock_init.assert_has_calls([
             mock.call(self.context, x_obj_1),
             mock.call(self.context, x_obj_2)])
@@ -457,6 +521,24 @@ class TestCluster(base.SenlinTestCase):
 
         self.assertEqual([node1, node2], cluster.nodes)
 
+    @mock.patch.object(no.Node, 'iter_all')
+    def test_node_ids(self, mock_iter):
+        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID, id=CLUSTER_ID)
+        cluster._context = self.context
+        cluster.rt = {'profile': None, 'policies': []}
+        mock_iter.return_value = [mock.Mock(id='N1'), mock.Mock(id='N2')]
+
+        self.assertEqual(['N1', 'N2'], cluster.node_ids())
+        mock_iter.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        # the nodes are not loaded
+        self.assertNotIn('nodes', cluster.rt)
+
+    def test_node_ids_loaded(self):
+        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID)
+        cluster.rt['nodes'] = [mock.Mock(id='N1'), mock.Mock(id='N2')]
+
+        self.assertEqual(['N1', 'N2'], cluster.node_ids())
+
     def test_policies_property(self):
         cluster = cm.Cluster('test-cluster', 0, PROFILE_ID)
         self.assertEqual([], cluster.policies)
@@ -481,6 +563,16 @@ class TestCluster(base.SenlinTestCase):
         cluster.add_node(another_node)
         self.assertEqual([node, another_node], cluster.nodes)
 
+    def test_add_node_not_loaded(self):
+        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID)
+        cluster.rt = {'profile': None, 'policies': []}
+
+        cluster.add_node(mock.Mock())
+        self.assertNotIn('nodes', cluster.rt)
+
+        res = cluster.remove_node('BOGUS')
+        self.assertIsNone(res)
+
     def test_remove_node(self):
         cluster = cm.Cluster('test-cluster', 0, PROFILE_ID)
         self.assertEqual([], cluster.nodes)
@@ -731,121 +823,50 @@ class TestCluster(base.SenlinTestCase):
         self.assertTrue(res)
         self.assertEqual('No update is needed.', reason)
 
-    def test_get_region_distribution(self):
-        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID)
-
-        node1 = mock.Mock()
-        node1.data = {'placement': {'region_name': 'R1'}}
-        node2 = mock.Mock()
-        node2.data = {'placement': {'region_name': 'R2'}}
-        node3 = mock.Mock()
-        node3.data = {'key': 'value'}
+    @mock.patch.object(no.Node, 'get_records')
+    def test_get_region_distribution(self, mock_records):
+        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID, id=CLUSTER_ID)
+        mock_records.return_value = [
+            mock.Mock(placement={'region_name': 'R1'}),
+            mock.Mock(placement={'region_name': 'R2'}),
+            mock.Mock(placement={}),
+            mock.Mock(placement={'region_name': 'BAD'}),
+        ]
 
-        node4 = mock.Mock()
-        node4.data = {'placement': {'region_name': 'BAD'}}
-
-        nodes = [node1, node2, node3, node4]
-        for n in nodes:
-            cluster.add_node(n)
-
-        result = cluster.get_region_distribution(['R1', 'R2', 'R3'])
+        result = cluster.get_region_distribution(self.context,
+                                                 ['R1', 'R2', 'R3'])
 
         self.assertEqual(3, len(result))
         self.assertEqual(1, result['R1'])
         self.assertEqual(1, result['R2'])
         self.assertEqual(0, result['R3'])
+        mock_records.assert_called_once_with(self.context, CLUSTER_ID,
+                                             project_safe=False)
 
-    def test_get_zone_distribution(self):
-        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID)
-        node1 = mock.Mock()
-        node1.data = {}
-        node1.get_details.return_value = {
-            'OS-EXT-AZ:availability_zone': 'AZ1',
-        }
-        node2 = mock.Mock()
-        node2.data = {
-            'foobar': 'irrelevant'
-        }
-        node3 = mock.Mock()
-        node3.data = {
-            'placement': {
-                'zone': 'AZ2'
-            }
-        }
-
-        nodes = [node1, node2, node3]
-        for n in nodes:
-            cluster.add_node(n)
+    @mock.patch.object(no.Node, 'count_by_zone')
+    def test_get_zone_distribution(self, mock_count):
+        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID, id=CLUSTER_ID)
+        mock_count.return_value = {'AZ1': 1, 'AZ2': 2, 'AZ4': 3}
+        mock_load = self.patchobject(node_mod.Node, 'load_all')
 
         result = cluster.get_zone_distribution(self.context,
                                                ['AZ1', 'AZ2', 'AZ3'])
 
-        self.assertEqual(3, len(result))
-        self.assertEqual(1, result['AZ1'])
-        self.assertEqual(1, result['AZ2'])
-        self.assertEqual(0, result['AZ3'])
-
-        node1.get_details.assert_called_once_with(self.context)
-
-    def test_nodes_by_region(self):
-        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID)
-        node1 = mock.Mock(data={'placement': {'region_name': 'R1'}})
-        node2 = mock.Mock(data={'placement': {'region_name': 'R2'}})
-        node3 = mock.Mock(data={'key': 'value'})
-        node4 = mock.Mock(data={'placement': {'region_name': 'BAD'}})
-
-        nodes = [node1, node2, node3, node4]
-        for n in nodes:
-            cluster.add_node(n)
-
-        result = cluster.nodes_by_region('R1')
-        self.assertEqual(1, len(result))
-        self.assertEqual(node1, result[0])
-
-        result = cluster.nodes_by_region('R2')
-        self.assertEqual(1, len(result))
-        self.assertEqual(node2, result[0])
-
-        result = cluster.nodes_by_region('R3')
-        self.assertEqual(0, len(result))
-
-    def test_nodes_by_zone(self):
-        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID)
-        node1 = mock.Mock(data={'placement': {'zone': 'AZ1'}})
-        node2 = mock.Mock(data={'placement': {'zone': 'AZ2'}})
-        node3 = mock.Mock(data={'key': 'value'})
-        node4 = mock.Mock(data={'placement': {'zone': 'BAD'}})
-
-        nodes = [node1, node2, node3, node4]
-        for n in nodes:
-            cluster.add_node(n)
-
-        result = cluster.nodes_by_zone('AZ1')
-        self.assertEqual(1, len(result))
-        self.assertEqual(node1, result[0])
-
-        result = cluster.nodes_by_zone('AZ2')
-        self.assertEqual(1, len(result))
-        self.assertEqual(node2, result[0])
-
-        result = cluster.nodes_by_region('AZ3')
-        self.assertEqual(0, len(result))
+        # Nodes without a recorded zone are not looked up in the backend
+        self.assertEqual({'AZ1': 1, 'AZ2': 2, 'AZ3': 0}, result)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID,
+                                           project_safe=False)
+        self.assertEqual(0, mock_load.call_count)
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_below_min_size(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_below_min_size(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 5, PROFILE_ID,
                              min_size=2, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ERROR')
-        node3 = mock.Mock(status='WARNING')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 1, 'ERROR': 1, 'WARNING': 1}
 
         cluster.eval_status(self.context, 'TEST')
-        rt = cluster.rt
-        self.assertEqual(3, len(rt['nodes']))
-        self.assertTrue(isinstance(rt['nodes'], list))
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'status': consts.CS_ERROR,
@@ -853,18 +874,15 @@ class TestCluster(base.SenlinTestCase):
                               'min_size (2).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_below_desired_capacity(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_below_desired_capacity(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 5, PROFILE_ID,
                              min_size=1, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ERROR')
-        node3 = mock.Mock(status='WARNING')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 1, 'ERROR': 1, 'WARNING': 1}
 
         cluster.eval_status(self.context, 'TEST')
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'status': consts.CS_WARNING,
@@ -872,18 +890,15 @@ class TestCluster(base.SenlinTestCase):
                               'desired_capacity (5).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_equal_desired_capacity(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_equal_desired_capacity(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 3, PROFILE_ID,
                              min_size=1, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ACTIVE')
-        node3 = mock.Mock(status='ACTIVE')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 3}
 
         cluster.eval_status(self.context, 'TEST')
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'status': consts.CS_ACTIVE,
@@ -891,18 +906,15 @@ class TestCluster(base.SenlinTestCase):
                               'desired_capacity (3).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_above_desired_capacity(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_above_desired_capacity(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 2, PROFILE_ID,
                              min_size=1, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ACTIVE')
-        node3 = mock.Mock(status='ACTIVE')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 3}
 
         cluster.eval_status(self.context, 'TEST')
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'status': consts.CS_ACTIVE,
@@ -910,18 +922,15 @@ class TestCluster(base.SenlinTestCase):
                               'desired_capacity (2).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_above_max_size(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_above_max_size(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 2, PROFILE_ID,
                              max_size=2, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ACTIVE')
-        node3 = mock.Mock(status='ACTIVE')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 3}
 
         cluster.eval_status(self.context, 'TEST')
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'status': consts.CS_WARNING,
@@ -929,17 +938,14 @@ class TestCluster(base.SenlinTestCase):
                               'max_size (2).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_with_new_desired(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_with_new_desired(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 5, PROFILE_ID, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ERROR')
-        node3 = mock.Mock(status='WARNING')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 1, 'ERROR': 1, 'WARNING': 1}
 
         cluster.eval_status(self.context, 'TEST', desired_capacity=2)
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'desired_capacity': 2,
@@ -948,17 +954,14 @@ class TestCluster(base.SenlinTestCase):
                               'desired_capacity (2).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status__new_desired_is_zero(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status__new_desired_is_zero(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 5, PROFILE_ID, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ERROR')
-        node3 = mock.Mock(status='WARNING')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 1, 'ERROR': 1, 'WARNING': 1}
 
         cluster.eval_status(self.context, 'TEST', desired_capacity=0)
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'desired_capacity': 0,
@@ -967,18 +970,15 @@ class TestCluster(base.SenlinTestCase):
                               'desired_capacity (0).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_with_new_min(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_with_new_min(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 5, PROFILE_ID,
                              id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ERROR')
-        node3 = mock.Mock(status='WARNING')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 1, 'ERROR': 1, 'WARNING': 1}
 
         cluster.eval_status(self.context, 'TEST', min_size=2)
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'min_size': 2,
@@ -987,18 +987,15 @@ class TestCluster(base.SenlinTestCase):
                               'min_size (2).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_with_new_max(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_with_new_max(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 2, PROFILE_ID,
                              max_size=5, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ACTIVE')
-        node3 = mock.Mock(status='ACTIVE')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 3}
 
         cluster.eval_status(self.context, 'TEST', max_size=6)
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'max_size': 6,
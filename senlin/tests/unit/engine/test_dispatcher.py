@@ -10,16 +10,21 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
+
+import eventlet
 import mock
 from oslo_config import cfg
 from oslo_context import context
 import oslo_messaging
+from oslo_utils import timeutils
 
 from senlin.common import consts
 from senlin.common import messaging
 from senlin.engine import dispatcher
 from senlin.engine import scheduler
 from senlin.engine import service
+from senlin.objects import service as service_obj
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 
@@ -34,6 +39,12 @@ class TestDispatcher(base.SenlinTestCase):
         self.thm = scheduler.ThreadGroupManager()
         self.svc = service.EngineService('HOST', 'TOPIC')
         self.svc.engine_id = '1234'
+        self.patchobject(dispatcher, '_CLIENT',
+                         new={'key': None, 'client': None})
+        self.patchobject(dispatcher, '_PENDING',
+                         new={'count': 0, 'timer': None, 'rotation': 0})
+        self.patchobject(dispatcher, '_ENGINES',
+                         new={'services': None, 'expires': 0})
 
     def test_init(self):
         disp = dispatcher.Dispatcher(self.svc, 'TOPIC', '1', self.thm)
@@ -155,9 +166,232 @@ class TestDispatcher(base.SenlinTestCase):
 
         mock_context.cast.assert_called_once_with(mock.ANY, 'METHOD')
 
+    @mock.patch.object(messaging, 'get_rpc_client')
+    def test_notify_client_reused(self, mock_rpc):
+        dispatcher.notify('METHOD')
+        dispatcher.notify('METHOD', 'FAKE_ENGINE')
+
+        mock_rpc.assert_called_once_with(consts.DISPATCHER_TOPIC,
+                                         cfg.CONF.host)
+
+        self.patchobject(messaging, 'TRANSPORT', new=mock.Mock())
+        dispatcher.notify('METHOD')
+        self.assertEqual(2, mock_rpc.call_count)
+
     @mock.patch.object(dispatcher, 'notify')
     def test_start_action_function(self, mock_notify):
         dispatcher.start_action(engine_id='FAKE_ENGINE')
 
         mock_notify.assert_called_once_with(dispatcher.START_ACTION,
                                             'FAKE_ENGINE')
+
+    @mock.patch.object(dispatcher, '_flush')
+    @mock.patch.object(eventlet, 'spawn_after')
+    def test_start_action_coalesced(self, mock_spawn, mock_flush):
+        mock_spawn.return_value = mock.Mock()
+        cfg.CONF.set_override('dispatch_coalesce_window', 0.5)
+
+        self.assertTrue(dispatcher.start_action())
+        self.assertTrue(dispatcher.start_action())
+
+        mock_spawn.assert_called_once_with(0.5, dispatcher._flush,
+                                           context.get_current())
+        self.assertEqual(2, dispatcher._PENDING['count'])
+        self.assertEqual(0, mock_flush.call_count)
+
+    @mock.patch.object(dispatcher, '_flush')
+    def test_start_action_not_coalesced(self, mock_flush):
+        cfg.CONF.set_override('dispatch_coalesce_window', 0)
+
+        res = dispatcher.start_action()
+
+        self.assertEqual(mock_flush.return_value, res)
+        self.assertEqual(1, dispatcher._PENDING['count'])
+        mock_flush.assert_called_once_with()
+
+    @mock.patch.object(dispatcher, 'notify')
+    @mock.patch.object(dispatcher, '_select_engines')
+    def test_flush(self, mock_select, mock_notify):
+        dispatcher._PENDING['count'] = 3
+        dispatcher._PENDING['timer'] = mock.Mock()
+        mock_select.return_value = ['E1', 'E2']
+        mock_notify.return_value = True
+
+        self.assertTrue(dispatcher._flush())
+
+        mock_select.assert_called_once_with(3)
+        mock_notify.assert_has_calls([
+            mock.call(dispatcher.START_ACTION, 'E1'),
+            mock.call(dispatcher.START_ACTION, 'E2')])
+        self.assertEqual(0, dispatcher._PENDING['count'])
+        self.assertIsNone(dispatcher._PENDING['timer'])
+
+    def _stub_rpc_client(self):
+        sent = []
+
+        def cast(ctxt, method, **kwargs):
+            # Serialized as the RPC client does before sending
+            sent.append((messaging.RequestContextSerializer.serialize_context(
+                ctxt), method))
+
+        client = mock.Mock()
+        client.prepare.return_value.cast.side_effect = cast
+        self.patchobject(messaging, 'get_rpc_client', return_value=client)
+        return sent
+
+    @mock.patch.object(dispatcher, '_select_engines')
+    def test_flush_in_timer(self, mock_select):
+        mock_select.return_value = ['E1']
+        sent = self._stub_rpc_client()
+        cfg.CONF.set_override('dispatch_coalesce_window', 0.01)
+        # The context of the caller, unknown to the timer thread
+        ctx = utils.dummy_context()
+
+        self.assertTrue(dispatcher.start_action())
+        dispatcher._PENDING['timer'].wait()
+
+        self.assertEqual(1, len(sent))
+        ctxt, method = sent[0]
+        self.assertEqual(dispatcher.START_ACTION, method)
+        self.assertEqual(ctx.request_id, ctxt['request_id'])
+
+    @mock.patch.object(dispatcher, '_select_engines')
+    def test_flush_no_context(self, mock_select):
+        mock_select.return_value = []
+        sent = self._stub_rpc_client()
+        self.patchobject(context, 'get_current', return_value=None)
+
+        self.assertTrue(dispatcher._flush())
+
+        self.assertEqual(1, len(sent))
+        ctxt, method = sent[0]
+        self.assertEqual(dispatcher.START_ACTION, method)
+        self.assertTrue(ctxt['is_admin'])
+
+    @mock.patch.object(dispatcher, 'notify')
+    @mock.patch.object(dispatcher, '_select_engines')
+    def test_flush_broadcast(self, mock_select, mock_notify):
+        mock_select.side_effect = Exception('boom')
+
+        dispatcher._flush()
+
+        mock_notify.assert_called_once_with(dispatcher.START_ACTION)
+        self.assertIn('Failed selecting engines to notify: boom',
+                      self.LOG.output)
+
+    @mock.patch.object(service_obj.Service, 'get_all')
+    def test_select_engines(self, mock_get):
+        now = timeutils.utcnow(True)
+        old = now - datetime.timedelta(seconds=3600)
+        engine = 'senlin-engine'
+        mock_get.return_value = [
+            mock.Mock(id='E1', binary=engine, disabled=False, capacity=2,
+                      updated_at=now),
+            mock.Mock(id='E2', binary=engine, disabled=False, capacity=5,
+                      updated_at=now),
+            mock.Mock(id='E3', binary=engine, disabled=False, capacity=0,
+                      updated_at=now),
+            mock.Mock(id='E4', binary=engine, disabled=False, capacity=9,
+                      updated_at=old),
+            mock.Mock(id='E5', binary=engine, disabled=True, capacity=9,
+                      updated_at=now),
+        ]
+
+        # One more engine is notified as a fallback
+        self.assertEqual(['E2', 'E1'], dispatcher._select_engines(1))
+        self.assertEqual(['E2', 'E1'], dispatcher._select_engines(6))
+        self.assertEqual(['E2', 'E1'], dispatcher._select_engines(100))
+
+    @mock.patch.object(service_obj.Service, 'get_all')
+    def test_select_engines_round_robin(self, mock_get):
+        now = timeutils.utcnow(True)
+        mock_get.return_value = [
+            mock.Mock(id='E%s' % i, binary='senlin-engine', disabled=False,
+                      capacity=3, updated_at=now)
+            for i in range(3)]
+
+        selected = [dispatcher._select_engines(1) for i in range(3)]
+
+        self.assertEqual([['E1', 'E2'], ['E2', 'E0'], ['E0', 'E1']],
+                         selected)
+
+    @mock.patch.object(service_obj.Service, 'get_all')
+    def test_select_engines_no_capacity(self, mock_get):
+        now = timeutils.utcnow(True)
+        mock_get.return_value = [
+            mock.Mock(id='E%s' % i, binary='senlin-engine', disabled=False,
+                      capacity=None, updated_at=now)
+            for i in range(3)]
+
+        # Engines with no bound on actions are notified by a broadcast
+        self.assertEqual([], dispatcher._select_engines(1))
+
+    @mock.patch.object(service_obj.Service, 'get_all')
+    def test_select_engines_some_capacity(self, mock_get):
+        now = timeutils.utcnow(True)
+        engine = 'senlin-engine'
+        mock_get.return_value = [
+            mock.Mock(id='E1', binary=engine, disabled=False, capacity=None,
+                      updated_at=now),
+            mock.Mock(id='E2', binary=engine, disabled=False, capacity=5,
+                      updated_at=now),
+            mock.Mock(id='E3', binary=engine, disabled=False, capacity=None,
+                      updated_at=now),
+            mock.Mock(id='E4', binary=engine, disabled=False, capacity=0,
+                      updated_at=now),
+        ]
+
+        self.assertEqual(['E3', 'E1', 'E2'], dispatcher._select_engines(1))
+
+    @mock.patch.object(dispatcher, 'notify')
+    @mock.patch.object(service_obj.Service, 'get_all')
+    def test_flush_picked_engine_not_listening(self, mock_get, mock_notify):
+        now = timeutils.utcnow(True)
+        engine = 'senlin-engine'
+        # E1 is still in its reporting window but no longer consumes
+        # notifications
+        mock_get.return_value = [
+            mock.Mock(id='E1', binary=engine, disabled=False, capacity=5,
+                      updated_at=now),
+            mock.Mock(id='E2', binary=engine, disabled=False, capacity=2,
+                      updated_at=now),
+        ]
+        consumed = []
+
+        def notify(method, engine_id=None, **kwargs):
+            if engine_id != 'E1':
+                consumed.append(engine_id)
+            return True
+
+        mock_notify.side_effect = notify
+        dispatcher._PENDING['count'] = 1
+
+        self.assertTrue(dispatcher._flush())
+
+        self.assertEqual(['E2'], consumed)
+
+    @mock.patch.object(service_obj.Service, 'get_all')
+    def test_select_engines_none(self, mock_get):
+        mock_get.return_value = []
+
+        self.assertEqual([], dispatcher._select_engines(1))
+
+    @mock.patch.object(timeutils, 'utcnow_ts')
+    @mock.patch.object(service_obj.Service, 'get_all')
+    def test_select_engines_cached(self, mock_get, mock_now):
+        cfg.CONF.set_override('periodic_interval', 60, enforce_type=True)
+        mock_now.return_value = 1000.0
+        mock_get.return_value = [
+            mock.Mock(id='E1', binary='senlin-engine', disabled=False,
+                      capacity=1, updated_at=timeutils.utcnow(True))]
+
+        self.assertEqual(['E1'], dispatcher._select_engines(1))
+        mock_now.return_value = 1059.0
+        self.assertEqual(['E1'], dispatcher._select_engines(1))
+        self.assertEqual(1, mock_get.call_count)
+
+        # The records are read again after one periodic interval
+        mock_get.return_value = []
+        mock_now.return_value = 1060.0
+        self.assertEqual([], dispatcher._select_engines(1))
+        self.assertEqual(2, mock_get.call_count)
@@ -20,7 +20,9 @@ from oslo_utils import uuidutils
 from senlin.common import consts
 from senlin.common import context
 from senlin.common import messaging as rpc_messaging
+from senlin.common import metrics
 from senlin.engine import service
+from senlin.objects import action as action_obj
 from senlin.objects import service as service_obj
 from senlin.tests.unit.common import base
 
@@ -123,6 +125,8 @@ class EngineStatusTest(base.SenlinTestCase):
     def setUp(self):
         super(EngineStatusTest, self).setUp()
         self.eng = service.EngineService('host-a', 'topic-a')
+        self.eng.TG = mock.Mock()
+        self.eng.TG.capacity.return_value = 5
         fake_id = '4db0a14c-dc10-4131-8ed6-7573987ce9b0'
         self.gen_id = self.patchobject(uuidutils, 'generate_uuid',
                                        return_value=fake_id)
@@ -146,16 +150,69 @@ class EngineStatusTest(base.SenlinTestCase):
     def test_service_manage_report_update(self, mock_update):
         mock_update.return_value = mock.Mock()
         self.eng.service_manage_report()
-        mock_update.assert_called_once_with(mock.ANY, self.eng.engine_id)
+        mock_update.assert_called_once_with(mock.ANY, self.eng.engine_id,
+                                            {'capacity': 5})
 
     @mock.patch.object(service_obj.Service, 'update')
     def test_service_manage_report_error(self, mock_update):
         mock_update.side_effect = [Exception]
         self.eng.service_manage_report()
-        mock_update.assert_called_once_with(mock.ANY, self.eng.engine_id)
+        mock_update.assert_called_once_with(mock.ANY, self.eng.engine_id,
+                                            {'capacity': 5})
         expect_str = 'Service %s update failed' % self.eng.engine_id
         self.assertIn(expect_str, self.LOG.output)
 
+    @mock.patch.object(metrics.ACTIONS, 'set')
+    @mock.patch.object(action_obj.Action, 'count_by_status')
+    @mock.patch.object(metrics.PROJECT_ACTIONS, 'set')
+    @mock.patch.object(metrics.PROJECT_ACTIONS, 'clear')
+    @mock.patch.object(action_obj.Action, 'count_by_project')
+    def test_sample_metrics(self, mock_project, mock_clear, mock_project_set,
+                            mock_count, mock_set):
+        mock_count.return_value = {'READY': 3, 'RUNNING': 1}
+        mock_project.return_value = {('P1', 'READY'): 3}
+
+        self.eng.sample_metrics()
+
+        mock_count.assert_called_once_with(
+            mock.ANY, [consts.ACTION_READY, consts.ACTION_WAITING,
+                       consts.ACTION_RUNNING])
+        mock_set.assert_has_calls([mock.call(3, status='READY'),
+                                   mock.call(0, status='WAITING'),
+                                   mock.call(1, status='RUNNING')])
+        mock_project.assert_called_once_with(
+            mock.ANY, [consts.ACTION_READY, consts.ACTION_RUNNING])
+        mock_clear.assert_called_once_with()
+        mock_project_set.assert_called_once_with(3, project='P1',
+                                                 status='READY')
+
+    @mock.patch.object(action_obj.Action, 'purge_contexts')
+    def test_purge_action_contexts(self, mock_purge):
+        mock_purge.return_value = 2
+
+        self.eng.purge_action_contexts()
+
+        mock_purge.assert_called_once_with(mock.ANY)
+
+    @mock.patch.object(action_obj.Action, 'purge_contexts')
+    def test_purge_action_contexts_error(self, mock_purge):
+        mock_purge.side_effect = Exception('boom')
+
+        self.eng.purge_action_contexts()
+
+        self.assertIn('Failed purging action contexts: boom',
+                      self.LOG.output)
+
+    @mock.patch.object(metrics.ACTIONS, 'set')
+    @mock.patch.object(action_obj.Action, 'count_by_status')
+    def test_sample_metrics_error(self, mock_count, mock_set):
+        mock_count.side_effect = Exception('boom')
+
+        self.eng.sample_metrics()
+
+        self.assertEqual(0, mock_set.call_count)
+        self.assertIn('Failed sampling metrics: boom', self.LOG.output)
+
     @mock.patch.object(service_obj.Service, 'get_all')
     @mock.patch.object(service_obj.Service, 'delete')
     def test__service_manage_cleanup(self, mock_delete, mock_get_all):
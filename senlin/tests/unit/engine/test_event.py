@@ -88,6 +88,21 @@ class TestEvent(testtools.TestCase):
         finally:
             event.dispatchers = saved_dispathers
 
+    def test__dump_with_extra(self):
+        cfg.CONF.set_override('debug', True, enforce_type=True)
+        saved_dispathers = event.dispatchers
+        event.dispatchers = mock.Mock()
+        action = mock.Mock()
+        try:
+            event._dump(logging.INFO, action, 'Phase1', 'Reason1', 'TS1',
+                        {'timing': {'lock': 0.1}})
+            event.dispatchers.map_method.assert_called_once_with(
+                'dump', logging.INFO, action,
+                phase='Phase1', reason='Reason1', timestamp='TS1',
+                extra={'timing': {'lock': 0.1}})
+        finally:
+            event.dispatchers = saved_dispathers
+
     def test__dump_without_timestamp(self):
         cfg.CONF.set_override('debug', True, enforce_type=True)
         saved_dispathers = event.dispatchers
@@ -132,6 +147,28 @@ class TestEvent(testtools.TestCase):
         finally:
             event.dispatchers = saved_dispathers
 
+    @mock.patch.object(event.db_api, 'after_commit')
+    @mock.patch.object(event.db_api, 'in_unit_of_work', return_value=True)
+    @mock.patch.object(event, 'dispatchers', new_callable=mock.MagicMock)
+    def test__dump_in_unit_of_work(self, dispatchers, mock_in_unit,
+                                   mock_after):
+        cfg.CONF.set_override('debug', True, enforce_type=True)
+        dispatchers.names.return_value = ['database', 'message']
+        action = mock.Mock()
+
+        event._dump(logging.INFO, action, 'Phase1', 'Reason1', 'TS1')
+
+        # Only the database dispatcher is called within the transaction
+        dispatchers.__getitem__.assert_called_once_with('database')
+        db_dispatcher = dispatchers.__getitem__.return_value.obj
+        db_dispatcher.dump.assert_called_once_with(
+            logging.INFO, action,
+            phase='Phase1', reason='Reason1', timestamp='TS1')
+        mock_after.assert_called_once_with(
+            event._dispatch, ['message'], logging.INFO, action,
+            phase='Phase1', reason='Reason1', timestamp='TS1')
+        self.assertEqual(0, dispatchers.map_method.call_count)
+
 
 @mock.patch.object(event, '_dump')
 class TestLogMethods(testtools.TestCase):
@@ -145,7 +182,7 @@ class TestLogMethods(testtools.TestCase):
 
         self.assertIsNone(res)
         mock_dump.assert_called_once_with(logging.CRITICAL, action,
-                                          'P1', 'R1', 'TS1')
+                                          'P1', 'R1', 'TS1', None)
 
     def test_error(self, mock_dump):
         entity = mock.Mock(id='1234567890')
@@ -156,7 +193,7 @@ class TestLogMethods(testtools.TestCase):
 
         self.assertIsNone(res)
         mock_dump.assert_called_once_with(logging.ERROR, action,
-                                          'P1', 'R1', 'TS1')
+                                          'P1', 'R1', 'TS1', None)
 
     def test_warning(self, mock_dump):
         entity = mock.Mock(id='1234567890')
@@ -167,7 +204,7 @@ class TestLogMethods(testtools.TestCase):
 
         self.assertIsNone(res)
         mock_dump.assert_called_once_with(logging.WARNING, action,
-                                          'P1', 'R1', 'TS1')
+                                          'P1', 'R1', 'TS1', None)
 
     def test_info(self, mock_dump):
         entity = mock.Mock(id='1234567890')
@@ -178,7 +215,7 @@ class TestLogMethods(testtools.TestCase):
 
         self.assertIsNone(res)
         mock_dump.assert_called_once_with(logging.INFO, action,
-                                          'P1', 'R1', 'TS1')
+                                          'P1', 'R1', 'TS1', None)
 
     def test_debug(self, mock_dump):
         entity = mock.Mock(id='1234567890')
@@ -189,4 +226,4 @@ class TestLogMethods(testtools.TestCase):
 
         self.assertIsNone(res)
         mock_dump.assert_called_once_with(logging.DEBUG, action,
-                                          'P1', 'R1', 'TS1')
+                                          'P1', 'R1', 'TS1', None)
@@ -14,13 +14,18 @@ import copy
 
 import mock
 from oslo_config import cfg
+from oslo_utils import timeutils
 
 from senlin.common import consts
 from senlin.common import messaging
+from senlin.common import metrics
+from senlin.common import utils as common_utils
 from senlin.engine import health_manager
 from senlin.objects import cluster as obj_cluster
 from senlin.objects import health_registry as hr
+from senlin.objects import node as obj_node
 from senlin.objects.requests import clusters as vorc
+from senlin.profiles import base as profile_base
 from senlin.rpc import client as rpc_client
 from senlin.tests.unit.common import base
 
@@ -271,8 +276,8 @@ class TestHealthManager(base.SenlinTestCase):
         # assertions
         mock_claim.assert_called_once_with(self.hm.ctx, self.hm.engine_id)
         mock_calls = [
-            mock.call(12, self.hm._poll_cluster, None, 'CID1'),
-            mock.call(34, self.hm._poll_cluster, None, 'CID2')
+            mock.call(12, self.hm._poll_cluster, None, 'CID1', 12),
+            mock.call(34, self.hm._poll_cluster, None, 'CID2', 34)
         ]
         mock_add_timer.assert_has_calls(mock_calls)
         self.assertEqual(2, len(self.hm.registries))
@@ -306,6 +311,130 @@ class TestHealthManager(base.SenlinTestCase):
         self.assertIsInstance(request, vorc.ClusterCheckRequest)
         self.assertEqual('CLUSTER_ID', request.identity)
 
+    @mock.patch.object(metrics.HEALTH_CHECK_LAG_SECONDS, 'observe')
+    @mock.patch.object(health_manager.time, 'time')
+    @mock.patch.object(rpc_client.EngineClient, 'call2')
+    def test__poll_cluster_lag(self, mock_check, mock_time, mock_observe):
+        mock_time.side_effect = [100.0, 112.5]
+
+        self.hm._poll_cluster('CLUSTER_ID', 10)
+        self.assertEqual(0, mock_observe.call_count)
+        self.hm._poll_cluster('CLUSTER_ID', 10)
+
+        mock_observe.assert_called_once_with(2.5)
+        self.assertEqual({'CLUSTER_ID': 112.5}, self.hm.last_polls)
+
+    @mock.patch.object(obj_node.Node, 'update')
+    @mock.patch.object(profile_base.Profile, 'load')
+    @mock.patch.object(obj_node.Node, 'iter_all')
+    def test__refresh_placements(self, mock_iter, mock_load, mock_update):
+        fresh = common_utils.isotime(timeutils.utcnow(True))
+        n1 = mock.Mock(id='N1', physical_id='P1', profile_id='PROF', data={})
+        n2 = mock.Mock(id='N2', physical_id=None, profile_id='PROF', data={})
+        n3 = mock.Mock(id='N3', physical_id='P3', profile_id='PROF',
+                       data={'placement': {'synced_at': fresh}})
+        mock_iter.return_value = [n1, n2, n3]
+        x_profile = mock.Mock()
+
+        def refresh(obj):
+            obj.data['placement'] = {'zone': 'AZ1'}
+            return True
+
+        x_profile.do_refresh_placement.side_effect = refresh
+        mock_load.return_value = x_profile
+
+        self.hm._refresh_placements()
+
+        mock_iter.assert_called_once_with(self.hm.ctx,
+                                          filters={'status': 'ACTIVE'},
+                                          project_safe=False)
+        mock_load.assert_called_once_with(self.hm.ctx, profile_id='PROF',
+                                          project_safe=False)
+        x_profile.do_refresh_placement.assert_called_once_with(n1)
+        mock_update.assert_called_once_with(
+            self.hm.ctx, 'N1', {'data': {'placement': {'zone': 'AZ1'}}})
+
+    @mock.patch.object(obj_node.Node, 'update')
+    @mock.patch.object(profile_base.Profile, 'load')
+    @mock.patch.object(obj_node.Node, 'iter_all')
+    def test__refresh_placements_no_registry(self, mock_iter, mock_load,
+                                             mock_update):
+        # Legacy nodes without a zone, in a cluster with no health policy
+        self.hm.rt['registries'] = []
+        n1 = mock.Mock(id='N1', cluster_id='CID2', physical_id='P1',
+                       profile_id='PROF', data={})
+        mock_iter.return_value = [n1]
+        x_profile = mock.Mock()
+
+        def refresh(obj):
+            obj.data['placement'] = {'zone': 'AZ1'}
+            return True
+
+        x_profile.do_refresh_placement.side_effect = refresh
+        mock_load.return_value = x_profile
+
+        self.hm._refresh_placements()
+
+        x_profile.do_refresh_placement.assert_called_once_with(n1)
+        mock_update.assert_called_once_with(
+            self.hm.ctx, 'N1', {'data': {'placement': {'zone': 'AZ1'}}})
+
+    @mock.patch.object(obj_node.Node, 'update')
+    @mock.patch.object(profile_base.Profile, 'load')
+    @mock.patch.object(obj_node.Node, 'iter_all')
+    def test__refresh_placements_unsupported(self, mock_iter, mock_load,
+                                             mock_update):
+        n1 = mock.Mock(id='N1', physical_id='P1', profile_id='PROF', data={})
+        n2 = mock.Mock(id='N2', physical_id='P2', profile_id='PROF', data={})
+        mock_iter.return_value = [n1, n2]
+        x_profile = mock.Mock()
+        x_profile.do_refresh_placement.side_effect = NotImplementedError
+        mock_load.return_value = x_profile
+
+        self.hm._refresh_placements()
+
+        self.assertEqual(1, mock_load.call_count)
+        self.assertEqual(1, x_profile.do_refresh_placement.call_count)
+        self.assertEqual(0, mock_update.call_count)
+
+    @mock.patch.object(obj_node.Node, 'update')
+    @mock.patch.object(profile_base.Profile, 'load')
+    @mock.patch.object(obj_node.Node, 'iter_all')
+    def test__refresh_placements_node_missed(self, mock_iter, mock_load,
+                                             mock_update):
+        n1 = mock.Mock(id='N1', physical_id='P1', profile_id='PROF', data={})
+        n2 = mock.Mock(id='N2', physical_id='P2', profile_id='PROF', data={})
+        mock_iter.return_value = [n1, n2]
+        x_profile = mock.Mock()
+        x_profile.do_refresh_placement.side_effect = [False, True]
+        mock_load.return_value = x_profile
+
+        self.hm._refresh_placements()
+
+        # A node whose server is gone does not stop the other refreshes
+        self.assertEqual(2, x_profile.do_refresh_placement.call_count)
+        mock_update.assert_called_once_with(self.hm.ctx, 'N2',
+                                            {'data': {}})
+
+    @mock.patch.object(obj_node.Node, 'update')
+    @mock.patch.object(profile_base.Profile, 'load')
+    @mock.patch.object(obj_node.Node, 'iter_all')
+    def test__refresh_placements_failed(self, mock_iter, mock_load,
+                                        mock_update):
+        n1 = mock.Mock(id='N1', physical_id='P1', profile_id='PROF', data={})
+        n2 = mock.Mock(id='N2', physical_id='P2', profile_id='PROF', data={})
+        mock_iter.return_value = [n1, n2]
+        x_profile = mock.Mock()
+        x_profile.do_refresh_placement.side_effect = [Exception('boom'),
+                                                      True]
+        mock_load.return_value = x_profile
+
+        self.hm._refresh_placements()
+
+        self.assertEqual(2, x_profile.do_refresh_placement.call_count)
+        mock_update.assert_called_once_with(self.hm.ctx, 'N2',
+                                            {'data': {}})
+
     @mock.patch.object(obj_cluster.Cluster, 'get')
     def test__add_listener(self, mock_get):
         x_listener = mock.Mock()
@@ -353,7 +482,7 @@ class TestHealthManager(base.SenlinTestCase):
         expected['timer'] = x_timer
         self.assertEqual(expected, res)
         mock_add_timer.assert_called_once_with(12, self.hm._poll_cluster, None,
-                                               'CCID')
+                                               'CCID', 12)
 
     def test__start_check_for_listening(self):
         x_listener = mock.Mock()
@@ -439,8 +568,11 @@ class TestHealthManager(base.SenlinTestCase):
                                             version=consts.RPC_API_VERSION)
         mock_get_rpc.assert_called_once_with(target, self.hm)
         x_rpc_server.start.assert_called_once_with()
-        mock_add_timer.assert_called_once_with(cfg.CONF.periodic_interval,
-                                               self.hm._dummy_task)
+        mock_add_timer.assert_has_calls([
+            mock.call(cfg.CONF.periodic_interval, self.hm._dummy_task),
+            mock.call(cfg.CONF.placement_refresh_interval,
+                      self.hm._refresh_placements)
+        ])
         mock_load.assert_called_once_with()
 
     @mock.patch.object(hr.HealthRegistry, 'create')
@@ -463,7 +595,7 @@ class TestHealthManager(base.SenlinTestCase):
 
         mock_reg_create.assert_called_once_with(
             ctx, 'CLUSTER_ID', consts.NODE_STATUS_POLLING, 50, {}, 'ENGINE_ID')
-        mock_add_tm.assert_called_with(50, mock_poll, None, 'CLUSTER_ID')
+        mock_add_tm.assert_called_with(50, mock_poll, None, 'CLUSTER_ID', 50)
         self.assertEqual(1, len(self.hm.registries))
 
     @mock.patch.object(health_manager.HealthManager, '_stop_check')
@@ -103,6 +103,60 @@ class TestNode(base.SenlinTestCase):
 
         self.assertEqual(node_id, new_node_id)
 
+    @mock.patch.object(node_obj.Node, 'update')
+    def test_node_store_changed_only(self, mock_update):
+        node = nodem.Node('node1', PROFILE_ID, None)
+        node_id = node.store(self.context)
+        node = nodem.Node.load(self.context, node_id, project_safe=False)
+        mock_load = self.patchobject(node, '_load_runtime_data')
+
+        node.name = 'new_name'
+        node.metadata['k'] = 'v'
+        node.store(self.context)
+
+        mock_update.assert_called_once_with(
+            self.context, node_id,
+            {'name': 'new_name', 'meta_data': {'k': 'v'}})
+        self.assertEqual(0, mock_load.call_count)
+
+    @mock.patch.object(node_obj.Node, 'update')
+    def test_node_store_unchanged(self, mock_update):
+        node = nodem.Node('node1', PROFILE_ID, None)
+        node_id = node.store(self.context)
+        node = nodem.Node.load(self.context, node_id, project_safe=False)
+
+        res = node.store(self.context)
+
+        self.assertEqual(node_id, res)
+        self.assertEqual(0, mock_update.call_count)
+
+    @mock.patch.object(pb.Profile, 'load')
+    def test_node_store_profile_changed(self, mock_load):
+        node = nodem.Node('node1', PROFILE_ID, None)
+        node_id = node.store(self.context)
+        node = nodem.Node.load(self.context, node_id, project_safe=False)
+        mock_load.reset_mock()
+
+        node.profile_id = 'NEW_PROFILE'
+        node.store(self.context)
+
+        mock_load.assert_called_once_with(self.context,
+                                          profile_id='NEW_PROFILE',
+                                          project_safe=False)
+
+    @mock.patch.object(node_obj.Node, 'update')
+    def test_node_store_after_set_status(self, mock_update):
+        node = nodem.Node('node1', PROFILE_ID, None)
+        node_id = node.store(self.context)
+        node = nodem.Node.load(self.context, node_id, project_safe=False)
+
+        node.set_status(self.context, consts.NS_ERROR, 'Boom',
+                        metadata={'k': 'v'})
+        mock_update.reset_mock()
+        node.store(self.context)
+
+        self.assertEqual(0, mock_update.call_count)
+
     def test_node_load(self):
         ex = self.assertRaises(exception.ResourceNotFound,
                                nodem.Node.load,
@@ -152,11 +206,11 @@ class TestNode(base.SenlinTestCase):
         self.assertEqual(x_node_id, res.id)
 
     @mock.patch.object(nodem.Node, '_from_object')
-    @mock.patch.object(node_obj.Node, 'get_all')
-    def test_node_load_all(self, mock_get, mock_init):
+    @mock.patch.object(node_obj.Node, 'iter_all')
+    def test_node_load_all(self, mock_iter, mock_init):
         x_obj_1 = mock.Mock()
         x_obj_2 = mock.Mock()
-        mock_get.return_value = [x_obj_1, x_obj_2]
+        mock_iter.return_value = iter([x_obj_1, x_obj_2])
 
         x_node_1 = mock.Mock()
         x_node_2 = mock.Mock()
@@ -165,14 +219,30 @@ class TestNode(base.SenlinTestCase):
         result = nodem.Node.load_all(self.context)
 
         self.assertEqual([x_node_1, x_node_2], [n for n in result])
-        mock_get.assert_called_once_with(self.context, cluster_id=None,
-                                         limit=None, marker=None,
-                                         sort=None, filters=None,
-                                         project_safe=True)
+        mock_iter.assert_called_once_with(self.context, cluster_id=None,
+                                          sort=None, filters=None,
+                                          project_safe=True)
         mock_init.assert_has_calls([
             mock.call(self.context, x_obj_1),
             mock.call(self.context, x_obj_2)])
 
+    @mock.patch.object(nodem.Node, '_from_object')
+    @mock.patch.object(node_obj.Node, 'get_all')
+    def test_node_load_all_paginated(self, mock_get, mock_init):
+        x_obj = mock.Mock()
+        mock_get.return_value = [x_obj]
+        x_node = mock.Mock()
+        mock_init.return_value = x_node
+
+        result = nodem.Node.load_all(self.context, limit=1, marker='MARKER')
+
+        self.assertEqual([x_node], [n for n in result])
+        mock_get.assert_called_once_with(self.context, cluster_id=None,
+                                         limit=1, marker='MARKER',
+                                         sort=None, filters=None,
+                                         project_safe=True, cursor=None)
+        mock_init.assert_called_once_with(self.context, x_obj)
+
     def test_node_to_dict(self):
         x_node_id = '16e70db8-4f70-4883-96be-cf40264a5abd'
         node = utils.create_node(self.context, x_node_id, PROFILE_ID,
@@ -311,7 +381,7 @@ class TestNode(base.SenlinTestCase):
                                     'Creation in progress')
         mock_status.assert_any_call(self.context, consts.NS_ACTIVE,
                                     'Creation succeeded',
-                                    physical_id=physical_id)
+                                    physical_id=physical_id, data={})
 
     def test_node_create_not_init(self):
         node = nodem.Node('node1', PROFILE_ID, CLUSTER_ID, self.context)
@@ -569,7 +639,8 @@ class TestNode(base.SenlinTestCase):
         self.assertTrue(res)
         mock_check.assert_called_once_with(self.context, node)
         mock_status.assert_called_once_with(self.context, consts.NS_ACTIVE,
-                                            'Check: Node is ACTIVE.')
+                                            'Check: Node is ACTIVE.',
+                                            data={})
 
     @mock.patch.object(nodem.Node, 'set_status')
     @mock.patch.object(pb.Profile, 'check_object')
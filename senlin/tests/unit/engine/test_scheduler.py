@@ -16,6 +16,7 @@ from oslo_config import cfg
 from oslo_context import context as oslo_context
 from oslo_service import threadgroup
 
+from senlin.common import consts
 from senlin.db import api as db_api
 from senlin.engine.actions import base as actionm
 from senlin.engine import scheduler
@@ -55,6 +56,49 @@ class DummyThreadGroup(object):
         pass
 
 
+class TokenBucketTest(base.SenlinTestCase):
+
+    @mock.patch.object(scheduler, 'wallclock')
+    def test_take(self, mock_clock):
+        mock_clock.return_value = 100.0
+        bucket = scheduler.TokenBucket(2, 4)
+
+        self.assertEqual(0, bucket.wait())
+        bucket.take()
+        self.assertEqual(0, bucket.wait())
+        bucket.take()
+        self.assertEqual(2.0, bucket.wait())
+        self.assertEqual(0, bucket.tokens)
+        self.assertFalse(bucket.idle())
+
+        mock_clock.return_value = 101.0
+        self.assertEqual(1.0, bucket.wait())
+
+        mock_clock.return_value = 110.0
+        self.assertTrue(bucket.idle())
+        self.assertEqual(2, bucket.tokens)
+
+    @mock.patch.object(scheduler, 'wallclock')
+    def test_take_no_interval(self, mock_clock):
+        mock_clock.return_value = 100.0
+        bucket = scheduler.TokenBucket(1, 0)
+
+        bucket.take()
+        self.assertEqual(0, bucket.wait())
+        bucket.take()
+        self.assertEqual(0, bucket.wait())
+
+    @mock.patch.object(scheduler, 'sleep')
+    def test_start_after(self, mock_sleep):
+        func = mock.Mock(return_value='RESULT')
+
+        res = scheduler._start_after(2.5, func, 'ARG', key='VALUE')
+
+        self.assertEqual('RESULT', res)
+        mock_sleep.assert_called_once_with(2.5)
+        func.assert_called_once_with('ARG', key='VALUE')
+
+
 class SchedulerTest(base.SenlinTestCase):
 
     def setUp(self):
@@ -98,6 +142,7 @@ class SchedulerTest(base.SenlinTestCase):
         self.mock_tg.return_value = mock_group
         action = mock.Mock()
         action.id = '0123'
+        action.action = 'CLUSTER_CREATE'
         mock_action_acquire.return_value = action
         mock_action_acquire_1st.return_value = None
 
@@ -111,7 +156,8 @@ class SchedulerTest(base.SenlinTestCase):
             tgm.db_session, '0123')
         mock_thread = mock_group.add_thread.return_value
         self.assertEqual(mock_thread, tgm.workers['0123'])
-        mock_thread.link.assert_called_once_with(mock.ANY, '0123')
+        mock_thread.link.assert_called_once_with(mock.ANY, '0123',
+                                                 'cluster')
 
     @mock.patch.object(db_api, 'action_acquire_random_ready')
     def test_start_action_no_action_id(self, mock_acquire_action):
@@ -132,31 +178,401 @@ class SchedulerTest(base.SenlinTestCase):
             tgm.db_session, '0123')
         mock_thread = mock_group.add_thread.return_value
         self.assertEqual(mock_thread, tgm.workers['0123'])
-        mock_thread.link.assert_called_once_with(mock.ANY, '0123')
+        mock_thread.link.assert_called_once_with(mock.ANY, '0123',
+                                                 'cluster')
 
-    @mock.patch.object(scheduler, 'sleep')
+    @mock.patch.object(db_api, 'action_abandon')
+    @mock.patch.object(scheduler, 'wallclock')
+    @mock.patch.object(db_api, 'action_acquire_random_ready')
+    def test_start_action_batch_control(self, mock_acquire_action,
+                                        mock_clock, mock_abandon):
+        mock_clock.return_value = 100.0
+        mock_action1 = mock.Mock(id='ID1', action='NODE_CREATE',
+                                 priority=consts.ACTION_PRIORITY_NORMAL,
+                                 data={})
+        mock_action2 = mock.Mock(id='ID2', action='CLUSTER_CREATE',
+                                 priority=consts.ACTION_PRIORITY_HIGH)
+        mock_acquire_action.side_effect = [mock_action1, mock_action2, None]
+        mock_group = mock.Mock()
+        self.mock_tg.return_value = mock_group
+        cfg.CONF.set_override('max_actions_per_batch', 1, enforce_type=True)
+        cfg.CONF.set_override('batch_interval', 3, enforce_type=True)
+
+        tgm = scheduler.ThreadGroupManager()
+        tgm.start_action('4567')
+
+        # Node actions are no longer claimed once the bucket is empty, the
+        # claims are started again when the bucket is refilled
+        self.assertEqual([
+            mock.call(mock.ANY, 'worker', 100.0, excluded=[],
+                      excluded_clusters=[]),
+            mock.call(mock.ANY, 'worker', 100.0, excluded=['NODE_'],
+                      excluded_clusters=[]),
+            mock.call(mock.ANY, 'worker', 100.0, excluded=['NODE_'],
+                      excluded_clusters=[]),
+        ], [mock.call(c[0][0], 'worker', c[0][2], **c[1])
+            for c in mock_acquire_action.call_args_list])
+        self.assertEqual([
+            mock.call(tgm._start_with_trace, mock.ANY, None,
+                      actionm.ActionProc, tgm.db_session, 'ID1'),
+            mock.call(tgm._start_with_trace, mock.ANY, None,
+                      scheduler._start_after, 3.0, tgm._reclaim, '4567',
+                      103.0),
+            mock.call(tgm._start_with_trace, mock.ANY, None,
+                      actionm.ActionProc, tgm.db_session, 'ID2'),
+        ], mock_group.add_thread.call_args_list)
+        self.assertEqual(103.0, tgm.reclaim_at)
+        self.assertEqual(0, mock_abandon.call_count)
+
+    @mock.patch.object(scheduler, 'wallclock')
+    @mock.patch.object(db_api, 'action_acquire_random_ready')
+    def test_start_action_batch_control_across_calls(self,
+                                                     mock_acquire_action,
+                                                     mock_clock):
+        mock_clock.return_value = 100.0
+        mock_action1 = mock.Mock(id='ID1', action='NODE_CREATE',
+                                 priority=consts.ACTION_PRIORITY_NORMAL,
+                                 data={})
+        mock_action2 = mock.Mock(id='ID2', action='NODE_CREATE',
+                                 priority=consts.ACTION_PRIORITY_NORMAL,
+                                 data={})
+        mock_acquire_action.side_effect = [mock_action1, None,
+                                           mock_action2, None]
+        mock_group = mock.Mock()
+        self.mock_tg.return_value = mock_group
+        cfg.CONF.set_override('max_actions_per_batch', 2, enforce_type=True)
+        cfg.CONF.set_override('batch_interval', 4, enforce_type=True)
+
+        tgm = scheduler.ThreadGroupManager()
+        tgm.start_action('4567')
+        tgm.start_action('4567')
+
+        # Both actions fit in the burst, the bucket is shared by the calls
+        self.assertEqual([
+            mock.call(tgm._start_with_trace, mock.ANY, None,
+                      actionm.ActionProc, tgm.db_session, 'ID1'),
+            mock.call(tgm._start_with_trace, mock.ANY, None,
+                      actionm.ActionProc, tgm.db_session, 'ID2'),
+            mock.call(tgm._start_with_trace, mock.ANY, None,
+                      scheduler._start_after, 2.0, tgm._reclaim, '4567',
+                      102.0),
+        ], mock_group.add_thread.call_args_list)
+        bucket = tgm.buckets[('backend', cfg.CONF.cloud_backend)]
+        self.assertEqual(0, bucket.tokens)
+
+    @mock.patch.object(db_api, 'action_abandon')
+    @mock.patch.object(scheduler, 'wallclock')
+    @mock.patch('senlin.objects.node.Node.get')
     @mock.patch.object(db_api, 'action_acquire_random_ready')
-    def test_start_action_batch_control(self, mock_acquire_action, mock_sleep):
-        mock_action1 = mock.Mock()
-        mock_action1.id = 'ID1'
-        mock_action1.action = 'NODE_CREATE'
-        mock_action2 = mock.Mock()
-        mock_action2.id = 'ID2'
-        mock_action2.action = 'CLUSTER_CREATE'
-        mock_action3 = mock.Mock()
-        mock_action3.id = 'ID3'
-        mock_action3.action = 'NODE_DELETE'
-        mock_acquire_action.side_effect = [mock_action1, mock_action2,
-                                           mock_action3, None]
+    def test_start_action_cluster_control(self, mock_acquire_action,
+                                          mock_node, mock_clock,
+                                          mock_abandon):
+        mock_clock.return_value = 100.0
+        mock_node.return_value = mock.Mock(cluster_id='C2')
+        actions = [
+            mock.Mock(id='ID0', action='NODE_CREATE', target='N0',
+                      priority=consts.ACTION_PRIORITY_NORMAL,
+                      data={'cluster_id': 'C1'}),
+            mock.Mock(id='ID1', action='NODE_CREATE', target='N1',
+                      priority=consts.ACTION_PRIORITY_NORMAL,
+                      data={'cluster_id': 'C1'}),
+            mock.Mock(id='ID2', action='NODE_CREATE', target='N2',
+                      priority=consts.ACTION_PRIORITY_NORMAL,
+                      data={'cluster_id': 'C3'}),
+        ]
+        mock_acquire_action.side_effect = actions + [None]
+        mock_group = mock.Mock()
+        self.mock_tg.return_value = mock_group
+        cfg.CONF.set_override('cluster_actions_per_batch', 1,
+                              enforce_type=True)
+        cfg.CONF.set_override('batch_interval', 2, enforce_type=True)
+
+        tgm = scheduler.ThreadGroupManager()
+        tgm.start_action('4567')
+
+        # The second action of the cluster is given back, node actions of
+        # other clusters are still claimed
+        self.assertEqual([
+            mock.call(tgm._start_with_trace, mock.ANY, None,
+                      actionm.ActionProc, tgm.db_session, 'ID0'),
+            mock.call(tgm._start_with_trace, mock.ANY, None,
+                      scheduler._start_after, 2.0, tgm._reclaim, '4567',
+                      102.0),
+            mock.call(tgm._start_with_trace, mock.ANY, None,
+                      actionm.ActionProc, tgm.db_session, 'ID2'),
+        ], mock_group.add_thread.call_args_list)
+        mock_abandon.assert_called_once_with(tgm.db_session, 'ID1')
+        self.assertEqual([
+            mock.call(tgm.db_session, '4567', 100.0, excluded=[],
+                      excluded_clusters=[]),
+            mock.call(tgm.db_session, '4567', 100.0, excluded=[],
+                      excluded_clusters=[]),
+            mock.call(tgm.db_session, '4567', 100.0, excluded=[],
+                      excluded_clusters=['C1']),
+            mock.call(tgm.db_session, '4567', 100.0, excluded=[],
+                      excluded_clusters=['C1']),
+        ], mock_acquire_action.call_args_list)
+        # The cluster was recorded in the actions
+        self.assertEqual(0, mock_node.call_count)
+
+        # Actions not recorded with a cluster get it from their node
+        action = mock.Mock(target='N2', data={})
+        self.assertEqual('C2', tgm._cluster_of(action))
+        mock_node.assert_called_once_with(tgm.db_session, 'N2')
+
+    @mock.patch.object(db_api, 'action_abandon')
+    @mock.patch.object(scheduler, 'wallclock')
+    @mock.patch.object(db_api, 'action_acquire_random_ready')
+    @mock.patch.object(db_api, 'action_acquire')
+    def test_start_action_batch_control_action_id(self, mock_acquire,
+                                                  mock_acquire_random,
+                                                  mock_clock, mock_abandon):
+        mock_clock.return_value = 100.0
+        mock_acquire.return_value = mock.Mock(
+            id='ID1', action='NODE_CREATE',
+            priority=consts.ACTION_PRIORITY_NORMAL, data={})
+        mock_acquire_random.return_value = None
         mock_group = mock.Mock()
         self.mock_tg.return_value = mock_group
         cfg.CONF.set_override('max_actions_per_batch', 1, enforce_type=True)
         cfg.CONF.set_override('batch_interval', 3, enforce_type=True)
 
         tgm = scheduler.ThreadGroupManager()
+        tgm._bucket('backend', cfg.CONF.cloud_backend, 1).take()
+        tgm.start_action('4567', 'ID1')
+
+        # A node action dispatched directly is admitted like claimed ones
+        mock_abandon.assert_called_once_with(tgm.db_session, 'ID1')
+        mock_group.add_thread.assert_called_once_with(
+            tgm._start_with_trace, mock.ANY, None,
+            scheduler._start_after, 3.0, tgm._reclaim, '4567', 103.0)
+
+    @mock.patch.object(db_api, 'action_abandon')
+    @mock.patch.object(scheduler, 'wallclock')
+    @mock.patch.object(db_api, 'action_acquire_random_ready')
+    def test_start_action_batch_control_cluster_nodes(self,
+                                                      mock_acquire_action,
+                                                      mock_clock,
+                                                      mock_abandon):
+        mock_clock.return_value = 100.0
+        actions = [
+            mock.Mock(id='ID%s' % i, action=name,
+                      priority=consts.ACTION_PRIORITY_NORMAL, data={})
+            for i, name in enumerate([consts.CLUSTER_ADD_NODES,
+                                      consts.CLUSTER_DEL_NODES,
+                                      consts.CLUSTER_REPLACE_NODES])
+        ]
+        mock_acquire_action.side_effect = actions + [None]
+        mock_group = mock.Mock()
+        self.mock_tg.return_value = mock_group
+        cfg.CONF.set_override('max_actions_per_batch', 1, enforce_type=True)
+        cfg.CONF.set_override('batch_interval', 3, enforce_type=True)
+
+        tgm = scheduler.ThreadGroupManager()
+        tgm._bucket('backend', cfg.CONF.cloud_backend, 1).take()
         tgm.start_action('4567')
 
-        mock_sleep.assert_called_once_with(3)
+        # Cluster actions on nodes are not throttled as node actions
+        self.assertEqual(0, mock_abandon.call_count)
+        self.assertEqual(
+            ['ID0', 'ID1', 'ID2'],
+            [c[0][-1] for c in mock_group.add_thread.call_args_list
+             if c[0][3] is actionm.ActionProc])
+
+    @mock.patch.object(scheduler, 'wallclock')
+    def test_reclaim_after(self, mock_clock):
+        mock_clock.return_value = 100.0
+        mock_group = mock.Mock()
+        self.mock_tg.return_value = mock_group
+        tgm = scheduler.ThreadGroupManager()
+
+        tgm._reclaim_after('4567', 2.0)
+        # Claims planned later are not needed
+        tgm._reclaim_after('4567', 3.0)
+        self.assertEqual(1, mock_group.add_thread.call_count)
+        # Claims planned earlier are added
+        tgm._reclaim_after('4567', 1.0)
+        self.assertEqual(2, mock_group.add_thread.call_count)
+        self.assertEqual(101.0, tgm.reclaim_at)
+
+        mock_start = self.patchobject(tgm, 'start_action')
+        tgm._reclaim('4567', 102.0)
+        self.assertEqual(101.0, tgm.reclaim_at)
+        tgm._reclaim('4567', 101.0)
+        self.assertIsNone(tgm.reclaim_at)
+        self.assertEqual([mock.call('4567'), mock.call('4567')],
+                         mock_start.call_args_list)
+
+    @mock.patch.object(db_api, 'action_acquire_random_ready')
+    def test_start_action_batch_control_high_priority(self,
+                                                      mock_acquire_action):
+        mock_action1 = mock.Mock(id='ID1', action='NODE_CREATE',
+                                 priority=consts.ACTION_PRIORITY_NORMAL,
+                                 data={})
+        mock_action2 = mock.Mock(id='ID2', action='NODE_DELETE',
+                                 priority=consts.ACTION_PRIORITY_HIGH)
+        mock_acquire_action.side_effect = [mock_action1, mock_action2, None]
+        mock_group = mock.Mock()
+        self.mock_tg.return_value = mock_group
+        cfg.CONF.set_override('max_actions_per_batch', 1, enforce_type=True)
+        cfg.CONF.set_override('batch_interval', 0, enforce_type=True)
+
+        tgm = scheduler.ThreadGroupManager()
+        tgm.start_action('4567')
+
+        self.assertEqual([
+            mock.call(tgm._start_with_trace, mock.ANY, None,
+                      actionm.ActionProc, tgm.db_session, 'ID1'),
+            mock.call(tgm._start_with_trace, mock.ANY, None,
+                      actionm.ActionProc, tgm.db_session, 'ID2'),
+        ], mock_group.add_thread.call_args_list)
+        for c in mock_acquire_action.call_args_list:
+            self.assertEqual([], c[1]['excluded'])
+
+    def test_capacity(self):
+        tgm = scheduler.ThreadGroupManager()
+        tgm.workers = {'A1': mock.Mock(), 'A2': mock.Mock()}
+        self.assertIsNone(tgm.capacity())
+
+        cfg.CONF.set_override('max_actions_per_engine', 3,
+                              enforce_type=True)
+        self.assertEqual(1, tgm.capacity())
+
+        cfg.CONF.set_override('max_actions_per_engine', 2,
+                              enforce_type=True)
+        self.assertEqual(0, tgm.capacity())
+
+        # Actions waiting for their dependents leave their slot
+        tgm.waiting = set(['A1'])
+        self.assertEqual(1, tgm.capacity())
+
+    @mock.patch.object(db_api, 'action_acquire_random_ready')
+    @mock.patch.object(db_api, 'action_acquire')
+    def test_start_action_saturated(self, mock_acquire,
+                                    mock_acquire_random):
+        mock_acquire_random.side_effect = [
+            mock.Mock(id='ID1', action='CLUSTER_CREATE',
+                      priority=consts.ACTION_PRIORITY_NORMAL),
+            mock.Mock(id='ID2', action='CLUSTER_CREATE',
+                      priority=consts.ACTION_PRIORITY_NORMAL),
+        ]
+        cfg.CONF.set_override('max_actions_per_engine', 2,
+                              enforce_type=True)
+        mock_group = mock.Mock()
+        self.mock_tg.return_value = mock_group
+
+        tgm = scheduler.ThreadGroupManager()
+        tgm.start_action('4567')
+        tgm.start_action('4567', '0123')
+
+        self.assertEqual(2, mock_acquire_random.call_count)
+        self.assertEqual(0, mock_acquire.call_count)
+        self.assertEqual({'cluster': 2}, tgm.running)
+        self.assertEqual('4567', tgm.saturated)
+
+    @mock.patch.object(db_api, 'action_acquire_random_ready')
+    def test_start_action_saturated_waiting(self, mock_acquire_random):
+        mock_acquire_random.side_effect = [
+            mock.Mock(id='ID1', action='CLUSTER_CREATE',
+                      priority=consts.ACTION_PRIORITY_NORMAL),
+            mock.Mock(id='ID2', action='NODE_CREATE',
+                      priority=consts.ACTION_PRIORITY_HIGH),
+        ]
+        cfg.CONF.set_override('max_actions_per_engine', 1,
+                              enforce_type=True)
+        mock_group = mock.Mock()
+        self.mock_tg.return_value = mock_group
+
+        tgm = scheduler.ThreadGroupManager()
+        tgm.start_action('4567')
+        self.assertEqual('4567', tgm.saturated)
+        self.assertIs(tgm, scheduler._MANAGERS['ID1'])
+
+        mock_group.add_thread.reset_mock()
+        with scheduler.waiting('ID1'):
+            # The slot of the parent is given to its dependents
+            self.assertEqual(set(['ID1']), tgm.waiting)
+            self.assertIsNone(tgm.saturated)
+            mock_group.add_thread.assert_called_once_with(
+                tgm._start_with_trace, mock.ANY, None, tgm.start_action,
+                '4567')
+            tgm.start_action('4567')
+
+        self.assertEqual(set(), tgm.waiting)
+        self.assertEqual({'cluster': 1, 'node': 1}, tgm.running)
+        self.assertEqual(0, tgm.capacity())
+        self.assertEqual(2, mock_acquire_random.call_count)
+
+        # Actions not run by a manager are not tracked
+        with scheduler.waiting('ID3'):
+            self.assertEqual(set(), tgm.waiting)
+
+    @mock.patch.object(db_api, 'action_acquire_random_ready')
+    @mock.patch.object(db_api, 'action_acquire')
+    def test_release_waiting(self, mock_acquire, mock_acquire_random):
+        mock_acquire.return_value = mock.Mock(
+            id='ID1', action='CLUSTER_CREATE',
+            priority=consts.ACTION_PRIORITY_NORMAL)
+        mock_acquire_random.return_value = None
+        tgm = scheduler.ThreadGroupManager()
+        tgm.start = mock.Mock(return_value=DummyThread(None))
+
+        tgm.start_action('4567', 'ID1')
+
+        # The dummy thread finishes the action at once
+        self.assertEqual({}, tgm.workers)
+        self.assertEqual(set(), tgm.waiting)
+        self.assertNotIn('ID1', scheduler._MANAGERS)
+
+    @mock.patch.object(db_api, 'action_acquire_random_ready')
+    def test_start_action_saturated_class(self, mock_acquire_random):
+        mock_acquire_random.side_effect = [
+            mock.Mock(id='ID1', action='NODE_CREATE',
+                      priority=consts.ACTION_PRIORITY_HIGH),
+            mock.Mock(id='ID2', action='CLUSTER_CREATE',
+                      priority=consts.ACTION_PRIORITY_NORMAL),
+            None,
+        ]
+        cfg.CONF.set_override('max_actions_per_class', {'node': '1'},
+                              enforce_type=True)
+        mock_group = mock.Mock()
+        self.mock_tg.return_value = mock_group
+
+        tgm = scheduler.ThreadGroupManager()
+        tgm.start_action('4567')
+
+        mock_acquire_random.assert_has_calls([
+            mock.call(tgm.db_session, '4567', mock.ANY, excluded=[],
+                      excluded_clusters=[]),
+            mock.call(tgm.db_session, '4567', mock.ANY, excluded=['NODE_'],
+                      excluded_clusters=[]),
+            mock.call(tgm.db_session, '4567', mock.ANY, excluded=['NODE_'],
+                      excluded_clusters=[]),
+        ])
+        self.assertEqual({'cluster': 1, 'node': 1}, tgm.running)
+
+    @mock.patch.object(db_api, 'action_acquire_random_ready')
+    def test_start_action_release_saturated(self, mock_acquire_random):
+        mock_acquire_random.side_effect = [
+            mock.Mock(id='ID1', action='CLUSTER_CREATE',
+                      priority=consts.ACTION_PRIORITY_NORMAL),
+        ]
+        cfg.CONF.set_override('max_actions_per_engine', 1,
+                              enforce_type=True)
+        mock_group = mock.Mock()
+        self.mock_tg.return_value = mock_group
+        tgm = scheduler.ThreadGroupManager()
+        tgm.start_action('4567')
+        mock_thread = mock_group.add_thread.return_value
+        release = mock_thread.link.call_args[0][0]
+
+        release(mock_thread, 'ID1', 'cluster')
+
+        self.assertEqual({}, tgm.workers)
+        self.assertEqual({'cluster': 0}, tgm.running)
+        self.assertIsNone(tgm.saturated)
+        mock_group.add_thread.assert_called_with(
+            tgm._start_with_trace, mock.ANY, None, tgm.start_action, '4567')
 
     @mock.patch.object(db_api, 'action_acquire_random_ready')
     @mock.patch.object(db_api, 'action_acquire')
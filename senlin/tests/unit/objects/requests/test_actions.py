@@ -131,6 +131,43 @@ class TestActionGet(test_base.SenlinTestCase):
         self.assertEqual('test-action', sot.identity)
 
 
+class TestActionTiming(test_base.SenlinTestCase):
+
+    def test_action_timing_request(self):
+        sot = actions.ActionTimingRequest(cluster='test-cluster',
+                                          action=['NODE_CREATE'])
+        sot.obj_set_defaults()
+        self.assertEqual('test-cluster', sot.cluster)
+        self.assertEqual(['NODE_CREATE'], sot.action)
+        self.assertEqual(3600, sot.since)
+        self.assertEqual(1000, sot.limit)
+        self.assertTrue(sot.project_safe)
+
+    def test_action_timing_request_window(self):
+        sot = actions.ActionTimingRequest(since='600', limit='10')
+        self.assertEqual(600, sot.since)
+        self.assertEqual(10, sot.limit)
+        self.assertRaises(ValueError, actions.ActionTimingRequest,
+                          since=-1)
+
+    def test_action_timing_request_invalid_action(self):
+        self.assertRaises(ValueError, actions.ActionTimingRequest,
+                          action=['FOO'])
+
+
+class TestActionUpdate(test_base.SenlinTestCase):
+
+    def test_action_update_request(self):
+        sot = actions.ActionUpdateRequest(identity='test-action',
+                                          priority='90')
+        self.assertEqual('test-action', sot.identity)
+        self.assertEqual(90, sot.priority)
+
+    def test_action_update_request_negative(self):
+        self.assertRaises(ValueError, actions.ActionUpdateRequest,
+                          identity='test-action', priority=-1)
+
+
 class TestActionDelete(test_base.SenlinTestCase):
 
     body = {
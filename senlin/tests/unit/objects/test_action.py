@@ -11,11 +11,10 @@
 # under the License.
 
 import mock
-from oslo_utils import uuidutils
-import six
 import testtools
 
 from senlin.common import exception as exc
+from senlin.db import api as db_api
 from senlin.objects import action as ao
 
 
@@ -25,66 +24,24 @@ class TestAction(testtools.TestCase):
         super(TestAction, self).setUp()
         self.ctx = mock.Mock()
 
-    @mock.patch.object(ao.Action, 'get')
-    def test_find_by_uuid(self, mock_get):
+    @mock.patch.object(ao.Action, '_from_db_object')
+    @mock.patch.object(db_api, 'action_find')
+    def test_find(self, mock_find, mock_from_db):
         x_action = mock.Mock()
-        mock_get.return_value = x_action
-        aid = uuidutils.generate_uuid()
+        mock_from_db.return_value = x_action
 
-        result = ao.Action.find(self.ctx, aid)
+        result = ao.Action.find(self.ctx, 'ACTION', project_safe=False)
 
         self.assertEqual(x_action, result)
-        mock_get.assert_called_once_with(self.ctx, aid)
-
-    @mock.patch.object(ao.Action, 'get_by_name')
-    @mock.patch.object(ao.Action, 'get')
-    def test_find_by_uuid_as_name(self, mock_get, mock_name):
-        mock_get.return_value = None
-        x_action = mock.Mock()
-        mock_name.return_value = x_action
-        aid = uuidutils.generate_uuid()
-
-        result = ao.Action.find(self.ctx, aid, project_safe=False)
-
-        self.assertEqual(x_action, result)
-        mock_get.assert_called_once_with(self.ctx, aid, project_safe=False)
-        mock_name.assert_called_once_with(self.ctx, aid, project_safe=False)
-
-    @mock.patch.object(ao.Action, 'get_by_name')
-    def test_find_by_name(self, mock_name):
-        x_action = mock.Mock()
-        mock_name.return_value = x_action
-        aid = 'not-a-uuid'
-
-        result = ao.Action.find(self.ctx, aid, project_safe=True)
-
-        self.assertEqual(x_action, result)
-        mock_name.assert_called_once_with(self.ctx, aid, project_safe=True)
-
-    @mock.patch.object(ao.Action, 'get_by_short_id')
-    @mock.patch.object(ao.Action, 'get_by_name')
-    def test_find_by_short_id(self, mock_name, mock_shortid):
-        mock_name.return_value = None
-        x_action = mock.Mock()
-        mock_shortid.return_value = x_action
-        aid = 'abcdef'
-
-        result = ao.Action.find(self.ctx, aid)
-
-        self.assertEqual(x_action, result)
-        mock_name.assert_called_once_with(self.ctx, aid)
-        mock_shortid.assert_called_once_with(self.ctx, aid)
-
-    @mock.patch.object(ao.Action, 'get_by_name')
-    @mock.patch.object(ao.Action, 'get_by_short_id')
-    def test_find_not_found(self, mock_shortid, mock_name):
-        mock_name.return_value = None
-        mock_shortid.return_value = None
-
-        ex = self.assertRaises(exc.ResourceNotFound,
-                               ao.Action.find,
-                               self.ctx, 'BOGUS')
-        self.assertEqual("The action (BOGUS) could not be found.",
-                         six.text_type(ex))
-        mock_name.assert_called_once_with(self.ctx, 'BOGUS')
-        mock_shortid.assert_called_once_with(self.ctx, 'BOGUS')
+        mock_find.assert_called_once_with(self.ctx, 'ACTION',
+                                          project_safe=False)
+        mock_from_db.assert_called_once_with(self.ctx, mock.ANY,
+                                             mock_find.return_value)
+
+    @mock.patch.object(db_api, 'action_find')
+    def test_find_not_found(self, mock_find):
+        mock_find.return_value = None
+
+        self.assertRaises(exc.ResourceNotFound,
+                          ao.Action.find, self.ctx, 'bogus')
+        mock_find.assert_called_once_with(self.ctx, 'bogus')
@@ -11,10 +11,10 @@
 # under the License.
 
 import mock
-from oslo_utils import uuidutils
 import testtools
 
 from senlin.common import exception as exc
+from senlin.db import api as db_api
 from senlin.objects import cluster as co
 
 
@@ -24,70 +24,24 @@ class TestCluster(testtools.TestCase):
         super(TestCluster, self).setUp()
         self.ctx = mock.Mock()
 
-    @mock.patch.object(co.Cluster, 'get')
-    def test_find_by_uuid(self, mock_get):
+    @mock.patch.object(co.Cluster, '_from_db_object')
+    @mock.patch.object(db_api, 'cluster_find')
+    def test_find(self, mock_find, mock_from_db):
         x_cluster = mock.Mock()
-        mock_get.return_value = x_cluster
+        mock_from_db.return_value = x_cluster
 
-        aid = uuidutils.generate_uuid()
-        result = co.Cluster.find(self.ctx, aid)
+        result = co.Cluster.find(self.ctx, 'CLUSTER', project_safe=False)
 
         self.assertEqual(x_cluster, result)
-        mock_get.assert_called_once_with(self.ctx, aid, project_safe=True)
+        mock_find.assert_called_once_with(self.ctx, 'CLUSTER',
+                                          project_safe=False)
+        mock_from_db.assert_called_once_with(self.ctx, mock.ANY,
+                                             mock_find.return_value)
 
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    @mock.patch.object(co.Cluster, 'get')
-    def test_find_by_uuid_as_name(self, mock_get, mock_get_name):
-        x_cluster = mock.Mock()
-        mock_get_name.return_value = x_cluster
-        mock_get.return_value = None
-
-        aid = uuidutils.generate_uuid()
-        result = co.Cluster.find(self.ctx, aid, False)
-
-        self.assertEqual(x_cluster, result)
-        mock_get.assert_called_once_with(self.ctx, aid, project_safe=False)
-        mock_get_name.assert_called_once_with(self.ctx, aid,
-                                              project_safe=False)
-
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    def test_find_by_name(self, mock_get_name):
-        x_cluster = mock.Mock()
-        mock_get_name.return_value = x_cluster
-
-        aid = 'this-is-not-uuid'
-        result = co.Cluster.find(self.ctx, aid)
-
-        self.assertEqual(x_cluster, result)
-        mock_get_name.assert_called_once_with(self.ctx, aid, project_safe=True)
-
-    @mock.patch.object(co.Cluster, 'get_by_short_id')
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    def test_find_by_shortid(self, mock_get_name, mock_get_shortid):
-        x_cluster = mock.Mock()
-        mock_get_shortid.return_value = x_cluster
-        mock_get_name.return_value = None
-
-        aid = 'abcd-1234-abcd'
-        result = co.Cluster.find(self.ctx, aid, False)
-
-        self.assertEqual(x_cluster, result)
-        mock_get_name.assert_called_once_with(self.ctx, aid,
-                                              project_safe=False)
-        mock_get_shortid.assert_called_once_with(self.ctx, aid,
-                                                 project_safe=False)
-
-    @mock.patch.object(co.Cluster, 'get_by_short_id')
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    def test_find_not_found(self, mock_get_name, mock_get_short_id):
-        mock_get_name.return_value = None
-        mock_get_short_id.return_value = None
+    @mock.patch.object(db_api, 'cluster_find')
+    def test_find_not_found(self, mock_find):
+        mock_find.return_value = None
 
         self.assertRaises(exc.ResourceNotFound,
-                          co.Cluster.find,
-                          self.ctx, 'bogus')
-
-        mock_get_name.assert_called_once_with(self.ctx, 'bogus',
-                                              project_safe=True)
-        mock_get_short_id.assert_called_once_with(self.ctx, 'bogus',
-                                                  project_safe=True)
+                          co.Cluster.find, self.ctx, 'bogus')
+        mock_find.assert_called_once_with(self.ctx, 'bogus', project_safe=True)
@@ -11,11 +11,10 @@
 # under the License.
 
 import mock
-from oslo_utils import uuidutils
-import six
 import testtools
 
 from senlin.common import exception as exc
+from senlin.db import api as db_api
 from senlin.objects import node as no
 
 
@@ -25,67 +24,112 @@ class TestNode(testtools.TestCase):
         super(TestNode, self).setUp()
         self.ctx = mock.Mock()
 
-    @mock.patch.object(no.Node, 'get')
-    def test_find_by_uuid(self, mock_get):
+    @mock.patch.object(no.Node, '_from_db_object')
+    @mock.patch.object(db_api, 'node_find')
+    def test_find(self, mock_find, mock_from_db):
         x_node = mock.Mock()
-        mock_get.return_value = x_node
-        aid = uuidutils.generate_uuid()
+        mock_from_db.return_value = x_node
 
-        result = no.Node.find(self.ctx, aid)
+        result = no.Node.find(self.ctx, 'NODE', project_safe=False)
 
         self.assertEqual(x_node, result)
-        mock_get.assert_called_once_with(self.ctx, aid, project_safe=True)
-
-    @mock.patch.object(no.Node, 'get_by_name')
-    @mock.patch.object(no.Node, 'get')
-    def test_find_by_uuid_as_name(self, mock_get, mock_name):
-        mock_get.return_value = None
-        x_node = mock.Mock()
-        mock_name.return_value = x_node
-        aid = uuidutils.generate_uuid()
-
-        result = no.Node.find(self.ctx, aid, False)
-
-        self.assertEqual(x_node, result)
-        mock_get.assert_called_once_with(self.ctx, aid, project_safe=False)
-        mock_name.assert_called_once_with(self.ctx, aid, project_safe=False)
-
-    @mock.patch.object(no.Node, 'get_by_name')
-    def test_find_by_name(self, mock_name):
-        x_node = mock.Mock()
-        mock_name.return_value = x_node
-        aid = 'not-a-uuid'
-
-        result = no.Node.find(self.ctx, aid)
-
-        self.assertEqual(x_node, result)
-        mock_name.assert_called_once_with(self.ctx, aid, project_safe=True)
-
-    @mock.patch.object(no.Node, 'get_by_short_id')
-    @mock.patch.object(no.Node, 'get_by_name')
-    def test_find_by_short_id(self, mock_name, mock_shortid):
-        mock_name.return_value = None
-        x_node = mock.Mock()
-        mock_shortid.return_value = x_node
-        aid = 'abcdef'
-
-        result = no.Node.find(self.ctx, aid, False)
-
-        self.assertEqual(x_node, result)
-        mock_name.assert_called_once_with(self.ctx, aid, project_safe=False)
-        mock_shortid.assert_called_once_with(self.ctx, aid, project_safe=False)
-
-    @mock.patch.object(no.Node, 'get_by_name')
-    @mock.patch.object(no.Node, 'get_by_short_id')
-    def test_find_not_found(self, mock_shortid, mock_name):
-        mock_name.return_value = None
-        mock_shortid.return_value = None
-
-        ex = self.assertRaises(exc.ResourceNotFound,
-                               no.Node.find,
-                               self.ctx, 'BOGUS')
-        self.assertEqual("The node (BOGUS) could not be found.",
-                         six.text_type(ex))
-        mock_name.assert_called_once_with(self.ctx, 'BOGUS', project_safe=True)
-        mock_shortid.assert_called_once_with(self.ctx, 'BOGUS',
-                                             project_safe=True)
+        mock_find.assert_called_once_with(self.ctx, 'NODE',
+                                          project_safe=False)
+        mock_from_db.assert_called_once_with(self.ctx, mock.ANY,
+                                             mock_find.return_value)
+
+    @mock.patch.object(db_api, 'node_find')
+    def test_find_not_found(self, mock_find):
+        mock_find.return_value = None
+
+        self.assertRaises(exc.ResourceNotFound,
+                          no.Node.find, self.ctx, 'bogus')
+        mock_find.assert_called_once_with(self.ctx, 'bogus', project_safe=True)
+
+    @mock.patch.object(db_api, 'encode_cursor')
+    @mock.patch.object(no.Node, '_from_db_object')
+    @mock.patch.object(db_api, 'node_get_all')
+    def test_iter_all(self, mock_get, mock_from_db, mock_cursor):
+        chunks = [['N1', 'N2'], ['N3', 'N4'], ['N5']]
+        mock_get.side_effect = chunks
+        mock_from_db.side_effect = lambda ctx, obj, db_obj: db_obj
+        mock_cursor.side_effect = ['C1', 'C2']
+
+        result = no.Node.iter_all(self.ctx, chunk_size=2, cluster_id='CID')
+
+        self.assertEqual(['N1', 'N2', 'N3', 'N4', 'N5'], list(result))
+        mock_get.assert_has_calls([
+            mock.call(self.ctx, limit=2, sort=None, cursor=None,
+                      cluster_id='CID'),
+            mock.call(self.ctx, limit=2, sort=None, cursor='C1',
+                      cluster_id='CID'),
+            mock.call(self.ctx, limit=2, sort=None, cursor='C2',
+                      cluster_id='CID'),
+        ])
+        mock_cursor.assert_has_calls([
+            mock.call('N2', None, 'init_at'),
+            mock.call('N4', None, 'init_at'),
+        ])
+
+    @mock.patch.object(db_api, 'node_get_all')
+    def test_iter_all_default_chunk_size(self, mock_get):
+        mock_get.return_value = []
+
+        result = no.Node.iter_all(self.ctx)
+
+        self.assertEqual([], list(result))
+        mock_get.assert_called_once_with(self.ctx, limit=100, sort=None,
+                                         cursor=None)
+
+    @mock.patch.object(db_api, 'node_get_records')
+    def test_get_records(self, mock_get):
+        mock_get.return_value = [
+            ('N1', 'ACTIVE', 'T1', 'P1', 'PT1',
+             {'placement': {'zone': 'AZ1'}, 'foo': 'bar'}),
+            ('N2', 'ERROR', None, 'P1', 'PT1', None),
+        ]
+
+        res = no.Node.get_records(self.ctx, 'CID', project_safe=False)
+
+        self.assertEqual(2, len(res))
+        self.assertIsInstance(res[0], no.NodeRecord)
+        self.assertEqual('N1', res[0].id)
+        self.assertEqual('ACTIVE', res[0].status)
+        self.assertEqual('T1', res[0].created_at)
+        self.assertEqual('P1', res[0].profile_id)
+        self.assertEqual('PT1', res[0].profile_created_at)
+        self.assertEqual({'zone': 'AZ1'}, res[0].placement)
+        self.assertEqual('N2', res[1].id)
+        self.assertEqual({}, res[1].placement)
+        mock_get.assert_called_once_with(self.ctx, 'CID', project_safe=False)
+
+    @mock.patch.object(db_api, 'encode_cursor')
+    @mock.patch.object(db_api, 'node_get_records')
+    def test_iter_records(self, mock_get, mock_encode):
+        rows = [('N1', 'ACTIVE', 'T1', 'P1', 'PT1', None, 'IT1'),
+                ('N2', 'ERROR', None, 'P1', 'PT1', None, 'IT2'),
+                ('N3', 'ACTIVE', 'T3', 'P1', 'PT1', None, 'IT3')]
+        mock_get.side_effect = [rows[:2], rows[2:]]
+        mock_encode.return_value = 'CURSOR'
+
+        res = no.Node.iter_records(self.ctx, 'CID', chunk_size=2,
+                                   project_safe=False)
+
+        self.assertEqual(['N1', 'N2', 'N3'], [r.id for r in res])
+        mock_get.assert_has_calls([
+            mock.call(self.ctx, 'CID', limit=2, cursor=None,
+                      project_safe=False),
+            mock.call(self.ctx, 'CID', limit=2, cursor='CURSOR',
+                      project_safe=False),
+        ])
+        # The next chunk starts after the last record of the previous one
+        mock_encode.assert_called_once_with(rows[1], None, 'init_at')
+
+    def test_node_record_immutable(self):
+        record = no.NodeRecord('N1', 'ACTIVE', None, 'P1', None, {})
+
+        self.assertRaises(AttributeError, setattr, record, 'status', 'ERROR')
+        self.assertRaises(AttributeError, setattr, record, 'foo', 'bar')
+        self.assertRaises(AttributeError, delattr, record, 'id')
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertEqual('ACTIVE', record.status)
@@ -11,10 +11,10 @@
 # under the License.
 
 import mock
-from oslo_utils import uuidutils
 import testtools
 
 from senlin.common import exception as exc
+from senlin.db import api as db_api
 from senlin.objects import receiver as ro
 
 
@@ -24,68 +24,24 @@ class ReceiverTest(testtools.TestCase):
         super(ReceiverTest, self).setUp()
         self.ctx = mock.Mock()
 
-    @mock.patch.object(ro.Receiver, 'get')
-    def test_find_by_uuid(self, mock_get):
-        fake_obj = mock.Mock()
-        mock_get.return_value = fake_obj
-        fake_id = uuidutils.generate_uuid()
+    @mock.patch.object(ro.Receiver, '_from_db_object')
+    @mock.patch.object(db_api, 'receiver_find')
+    def test_find(self, mock_find, mock_from_db):
+        x_receiver = mock.Mock()
+        mock_from_db.return_value = x_receiver
 
-        res = ro.Receiver.find(self.ctx, fake_id)
+        result = ro.Receiver.find(self.ctx, 'RECEIVER', project_safe=False)
 
-        self.assertEqual(fake_obj, res)
-        mock_get.assert_called_once_with(self.ctx, fake_id)
+        self.assertEqual(x_receiver, result)
+        mock_find.assert_called_once_with(self.ctx, 'RECEIVER',
+                                          project_safe=False)
+        mock_from_db.assert_called_once_with(self.ctx, mock.ANY,
+                                             mock_find.return_value)
 
-    @mock.patch.object(ro.Receiver, 'get_by_name')
-    @mock.patch.object(ro.Receiver, 'get')
-    def test_find_by_uuid_as_name(self, mock_get, mock_get_name):
-        mock_get.return_value = None
-        fake_obj = mock.Mock()
-        mock_get_name.return_value = fake_obj
-        fake_id = uuidutils.generate_uuid()
-
-        res = ro.Receiver.find(self.ctx, fake_id, project_safe=False)
-
-        self.assertEqual(fake_obj, res)
-        mock_get.assert_called_once_with(self.ctx, fake_id, project_safe=False)
-        mock_get_name.assert_called_once_with(self.ctx, fake_id,
-                                              project_safe=False)
-
-    @mock.patch.object(ro.Receiver, 'get_by_name')
-    def test_find_by_name(self, mock_get_name):
-        fake_obj = mock.Mock()
-        mock_get_name.return_value = fake_obj
-        fake_id = 'not-a-uuid'
-
-        res = ro.Receiver.find(self.ctx, fake_id)
-
-        self.assertEqual(fake_obj, res)
-        mock_get_name.assert_called_once_with(self.ctx, fake_id)
-
-    @mock.patch.object(ro.Receiver, 'get_by_short_id')
-    @mock.patch.object(ro.Receiver, 'get_by_name')
-    def test_find_by_short_id(self, mock_get_name, mock_get_shortid):
-        mock_get_name.return_value = None
-        fake_obj = mock.Mock()
-        mock_get_shortid.return_value = fake_obj
-        fake_id = '12345678'
-
-        res = ro.Receiver.find(self.ctx, fake_id, project_safe=False)
-
-        self.assertEqual(fake_obj, res)
-        mock_get_name.assert_called_once_with(self.ctx, fake_id,
-                                              project_safe=False)
-        mock_get_shortid.assert_called_once_with(self.ctx, fake_id,
-                                                 project_safe=False)
-
-    @mock.patch.object(ro.Receiver, 'get_by_short_id')
-    @mock.patch.object(ro.Receiver, 'get_by_name')
-    def test_find_not_found(self, mock_get_name, mock_get_shortid):
-        mock_get_shortid.return_value = None
-        mock_get_name.return_value = None
-        fake_id = '12345678'  # not a uuid
+    @mock.patch.object(db_api, 'receiver_find')
+    def test_find_not_found(self, mock_find):
+        mock_find.return_value = None
 
         self.assertRaises(exc.ResourceNotFound,
-                          ro.Receiver.find,
-                          self.ctx, fake_id)
-
-        mock_get_name.assert_called_once_with(self.ctx, fake_id)
+                          ro.Receiver.find, self.ctx, 'bogus')
+        mock_find.assert_called_once_with(self.ctx, 'bogus')
@@ -94,7 +94,7 @@ class TestBatchPolicy(base.SenlinTestCase):
         node3 = mock.Mock(id='3', status='ACTIVE')
 
         bad = []
-        good = [node1, node2, node3]
+        good = [node1.id, node2.id, node3.id]
 
         policy = bp.BatchPolicy('test-batch', self.spec)
         nodes = policy._pick_nodes(2, 2, bad, good)
@@ -110,7 +110,7 @@ class TestBatchPolicy(base.SenlinTestCase):
         node3 = mock.Mock(id='3', status='ERROR')
 
         bad = [node3.id]
-        good = [node1, node2]
+        good = [node1.id, node2.id]
 
         policy = bp.BatchPolicy('test-batch', self.spec)
 
@@ -124,9 +124,10 @@ class TestBatchPolicy(base.SenlinTestCase):
     @mock.patch.object(bp.BatchPolicy, '_pick_nodes')
     @mock.patch.object(bp.BatchPolicy, '_cal_batch_size')
     @mock.patch.object(su, 'filter_error_nodes')
+    @mock.patch.object(no.Node, 'iter_records')
     @mock.patch.object(no.Node, 'count_by_cluster')
-    def test__create_plan_for_update(self, mock_count, mock_filter,
-                                     mock_cal, mock_pick):
+    def test__create_plan_for_update(self, mock_count, mock_nodes,
+                                     mock_filter, mock_cal, mock_pick):
         action = mock.Mock()
         action.context = self.context
         action.action = 'CLUSTER_UPDATE'
@@ -134,11 +135,11 @@ class TestBatchPolicy(base.SenlinTestCase):
         node1 = mock.Mock(id='1', status='ACTIVE')
         node2 = mock.Mock(id='2', status='ACTIVE')
         node3 = mock.Mock(id='3', status='ACTIVE')
-        cluster.nodes = [node1, node2, node3]
+        mock_nodes.return_value = [node1, node2, node3]
 
         count = 3
         mock_count.return_value = count
-        mock_filter.return_value = ([], [node1, node2, node3])
+        mock_filter.return_value = ([], ['1', '2', '3'])
         mock_cal.return_value = (2, 2)
         mock_pick.return_value = [{'1', '2'}, {'3'}]
 
@@ -152,9 +153,11 @@ class TestBatchPolicy(base.SenlinTestCase):
         self.assertEqual(excepted_plan, plan)
 
         mock_count.assert_called_once_with(action.context, cluster.id)
-        mock_filter.assert_called_once_with(cluster.nodes)
+        mock_nodes.assert_called_once_with(action.context, 'cid')
+        mock_filter.assert_called_once_with(mock_nodes.return_value,
+                                            ids_only=True)
         mock_cal.assert_called_once_with(count, 'CLUSTER_UPDATE')
-        mock_pick.assert_called_once_with(2, 2, [], [node1, node2, node3])
+        mock_pick.assert_called_once_with(2, 2, [], ['1', '2', '3'])
 
     @mock.patch.object(bp.BatchPolicy, '_cal_batch_size')
     @mock.patch.object(no.Node, 'count_by_cluster')
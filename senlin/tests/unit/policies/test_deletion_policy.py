@@ -14,7 +14,6 @@ import mock
 
 from senlin.common import consts
 from senlin.common import scaleutils as su
-from senlin.engine import cluster as cm
 from senlin.objects import cluster as co
 from senlin.objects import node as no
 from senlin.policies import deletion_policy as dp
@@ -51,141 +50,112 @@ class TestDeletionPolicy(base.SenlinTestCase):
 
     @mock.patch.object(su, 'nodes_by_random')
     def test__victims_by_regions_random(self, mock_select):
-        cluster = mock.Mock()
         node1 = mock.Mock(id=1)
         node2 = mock.Mock(id=2)
         node3 = mock.Mock(id=3)
-        cluster.nodes_by_region.side_effect = [
-            [node1], [node2, node3]
-        ]
+        groups = {'R1': [node1], 'R2': [node2, node3]}
 
         mock_select.side_effect = [['1'], ['2', '3']]
 
         self.spec['properties']['criteria'] = 'RANDOM'
         policy = dp.DeletionPolicy('test-policy', self.spec)
 
-        res = policy._victims_by_regions(cluster, {'R1': 1, 'R2': 2})
+        res = policy._victims_by_regions(groups, {'R1': 1, 'R2': 2})
         self.assertEqual(['1', '2', '3'], res)
         mock_select.assert_has_calls([
             mock.call([node1], 1),
             mock.call([node2, node3], 2)
         ])
-        cluster.nodes_by_region.assert_has_calls([
-            mock.call('R1'), mock.call('R2')])
 
     @mock.patch.object(su, 'nodes_by_profile_age')
     def test__victims_by_regions_profile_age(self, mock_select):
-        cluster = mock.Mock()
         node1 = mock.Mock(id=1)
         node2 = mock.Mock(id=2)
         node3 = mock.Mock(id=3)
-        cluster.nodes_by_region.side_effect = [
-            [node1], [node2, node3]
-        ]
+        groups = {'R1': [node1], 'R2': [node2, node3]}
 
         mock_select.side_effect = [['1'], ['2', '3']]
 
         self.spec['properties']['criteria'] = 'OLDEST_PROFILE_FIRST'
         policy = dp.DeletionPolicy('test-policy', self.spec)
 
-        res = policy._victims_by_regions(cluster, {'R1': 1, 'R2': 2})
+        res = policy._victims_by_regions(groups, {'R1': 1, 'R2': 2})
         self.assertEqual(['1', '2', '3'], res)
         mock_select.assert_has_calls([
             mock.call([node1], 1),
             mock.call([node2, node3], 2)
         ])
-        cluster.nodes_by_region.assert_has_calls([
-            mock.call('R1'), mock.call('R2')])
 
     @mock.patch.object(su, 'nodes_by_age')
     def test__victims_by_regions_age_oldest(self, mock_select):
-        cluster = mock.Mock()
         node1 = mock.Mock(id=1)
         node2 = mock.Mock(id=2)
         node3 = mock.Mock(id=3)
-        cluster.nodes_by_region.side_effect = [
-            [node1], [node2, node3]
-        ]
+        groups = {'R1': [node1], 'R2': [node2, node3]}
 
         mock_select.side_effect = [['1'], ['2', '3']]
 
         self.spec['properties']['criteria'] = 'OLDEST_FIRST'
         policy = dp.DeletionPolicy('test-policy', self.spec)
 
-        res = policy._victims_by_regions(cluster, {'R1': 1, 'R2': 2})
+        res = policy._victims_by_regions(groups, {'R1': 1, 'R2': 2})
         self.assertEqual(['1', '2', '3'], res)
         mock_select.assert_has_calls([
             mock.call([node1], 1, True),
             mock.call([node2, node3], 2, True)
         ])
-        cluster.nodes_by_region.assert_has_calls([
-            mock.call('R1'), mock.call('R2')])
 
     @mock.patch.object(su, 'nodes_by_age')
     def test__victims_by_regions_age_youngest(self, mock_select):
-        cluster = mock.Mock()
         node1 = mock.Mock(id=1)
         node2 = mock.Mock(id=2)
         node3 = mock.Mock(id=3)
-        cluster.nodes_by_region.side_effect = [
-            [node1], [node2, node3]
-        ]
+        groups = {'R1': [node1], 'R2': [node2, node3]}
 
         mock_select.side_effect = [['1'], ['2', '3']]
 
         self.spec['properties']['criteria'] = 'YOUNGEST_FIRST'
         policy = dp.DeletionPolicy('test-policy', self.spec)
 
-        res = policy._victims_by_regions(cluster, {'R1': 1, 'R2': 2})
+        res = policy._victims_by_regions(groups, {'R1': 1, 'R2': 2})
         self.assertEqual(['1', '2', '3'], res)
         mock_select.assert_has_calls([
             mock.call([node1], 1, False),
             mock.call([node2, node3], 2, False)
         ])
-        cluster.nodes_by_region.assert_has_calls([
-            mock.call('R1'), mock.call('R2')])
 
     @mock.patch.object(su, 'nodes_by_random')
     def test__victims_by_zones_random(self, mock_select):
-        cluster = mock.Mock()
         node1 = mock.Mock(id=1)
         node2 = mock.Mock(id=2)
         node3 = mock.Mock(id=3)
-        cluster.nodes_by_zone.side_effect = [
-            [node1], [node2, node3]
-        ]
+        groups = {'AZ1': [node1], 'AZ2': [node2, node3]}
 
         mock_select.side_effect = [['1'], ['3']]
 
         self.spec['properties']['criteria'] = 'RANDOM'
         policy = dp.DeletionPolicy('test-policy', self.spec)
 
-        res = policy._victims_by_zones(cluster, {'AZ1': 1, 'AZ2': 1})
+        res = policy._victims_by_zones(groups, {'AZ1': 1, 'AZ2': 1})
         self.assertEqual(['1', '3'], res)
         mock_select.assert_has_calls([
             mock.call([node1], 1),
             mock.call([node2, node3], 1)
         ])
-        cluster.nodes_by_zone.assert_has_calls(
-            [mock.call('AZ1'), mock.call('AZ2')],
-        )
 
     @mock.patch.object(su, 'nodes_by_profile_age')
     def test__victims_by_zones_profile_age(self, mock_select):
-        cluster = mock.Mock()
         node1 = mock.Mock(id=1)
         node2 = mock.Mock(id=2)
         node3 = mock.Mock(id=3)
-        cluster.nodes_by_zone.side_effect = [
-            [node1], [node2, node3]
-        ]
+        groups = {'AZ1': [node1], 'AZ2': [node2, node3]}
 
         mock_select.side_effect = [['1'], ['2']]
 
         self.spec['properties']['criteria'] = 'OLDEST_PROFILE_FIRST'
         policy = dp.DeletionPolicy('test-policy', self.spec)
 
-        res = policy._victims_by_zones(cluster, {'AZ1': 1, 'AZ2': 1})
+        res = policy._victims_by_zones(groups, {'AZ1': 1, 'AZ2': 1})
         self.assertEqual(['1', '2'], res)
         mock_select.assert_has_calls(
             [
@@ -193,51 +163,39 @@ class TestDeletionPolicy(base.SenlinTestCase):
                 mock.call([node2, node3], 1)
             ],
         )
-        cluster.nodes_by_zone.assert_has_calls(
-            [mock.call('AZ1'), mock.call('AZ2')],
-        )
 
     @mock.patch.object(su, 'nodes_by_age')
     def test__victims_by_zones_age_oldest(self, mock_select):
-        cluster = mock.Mock()
         node1 = mock.Mock(id=1)
         node2 = mock.Mock(id=2)
         node3 = mock.Mock(id=3)
-        cluster.nodes_by_zone.side_effect = [
-            [node1], [node2, node3]
-        ]
+        groups = {'AZ1': [node1], 'AZ8': [node2, node3]}
 
         mock_select.side_effect = [['1'], ['3']]
 
         self.spec['properties']['criteria'] = 'OLDEST_FIRST'
         policy = dp.DeletionPolicy('test-policy', self.spec)
 
-        res = policy._victims_by_zones(cluster, {'AZ1': 1, 'AZ8': 1})
+        res = policy._victims_by_zones(groups, {'AZ1': 1, 'AZ8': 1})
         self.assertEqual(['1', '3'], res)
         mock_select.assert_has_calls([
             mock.call([node1], 1, True),
             mock.call([node2, node3], 1, True)
         ])
-        cluster.nodes_by_zone.assert_has_calls(
-            [mock.call('AZ1'), mock.call('AZ8')],
-        )
 
     @mock.patch.object(su, 'nodes_by_age')
     def test__victims_by_zones_age_youngest(self, mock_select):
-        cluster = mock.Mock()
         node1 = mock.Mock(id=1)
         node2 = mock.Mock(id=3)
         node3 = mock.Mock(id=5)
-        cluster.nodes_by_zone.side_effect = [
-            [node1], [node2, node3]
-        ]
+        groups = {'AZ5': [node1], 'AZ6': [node2, node3]}
 
         mock_select.side_effect = [['1'], ['3', '5']]
 
         self.spec['properties']['criteria'] = 'YOUNGEST_FIRST'
         policy = dp.DeletionPolicy('test-policy', self.spec)
 
-        res = policy._victims_by_zones(cluster, {'AZ5': 1, 'AZ6': 2})
+        res = policy._victims_by_zones(groups, {'AZ5': 1, 'AZ6': 2})
         self.assertEqual(['1', '3', '5'], res)
         mock_select.assert_has_calls(
             [
@@ -245,9 +203,6 @@ class TestDeletionPolicy(base.SenlinTestCase):
                 mock.call([node2, node3], 2, False)
             ],
         )
-        cluster.nodes_by_zone.assert_has_calls(
-            [mock.call('AZ5'), mock.call('AZ6')],
-        )
 
     def test__update_action_clean(self):
         action = mock.Mock()
@@ -325,31 +280,30 @@ class TestDeletionPolicy(base.SenlinTestCase):
         mock_update.assert_called_once_with(action, ['NODE_ID'])
 
     @mock.patch.object(dp.DeletionPolicy, '_update_action')
-    @mock.patch.object(su, 'nodes_by_age')
-    @mock.patch.object(cm.Cluster, 'load')
-    def test_pre_op_with_count_decisions(self, mock_load, mock_select,
+    @mock.patch.object(no.Node, 'get_victims')
+    @mock.patch.object(no.Node, 'get_records')
+    def test_pre_op_with_count_decisions(self, mock_records, mock_select,
                                          mock_update):
         action = mock.Mock()
         action.context = self.context
         action.inputs = {}
         action.data = {'deletion': {'count': 2}}
 
-        cluster = mock.Mock(nodes=['a', 'b', 'c'])
-        mock_load.return_value = cluster
         mock_select.return_value = ['NODE1', 'NODE2']
 
         policy = dp.DeletionPolicy('test-policy', self.spec)
         policy.pre_op('FAKE_ID', action)
 
         mock_update.assert_called_once_with(action, ['NODE1', 'NODE2'])
-        mock_load.assert_called_once_with(action.context,
-                                          dbcluster=None, cluster_id='FAKE_ID')
-        mock_select.assert_called_once_with(cluster.nodes, 2, True)
+        self.assertEqual(0, mock_records.call_count)
+        mock_select.assert_called_once_with(action.context, 'FAKE_ID', 2,
+                                            'OLDEST_FIRST',
+                                            project_safe=False)
 
     @mock.patch.object(dp.DeletionPolicy, '_update_action')
     @mock.patch.object(dp.DeletionPolicy, '_victims_by_regions')
-    @mock.patch.object(cm.Cluster, 'load')
-    def test_pre_op_with_region_decisions(self, mock_load, mock_select,
+    @mock.patch.object(no.Node, 'get_records')
+    def test_pre_op_with_region_decisions(self, mock_records, mock_select,
                                           mock_update):
         action = mock.Mock()
         action.context = self.context
@@ -364,22 +318,26 @@ class TestDeletionPolicy(base.SenlinTestCase):
             }
         }
 
-        cluster = mock.Mock(nodes=['a', 'b', 'c'])
-        mock_load.return_value = cluster
+        node1 = mock.Mock(placement={'region_name': 'R1'})
+        node2 = mock.Mock(placement={'region_name': 'R2'})
+        node3 = mock.Mock(placement={'region_name': 'R1'})
+        node4 = mock.Mock(placement={'region_name': 'R3'})
+        mock_records.return_value = [node1, node2, node3, node4]
         mock_select.return_value = ['NODE1', 'NODE2']
 
         policy = dp.DeletionPolicy('test-policy', self.spec)
         policy.pre_op('FAKE_ID', action)
 
         mock_update.assert_called_once_with(action, ['NODE1', 'NODE2'])
-        mock_load.assert_called_once_with(action.context,
-                                          dbcluster=None, cluster_id='FAKE_ID')
-        mock_select.assert_called_once_with(cluster, {'R1': 1, 'R2': 1})
+        mock_records.assert_called_once_with(action.context, 'FAKE_ID',
+                                             project_safe=False)
+        groups = {'R1': [node1, node3], 'R2': [node2], 'R3': [node4]}
+        mock_select.assert_called_once_with(groups, {'R1': 1, 'R2': 1})
 
     @mock.patch.object(dp.DeletionPolicy, '_update_action')
     @mock.patch.object(dp.DeletionPolicy, '_victims_by_zones')
-    @mock.patch.object(cm.Cluster, 'load')
-    def test_pre_op_with_zone_decisions(self, mock_load, mock_select,
+    @mock.patch.object(no.Node, 'get_records')
+    def test_pre_op_with_zone_decisions(self, mock_records, mock_select,
                                         mock_update):
         action = mock.Mock()
         action.context = self.context
@@ -394,67 +352,62 @@ class TestDeletionPolicy(base.SenlinTestCase):
             }
         }
 
-        cluster = mock.Mock(nodes=['a', 'b', 'c'])
-        mock_load.return_value = cluster
+        node1 = mock.Mock(placement={'zone': 'AZ1'})
+        node2 = mock.Mock(placement={'zone': 'AZ2'})
+        node3 = mock.Mock(placement={'zone': 'AZ1'})
+        node4 = mock.Mock(placement={'zone': 'AZ3'})
+        mock_records.return_value = [node1, node2, node3, node4]
         mock_select.return_value = ['NODE1', 'NODE2']
 
         policy = dp.DeletionPolicy('test-policy', self.spec)
         policy.pre_op('FAKE_ID', action)
 
         mock_update.assert_called_once_with(action, ['NODE1', 'NODE2'])
-        mock_load.assert_called_once_with(action.context,
-                                          dbcluster=None, cluster_id='FAKE_ID')
-        mock_select.assert_called_once_with(cluster, {'AZ1': 1, 'AZ2': 1})
+        mock_records.assert_called_once_with(action.context, 'FAKE_ID',
+                                             project_safe=False)
+        groups = {'AZ1': [node1, node3], 'AZ2': [node2], 'AZ3': [node4]}
+        mock_select.assert_called_once_with(groups, {'AZ1': 1, 'AZ2': 1})
 
     @mock.patch.object(dp.DeletionPolicy, '_update_action')
-    @mock.patch.object(su, 'nodes_by_age')
-    @mock.patch.object(cm.Cluster, 'load')
-    def test_pre_op_scale_in_with_count(self, mock_load, mock_select,
-                                        mock_update):
+    @mock.patch.object(no.Node, 'get_victims')
+    def test_pre_op_scale_in_with_count(self, mock_select, mock_update):
         action = mock.Mock()
         action.action = consts.CLUSTER_SCALE_IN
         action.context = self.context
         action.data = {}
         action.inputs = {'count': 2}
 
-        cluster = mock.Mock(nodes=[mock.Mock()])
-        mock_load.return_value = cluster
+        # the input count is greater than the cluster size
         mock_select.return_value = ['NODE_ID']
 
         policy = dp.DeletionPolicy('test-policy', self.spec)
         policy.pre_op('FAKE_ID', action)
 
-        mock_load.assert_called_once_with(action.context,
-                                          dbcluster=None, cluster_id='FAKE_ID')
         mock_update.assert_called_once_with(action, ['NODE_ID'])
-        # the following was invoked with 1 because the input count is
-        # greater than the cluster size
-        mock_select.assert_called_once_with(cluster.nodes, 1, True)
+        mock_select.assert_called_once_with(action.context, 'FAKE_ID', 2,
+                                            'OLDEST_FIRST',
+                                            project_safe=False)
 
     @mock.patch.object(dp.DeletionPolicy, '_update_action')
-    @mock.patch.object(su, 'nodes_by_age')
-    @mock.patch.object(cm.Cluster, 'load')
-    def test_pre_op_scale_in_without_count(self, mock_load, mock_select,
-                                           mock_update):
+    @mock.patch.object(no.Node, 'get_victims')
+    def test_pre_op_scale_in_without_count(self, mock_select, mock_update):
         action = mock.Mock()
         action.context = self.context
         action.action = consts.CLUSTER_SCALE_IN
         action.data = {}
         action.inputs = {}
 
-        cluster = mock.Mock(nodes=[mock.Mock()])
-        mock_load.return_value = cluster
         mock_select.return_value = ['NODE_ID']
 
         policy = dp.DeletionPolicy('test-policy', self.spec)
         policy.pre_op('FAKE_ID', action)
 
-        mock_load.assert_called_once_with(action.context,
-                                          dbcluster=None, cluster_id='FAKE_ID')
         mock_update.assert_called_once_with(action, ['NODE_ID'])
         # the following was invoked with 1 because the input count is
         # not specified so 1 becomes the default
-        mock_select.assert_called_once_with(cluster.nodes, 1, True)
+        mock_select.assert_called_once_with(action.context, 'FAKE_ID', 1,
+                                            'OLDEST_FIRST',
+                                            project_safe=False)
 
     @mock.patch.object(dp.DeletionPolicy, '_update_action')
     @mock.patch.object(su, 'parse_resize_params')
@@ -518,12 +471,10 @@ class TestDeletionPolicy(base.SenlinTestCase):
     @mock.patch.object(su, 'parse_resize_params')
     @mock.patch.object(no.Node, 'count_by_cluster')
     @mock.patch.object(dp.DeletionPolicy, '_update_action')
-    @mock.patch.object(su, 'nodes_by_age')
-    @mock.patch.object(cm.Cluster, 'load')
+    @mock.patch.object(no.Node, 'get_victims')
     @mock.patch.object(co.Cluster, 'get')
-    def test_pre_op_resize_with_count(self, mock_get, mock_load,
-                                      mock_select, mock_update, mock_count,
-                                      mock_parse):
+    def test_pre_op_resize_with_count(self, mock_get, mock_select,
+                                      mock_update, mock_count, mock_parse):
         def fake_parse(a, cluster, current):
             a.data = {
                 'deletion': {
@@ -543,53 +494,42 @@ class TestDeletionPolicy(base.SenlinTestCase):
         mock_count.return_value = 2
         mock_parse.side_effect = fake_parse
 
-        cluster = mock.Mock(nodes=[mock.Mock(), mock.Mock()])
-        mock_load.return_value = cluster
-
         mock_select.return_value = ['NID']
 
         policy = dp.DeletionPolicy('test-policy', self.spec)
 
-        # mock_parse = self.patchobject(su, 'parse_resize_params',
-        #                              side_effect=fake_parse)
-
         policy.pre_op('FAKE_ID', action)
 
         mock_get.assert_called_once_with(action.context, 'FAKE_ID')
         mock_count.assert_called_once_with(action.context, 'FAKE_ID')
         mock_parse.assert_called_once_with(action, db_cluster, 2)
-        mock_load.assert_called_once_with(action.context,
-                                          dbcluster=db_cluster,
-                                          cluster_id='FAKE_ID')
+        mock_select.assert_called_once_with(action.context, 'FAKE_ID', 2,
+                                            'OLDEST_FIRST',
+                                            project_safe=False)
         mock_update.assert_called_once_with(action, ['NID'])
 
     @mock.patch.object(dp.DeletionPolicy, '_update_action')
-    @mock.patch.object(su, 'nodes_by_random')
-    @mock.patch.object(cm.Cluster, 'load')
-    def test_pre_op_do_random(self, mock_load, mock_select, mock_update):
+    @mock.patch.object(no.Node, 'get_victims')
+    def test_pre_op_do_random(self, mock_select, mock_update):
         action = mock.Mock()
         action.context = self.context
         action.inputs = {}
         action.data = {'deletion': {'count': 2}}
 
-        cluster = mock.Mock(nodes=['a', 'b', 'c'])
         mock_select.return_value = ['NODE1', 'NODE2']
-        mock_load.return_value = cluster
 
         self.spec['properties']['criteria'] = 'RANDOM'
         policy = dp.DeletionPolicy('test-policy', self.spec)
         policy.pre_op('FAKE_ID', action)
 
-        mock_load.assert_called_once_with(action.context,
-                                          dbcluster=None, cluster_id='FAKE_ID')
-        mock_select.assert_called_once_with(cluster.nodes, 2)
+        mock_select.assert_called_once_with(action.context, 'FAKE_ID', 2,
+                                            'RANDOM',
+                                            project_safe=False)
         mock_update.assert_called_once_with(action, ['NODE1', 'NODE2'])
 
     @mock.patch.object(dp.DeletionPolicy, '_update_action')
-    @mock.patch.object(su, 'nodes_by_profile_age')
-    @mock.patch.object(cm.Cluster, 'load')
-    def test_pre_op_do_oldest_profile(self, mock_load, mock_select,
-                                      mock_update):
+    @mock.patch.object(no.Node, 'get_victims')
+    def test_pre_op_do_oldest_profile(self, mock_select, mock_update):
         action = mock.Mock()
         action.context = self.context
         action.inputs = {}
@@ -597,59 +537,49 @@ class TestDeletionPolicy(base.SenlinTestCase):
 
         mock_select.return_value = ['NODE1', 'NODE2']
 
-        cluster = mock.Mock(nodes=['a', 'b', 'c'])
-        mock_load.return_value = cluster
-
         self.spec['properties']['criteria'] = 'OLDEST_PROFILE_FIRST'
         policy = dp.DeletionPolicy('test-policy', self.spec)
         policy.pre_op('FAKE_ID', action)
 
-        mock_load.assert_called_once_with(action.context,
-                                          dbcluster=None, cluster_id='FAKE_ID')
-        mock_select.assert_called_once_with(cluster.nodes, 2)
+        mock_select.assert_called_once_with(action.context, 'FAKE_ID', 2,
+                                            'OLDEST_PROFILE_FIRST',
+                                            project_safe=False)
         mock_update.assert_called_once_with(action, ['NODE1', 'NODE2'])
 
     @mock.patch.object(dp.DeletionPolicy, '_update_action')
-    @mock.patch.object(su, 'nodes_by_age')
-    @mock.patch.object(cm.Cluster, 'load')
-    def test_pre_op_do_oldest_first(self, mock_load, mock_select, mock_update):
+    @mock.patch.object(no.Node, 'get_victims')
+    def test_pre_op_do_oldest_first(self, mock_select, mock_update):
         action = mock.Mock()
         action.context = self.context
         action.inputs = {}
         action.data = {'deletion': {'count': 2}}
 
-        cluster = mock.Mock(nodes=['a', 'b', 'c'])
         mock_select.return_value = ['NODE1', 'NODE2']
-        mock_load.return_value = cluster
 
         self.spec['properties']['criteria'] = 'OLDEST_FIRST'
         policy = dp.DeletionPolicy('test-policy', self.spec)
         policy.pre_op('FAKE_ID', action)
 
-        mock_load.assert_called_once_with(action.context,
-                                          dbcluster=None, cluster_id='FAKE_ID')
-        mock_select.assert_called_once_with(cluster.nodes, 2, True)
+        mock_select.assert_called_once_with(action.context, 'FAKE_ID', 2,
+                                            'OLDEST_FIRST',
+                                            project_safe=False)
         mock_update.assert_called_once_with(action, ['NODE1', 'NODE2'])
 
     @mock.patch.object(dp.DeletionPolicy, '_update_action')
-    @mock.patch.object(su, 'nodes_by_age')
-    @mock.patch.object(cm.Cluster, 'load')
-    def test_pre_op_do_youngest_first(self, mock_load, mock_select,
-                                      mock_update):
+    @mock.patch.object(no.Node, 'get_victims')
+    def test_pre_op_do_youngest_first(self, mock_select, mock_update):
         action = mock.Mock()
         action.context = self.context
         action.inputs = {}
         action.data = {'deletion': {'count': 2}}
 
-        cluster = mock.Mock(nodes=['a', 'b', 'c'])
         mock_select.return_value = ['NODE1', 'NODE2']
-        mock_load.return_value = cluster
 
         self.spec['properties']['criteria'] = 'YOUNGEST_FIRST'
         policy = dp.DeletionPolicy('test-policy', self.spec)
         policy.pre_op('FAKE_ID', action)
 
-        mock_load.assert_called_once_with(action.context,
-                                          dbcluster=None, cluster_id='FAKE_ID')
-        mock_select.assert_called_once_with(cluster.nodes, 2, False)
+        mock_select.assert_called_once_with(action.context, 'FAKE_ID', 2,
+                                            'YOUNGEST_FIRST',
+                                            project_safe=False)
         mock_update.assert_called_once_with(action, ['NODE1', 'NODE2'])
@@ -175,13 +175,14 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
         self.assertEqual("The specified subnet 'external-subnet' could not "
                          "be found.", six.text_type(ex))
 
+    @mock.patch.object(no.Node, 'update_batch')
     @mock.patch.object(lb_policy.LoadBalancingPolicy, '_build_policy_data')
     @mock.patch.object(node_mod.Node, 'load_all')
     @mock.patch.object(policy_base.Policy, 'attach')
-    def test_attach_succeeded(self, m_attach, m_load, m_build):
+    def test_attach_succeeded(self, m_attach, m_load, m_build, m_update):
         cluster = mock.Mock(id='CLUSTER_ID', data={})
-        node1 = mock.Mock()
-        node2 = mock.Mock()
+        node1 = mock.Mock(id='NODE1_ID', data={})
+        node2 = mock.Mock(id='NODE2_ID', data={})
         m_attach.return_value = (True, None)
         m_load.return_value = [node1, node2]
         m_build.return_value = 'policy_data'
@@ -191,7 +192,10 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
             'pool': 'POOL_ID'
         }
         self.lb_driver.lb_create.return_value = (True, data)
-        self.lb_driver.member_add.side_effect = ['MEMBER1_ID', 'MEMBER2_ID']
+        self.lb_driver.members_add.return_value = {
+            'NODE1_ID': 'MEMBER1_ID',
+            'NODE2_ID': 'MEMBER2_ID',
+        }
 
         policy = lb_policy.LoadBalancingPolicy('test-policy', self.spec)
         policy.id = 'FAKE_ID'
@@ -205,15 +209,16 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
                                                          policy.pool_spec,
                                                          policy.hm_spec)
         m_load.assert_called_once_with(mock.ANY, cluster_id=cluster.id)
-        member_add_calls = [
-            mock.call(node1, 'LB_ID', 'POOL_ID', 80, 'internal-subnet'),
-            mock.call(node2, 'LB_ID', 'POOL_ID', 80, 'internal-subnet')
-        ]
-        self.lb_driver.member_add.assert_has_calls(member_add_calls)
-        node1.data.update.assert_called_once_with({'lb_member': 'MEMBER1_ID'})
-        node2.data.update.assert_called_once_with({'lb_member': 'MEMBER2_ID'})
-        node1.store.assert_called_once_with(mock.ANY)
-        node2.store.assert_called_once_with(mock.ANY)
+        self.lb_driver.members_add.assert_called_once_with(
+            [node1, node2], 'LB_ID', 'POOL_ID', 80, 'internal-subnet')
+        self.assertEqual({'lb_member': 'MEMBER1_ID'}, node1.data)
+        self.assertEqual({'lb_member': 'MEMBER2_ID'}, node2.data)
+        m_update.assert_called_once_with(mock.ANY, {
+            'NODE1_ID': {'data': {'lb_member': 'MEMBER1_ID'}},
+            'NODE2_ID': {'data': {'lb_member': 'MEMBER2_ID'}},
+        })
+        self.assertEqual(0, node1.store.call_count)
+        self.assertEqual(0, node2.store.call_count)
         expected = {
             policy.id: {'vip_address': '192.168.1.100'}
         }
@@ -249,7 +254,8 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
     def test_attach_failed_member_add(self, mock_attach, mock_load):
         cluster = mock.Mock()
         mock_attach.return_value = (True, None)
-        mock_load.return_value = ['node1', 'node2']
+        mock_load.return_value = [mock.Mock(id='NODE1_ID'),
+                                  mock.Mock(id='NODE2_ID')]
         lb_data = {
             'loadbalancer': 'LB_ID',
             'vip_address': '192.168.1.100',
@@ -257,9 +263,9 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
         }
         policy = lb_policy.LoadBalancingPolicy('test-policy', self.spec)
         policy._lbaasclient = self.lb_driver
-        # lb_driver.member_add return None
+        # lb_driver.members_add failed for one of the nodes
         self.lb_driver.lb_create.return_value = (True, lb_data)
-        self.lb_driver.member_add.return_value = None
+        self.lb_driver.members_add.return_value = {'NODE1_ID': 'MEMBER1_ID'}
 
         res = policy.attach(cluster)
 
@@ -284,7 +290,7 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
 
         self.assertEqual(['node1', 'node2'], res)
 
-    @mock.patch.object(no.Node, 'get_all_by_cluster')
+    @mock.patch.object(no.Node, 'get_records')
     @mock.patch.object(scaleutils, 'nodes_by_random')
     def test_get_delete_candidates_no_deletion_data_scale_in(self,
                                                              m_nodes_random,
@@ -301,7 +307,7 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
         m_nodes_random.assert_called_once_with(['node1', 'node2', 'node3'], 1)
         self.assertEqual(['node1', 'node3'], res)
 
-    @mock.patch.object(no.Node, 'get_all_by_cluster')
+    @mock.patch.object(no.Node, 'get_records')
     @mock.patch.object(no.Node, 'count_by_cluster')
     @mock.patch.object(co.Cluster, 'get')
     @mock.patch.object(scaleutils, 'parse_resize_params')
@@ -332,7 +338,7 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
         m_nodes_random.assert_called_once_with(['node1', 'node2', 'node3'], 2)
         self.assertEqual(['node1', 'node3'], res)
 
-    @mock.patch.object(no.Node, 'get_all_by_cluster')
+    @mock.patch.object(no.Node, 'get_records')
     @mock.patch.object(scaleutils, 'nodes_by_random')
     def test_get_delete_candidates_deletion_no_candidates(self,
                                                           m_nodes_random,
@@ -362,7 +368,7 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
 
         self.assertEqual([], res)
 
-    @mock.patch.object(no.Node, 'get_all_by_cluster')
+    @mock.patch.object(no.Node, 'get_records')
     @mock.patch.object(scaleutils, 'nodes_by_random')
     def test_get_delete_candidates_deletion_count_over_size(self,
                                                             m_nodes_random,
@@ -502,15 +508,16 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
 
         self.assertIsNone(res)
 
+    @mock.patch.object(no.Node, 'update_batch')
     @mock.patch.object(node_mod.Node, 'load')
     @mock.patch.object(co.Cluster, 'get')
-    def test_post_op_node_create(self, m_cluster_get, m_node_load, m_extract,
-                                 m_load):
+    def test_post_op_node_create(self, m_cluster_get, m_node_load, m_update,
+                                 m_extract, m_load):
         ctx = mock.Mock()
         cid = 'CLUSTER_ID'
         cluster = mock.Mock(user='user1', project='project1')
         m_cluster_get.return_value = cluster
-        node_obj = mock.Mock(data={})
+        node_obj = mock.Mock(id='NODE_ID', data={})
         action = mock.Mock(data={}, context=ctx, action=consts.NODE_CREATE,
                            node=mock.Mock(id='NODE_ID'))
         cp = mock.Mock()
@@ -531,7 +538,7 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         m_load.return_value = cp
         m_extract.return_value = policy_data
 
-        self.lb_driver.member_add.side_effect = ['MEMBER_ID']
+        self.lb_driver.members_add.return_value = {'NODE_ID': 'MEMBER_ID'}
         policy = lb_policy.LoadBalancingPolicy('test-policy', self.spec)
         policy._lbaasclient = self.lb_driver
 
@@ -544,20 +551,22 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         m_load.assert_called_once_with(ctx, cid, policy.id)
         m_extract.assert_called_once_with(cp_data)
         m_node_load.assert_called_once_with(ctx, node_id='NODE_ID')
-        self.lb_driver.member_add.assert_called_once_with(
-            node_obj, 'LB_ID', 'POOL_ID', 80, 'test-subnet')
-        node_obj.store.assert_called_once_with(ctx)
+        self.lb_driver.members_add.assert_called_once_with(
+            [node_obj], 'LB_ID', 'POOL_ID', 80, 'test-subnet')
+        m_update.assert_called_once_with(
+            ctx, {'NODE_ID': {'data': {'lb_member': 'MEMBER_ID'}}})
         self.assertEqual({'lb_member': 'MEMBER_ID'}, node_obj.data)
 
+    @mock.patch.object(no.Node, 'update_batch')
     @mock.patch.object(node_mod.Node, 'load')
     @mock.patch.object(co.Cluster, 'get')
-    def test_post_op_add_nodes(self, m_cluster_get, m_node_load, m_extract,
-                               m_load):
+    def test_post_op_add_nodes(self, m_cluster_get, m_node_load, m_update,
+                               m_extract, m_load):
         cid = 'CLUSTER_ID'
         cluster = mock.Mock(user='user1', project='project1')
         m_cluster_get.return_value = cluster
-        node1 = mock.Mock(data={})
-        node2 = mock.Mock(data={})
+        node1 = mock.Mock(id='NODE1_ID', data={})
+        node2 = mock.Mock(id='NODE2_ID', data={})
         action = mock.Mock(context='action_context',
                            action=consts.CLUSTER_RESIZE,
                            data={
@@ -579,7 +588,10 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
             }
         }
         cp.data = cp_data
-        self.lb_driver.member_add.side_effect = ['MEMBER1_ID', 'MEMBER2_ID']
+        self.lb_driver.members_add.return_value = {
+            'NODE1_ID': 'MEMBER1_ID',
+            'NODE2_ID': 'MEMBER2_ID',
+        }
         m_node_load.side_effect = [node1, node2]
         m_load.return_value = cp
         m_extract.return_value = policy_data
@@ -599,23 +611,25 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
             mock.call('action_context', node_id='NODE2_ID')
         ]
         m_node_load.assert_has_calls(calls_node_load)
-        calls_member_add = [
-            mock.call(node1, 'LB_ID', 'POOL_ID', 80, 'test-subnet'),
-            mock.call(node2, 'LB_ID', 'POOL_ID', 80, 'test-subnet'),
-        ]
-        self.lb_driver.member_add.assert_has_calls(calls_member_add)
-        node1.store.assert_called_once_with('action_context')
-        node2.store.assert_called_once_with('action_context')
+        self.lb_driver.members_add.assert_called_once_with(
+            [node1, node2], 'LB_ID', 'POOL_ID', 80, 'test-subnet')
+        m_update.assert_called_once_with('action_context', {
+            'NODE1_ID': {'data': {'lb_member': 'MEMBER1_ID'}},
+            'NODE2_ID': {'data': {'lb_member': 'MEMBER2_ID'}},
+        })
+        self.assertEqual(0, node1.store.call_count)
+        self.assertEqual(0, node2.store.call_count)
         self.assertEqual({'lb_member': 'MEMBER1_ID'}, node1.data)
         self.assertEqual({'lb_member': 'MEMBER2_ID'}, node2.data)
 
+    @mock.patch.object(no.Node, 'update_batch')
     @mock.patch.object(node_mod.Node, 'load')
     @mock.patch.object(co.Cluster, 'get')
     def test_post_op_add_nodes_in_pool(self, m_cluster_get, m_node_load,
-                                       m_extract, m_load):
+                                       m_update, m_extract, m_load):
         cluster_id = 'CLUSTER_ID'
-        node1 = mock.Mock(data={'lb_member': 'MEMBER1_ID'})
-        node2 = mock.Mock(data={})
+        node1 = mock.Mock(id='NODE1_ID', data={'lb_member': 'MEMBER1_ID'})
+        node2 = mock.Mock(id='NODE2_ID', data={})
         action = mock.Mock(
             action=consts.CLUSTER_RESIZE,
             context='action_context',
@@ -627,7 +641,7 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
             'pool': 'POOL_ID',
             'healthmonitor': 'HM_ID'
         }
-        self.lb_driver.member_add.side_effect = ['MEMBER2_ID']
+        self.lb_driver.members_add.return_value = {'NODE2_ID': 'MEMBER2_ID'}
         m_node_load.side_effect = [node1, node2]
         m_extract.return_value = policy_data
         policy = lb_policy.LoadBalancingPolicy('test-policy', self.spec)
@@ -636,19 +650,23 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         res = policy.post_op(cluster_id, action)
 
         self.assertIsNone(res)
-        self.lb_driver.member_add.assert_called_once_with(
-            node2, 'LB_ID', 'POOL_ID', 80, 'test-subnet')
+        self.lb_driver.members_add.assert_called_once_with(
+            [node2], 'LB_ID', 'POOL_ID', 80, 'test-subnet')
+        m_update.assert_called_once_with(
+            'action_context',
+            {'NODE2_ID': {'data': {'lb_member': 'MEMBER2_ID'}}})
 
+    @mock.patch.object(no.Node, 'update_batch')
     @mock.patch.object(node_mod.Node, 'load')
     @mock.patch.object(co.Cluster, 'get')
     def test_post_op_add_nodes_failed(self, m_cluster_get, m_node_load,
-                                      m_extract, m_load):
+                                      m_update, m_extract, m_load):
         cluster_id = 'CLUSTER_ID'
-        node1 = mock.Mock(data={})
+        node1 = mock.Mock(id='NODE1_ID', data={})
         action = mock.Mock(data={'creation': {'nodes': ['NODE1_ID']}},
                            context='action_context',
                            action=consts.CLUSTER_RESIZE)
-        self.lb_driver.member_add.return_value = None
+        self.lb_driver.members_add.return_value = {}
         m_node_load.side_effect = [node1]
         m_extract.return_value = {
             'loadbalancer': 'LB_ID',
@@ -665,8 +683,10 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         self.assertEqual(policy_base.CHECK_ERROR, action.data['status'])
         self.assertEqual('Failed in adding new node(s) into lb pool.',
                          action.data['reason'])
-        self.lb_driver.member_add.assert_called_once_with(
-            node1, 'LB_ID', 'POOL_ID', 80, 'test-subnet')
+        self.lb_driver.members_add.assert_called_once_with(
+            [node1], 'LB_ID', 'POOL_ID', 80, 'test-subnet')
+        m_update.assert_called_once_with('action_context', {})
+        self.assertEqual({}, node1.data)
 
     @mock.patch.object(node_mod.Node, 'load')
     @mock.patch.object(co.Cluster, 'get')
@@ -698,7 +718,8 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
             }
         }
         cp.data = cp_data
-        self.lb_driver.member_remove.return_value = True
+        self.lb_driver.members_remove.return_value = ['MEMBER1_ID',
+                                                      'MEMBER2_ID']
         m_node_load.side_effect = [node1, node2]
         m_load.return_value = cp
         m_extract.return_value = policy_data
@@ -716,11 +737,8 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
             mock.call(mock.ANY, node_id='NODE2_ID')
         ]
         m_node_load.assert_has_calls(calls_node_load)
-        calls_member_del = [
-            mock.call('LB_ID', 'POOL_ID', 'MEMBER1_ID'),
-            mock.call('LB_ID', 'POOL_ID', 'MEMBER2_ID')
-        ]
-        self.lb_driver.member_remove.assert_has_calls(calls_member_del)
+        self.lb_driver.members_remove.assert_called_once_with(
+            'LB_ID', 'POOL_ID', ['MEMBER1_ID', 'MEMBER2_ID'])
 
         expected_data = {'deletion': {'candidates': ['NODE1_ID', 'NODE2_ID'],
                                       'count': 2}}
@@ -737,7 +755,7 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
             action=consts.CLUSTER_RESIZE,
             context='action_context',
             data={'deletion': {'candidates': ['NODE1_ID', 'NODE2_ID']}})
-        self.lb_driver.member_remove.return_value = True
+        self.lb_driver.members_remove.return_value = ['MEMBER2_ID']
         m_node_load.side_effect = [node1, node2]
         m_extract.return_value = {
             'loadbalancer': 'LB_ID',
@@ -751,8 +769,8 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         res = policy.pre_op(cluster_id, action)
 
         self.assertIsNone(res)
-        self.lb_driver.member_remove.assert_called_once_with(
-            'LB_ID', 'POOL_ID', 'MEMBER2_ID')
+        self.lb_driver.members_remove.assert_called_once_with(
+            'LB_ID', 'POOL_ID', ['MEMBER2_ID'])
 
     @mock.patch.object(node_mod.Node, 'load')
     @mock.patch.object(co.Cluster, 'get')
@@ -765,7 +783,7 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
             action=consts.CLUSTER_RESIZE,
             context='action_context',
             data={'deletion': {'candidates': ['NODE1_ID']}})
-        self.lb_driver.member_remove.return_value = False
+        self.lb_driver.members_remove.return_value = []
         m_node_load.side_effect = [node1]
         m_extract.return_value = {
             'loadbalancer': 'LB_ID',
@@ -782,5 +800,5 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         self.assertEqual(policy_base.CHECK_ERROR, action.data['status'])
         self.assertEqual('Failed in removing deleted node(s) from lb pool.',
                          action.data['reason'])
-        self.lb_driver.member_remove.assert_called_once_with(
-            'LB_ID', 'POOL_ID', 'MEMBER1_ID')
+        self.lb_driver.members_remove.assert_called_once_with(
+            'LB_ID', 'POOL_ID', ['MEMBER1_ID'])
@@ -344,7 +344,8 @@ class TestRegionPlacementPolicy(base.SenlinTestCase):
 
         mock_load.assert_called_once_with(action.context, 'FAKE_CLUSTER')
         kc.validate_regions.assert_called_once_with(regions.keys())
-        cluster.get_region_distribution.assert_called_once_with(regions.keys())
+        cluster.get_region_distribution.assert_called_once_with(
+            action.context, regions.keys())
         policy._create_plan.assert_called_once_with(
             current_dist, regions, 3, True)
 
@@ -436,6 +437,7 @@ class TestRegionPlacementPolicy(base.SenlinTestCase):
 
         mock_load.assert_called_once_with(action.context, 'FAKE_CLUSTER')
         kc.validate_regions.assert_called_once_with(regions.keys())
-        cluster.get_region_distribution.assert_called_once_with(regions.keys())
+        cluster.get_region_distribution.assert_called_once_with(
+            action.context, regions.keys())
         policy._create_plan.assert_called_once_with(
             current_dist, regions, 3, True)
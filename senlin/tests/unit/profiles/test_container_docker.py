@@ -208,7 +208,7 @@ class TestContainerDockerProfile(base.SenlinTestCase):
         node1 = mock.Mock(status='ERROR')
         node2 = mock.Mock(status='ACTIVE')
         node3 = mock.Mock(status='ACTIVE')
-        cluster = mock.Mock(rt={'nodes': [node1, node2, node3]})
+        cluster = mock.Mock(nodes=[node1, node2, node3])
         mock_cluster.return_value = cluster
         active_nodes = [node2, node3]
         profile = docker_profile.DockerProfile('container', self.spec)
@@ -232,7 +232,7 @@ class TestContainerDockerProfile(base.SenlinTestCase):
 
     @mock.patch.object(cluster.Cluster, 'load')
     def test__get_random_node_empty_cluster(self, mock_cluster):
-        cluster = mock.Mock(rt={'nodes': []})
+        cluster = mock.Mock(nodes=[])
         mock_cluster.return_value = cluster
         profile = docker_profile.DockerProfile('container', self.spec)
         ctx = mock.Mock()
@@ -248,7 +248,7 @@ class TestContainerDockerProfile(base.SenlinTestCase):
         node1 = mock.Mock(status='ERROR')
         node2 = mock.Mock(status='ERROR')
         node3 = mock.Mock(status='ERROR')
-        cluster = mock.Mock(rt={'nodes': [node1, node2, node3]})
+        cluster = mock.Mock(nodes=[node1, node2, node3])
         mock_cluster.return_value = cluster
         profile = docker_profile.DockerProfile('container', self.spec)
         ctx = mock.Mock()
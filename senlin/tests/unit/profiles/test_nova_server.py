@@ -959,18 +959,82 @@ class TestNovaServerBasic(base.SenlinTestCase):
         cc.server_get.return_value = None
         profile._computeclient = cc
 
-        test_server = mock.Mock(physical_id='FAKE_ID')
+        test_server = mock.Mock(physical_id='FAKE_ID', data={})
 
         res = profile.do_check(test_server)
         cc.server_get.assert_called_once_with('FAKE_ID')
         self.assertFalse(res)
 
-        return_server = mock.Mock()
+        return_server = mock.Mock(availability_zone='AZ1',
+                                  hypervisor_hostname='HOST1')
         return_server.status = 'ACTIVE'
         cc.server_get.return_value = return_server
         res = profile.do_check(test_server)
         cc.server_get.assert_called_with('FAKE_ID')
         self.assertTrue(res)
+        placement = test_server.data['placement']
+        self.assertEqual('AZ1', placement['zone'])
+        self.assertEqual('HOST1', placement['host'])
+        self.assertIn('synced_at', placement)
+
+    def test__update_placement_keep_host_qualified_zone(self):
+        profile = server.ServerProfile('t', self.spec)
+        obj = mock.Mock(data={'placement': {'zone': 'nova:host1',
+                                            'servergroup': 'SG'}})
+        srv = mock.Mock(availability_zone='nova',
+                        hypervisor_hostname='host1')
+
+        profile._update_placement(obj, srv)
+
+        placement = obj.data['placement']
+        self.assertEqual('nova:host1', placement['zone'])
+        self.assertEqual('host1', placement['host'])
+        self.assertEqual('SG', placement['servergroup'])
+
+    def test__update_placement_zone_changed(self):
+        profile = server.ServerProfile('t', self.spec)
+        obj = mock.Mock(data={'placement': {'zone': 'AZ1'}})
+        srv = mock.Mock(availability_zone='AZ2', hypervisor_hostname=None)
+
+        profile._update_placement(obj, srv)
+
+        self.assertEqual('AZ2', obj.data['placement']['zone'])
+        self.assertNotIn('host', obj.data['placement'])
+
+    def test_do_refresh_placement(self):
+        profile = server.ServerProfile('t', self.spec)
+        cc = mock.Mock()
+        cc.server_get.return_value = mock.Mock(availability_zone='AZ1',
+                                               hypervisor_hostname='HOST1')
+        profile._computeclient = cc
+        obj = mock.Mock(physical_id='FAKE_ID', data={})
+
+        res = profile.do_refresh_placement(obj)
+
+        self.assertTrue(res)
+        cc.server_get.assert_called_once_with('FAKE_ID')
+        self.assertEqual('AZ1', obj.data['placement']['zone'])
+
+    def test_do_refresh_placement_no_physical_id(self):
+        profile = server.ServerProfile('t', self.spec)
+        obj = mock.Mock(physical_id=None, data={})
+
+        res = profile.do_refresh_placement(obj)
+
+        self.assertFalse(res)
+        self.assertEqual({}, obj.data)
+
+    def test_do_refresh_placement_server_not_found(self):
+        profile = server.ServerProfile('t', self.spec)
+        cc = mock.Mock()
+        cc.server_get.return_value = None
+        profile._computeclient = cc
+        obj = mock.Mock(physical_id='FAKE_ID', data={})
+
+        res = profile.do_refresh_placement(obj)
+
+        self.assertFalse(res)
+        self.assertEqual({}, obj.data)
 
     @mock.patch.object(server.ServerProfile, 'do_rebuild')
     def test_do_recover_rebuild(self, mock_rebuild):
@@ -463,6 +463,20 @@ class TestProfileBase(base.SenlinTestCase):
         res_obj = profile.do_recover.return_value
         self.assertEqual(res_obj, res)
 
+    @mock.patch.object(pb.Profile, 'load')
+    def test_refresh_placement(self, mock_load):
+        profile = mock.Mock()
+        mock_load.return_value = profile
+        obj = mock.Mock()
+        obj.profile_id = 'FAKE_ID'
+
+        res = pb.Profile.refresh_placement(self.ctx, obj)
+
+        mock_load.assert_called_once_with(self.ctx, profile_id='FAKE_ID')
+        profile.do_refresh_placement.assert_called_once_with(obj)
+        res_obj = profile.do_refresh_placement.return_value
+        self.assertEqual(res_obj, res)
+
     @mock.patch.object(pb.Profile, 'load')
     def test_get_details(self, mock_load):
         profile = mock.Mock()
@@ -738,6 +752,8 @@ class TestProfileBase(base.SenlinTestCase):
         self.assertTrue(profile.do_leave(mock.Mock()))
         self.assertTrue(profile.do_rebuild(mock.Mock()))
         self.assertTrue(profile.do_validate(mock.Mock()))
+        self.assertRaises(NotImplementedError,
+                          profile.do_refresh_placement, mock.Mock())
 
     def test_do_recover_default(self):
         profile = self._create_profile('test-profile')
@@ -0,0 +1,102 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+import six
+import sqlalchemy
+
+from senlin.tests import benchmark
+from senlin.tests.benchmark import encoding
+from senlin.tests.benchmark import harness
+from senlin.tests.benchmark import node_records
+from senlin.tests.benchmark import spec
+from senlin.tests.unit.common import base
+
+
+class TestBenchmarkHarness(base.SenlinTestCase):
+
+    def test_percentile(self):
+        values = [5, 1, 4, 2, 3, 6, 7, 8, 9, 10]
+
+        self.assertEqual(5, harness.percentile(values, 50))
+        self.assertEqual(9, harness.percentile(values, 90))
+        self.assertEqual(10, harness.percentile(values, 99))
+        self.assertEqual(1, harness.percentile(values, 0))
+        self.assertIsNone(harness.percentile([], 50))
+
+    def test_summarize(self):
+        self.assertEqual({'count': 3, 'p50': 2, 'p90': 3, 'p99': 3,
+                          'max': 3},
+                         harness.summarize([3, 1, 2]))
+        self.assertEqual({'count': 0, 'p50': None, 'p90': None,
+                          'p99': None, 'max': None},
+                         harness.summarize([]))
+
+    def test_query_counter(self):
+        engine = sqlalchemy.create_engine('sqlite://')
+        counter = harness.QueryCounter(engine)
+
+        with engine.connect() as conn:
+            conn.execute(sqlalchemy.text('SELECT 1'))
+            with counter.paused():
+                conn.execute(sqlalchemy.text('SELECT 2'))
+            conn.execute(sqlalchemy.text('SELECT 3'))
+
+        self.assertEqual(2, counter.count)
+        counter.reset()
+        self.assertEqual(0, counter.count)
+
+    def test_run_command(self):
+        parser = benchmark.make_parser('A benchmark.')
+        parser.add_argument('--count', type=int, default=1)
+        run = mock.Mock(return_value={'count': 2})
+
+        with mock.patch('sys.stdout', new=six.StringIO()) as stdout:
+            res = benchmark.run_command(parser, run, ['--count', '2'])
+
+        self.assertEqual({'count': 2}, res)
+        self.assertEqual(2, run.call_args[0][0].count)
+        self.assertEqual('{\n  "count": 2\n}\n', stdout.getvalue())
+
+    def test_spec_measure(self):
+        for profile_type in spec.SPECS:
+            res = spec.measure(profile_type, iterations=2, reads=2)
+
+            self.assertEqual(['build_validate', 'reads', 'reads_unmemoized'],
+                             sorted(res))
+
+    def test_encoding_measure(self):
+        for name, threshold in encoding.CONFIGS:
+            res = encoding.measure(name, threshold, iterations=2)
+
+            self.assertEqual(['decode', 'encode', 'row_size'], sorted(res))
+            self.assertGreater(res['row_size'], 0)
+
+    def test_encoding_table_size(self):
+        res = encoding.table_size('msgpack', 256, rows=3, batch=2)
+
+        self.assertGreater(res, 0)
+
+    def test_node_records_measure(self):
+        for kind in node_records.BUILDERS:
+            res = node_records.measure(kind, nodes=2, iterations=2)
+
+            self.assertEqual(['build', 'memory'], sorted(res))
+
+    @mock.patch.object(node_records, 'tracemalloc', None)
+    def test_node_records_held_memory_without_tracemalloc(self):
+        values = [node_records.node_values(i) for i in range(2)]
+
+        res = node_records.held_memory(node_records.build_node_record,
+                                       values)
+
+        self.assertGreater(res, 0)
@@ -29,6 +29,7 @@ class TestRequestContext(base.SenlinTestCase):
             'trusts': None,
             'region_name': 'regionOne',
             'password': 'foo',
+            'read_primary': True,
             'is_admin': False  # needed for tests to work
         }
 
@@ -47,6 +48,7 @@ class TestRequestContext(base.SenlinTestCase):
             trusts=self.ctx.get('trusts'),
             region_name=self.ctx.get('region_name'),
             password=self.ctx.get('password'),
+            read_primary=self.ctx.get('read_primary'),
             is_admin=self.ctx.get('is_admin'))  # need for tests to work
 
         ctx_dict = ctx.to_dict()
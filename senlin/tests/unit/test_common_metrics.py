@@ -0,0 +1,195 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import eventlet
+import mock
+from oslo_config import cfg
+
+from senlin.common import exception
+from senlin.common import metrics
+from senlin.drivers.openstack import sdk
+from senlin.engine import senlin_lock
+from senlin.objects import cluster_lock as cl_obj
+from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
+
+
+class TestMetrics(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestMetrics, self).setUp()
+        self.registry = metrics.Registry()
+        self.registry.enabled = True
+
+    def test_disabled(self):
+        self.registry.enabled = False
+        counter = metrics.Counter('c', 'help', registry=self.registry)
+        histogram = metrics.Histogram('h', 'help', registry=self.registry)
+
+        counter.inc()
+        histogram.observe(1)
+
+        self.assertEqual({}, counter.samples)
+        self.assertEqual({}, histogram.samples)
+
+    def test_counter(self):
+        counter = metrics.Counter('senlin_things_total', 'Things.',
+                                  labels=('kind',), registry=self.registry)
+
+        counter.inc(kind='a')
+        counter.inc(2, kind='a')
+        counter.inc(kind='b"c')
+
+        self.assertEqual(
+            '# HELP senlin_things_total Things.\n'
+            '# TYPE senlin_things_total counter\n'
+            'senlin_things_total{kind="a"} 3.0\n'
+            'senlin_things_total{kind="b\\"c"} 1.0\n',
+            self.registry.render())
+
+    def test_gauge(self):
+        gauge = metrics.Gauge('g', 'Gauge.', labels=('status',),
+                              registry=self.registry)
+        gauge.set(5, status='READY')
+        gauge.set(3, status='READY')
+
+        self.assertEqual([(('READY',), 3)], gauge.collect())
+
+    def test_gauge_function(self):
+        gauge = metrics.Gauge('g', 'Gauge.', registry=self.registry)
+        gauge.set_function(lambda: 7)
+
+        self.assertEqual('# HELP g Gauge.\n# TYPE g gauge\ng 7.0\n',
+                         self.registry.render())
+
+        gauge.set_function(mock.Mock(side_effect=Exception('boom')))
+        self.assertEqual([], gauge.collect())
+
+    def test_histogram(self):
+        histogram = metrics.Histogram('h', 'Histogram.', labels=('op',),
+                                      registry=self.registry,
+                                      buckets=(0.1, 1))
+        histogram.observe(0.05, op='x')
+        histogram.observe(0.5, op='x')
+        histogram.observe(5, op='x')
+
+        self.assertEqual(
+            '# HELP h Histogram.\n'
+            '# TYPE h histogram\n'
+            'h_bucket{op="x",le="0.1"} 1.0\n'
+            'h_bucket{op="x",le="1.0"} 2.0\n'
+            'h_bucket{op="x",le="+Inf"} 3.0\n'
+            'h_sum{op="x"} 5.55\n'
+            'h_count{op="x"} 3.0\n',
+            self.registry.render())
+
+    @mock.patch.object(metrics.time, 'time')
+    def test_histogram_time(self, mock_time):
+        mock_time.side_effect = [10.0, 10.5]
+        histogram = metrics.Histogram('h', 'Histogram.',
+                                      registry=self.registry)
+
+        with histogram.time():
+            pass
+
+        self.assertEqual(1, histogram.samples[()]['count'])
+        self.assertEqual(0.5, histogram.samples[()]['sum'])
+
+    def test_metrics_app(self):
+        start_response = mock.Mock()
+        res = metrics.metrics_app({'PATH_INFO': '/metrics'}, start_response)
+
+        self.assertIn(b'# TYPE senlin_action_claim_seconds histogram',
+                      res[0])
+        start_response.assert_called_once_with('200 OK', mock.ANY)
+
+        start_response.reset_mock()
+        metrics.metrics_app({'PATH_INFO': '/other'}, start_response)
+        start_response.assert_called_once_with('404 Not Found', mock.ANY)
+
+    @mock.patch.object(eventlet, 'spawn_n')
+    @mock.patch.object(eventlet, 'listen')
+    def test_serve_next_free_port(self, mock_listen, mock_spawn):
+        sock = mock.Mock()
+        mock_listen.side_effect = [EnvironmentError('in use'), sock]
+
+        res = metrics.serve(9780, host='127.0.0.1', tries=3)
+
+        self.assertEqual(9781, res)
+        mock_listen.assert_has_calls([mock.call(('127.0.0.1', 9780)),
+                                      mock.call(('127.0.0.1', 9781))])
+        mock_spawn.assert_called_once_with(mock.ANY, sock,
+                                           metrics.metrics_app,
+                                           log_output=False)
+
+    @mock.patch.object(eventlet, 'listen')
+    def test_serve_no_free_port(self, mock_listen):
+        mock_listen.side_effect = EnvironmentError('in use')
+
+        self.assertIsNone(metrics.serve(9780, host='127.0.0.1', tries=2))
+        self.assertEqual(2, mock_listen.call_count)
+
+    @mock.patch.object(metrics, 'serve')
+    def test_setup(self, mock_serve):
+        self.assertIsNone(metrics.setup(9780))
+        self.assertEqual(0, mock_serve.call_count)
+
+        cfg.CONF.set_override('enabled', True, group='metrics')
+        self.addCleanup(setattr, metrics.REGISTRY, 'enabled', False)
+        mock_serve.return_value = 9780
+
+        self.assertEqual(9780, metrics.setup(9780, tries=4))
+        self.assertTrue(metrics.REGISTRY.enabled)
+        mock_serve.assert_called_once_with(9780, tries=4)
+
+
+class TestInstrumentation(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestInstrumentation, self).setUp()
+        self.ctx = utils.dummy_context()
+        metrics.REGISTRY.enabled = True
+        self.addCleanup(setattr, metrics.REGISTRY, 'enabled', False)
+        self.addCleanup(metrics.REGISTRY.reset)
+
+    @mock.patch.object(cl_obj.ClusterLock, 'acquire')
+    def test_lock_contention(self, mock_acquire):
+        mock_acquire.return_value = ['ACTION_ID']
+        self.assertTrue(senlin_lock.cluster_lock_acquire(
+            self.ctx, 'CLUSTER_ID', 'ACTION_ID', forced=True))
+        self.assertEqual({}, metrics.LOCK_CONTENTIONS.samples)
+
+        mock_acquire.return_value = ['OTHER_ID']
+        self.patchobject(cl_obj.ClusterLock, 'steal',
+                         return_value=['OTHER_ID'])
+        self.assertFalse(senlin_lock.cluster_lock_acquire(
+            self.ctx, 'CLUSTER_ID', 'ACTION_ID', forced=True))
+
+        self.assertEqual({('cluster',): 1}, metrics.LOCK_CONTENTIONS.samples)
+        self.assertEqual(
+            2, metrics.LOCK_ACQUIRE_SECONDS.samples[('cluster',)]['count'])
+
+    def test_driver_call(self):
+        class FakeDriver(object):
+            @sdk.translate_exception
+            def server_get(self, server_id):
+                if server_id is None:
+                    raise Exception('boom')
+                return server_id
+
+        driver = FakeDriver()
+        driver.server_get('FAKE_ID')
+        self.assertRaises(exception.InternalError, driver.server_get, None)
+
+        key = ('FakeDriver', 'server_get')
+        self.assertEqual(2, metrics.DRIVER_CALL_SECONDS.samples[key]['count'])
+        self.assertEqual({key: 1}, metrics.DRIVER_CALL_ERRORS.samples)
@@ -865,6 +865,46 @@ class TestSpec(base.SenlinTestCase):
         res = sot['key2']
         self.assertEqual(2, res)
 
+    def test___getitem___resolved_once(self):
+        data = {'key2': 2}
+        sot = schema.Spec(self.spec_schema, data, version='1.2')
+        mock_resolve = self.patchobject(sot, 'resolve_value',
+                                        wraps=sot.resolve_value)
+
+        sot.validate()
+        self.assertEqual(2, sot['key2'])
+        self.assertEqual(2, sot['key2'])
+        self.assertEqual(2, mock_resolve.call_count)
+
+        data['key2'] = 3
+        sot.invalidate()
+        self.assertEqual(3, sot['key2'])
+        self.assertEqual(3, mock_resolve.call_count)
+
+    def test___getitem___copies(self):
+        spec_schema = {
+            'key1': schema.List(
+                'a list',
+                schema=schema.Map('a map', schema={
+                    'name': schema.String('a name'),
+                    'tags': schema.Map('free form map'),
+                }),
+            ),
+        }
+        tags = {'k': ['v']}
+        data = {'key1': [{'name': 'n1', 'tags': tags}]}
+        sot = schema.Spec(spec_schema, data)
+
+        res = sot['key1']
+        res[0]['name'] = 'n2'
+        res[0]['tags']['k2'] = 'v2'
+        res.append({})
+
+        self.assertEqual([{'name': 'n1', 'tags': {'k': ['v']}}], sot['key1'])
+        self.assertIsNot(sot['key1'][0]['tags'], sot['key1'][0]['tags'])
+        # Values of free form maps are shared, as if they were resolved again
+        self.assertIs(tags['k'], sot['key1'][0]['tags']['k'])
+
     def test___len__(self):
         data = {'key2': 2}
         sot = schema.Spec(self.spec_schema, data, version='1.2')
@@ -186,6 +186,23 @@ class TestParseLevelValues(base.SenlinTestCase):
         self.assertIsNone(res)
 
 
+class TestChangedValues(base.SenlinTestCase):
+
+    def test_unknown_stored(self):
+        values = {'a': 1, 'b': {'c': 2}}
+        self.assertEqual(values, utils.changed_values(values, None))
+
+    def test_changed(self):
+        stored = {'a': 1, 'b': {'c': 2}, 'd': 'x'}
+        values = {'a': 1, 'b': {'c': 3}, 'd': 'x', 'e': None}
+        self.assertEqual({'b': {'c': 3}, 'e': None},
+                         utils.changed_values(values, stored))
+
+    def test_unchanged(self):
+        values = {'a': 1, 'b': {'c': 2}}
+        self.assertEqual({}, utils.changed_values(values, dict(values)))
+
+
 class TestGetPathParser(base.SenlinTestCase):
 
     def test_normal(self):